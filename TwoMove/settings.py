@@ -26,6 +26,7 @@ INSTALLED_APPS = [
     'django.contrib.messages',
     'django.contrib.staticfiles',
 
+    'apps.core.apps.CoreConfig',
     'apps.users.apps.UsersConfig',
     'apps.bikes.apps.BikesConfig',
     'apps.stations',
@@ -34,6 +35,7 @@ INSTALLED_APPS = [
     'apps.transactions.apps.TransactionsConfig',
     'apps.iot.apps.IotConfig',
     'apps.payment.apps.PaymentConfig',   
+    'apps.notifications.apps.NotificationsConfig',
      "apps.admin_dashboard.apps.AdminDashboardConfig",
     'rest_framework',
     
@@ -117,7 +119,10 @@ MEDIA_ROOT = os.path.join(BASE_DIR, 'media')
 
 
 
-EMAIL_BACKEND = 'django.core.mail.backends.smtp.EmailBackend'
+# Para pruebas locales: EMAIL_BACKEND=django.core.mail.backends.filebased.EmailBackend (escribe en EMAIL_FILE_PATH)
+EMAIL_BACKEND = os.environ.get("EMAIL_BACKEND", 'django.core.mail.backends.smtp.EmailBackend')
+EMAIL_FILE_PATH = os.environ.get("EMAIL_FILE_PATH", os.path.join(BASE_DIR, "sent_emails"))
+EMAIL_TIMEOUT = 20                    # segundos; evita que un SMTP colgado bloquee al worker
 EMAIL_HOST = 'smtp.gmail.com'
 EMAIL_PORT = 587
 EMAIL_USE_TLS = True
@@ -167,4 +172,77 @@ LOGGING = {
 
 
 STRIPE_PUBLIC_KEY = ''
-STRIPE_SECRET_KEY = ''
\ No newline at end of file
+STRIPE_SECRET_KEY = ''
+
+
+
+# Ingesta de telemetría IoT (mqtt_listener en modo por lotes)
+IOT_TELEMETRY_BATCH_SIZE = 500        # registros por bulk_create
+IOT_TELEMETRY_FLUSH_INTERVAL = 1.0    # segundos máximos entre vaciados
+IOT_TELEMETRY_MAX_PENDING = 50000     # tope de la cola en memoria (el resto se descarta)
+IOT_TELEMETRY_RETENTION_DAYS = 7      # días de telemetría cruda antes de compactar por minuto
+
+# Feed en vivo del mapa IoT (Server-Sent Events)
+IOT_LIVE_FEED_INTERVAL = 1.0          # segundos entre consultas incrementales (una por proceso)
+IOT_LIVE_FEED_HEARTBEAT = 15          # segundos entre comentarios de keep-alive
+IOT_LIVE_FEED_MAX_QUEUE = 100         # deltas pendientes por cliente antes de forzar resync
+
+# Búsqueda geográfica de estaciones (índice en memoria por proceso)
+STATIONS_GEO_CELL_KM = 0.5            # lado aproximado de cada celda de la rejilla
+STATIONS_GEO_INDEX_TTL = 300          # segundos antes de reconstruir (cambios de otros procesos)
+
+# Motor de rutas local para la simulación IoT
+IOT_ROUTE_CACHE_DIR = os.environ.get("IOT_ROUTE_CACHE_DIR", os.path.join(BASE_DIR, "route_cache"))
+IOT_ROAD_GRAPH_FILE = os.environ.get("IOT_ROAD_GRAPH_FILE")  # JSON opcional {"nodos": ..., "aristas": ...}
+IOT_ROUTE_MEMORY_MAX = 5000           # rutas en memoria por proceso (50 estaciones = 2.450 pares)
+IOT_OSRM_TIMEOUT = 3                  # segundos máximos de espera a OSRM
+
+# Simulación IoT de viajes (planificador único por proceso)
+IOT_MQTT_HOST = os.environ.get("IOT_MQTT_HOST", "localhost")
+IOT_MQTT_PORT = int(os.environ.get("IOT_MQTT_PORT", 1883))
+IOT_SIM_MAX_ACTIVE = 200              # viajes simulados a la vez; el resto espera turno
+IOT_SIM_INTERVAL = 1.0                # segundos entre puntos de un mismo viaje
+
+# Listeners MQTT en varios procesos (manage.py run_listeners)
+IOT_MQTT_PARTITIONS = int(os.environ.get("IOT_MQTT_PARTITIONS", 1))  # particiones por bike_id (= workers)
+IOT_LISTENER_HEALTH_INTERVAL = 5.0    # segundos entre latidos de cada worker
+IOT_LISTENER_MAX_LAG_MS = 5000        # lag de ingesta a partir del cual un worker se marca atrasado
+
+# Outbox de trabajos diferidos (manage.py process_outbox --continuo)
+OUTBOX_MAX_INTENTOS = 5               # intentos antes de marcar un mensaje como fallido
+OUTBOX_BACKOFF_BASE = 30              # segundos del primer reintento (se duplica en cada fallo)
+OUTBOX_BACKOFF_MAX = 3600             # tope de espera entre reintentos
+OUTBOX_RESERVA_SEGUNDOS = 300         # tiempo tras el cual un mensaje reclamado por un worker caído se libera
+OUTBOX_INTERVALO = 2.0                # segundos de espera del worker con la cola vacía
+
+# Despacho de correo con conexión SMTP persistente (apps/notifications/services/mail_dispatcher.py)
+MAIL_MENSAJES_POR_CONEXION = 100      # mensajes por sesión SMTP antes de reconectar (Gmail corta ~100)
+MAIL_CONEXION_MAX_INACTIVA = 60       # segundos de inactividad tras los que se reabre la conexión
+
+# KPIs del panel administrativo (apps/admin_dashboard/services/kpi_service.py)
+KPI_CACHE_TTL = 30                    # segundos máximos de un KPI en caché (se invalida antes si hay cambios)
+
+# Caché de datos calientes (apps/core/services/cache_service.py)
+# memoria: por proceso (desarrollo, un solo worker) · archivo: compartida entre los
+# workers de una máquina · redis: compartida entre máquinas (requiere el paquete `redis`)
+CACHE_BACKEND = os.environ.get("CACHE_BACKEND", "memoria")
+_CACHE_OPCIONES = {
+    "memoria": ("django.core.cache.backends.locmem.LocMemCache", "twomove"),
+    "archivo": ("django.core.cache.backends.filebased.FileBasedCache",
+                os.environ.get("CACHE_DIR", os.path.join(BASE_DIR, "cache"))),
+    "redis": ("django.core.cache.backends.redis.RedisCache",
+              os.environ.get("CACHE_URL", "redis://localhost:6379/1")),
+}
+CACHES = {
+    "default": {
+        "BACKEND": _CACHE_OPCIONES[CACHE_BACKEND][0],
+        "LOCATION": _CACHE_OPCIONES[CACHE_BACKEND][1],
+        "TIMEOUT": 300,                   # TTL por defecto; cada espacio puede fijar el suyo
+        "KEY_PREFIX": "twomove",
+        **({} if CACHE_BACKEND == "redis" else {"OPTIONS": {"MAX_ENTRIES": 5000}}),
+    }
+}
+CACHE_ESTACIONES_TTL = 60             # listado de estaciones con disponibilidad
+CACHE_ESTACIONES_GEO_TTL = 3600       # coordenadas de estaciones (cambian muy poco)
+CACHE_ADMINS_TTL = 300                # verificación de rol de administrador por usuario
+CACHE_CALENTAR_AL_INICIAR = True      # precarga al arrancar cada worker (gunicorn.conf.py)
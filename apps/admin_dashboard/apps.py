@@ -4,3 +4,6 @@ from django.apps import AppConfig
 class AdminDashboardConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'apps.admin_dashboard'
+
+    def ready(self):
+        from apps.admin_dashboard import signals  # noqa: F401  (espacios de caché del panel)
@@ -0,0 +1,42 @@
+import time
+from datetime import date, timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from apps.admin_dashboard.services.parquet_export_service import ParquetExportService
+
+
+class Command(BaseCommand):
+    help = ("Exporta viajes, transacciones de wallet y telemetría de un rango de fechas a Parquet "
+            "(lectura por lotes, columnas tipadas, un archivo por día)")
+
+    def add_arguments(self, parser):
+        parser.add_argument('destino', help='Directorio de salida')
+        parser.add_argument('--desde', type=date.fromisoformat, help='Fecha inicial AAAA-MM-DD (por defecto ayer)')
+        parser.add_argument('--hasta', type=date.fromisoformat, help='Fecha final AAAA-MM-DD, inclusiva (por defecto --desde)')
+        parser.add_argument('--dataset', action='append', dest='datasets',
+                            choices=sorted(ParquetExportService.DATASETS),
+                            help='Dataset a exportar (se puede repetir). Por defecto todos.')
+        parser.add_argument('--lote', type=int, default=ParquetExportService.LOTE, help='Filas por consulta / row group')
+
+    def handle(self, *args, **options):
+        if not ParquetExportService.disponible():
+            raise CommandError("Instale 'pyarrow' para exportar a Parquet.")
+
+        desde = options['desde'] or timezone.localdate() - timedelta(days=1)
+        hasta = options['hasta'] or desde
+        inicio = time.perf_counter()
+        try:
+            resumen = ParquetExportService.exportar(
+                desde, hasta, options['destino'], datasets=options['datasets'], lote=options['lote']
+            )
+        except ValueError as e:
+            raise CommandError(str(e))
+        duracion = time.perf_counter() - inicio
+
+        for dataset, datos in resumen.items():
+            self.stdout.write(f"📦 {dataset}: {datos['filas']} filas en {len(datos['archivos'])} archivos")
+        self.stdout.write(self.style.SUCCESS(
+            f"✅ Exportación {desde}..{hasta} completada en {duracion:.2f}s en {options['destino']}."
+        ))
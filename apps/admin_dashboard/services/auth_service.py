@@ -1,6 +1,8 @@
+from django.conf import settings
 from django.contrib.auth import authenticate, login, logout
 from django.core.exceptions import PermissionDenied
 from apps.admin_dashboard.models import Administrador
+from apps.core.services.cache_service import cache_datos
 
 
 class AdminAuthService:
@@ -8,6 +10,28 @@ class AdminAuthService:
     Servicio de autenticación para administradores del panel TwoMove.
     """
 
+    ESPACIO_CACHE = "admins"
+
+    @staticmethod
+    def es_admin(usuario):
+        """
+        True si el usuario tiene perfil de administrador activo. Se consulta en
+        cada vista del panel, así que se guarda en caché por usuario (el espacio
+        se invalida con cualquier cambio de Administrador, ver signals.py).
+        """
+        if not getattr(usuario, "is_authenticated", False):
+            return False
+        return cache_datos.obtener(
+            AdminAuthService.ESPACIO_CACHE,
+            usuario.pk,
+            lambda: Administrador.objects.filter(usuario_id=usuario.pk, activo=True).exists(),
+            tipo=bool,
+        )
+
+    @staticmethod
+    def ttl_cache():
+        return getattr(settings, "CACHE_ADMINS_TTL", 300)
+
     @staticmethod
     def autenticar_admin(request, email, password):
         """
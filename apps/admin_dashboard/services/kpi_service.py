@@ -0,0 +1,107 @@
+# apps/admin_dashboard/services/kpi_service.py
+from datetime import datetime, time
+from decimal import Decimal
+
+from django.conf import settings
+from django.db.models import Count, DecimalField, Func, Q, Subquery, Sum
+from django.utils import timezone
+
+from apps.bikes.models import Bike
+from apps.core.services.cache_service import cache_datos
+from apps.rentals.models import Rental
+from apps.stations.models import Station
+from apps.wallet.models import Wallet
+
+
+class _Escalar(Subquery):
+    """
+    Subconsulta escalar sin correlación (p. ej. SELECT COUNT(*) FROM otra_tabla)
+    admitida dentro de `aggregate()`: así un conteo de otra tabla viaja en la
+    misma consulta que las agregaciones condicionales. El agregado interno va
+    como Func para que el ORM no agregue un GROUP BY.
+    """
+
+    contains_aggregate = True
+
+
+class KpiService:
+    """
+    Indicadores del panel administrativo (dashboard_home y su endpoint JSON).
+
+    Todo sale de dos consultas con agregación condicional (COUNT ... FILTER /
+    CASE WHEN según el motor): una sobre la flota (bicicletas y estaciones) y otra
+    sobre la operación (viajes y saldo de wallets). El resultado se guarda en el
+    espacio "kpis" de la caché de datos con un TTL corto y se invalida tras el
+    commit de cualquier cambio en bicicletas, estaciones, viajes o wallets
+    (apps/admin_dashboard/signals.py), así que un panel que se refresca solo no
+    vuelve a consultar la base de datos mientras nada cambie.
+    """
+
+    ESPACIO_CACHE = "kpis"
+
+    # Estados que escriben los servicios de viaje además de los de Bike.STATUS_CHOICES
+    ESTADOS_EN_USO = ("in_use", "en_uso")
+    ESTADOS_BLOQUEADA = ("block",)
+
+    @staticmethod
+    def ttl():
+        return getattr(settings, "KPI_CACHE_TTL", 30)
+
+    # ============================================================
+    # 📊 Instantánea (con caché)
+    # ============================================================
+    @staticmethod
+    def obtener():
+        """Indicadores actuales; solo consulta la base de datos si la caché expiró o se invalidó."""
+        return cache_datos.obtener(KpiService.ESPACIO_CACHE, "panel", KpiService.calcular, tipo=dict)
+
+    @staticmethod
+    def invalidar():
+        cache_datos.invalidar(KpiService.ESPACIO_CACHE)
+
+    # ============================================================
+    # 🧮 Cálculo (dos consultas)
+    # ============================================================
+    @staticmethod
+    def calcular():
+        flota = Bike.objects.aggregate(
+            total_bikes=Count("id"),
+            disponibles=Count("id", filter=Q(estado="available")),
+            reservadas=Count("id", filter=Q(estado="reserved")),
+            en_uso=Count("id", filter=Q(estado__in=KpiService.ESTADOS_EN_USO)),
+            bloqueadas=Count("id", filter=Q(estado__in=KpiService.ESTADOS_BLOQUEADA)),
+            mantenimiento=Count("id", filter=Q(estado="maintenance")),
+            no_disponibles=Count("id", filter=Q(estado="unavailable")),
+            electricas=Count("id", filter=Q(tipo="electric")),
+            total_stations=_Escalar(Station.objects.order_by().values(n=Func("id", function="COUNT"))),
+        )
+
+        inicio_hoy = timezone.make_aware(datetime.combine(timezone.localdate(), time.min))
+        operacion = Rental.objects.aggregate(
+            total_rentals=Count("id"),
+            reservados=Count("id", filter=Q(estado="reservado")),
+            activos=Count("id", filter=Q(estado="activo")),
+            finalizados=Count("id", filter=Q(estado="finalizado")),
+            cancelados=Count("id", filter=Q(estado="cancelado")),
+            viajes_hoy=Count("id", filter=Q(creado_en__gte=inicio_hoy)),
+            ingresos_hoy=Sum("costo_total", filter=Q(estado="finalizado", hora_fin__gte=inicio_hoy)),
+            total_wallets=_Escalar(
+                Wallet.objects.order_by().values(s=Func("balance", function="SUM")),
+                output_field=DecimalField(max_digits=14, decimal_places=2),
+            ),
+        )
+
+        datos = {**flota, **operacion}
+        datos["ingresos_hoy"] = datos["ingresos_hoy"] or Decimal("0.00")
+        datos["total_wallets"] = datos["total_wallets"] or Decimal("0.00")
+        datos["calculado_en"] = timezone.now()
+        return datos
+
+    @staticmethod
+    def serializar(datos):
+        """Versión JSON (decimales como texto para no perder centavos)."""
+        return {
+            clave: str(valor) if isinstance(valor, Decimal) else
+            valor.isoformat() if isinstance(valor, datetime) else valor
+            for clave, valor in datos.items()
+        }
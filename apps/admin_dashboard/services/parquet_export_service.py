@@ -0,0 +1,180 @@
+# apps/admin_dashboard/services/parquet_export_service.py
+import os
+import tempfile
+import zipfile
+from datetime import datetime, time, timedelta
+
+from django.utils import timezone
+
+from apps.iot.models import BikeTelemetry
+from apps.rentals.models import Rental
+from apps.transactions.models import WalletTransaccion
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # dependencia opcional: solo la usa esta exportación
+    pa = pq = None
+
+
+class ParquetExportService:
+    """
+    Exportación columnar para analítica (Parquet, un archivo por dataset y día).
+
+    Cada día del rango se lee por lotes de id (WHERE fecha en el día AND id > último
+    ORDER BY id LIMIT n) con `.values()`, sin instanciar modelos, y cada lote se
+    escribe como un row group con un esquema fijo: enteros, decimales, fechas en UTC
+    y textos tipados aunque el lote venga con nulos. La salida queda particionada
+    al estilo Hive (`<dataset>/fecha=AAAA-MM-DD/<dataset>.parquet`), que pandas y
+    pyarrow leen directamente como un solo dataset.
+    """
+
+    LOTE = 10000
+    COMPRESION = "snappy"
+
+    # dataset → (modelo, campo de fecha que define la partición, [(columna, tipo)])
+    DATASETS = {
+        "viajes": (Rental, "creado_en", [
+            ("id", "int64"),
+            ("usuario_id", "int64"),
+            ("bike_id", "int64"),
+            ("estacion_origen_id", "int64"),
+            ("estacion_destino_id", "int64"),
+            ("tipo_viaje", "string"),
+            ("estado", "string"),
+            ("metodo_pago", "string"),
+            ("hora_inicio", "timestamp"),
+            ("hora_fin", "timestamp"),
+            ("duracion_minutos", "int32"),
+            ("costo_estimado", ("decimal", 10, 2)),
+            ("costo_total", ("decimal", 10, 2)),
+            ("creado_en", "timestamp"),
+        ]),
+        "transacciones": (WalletTransaccion, "creado_en", [
+            ("id", "int64"),
+            ("wallet_id", "int64"),
+            ("tipo", "string"),
+            ("monto", ("decimal", 12, 2)),
+            ("saldo_resultante", ("decimal", 12, 2)),
+            ("referencia_externa", "string"),
+            ("creado_en", "timestamp"),
+        ]),
+        "telemetria": (BikeTelemetry, "timestamp", [
+            ("id", "int64"),
+            ("bike_id", "int64"),
+            ("timestamp", "timestamp"),
+            ("latitude", "float64"),
+            ("longitude", "float64"),
+            ("battery", "float64"),
+            ("lock_status", "string"),
+            ("received_at", "timestamp"),
+        ]),
+    }
+
+    # ============================================================
+    # 🧱 Esquemas
+    # ============================================================
+    @staticmethod
+    def disponible():
+        return pa is not None
+
+    @staticmethod
+    def _requerir_pyarrow():
+        if pa is None:
+            raise RuntimeError("La exportación Parquet requiere el paquete 'pyarrow' (ver requirements.txt).")
+
+    @staticmethod
+    def esquema(dataset):
+        """Esquema Arrow del dataset (los tipos no dependen de los datos de cada lote)."""
+        ParquetExportService._requerir_pyarrow()
+        _, _, columnas = ParquetExportService.DATASETS[dataset]
+        return pa.schema([(nombre, ParquetExportService._tipo_arrow(tipo)) for nombre, tipo in columnas])
+
+    @staticmethod
+    def _tipo_arrow(tipo):
+        if isinstance(tipo, tuple):
+            _, precision, escala = tipo
+            return pa.decimal128(precision, escala)
+        if tipo == "timestamp":
+            return pa.timestamp("us", tz="UTC")
+        return getattr(pa, tipo)()
+
+    # ============================================================
+    # 📦 Exportación
+    # ============================================================
+    @staticmethod
+    def exportar(desde, hasta, destino, datasets=None, lote=None):
+        """
+        Escribe en `destino` los días `desde`..`hasta` (fechas locales, inclusivas)
+        de cada dataset. Los días sin registros no generan archivo.
+        Retorna {dataset: {"filas": n, "archivos": [rutas relativas a destino]}}.
+        """
+        ParquetExportService._requerir_pyarrow()
+        datasets = datasets or list(ParquetExportService.DATASETS)
+        desconocidos = set(datasets) - set(ParquetExportService.DATASETS)
+        if desconocidos:
+            raise ValueError(f"Dataset no válido: {', '.join(sorted(desconocidos))}")
+        if desde > hasta:
+            raise ValueError("La fecha 'desde' no puede ser posterior a 'hasta'.")
+
+        resumen = {}
+        for dataset in datasets:
+            resumen[dataset] = {"filas": 0, "archivos": []}
+            dia = desde
+            while dia <= hasta:
+                relativa = os.path.join(dataset, f"fecha={dia.isoformat()}", f"{dataset}.parquet")
+                filas = ParquetExportService._escribir_dia(
+                    dataset, dia, os.path.join(destino, relativa), lote or ParquetExportService.LOTE
+                )
+                if filas:
+                    resumen[dataset]["filas"] += filas
+                    resumen[dataset]["archivos"].append(relativa)
+                dia += timedelta(days=1)
+            print(f"📦 Parquet {dataset}: {resumen[dataset]['filas']} filas en "
+                  f"{len(resumen[dataset]['archivos'])} archivos")
+        return resumen
+
+    @staticmethod
+    def _escribir_dia(dataset, dia, ruta, lote):
+        modelo, campo_fecha, columnas = ParquetExportService.DATASETS[dataset]
+        nombres = [nombre for nombre, _ in columnas]
+        inicio = timezone.make_aware(datetime.combine(dia, time.min))
+        fin = timezone.make_aware(datetime.combine(dia + timedelta(days=1), time.min))
+        registros = modelo.objects.filter(**{f"{campo_fecha}__gte": inicio, f"{campo_fecha}__lt": fin})
+
+        esquema = ParquetExportService.esquema(dataset)
+        escritor, total, ultimo_id = None, 0, 0
+        try:
+            while True:
+                filas = list(registros.filter(pk__gt=ultimo_id).order_by("pk").values(*nombres)[:lote])
+                if not filas:
+                    break
+                if escritor is None:
+                    os.makedirs(os.path.dirname(ruta), exist_ok=True)
+                    escritor = pq.ParquetWriter(ruta, esquema, compression=ParquetExportService.COMPRESION)
+                escritor.write_batch(pa.RecordBatch.from_pylist(filas, schema=esquema))
+                total += len(filas)
+                ultimo_id = filas[-1]["id"]
+                if len(filas) < lote:
+                    break
+        finally:
+            if escritor is not None:
+                escritor.close()
+        return total
+
+    @staticmethod
+    def exportar_zip(desde, hasta, datasets=None, lote=None):
+        """
+        Exporta a un directorio temporal y empaqueta el resultado en un ZIP
+        (archivo temporal abierto, posicionado al inicio). Los Parquet ya van
+        comprimidos, así que el ZIP solo los almacena.
+        """
+        archivo = tempfile.TemporaryFile(suffix=".zip")
+        with tempfile.TemporaryDirectory(prefix="parquet_") as directorio:
+            resumen = ParquetExportService.exportar(desde, hasta, directorio, datasets, lote)
+            with zipfile.ZipFile(archivo, "w", compression=zipfile.ZIP_STORED) as zf:
+                for datos in resumen.values():
+                    for relativa in datos["archivos"]:
+                        zf.write(os.path.join(directorio, relativa), relativa.replace(os.sep, "/"))
+        archivo.seek(0)
+        return archivo, resumen
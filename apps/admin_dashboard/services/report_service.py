@@ -2,40 +2,57 @@
 import csv
 import io
 from decimal import Decimal
-from datetime import datetime
+from datetime import datetime, time, timedelta
 from django.utils import timezone
-from django.db.models import Sum
+from django.db.models import QuerySet
+from django.db.models import Avg, Count, Sum
 from reportlab.lib.pagesizes import letter
 from reportlab.lib import colors
 from reportlab.pdfgen import canvas
 from reportlab.lib.units import inch
-from apps.rentals.models import Rental
+from apps.rentals.models import DuracionMinutos, Rental
+from apps.rentals.services.user_stats_service import UserStatsService
 from apps.users.models import Usuario
 
 
+class _Eco:
+    """Pseudo-archivo para csv.writer: `write` devuelve la línea en vez de guardarla."""
+
+    def write(self, valor):
+        return valor
+
+
 class ReportService:
     """
     Servicio para generar reportes generales o por usuario.
     """
 
+    LOTE_EXPORTACION = 2000
+    ENCABEZADO_CSV = [
+        "ID", "Usuario", "Origen", "Destino",
+        "Inicio", "Fin", "Duración (min)", "Costo", "Estado"
+    ]
+
     # ============================================================
     # 📊 Reporte general
     # ============================================================
     @staticmethod
     def resumen_general():
-        """Devuelve datos agregados de toda la operación."""
-        rentals = Rental.objects.filter(estado="finalizado")
+        """
+        Devuelve datos agregados de toda la operación.
+        Una sola consulta de agregación: no se cargan viajes en memoria.
+        """
+        datos = Rental.objects.filter(estado="finalizado").aggregate(
+            total_viajes=Count("id"),
+            total_usuarios=Count("usuario", distinct=True),
+            total_recaudado=Sum("costo_total"),
+            promedio_duracion=Avg(DuracionMinutos("hora_inicio", "hora_fin")),
+        )
 
-        total_viajes = rentals.count()
-        total_usuarios = rentals.values("usuario").distinct().count()
-        total_recaudado = rentals.aggregate(total=Sum("costo_total"))["total"] or Decimal("0.00")
-
-        # Duración promedio
-        duraciones = [
-            (r.hora_fin - r.hora_inicio).total_seconds() / 60
-            for r in rentals if r.hora_inicio and r.hora_fin
-        ]
-        promedio_duracion = round(sum(duraciones) / len(duraciones), 1) if duraciones else 0
+        total_viajes = datos["total_viajes"]
+        total_usuarios = datos["total_usuarios"]
+        total_recaudado = datos["total_recaudado"] or Decimal("0.00")
+        promedio_duracion = round(datos["promedio_duracion"], 1) if datos["promedio_duracion"] is not None else 0
 
         # Estimación de CO₂ evitado: 0.3 kg por viaje
         co2_ev = round(total_viajes * 0.3, 2)
@@ -75,14 +92,16 @@ class ReportService:
             .order_by("-hora_inicio")
         )
 
-        total_viajes = viajes.count()
-        total_gasto = viajes.aggregate(total=Sum("costo_total"))["total"] or Decimal("0.00")
-
-        duraciones = [
-            (r.hora_fin - r.hora_inicio).total_seconds() / 60
-            for r in viajes if r.hora_inicio and r.hora_fin
-        ]
-        promedio_duracion = round(sum(duraciones) / len(duraciones), 1) if duraciones else 0
+        # Totales desde el resumen EstadisticasUsuario, cubriendo los mismos viajes
+        # del listado: finalizados + cancelados + los que siguen en curso (reservado
+        # o activo; la reserva admite uno por usuario, así que es un conteo por índice).
+        # Solo el fin de viaje cobra y fija hora_inicio/hora_fin, de modo que gasto y
+        # duración promedio salen de los finalizados sin cambiar su valor.
+        stats = UserStatsService.obtener(usuario)
+        en_curso = viajes.filter(estado__in=["reservado", "activo"]).count()
+        total_viajes = stats.viajes_finalizados + stats.viajes_cancelados + en_curso
+        total_gasto = stats.gasto_total
+        promedio_duracion = round(UserStatsService.duracion_promedio(stats), 1)
 
         print(f"✅ Usuario {usuario.email} - viajes: {total_viajes}, gasto: {total_gasto}, promedio: {promedio_duracion}")
 
@@ -98,34 +117,84 @@ class ReportService:
     # 🧾 Exportación CSV
     # ============================================================
     @staticmethod
-    def generar_csv_viajes(viajes):
-        """Crea un CSV a partir de una queryset de viajes."""
-        buffer = io.StringIO()
-        writer = csv.writer(buffer)
-        writer.writerow([
-            "ID", "Usuario", "Origen", "Destino",
-            "Inicio", "Fin", "Duración (min)", "Costo", "Estado"
-        ])
-
-        for r in viajes:
-            duracion = (
-                (r.hora_fin - r.hora_inicio).total_seconds() / 60
-                if r.hora_inicio and r.hora_fin else ""
+    def filtrar_viajes(usuario_id=None, desde=None, hasta=None, estado=None):
+        """
+        Viajes a exportar, con usuario y estaciones en el mismo SELECT (sin N+1).
+        `desde` y `hasta` son fechas (date) inclusivas sobre `creado_en`.
+        """
+        viajes = Rental.objects.select_related("usuario", "estacion_origen", "estacion_destino")
+        if usuario_id:
+            viajes = viajes.filter(usuario_id=usuario_id)
+        if desde:
+            viajes = viajes.filter(creado_en__gte=timezone.make_aware(datetime.combine(desde, time.min)))
+        if hasta:
+            viajes = viajes.filter(
+                creado_en__lt=timezone.make_aware(datetime.combine(hasta + timedelta(days=1), time.min))
             )
-            writer.writerow([
-                r.id,
-                getattr(r.usuario, "email", ""),
-                getattr(r.estacion_origen, "nombre", ""),
-                getattr(r.estacion_destino, "nombre", ""),
-                r.hora_inicio.strftime("%Y-%m-%d %H:%M:%S") if r.hora_inicio else "",
-                r.hora_fin.strftime("%Y-%m-%d %H:%M:%S") if r.hora_fin else "",
-                f"{duracion:.1f}" if duracion else "",
-                f"{r.costo_total:.2f}" if r.costo_total else "0",
-                r.estado,
-            ])
+        if estado:
+            viajes = viajes.filter(estado=estado)
+        return viajes
 
-        buffer.seek(0)
-        return buffer.getvalue()
+    @staticmethod
+    def iterar_viajes(viajes, lote=None):
+        """
+        Recorre un queryset por lotes de id (WHERE id > último ORDER BY id LIMIT n):
+        en memoria nunca hay más de `lote` viajes. Con MySQL, `.iterator()` no
+        basta porque el driver descarga el resultado completo al cliente.
+        """
+        if not isinstance(viajes, QuerySet):
+            yield from viajes
+            return
+        lote = lote or ReportService.LOTE_EXPORTACION
+        ultimo_id = 0
+        while True:
+            bloque = list(viajes.filter(pk__gt=ultimo_id).order_by("pk")[:lote])
+            if not bloque:
+                return
+            yield from bloque
+            ultimo_id = bloque[-1].pk
+
+    @staticmethod
+    def filas_csv_viajes(viajes, lote=None):
+        """
+        Genera el CSV por partes (encabezado y luego un bloque de texto por lote),
+        para `StreamingHttpResponse`: el primer byte sale antes de leer los viajes.
+        """
+        lote = lote or ReportService.LOTE_EXPORTACION
+        writer = csv.writer(_Eco())
+        yield writer.writerow(ReportService.ENCABEZADO_CSV)
+
+        bloque = []
+        for r in ReportService.iterar_viajes(viajes, lote):
+            bloque.append(writer.writerow(ReportService._fila_csv(r)))
+            if len(bloque) >= lote:
+                yield "".join(bloque)
+                bloque = []
+        if bloque:
+            yield "".join(bloque)
+
+    @staticmethod
+    def _fila_csv(r):
+        duracion = (
+            (r.hora_fin - r.hora_inicio).total_seconds() / 60
+            if r.hora_inicio and r.hora_fin else ""
+        )
+        return [
+            r.id,
+            getattr(r.usuario, "email", ""),
+            getattr(r.estacion_origen, "nombre", ""),
+            getattr(r.estacion_destino, "nombre", ""),
+            r.hora_inicio.strftime("%Y-%m-%d %H:%M:%S") if r.hora_inicio else "",
+            r.hora_fin.strftime("%Y-%m-%d %H:%M:%S") if r.hora_fin else "",
+            f"{duracion:.1f}" if duracion else "",
+            f"{r.costo_total:.2f}" if r.costo_total else "0",
+            r.estado,
+        ]
+
+    @staticmethod
+    def generar_csv_viajes(viajes):
+        """Crea un CSV completo en memoria (para volúmenes pequeños; ver `filas_csv_viajes`)."""
+        return "".join(ReportService.filas_csv_viajes(viajes))
 
     # ============================================================
     # 📄 PDF general
@@ -0,0 +1,28 @@
+from apps.admin_dashboard.models import Administrador
+from apps.admin_dashboard.services.auth_service import AdminAuthService
+from apps.admin_dashboard.services.kpi_service import KpiService
+from apps.bikes.models import Bike
+from apps.core.services.cache_service import cache_datos
+from apps.rentals.models import Rental
+from apps.stations.models import Station
+from apps.transactions.models import WalletTransaccion
+from apps.wallet.models import Wallet
+
+
+# ============================================================
+# 📊 KPIs del panel
+# ============================================================
+# Los movimientos de saldo se aplican con UPDATE y no emiten señal de Wallet;
+# los cubre el post_save del WalletTransaccion que los acompaña.
+cache_datos.registrar(
+    KpiService.ESPACIO_CACHE,
+    modelos=(Bike, Station, Rental, Wallet, WalletTransaccion),
+    ttl=KpiService.ttl(),
+    calentar=KpiService.obtener,
+)
+
+
+# ============================================================
+# 🔐 Roles de administrador
+# ============================================================
+cache_datos.registrar(AdminAuthService.ESPACIO_CACHE, modelos=(Administrador,), ttl=AdminAuthService.ttl_cache())
@@ -0,0 +1,108 @@
+from decimal import Decimal
+
+from django.core.cache import cache
+from django.db import transaction
+from django.test import TestCase, TransactionTestCase
+from django.utils import timezone
+
+from apps.admin_dashboard.models import Administrador
+from apps.admin_dashboard.services.kpi_service import KpiService
+from apps.bikes.models import Bike
+from apps.rentals.models import Rental
+from apps.stations.models import Station
+from apps.users.models import Usuario
+from apps.wallet.models import Wallet
+
+
+class TestKpiService(TestCase):
+    """Pruebas de los KPIs del panel (apps/admin_dashboard/services/kpi_service.py)."""
+
+    def setUp(self):
+        cache.clear()
+        self.addCleanup(cache.clear)
+        self.usuario = Usuario.objects.create_user(email="kpi@example.com", nombre="Ana", apellido="Ruiz",
+                                                   password="12345")
+        self.estacion = Station.objects.create(nombre="Estación Central", direccion="Calle 1 #2-3")
+        Station.objects.create(nombre="Estación Norte", direccion="Calle 80")
+
+        estados = ["available", "available", "reserved", "in_use", "en_uso", "block", "maintenance"]
+        self.bikes = [
+            Bike.objects.create(numero_serie=f"KPI-{i}", tipo="electric" if i % 2 else "manual", estado=estado,
+                                station=self.estacion)
+            for i, estado in enumerate(estados)
+        ]
+        for estado, costo in [("activo", None), ("finalizado", "4000"), ("finalizado", "2500.50"), ("cancelado", None)]:
+            Rental.objects.create(usuario=self.usuario, bike=self.bikes[0], estacion_origen=self.estacion,
+                                  estado=estado, hora_fin=timezone.now() if costo else None,
+                                  costo_total=Decimal(costo) if costo else None)
+        Wallet.objects.create(usuario=self.usuario, balance=Decimal("15000.25"))
+
+    def test_calcula_todo_en_dos_consultas(self):
+        with self.assertNumQueries(2):
+            datos = KpiService.calcular()
+
+        self.assertEqual(datos["total_bikes"], 7)
+        self.assertEqual(datos["disponibles"], 2)
+        # "en_uso" (inicio de viaje) cuenta igual que "in_use"
+        self.assertEqual(datos["en_uso"], 2)
+        self.assertEqual((datos["reservadas"], datos["bloqueadas"], datos["mantenimiento"]), (1, 1, 1))
+        self.assertEqual(datos["electricas"], 3)
+        self.assertEqual(datos["total_stations"], 2)
+
+        self.assertEqual(datos["total_rentals"], 4)
+        self.assertEqual((datos["activos"], datos["finalizados"], datos["cancelados"]), (1, 2, 1))
+        self.assertEqual(datos["viajes_hoy"], 4)
+        self.assertEqual(datos["ingresos_hoy"], Decimal("6500.50"))
+        self.assertEqual(datos["total_wallets"], Decimal("15000.25"))
+
+    def test_sin_datos(self):
+        Rental.objects.all().delete()
+        Wallet.objects.all().delete()
+        datos = KpiService.calcular()
+        self.assertEqual(datos["total_rentals"], 0)
+        self.assertEqual(datos["ingresos_hoy"], Decimal("0.00"))
+        self.assertEqual(datos["total_wallets"], Decimal("0.00"))
+
+    def test_vistas(self):
+        self.client.force_login(self.usuario)
+        self.assertEqual(self.client.get("/admin-dashboard/home/kpis/").status_code, 403)
+
+        resp = self.client.get("/admin-dashboard/home/")
+        self.assertEqual(resp.status_code, 200)
+        self.assertEqual(resp.context["en_uso"], 2)
+
+        Administrador.objects.create(usuario=self.usuario)
+        datos = self.client.get("/admin-dashboard/home/kpis/").json()
+        self.assertEqual(datos["total_bikes"], 7)
+        self.assertEqual(datos["total_wallets"], "15000.25")
+
+
+class TestKpiCache(TransactionTestCase):
+    """Caché de los KPIs: fuera de una transacción de prueba para que haya commits reales."""
+
+    def setUp(self):
+        cache.clear()
+        self.addCleanup(cache.clear)
+        usuario = Usuario.objects.create_user(email="kpi2@example.com", nombre="Ana", apellido="Ruiz",
+                                              password="12345")
+        estacion = Station.objects.create(nombre="Estación Central", direccion="Calle 1 #2-3")
+        bike = Bike.objects.create(numero_serie="KPI-C", tipo="manual", estado="in_use", station=estacion)
+        self.rental = Rental.objects.create(usuario=usuario, bike=bike, estacion_origen=estacion, estado="activo")
+
+    def test_cache_e_invalidacion_tras_commit(self):
+        KpiService.obtener()
+        with self.assertNumQueries(0):
+            self.assertEqual(KpiService.obtener()["activos"], 1)
+
+        self.rental.estado = "finalizado"
+        self.rental.save()
+
+        with self.assertNumQueries(2):
+            datos = KpiService.obtener()
+        self.assertEqual((datos["activos"], datos["finalizados"]), (0, 1))
+
+    def test_no_guarda_lecturas_dentro_de_una_transaccion(self):
+        with transaction.atomic():
+            KpiService.obtener()
+        with self.assertNumQueries(2):
+            KpiService.obtener()
@@ -0,0 +1,125 @@
+import io
+import os
+import tempfile
+import unittest
+import zipfile
+from datetime import timedelta
+from decimal import Decimal
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import TestCase
+from django.utils import timezone
+
+from apps.admin_dashboard.models import Administrador
+from apps.admin_dashboard.services.parquet_export_service import ParquetExportService, pa, pq
+from apps.bikes.models import Bike
+from apps.iot.models import BikeTelemetry
+from apps.rentals.models import Rental
+from apps.stations.models import Station
+from apps.transactions.models import WalletTransaccion
+from apps.users.models import Usuario
+from apps.wallet.models import Wallet
+
+
+@unittest.skipUnless(ParquetExportService.disponible(), "pyarrow no está instalado")
+class TestParquetExportService(TestCase):
+    """Pruebas de la exportación Parquet (apps/admin_dashboard/services/parquet_export_service.py)."""
+
+    def setUp(self):
+        self.usuario = Usuario.objects.create_user(email="parquet@example.com", nombre="Ana", apellido="Ruiz",
+                                                   password="12345")
+        estacion = Station.objects.create(nombre="Estación Central", direccion="Calle 1 #2-3")
+        bike = Bike.objects.create(tipo="manual", estado="disponible")
+        wallet = Wallet.objects.create(usuario=self.usuario, balance=Decimal("0"))
+
+        self.hoy = timezone.localdate()
+        self.ayer = self.hoy - timedelta(days=1)
+        ahora = timezone.now()
+        for i in range(5):
+            Rental.objects.create(usuario=self.usuario, bike=bike, estacion_origen=estacion,
+                                  estado="finalizado", hora_inicio=ahora - timedelta(minutes=20), hora_fin=ahora,
+                                  duracion_minutos=20, costo_total=Decimal("3500.50"))
+        # Un viaje reservado (columnas nulas) del día anterior
+        Rental.objects.create(usuario=self.usuario, bike=bike, estacion_origen=estacion, estado="reservado")
+        Rental.objects.filter(estado="reservado").update(creado_en=ahora - timedelta(days=1))
+
+        for monto in ("20000", "-3500.50"):
+            WalletTransaccion.objects.create(wallet=wallet, tipo="RECARGA" if monto[0] != "-" else "PAGO",
+                                             monto=Decimal(monto), saldo_resultante=Decimal("16499.50"))
+        for i in range(3):
+            BikeTelemetry.objects.create(bike_id=bike.id, timestamp=ahora - timedelta(days=i % 2), latitude=6.25,
+                                         longitude=-75.56, battery=80.5, lock_status="LOCKED")
+
+        self.directorio = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directorio.cleanup)
+
+    def test_particiona_por_dia_con_tipos_fijos(self):
+        resumen = ParquetExportService.exportar(self.ayer, self.hoy, self.directorio.name, lote=2)
+
+        self.assertEqual(resumen["viajes"]["filas"], 6)
+        self.assertEqual(resumen["transacciones"]["filas"], 2)
+        self.assertEqual(resumen["telemetria"]["filas"], 3)
+        self.assertEqual(resumen["viajes"]["archivos"], [
+            os.path.join("viajes", f"fecha={self.ayer}", "viajes.parquet"),
+            os.path.join("viajes", f"fecha={self.hoy}", "viajes.parquet"),
+        ])
+        # Sin transacciones ayer: no hay archivo vacío
+        self.assertEqual(len(resumen["transacciones"]["archivos"]), 1)
+
+        hoy = pq.ParquetFile(os.path.join(self.directorio.name, resumen["viajes"]["archivos"][1]))
+        # 5 viajes en lotes de 2 → 3 row groups
+        self.assertEqual((hoy.metadata.num_rows, hoy.metadata.num_row_groups), (5, 3))
+        self.assertEqual(hoy.schema_arrow, ParquetExportService.esquema("viajes"))
+
+        # El lote de ayer solo trae nulos en costo/horas y aun así conserva los tipos
+        ayer = pq.read_table(os.path.join(self.directorio.name, resumen["viajes"]["archivos"][0]))
+        self.assertEqual(ayer.schema.field("costo_total").type, pa.decimal128(10, 2))
+        self.assertEqual(ayer.schema.field("hora_fin").type, pa.timestamp("us", tz="UTC"))
+        self.assertEqual(ayer.column("costo_total").to_pylist(), [None])
+
+        transacciones = pq.read_table(os.path.join(self.directorio.name, resumen["transacciones"]["archivos"][0]))
+        self.assertEqual(sorted(transacciones.column("monto").to_pylist()), [Decimal("-3500.50"), Decimal("20000.00")])
+
+    def test_lectura_por_lotes(self):
+        # 5 viajes de hoy en lotes de 2: tres lecturas, la última incompleta cierra el día
+        with self.assertNumQueries(3):
+            filas = ParquetExportService._escribir_dia(
+                "viajes", self.hoy, os.path.join(self.directorio.name, "hoy.parquet"), lote=2
+            )
+        self.assertEqual(filas, 5)
+
+    def test_dataset_invalido(self):
+        with self.assertRaises(ValueError):
+            ParquetExportService.exportar(self.hoy, self.hoy, self.directorio.name, datasets=["pagos"])
+        with self.assertRaises(ValueError):
+            ParquetExportService.exportar(self.hoy, self.ayer, self.directorio.name)
+
+    def test_comando(self):
+        salida = StringIO()
+        call_command("export_parquet", self.directorio.name, desde=self.ayer, hasta=self.hoy,
+                     datasets=["telemetria"], stdout=salida)
+        self.assertIn("telemetria: 3 filas en 2 archivos", salida.getvalue())
+        self.assertFalse(os.path.exists(os.path.join(self.directorio.name, "viajes")))
+
+    def test_descarga_zip(self):
+        url = "/admin-dashboard/reportes/parquet/"
+        self.client.force_login(self.usuario)
+        self.assertEqual(self.client.get(url, {"desde": str(self.hoy), "hasta": str(self.hoy)}).status_code, 403)
+
+        Administrador.objects.create(usuario=self.usuario)
+        resp = self.client.get(url, {"desde": str(self.ayer), "hasta": str(self.hoy), "datasets": "viajes,telemetria"})
+        self.assertEqual(resp.status_code, 200)
+        self.assertEqual(resp["Content-Type"], "application/zip")
+
+        with zipfile.ZipFile(io.BytesIO(b"".join(resp.streaming_content))) as zf:
+            nombres = sorted(zf.namelist())
+            self.assertEqual(nombres[0], f"telemetria/fecha={self.ayer}/telemetria.parquet")
+            self.assertEqual(len(nombres), 4)
+            tabla = pq.read_table(io.BytesIO(zf.read(f"viajes/fecha={self.hoy}/viajes.parquet")))
+        self.assertEqual(tabla.num_rows, 5)
+
+        sin_rango = self.client.get(url, {"desde": str(self.hoy)})
+        self.assertEqual(sin_rango.status_code, 400)
+        largo = self.client.get(url, {"desde": str(self.hoy - timedelta(days=90)), "hasta": str(self.hoy)})
+        self.assertEqual(largo.status_code, 400)
@@ -5,6 +5,7 @@ from django.test import TestCase
 from django.utils import timezone
 
 from apps.admin_dashboard.services.report_service import ReportService
+from apps.rentals.services.user_stats_service import UserStatsService
 from apps.rentals.models import Rental
 from apps.bikes.models import Bike
 from apps.users.models import Usuario
@@ -65,6 +66,12 @@ class TestReportService(TestCase):
         self.assertGreater(result["promedio_duracion"], 0)
         self.assertAlmostEqual(result["co2_ev"], 0.6, places=1)
 
+    def test_resumen_general_una_sola_consulta(self):
+        self.crear_rentals_finalizados()
+        with self.assertNumQueries(1):
+            result = ReportService.resumen_general()
+        self.assertEqual(result["promedio_duracion"], 30.0)
+
     def test_resumen_general_sin_datos(self):
         result = ReportService.resumen_general()
         self.assertEqual(result["total_viajes"], 0)
@@ -84,6 +91,23 @@ class TestReportService(TestCase):
         self.assertGreater(result["promedio_duracion"], 0)
         self.assertTrue(list(result["viajes"]))
 
+    def test_reporte_por_usuario_totales_cubren_el_listado(self):
+        """Los totales cuentan los mismos viajes que el listado, no solo los finalizados."""
+        self.crear_rentals_finalizados()
+        for estado in ("cancelado", "reservado"):
+            Rental.objects.create(usuario=self.usuario, bike=self.bike, estacion_origen=self.estacion,
+                                  estado=estado)
+        UserStatsService.obtener(self.usuario)  # la primera lectura construye el resumen
+
+        # Usuario, resumen y conteo de viajes en curso
+        with self.assertNumQueries(3):
+            result = ReportService.reporte_por_usuario(self.usuario.usuario_id)
+
+        self.assertEqual(result["total_viajes"], len(result["viajes"]))
+        self.assertEqual(result["total_viajes"], 4)
+        self.assertEqual(result["total_gasto"], Decimal("150.50"))
+        self.assertEqual(result["promedio_duracion"], 30.0)
+
     def test_reporte_por_usuario_inexistente(self):
         result = ReportService.reporte_por_usuario(999)
         self.assertIsNone(result["usuario"])
@@ -146,3 +170,62 @@ class TestReportService(TestCase):
         self.assertIsInstance(buffer, io.BytesIO)
         self.assertGreater(len(pdf_bytes), 1000)
         self.assertTrue(pdf_bytes.startswith(b"%PDF"))
+
+
+class TestExportacionCsvViajes(TestCase):
+    """Exportación de viajes en streaming (ReportService.filas_csv_viajes y descargar_reporte)."""
+
+    def setUp(self):
+        self.usuario = Usuario.objects.create_user(email="csv@example.com", nombre="Ana", apellido="Ruiz",
+                                                   password="12345")
+        otro = Usuario.objects.create_user(email="otro@example.com", nombre="B", apellido="C", password="12345")
+        self.estacion = Station.objects.create(nombre="Estación Central", direccion="Calle 1 #2-3")
+        bike = Bike.objects.create(tipo="manual", estado="disponible")
+        now = timezone.now()
+        for i in range(7):
+            Rental.objects.create(usuario=self.usuario if i % 2 else otro, bike=bike, estacion_origen=self.estacion,
+                                  estacion_destino=self.estacion, estado="finalizado" if i < 5 else "cancelado",
+                                  hora_inicio=now - timedelta(minutes=30), hora_fin=now, costo_total=Decimal("10"))
+        Rental.objects.filter(estado="cancelado").update(creado_en=now - timedelta(days=10))
+
+    def test_streaming_por_lotes_sin_n_mas_1(self):
+        partes = ReportService.filas_csv_viajes(ReportService.filtrar_viajes(), lote=3)
+
+        # El encabezado sale sin tocar la base de datos
+        with self.assertNumQueries(0):
+            encabezado = next(partes)
+        self.assertTrue(encabezado.startswith("ID,Usuario,Origen"))
+
+        # 7 viajes en lotes de 3: 3 lecturas con datos + 1 vacía, sin consultas por fila
+        with self.assertNumQueries(4):
+            bloques = list(partes)
+        self.assertEqual(len(bloques), 3)
+        self.assertEqual(sum(b.count("\n") for b in bloques), 7)
+        self.assertIn("csv@example.com", "".join(bloques))
+
+    def test_filtros(self):
+        hoy = timezone.localdate()
+        self.assertEqual(ReportService.filtrar_viajes(estado="cancelado").count(), 2)
+        self.assertEqual(ReportService.filtrar_viajes(desde=hoy, hasta=hoy).count(), 5)
+        self.assertEqual(ReportService.filtrar_viajes(usuario_id=self.usuario.pk, hasta=hoy - timedelta(days=1)).count(), 1)
+
+    def test_descarga_en_streaming(self):
+        from apps.admin_dashboard.models import Administrador
+
+        Administrador.objects.create(usuario=self.usuario)
+        self.client.force_login(self.usuario)
+
+        resp = self.client.get("/admin-dashboard/reportes/descargar/",
+                               {"tipo": "viajes", "formato": "csv", "estado": "finalizado"})
+        self.assertEqual(resp.status_code, 200)
+        self.assertTrue(resp.streaming)
+        contenido = b"".join(resp.streaming_content).decode()
+        self.assertEqual(contenido.count("finalizado"), 5)
+
+        usuario = self.client.get("/admin-dashboard/reportes/descargar/",
+                                  {"tipo": "usuario", "usuario_id": self.usuario.pk, "formato": "csv"})
+        self.assertEqual(b"".join(usuario.streaming_content).decode().count("csv@example.com"), 3)
+
+        invalido = self.client.get("/admin-dashboard/reportes/descargar/",
+                                   {"tipo": "viajes", "formato": "csv", "desde": "31-12-2025"})
+        self.assertEqual(invalido.status_code, 400)
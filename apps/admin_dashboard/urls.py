@@ -11,12 +11,15 @@ urlpatterns = [
 
     # Dashboard principal
     path("home/", views.dashboard_home, name="dashboard_home"),
+    path("home/kpis/", views.dashboard_kpis, name="dashboard_kpis"),
+    path("cache/estadisticas/", views.estadisticas_cache, name="estadisticas_cache"),
 
     # Panel de reportes
     path("reportes/", views.reportes_panel, name="reportes_panel"),
 
     # ✅ Nueva ruta para descargar reportes (falta en tu proyecto)
     path("reportes/descargar/", views.descargar_reporte, name="descargar_reporte"),
+    path("reportes/parquet/", views.exportar_parquet, name="exportar_parquet"),
     
     path("sanciones/", views.sanciones_panel, name="sanciones_panel"),
     path("sanciones/levantar/<int:sancion_id>/", views.levantar_sancion, name="levantar_sancion"),
@@ -2,18 +2,21 @@ from django.shortcuts import render, redirect, get_object_or_404
 from django.contrib import messages
 from django.contrib.auth.decorators import login_required
 from django.core.exceptions import PermissionDenied
-from django.utils import timezone
-from django.http import HttpResponse, HttpResponseBadRequest, HttpResponseServerError
-from django.db import models
+from django.http import (
+    FileResponse, HttpResponse, HttpResponseBadRequest, HttpResponseServerError, JsonResponse, StreamingHttpResponse,
+)
+from django.conf import settings
+import os
 import traceback
+from datetime import datetime
 
-from apps.bikes.models import Bike
 from apps.rentals.models import Rental
-from apps.stations.models import Station
-from apps.wallet.models import Wallet
 from apps.users.models import Usuario
-from apps.admin_dashboard.models import Administrador, Sancion
+from apps.admin_dashboard.models import Sancion
+from apps.core.services.cache_service import cache_datos
 from .services.auth_service import AdminAuthService
+from .services.kpi_service import KpiService
+from .services.parquet_export_service import ParquetExportService
 from .services.report_service import ReportService
 from .services.sancion_service import SancionService
 from django.core.exceptions import ValidationError  
@@ -26,12 +29,10 @@ from .services.user_service import UsuarioService
 def admin_login_view(request):
     """Vista de login del administrador"""
     if request.user.is_authenticated:
-        try:
-            Administrador.objects.get(usuario=request.user, activo=True)
+        if AdminAuthService.es_admin(request.user):
             return redirect("admin_dashboard:dashboard_home")
-        except Administrador.DoesNotExist:
-            messages.warning(request, "No tienes permisos para el panel administrativo.")
-            return redirect("admin_dashboard:admin_logout")
+        messages.warning(request, "No tienes permisos para el panel administrativo.")
+        return redirect("admin_dashboard:admin_logout")
 
     if request.method == "POST":
         email = request.POST.get("email")
@@ -62,34 +63,33 @@ def admin_logout_view(request):
 # ======================================================
 @login_required
 def dashboard_home(request):
-    """Página principal del panel administrativo"""
-    total_bikes = Bike.objects.count()
-    disponibles = Bike.objects.filter(estado="available").count()
-    en_uso = Bike.objects.filter(estado="in_use").count()
-    mantenimiento = Bike.objects.filter(estado="maintenance").count()
-
-    total_rentals = Rental.objects.count()
-    activos = Rental.objects.filter(estado="activo").count()
-    finalizados = Rental.objects.filter(estado="finalizado").count()
-
-    total_stations = Station.objects.count()
-    total_wallets = Wallet.objects.aggregate(total_balance=models.Sum("balance"))["total_balance"] or 0
-
-    context = {
-        "total_bikes": total_bikes,
-        "disponibles": disponibles,
-        "en_uso": en_uso,
-        "mantenimiento": mantenimiento,
-        "total_rentals": total_rentals,
-        "activos": activos,
-        "finalizados": finalizados,
-        "total_stations": total_stations,
-        "total_wallets": total_wallets,
-        "ahora": timezone.now(),
-    }
+    """Página principal del panel administrativo (KPIs en caché, ver KpiService)"""
+    kpis = KpiService.obtener()
+    context = {**kpis, "ahora": kpis["calculado_en"]}
     return render(request, "admin_dashboard/dashboard_home.html", context)
 
 
+@login_required
+def dashboard_kpis(request):
+    """KPIs del panel en JSON para el refresco automático de dashboard_home."""
+    if not AdminAuthService.es_admin(request.user):
+        return JsonResponse({"error": "Solo los administradores pueden consultar los indicadores."}, status=403)
+    return JsonResponse(KpiService.serializar(KpiService.obtener()))
+
+
+@login_required
+def estadisticas_cache(request):
+    """Aciertos/fallos de la caché de datos en el worker que atiende la petición."""
+    if not AdminAuthService.es_admin(request.user):
+        return JsonResponse({"error": "Solo los administradores pueden consultar la caché."}, status=403)
+    return JsonResponse({
+        "backend": getattr(settings, "CACHE_BACKEND", "memoria"),
+        "pid": os.getpid(),
+        "espacios_registrados": cache_datos.espacios(),
+        **cache_datos.estadisticas(),
+    })
+
+
 # ======================================================
 # 📂 SECCIONES INTERNAS
 # ======================================================
@@ -111,7 +111,7 @@ def sanciones_panel(request):
     """
     try:
         # Verificar permisos
-        if not Administrador.objects.filter(usuario=request.user, activo=True).exists():
+        if not AdminAuthService.es_admin(request.user):
             raise PermissionDenied("Solo los administradores pueden gestionar sanciones.")
 
         usuarios = Usuario.objects.all().order_by("email")
@@ -156,7 +156,7 @@ def levantar_sancion(request, sancion_id):
     Desactiva una sanción manualmente desde el panel.
     """
     try:
-        if not Administrador.objects.filter(usuario=request.user, activo=True).exists():
+        if not AdminAuthService.es_admin(request.user):
             raise PermissionDenied("Solo los administradores pueden levantar sanciones.")
 
         sancion = get_object_or_404(Sancion, pk=sancion_id)
@@ -183,14 +183,43 @@ def reportes_panel(request):
     return render(request, "admin_dashboard/reportes_panel.html", {"usuarios": usuarios})
 
 
+def _filtros_exportacion(request):
+    """Lee desde/hasta (YYYY-MM-DD) y estado del query string. ValueError si son inválidos."""
+    filtros = {}
+    for campo in ("desde", "hasta"):
+        valor = (request.GET.get(campo) or "").strip()
+        if valor:
+            try:
+                filtros[campo] = datetime.strptime(valor, "%Y-%m-%d").date()
+            except ValueError:
+                raise ValueError(f"Fecha inválida en '{campo}': use el formato AAAA-MM-DD.")
+    if filtros.get("desde") and filtros.get("hasta") and filtros["desde"] > filtros["hasta"]:
+        raise ValueError("La fecha 'desde' no puede ser posterior a 'hasta'.")
+
+    estado = (request.GET.get("estado") or "").strip().lower()
+    if estado:
+        if estado not in dict(Rental.ESTADO):
+            raise ValueError(f"Estado no válido: {estado}")
+        filtros["estado"] = estado
+    return filtros
+
+
+def _respuesta_csv_viajes(viajes, nombre_archivo):
+    """CSV de viajes en streaming: memoria constante y primeros bytes inmediatos."""
+    resp = StreamingHttpResponse(ReportService.filas_csv_viajes(viajes), content_type="text/csv; charset=utf-8")
+    resp["Content-Disposition"] = f'attachment; filename="{nombre_archivo}"'
+    return resp
+
+
 @login_required
 def descargar_reporte(request):
     """
     Genera y descarga reportes en PDF o CSV.
     Parámetros:
-      - tipo: "general" | "usuario"
+      - tipo: "general" | "usuario" | "viajes" (detalle de viajes de toda la flota, solo CSV)
       - usuario_id: requerido si tipo="usuario"
       - formato: "pdf" | "csv"
+      - desde, hasta (AAAA-MM-DD) y estado: filtros de los CSV de viajes
     """
     try:
         tipo = (request.GET.get("tipo") or "general").strip().lower()
@@ -202,9 +231,23 @@ def descargar_reporte(request):
         # ----------------------------------------------------------
         # 🔐 Verificación de permisos (solo administradores activos)
         # ----------------------------------------------------------
-        if not Administrador.objects.filter(usuario=request.user, activo=True).exists():
+        if not AdminAuthService.es_admin(request.user):
             raise PermissionDenied("Solo los administradores pueden generar reportes.")
 
+        try:
+            filtros = _filtros_exportacion(request)
+        except ValueError as e:
+            return HttpResponseBadRequest(str(e))
+
+        # ----------------------------------------------------------
+        # 🚲 Detalle de viajes de toda la flota (CSV en streaming)
+        # ----------------------------------------------------------
+        if tipo == "viajes":
+            if formato != "csv":
+                return HttpResponseBadRequest("El detalle de viajes solo se exporta en CSV.")
+            print(f"✅ Exportando viajes en streaming con filtros {filtros}")
+            return _respuesta_csv_viajes(ReportService.filtrar_viajes(**filtros), "viajes.csv")
+
         # ----------------------------------------------------------
         # 📄 Reporte individual por usuario
         # ----------------------------------------------------------
@@ -213,10 +256,10 @@ def descargar_reporte(request):
                 return HttpResponseBadRequest("Debe seleccionar un usuario válido para el reporte individual.")
 
             usuario = get_object_or_404(Usuario, usuario_id=int(usuario_id))
-            data = ReportService.reporte_por_usuario(int(usuario_id))
 
             # PDF
             if formato == "pdf":
+                data = ReportService.reporte_por_usuario(int(usuario_id))
                 pdf_buffer = ReportService.generar_pdf_usuario(usuario, data)
                 resp = HttpResponse(pdf_buffer, content_type="application/pdf")
                 resp["Content-Disposition"] = f'inline; filename="reporte_usuario_{usuario.usuario_id}.pdf"'
@@ -225,11 +268,9 @@ def descargar_reporte(request):
 
             # CSV
             if formato == "csv":
-                csv_data = ReportService.generar_csv_viajes(data["viajes"])
-                resp = HttpResponse(csv_data, content_type="text/csv")
-                resp["Content-Disposition"] = f'attachment; filename="reporte_usuario_{usuario.usuario_id}.csv"'
-                print(f"✅ Reporte CSV individual generado correctamente para {usuario.email}")
-                return resp
+                viajes = ReportService.filtrar_viajes(usuario_id=usuario.usuario_id, **filtros)
+                print(f"✅ Reporte CSV individual en streaming para {usuario.email}")
+                return _respuesta_csv_viajes(viajes, f"reporte_usuario_{usuario.usuario_id}.csv")
 
             return HttpResponseBadRequest("Formato no soportado para reporte individual.")
 
@@ -269,6 +310,42 @@ def descargar_reporte(request):
         print("🔥 ERROR al generar reporte:", e)
         traceback.print_exc()
         return HttpResponseServerError(f"Ocurrió un error al generar el reporte: {e}")
+
+
+@login_required
+def exportar_parquet(request):
+    """
+    Descarga un ZIP con los Parquet (particionados por día) de viajes, transacciones
+    y telemetría para analítica.
+    Parámetros:
+      - desde, hasta (AAAA-MM-DD): obligatorios, como máximo PARQUET_EXPORT_MAX_DIAS días
+      - datasets: lista separada por comas (viajes,transacciones,telemetria); por defecto todos
+    """
+    if not AdminAuthService.es_admin(request.user):
+        raise PermissionDenied("Solo los administradores pueden exportar datos.")
+    if not ParquetExportService.disponible():
+        return HttpResponseServerError("La exportación Parquet no está disponible: falta instalar 'pyarrow'.")
+
+    try:
+        filtros = _filtros_exportacion(request)
+    except ValueError as e:
+        return HttpResponseBadRequest(str(e))
+    desde, hasta = filtros.get("desde"), filtros.get("hasta")
+    if not desde or not hasta:
+        return HttpResponseBadRequest("Debe indicar 'desde' y 'hasta' (AAAA-MM-DD).")
+    max_dias = getattr(settings, "PARQUET_EXPORT_MAX_DIAS", 31)
+    if (hasta - desde).days + 1 > max_dias:
+        return HttpResponseBadRequest(f"El rango no puede superar {max_dias} días; use el comando export_parquet.")
+
+    datasets = [d.strip().lower() for d in (request.GET.get("datasets") or "").split(",") if d.strip()]
+    try:
+        archivo, resumen = ParquetExportService.exportar_zip(desde, hasta, datasets or None)
+    except ValueError as e:
+        return HttpResponseBadRequest(str(e))
+
+    print(f"✅ Exportación Parquet {desde}..{hasta}: " + ", ".join(f"{d}={r['filas']}" for d, r in resumen.items()))
+    return FileResponse(archivo, as_attachment=True, filename=f"twomove_{desde}_{hasta}.zip",
+                        content_type="application/zip")
     
     # ======================================================
 # 👥 GESTIÓN DE USUARIOS (CRUD)
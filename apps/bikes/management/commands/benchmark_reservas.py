@@ -0,0 +1,113 @@
+import random
+import threading
+import time
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.core.exceptions import ValidationError
+from django.core.management.base import BaseCommand
+from django.db import OperationalError, connection
+
+from apps.bikes.models import Bike
+from apps.rentals.models import Rental
+from apps.rentals.services.reservation_service import ReservationService
+from apps.stations.models import Station
+from apps.stations.services.availability_service import AvailabilityService
+from apps.wallet.models import Wallet
+
+
+class Command(BaseCommand):
+    help = ("Lanza reservas simultáneas sobre pocas bicicletas de una estación, mide el rendimiento "
+            "(reservas/s) y verifica que ninguna bicicleta se asigne dos veces")
+
+    def add_arguments(self, parser):
+        parser.add_argument('--usuarios', type=int, default=50,
+                            help='Usuarios que reservan a la vez (un hilo cada uno)')
+        parser.add_argument('--bicicletas', type=int, default=20)
+        parser.add_argument('--conservar', action='store_true', help='No borra los datos de prueba al terminar')
+
+    def handle(self, *args, **opts):
+        marca = time.time_ns()
+        origen = Station.objects.create(nombre=f"Benchmark origen {marca}", direccion="Benchmark",
+                                        latitud=4.6, longitud=-74.1)
+        destino = Station.objects.create(nombre=f"Benchmark destino {marca}", direccion="Benchmark",
+                                         latitud=4.7, longitud=-74.0)
+        for i in range(opts['bicicletas']):
+            Bike.objects.create(numero_serie=f"BENCH-{marca}-{i}", tipo="electric", estado="available",
+                                station=origen, bateria_porcentaje=100)
+        usuarios = []
+        for i in range(opts['usuarios']):
+            usuario = get_user_model().objects.create_user(
+                email=f"benchmark-reservas-{marca}-{i}@twomove.local", nombre="Benchmark", apellido="Reservas",
+            )
+            Wallet.objects.create(usuario=usuario, balance=Decimal("50000"))
+            usuarios.append(usuario)
+
+        conteo = {"reservadas": 0, "sin_bici": 0, "reintentos": 0}
+        asignadas = []
+        lock = threading.Lock()
+        barrera = threading.Barrier(len(usuarios))
+
+        def trabajador(usuario):
+            local = {"reservadas": 0, "sin_bici": 0, "reintentos": 0}
+            bike_id = None
+            barrera.wait()
+            try:
+                while True:
+                    try:
+                        rental = ReservationService.create_reservation(
+                            usuario=usuario, estacion_origen_id=origen.id, tipo_bicicleta="electric",
+                            tipo_viaje="ultima_milla", metodo_pago="wallet", estacion_destino_id=destino.id,
+                        )
+                        local["reservadas"] += 1
+                        bike_id = rental.bike_id
+                    except ValidationError:
+                        local["sin_bici"] += 1
+                    except OperationalError:
+                        # SQLite bloquea la tabla completa; MySQL puede abortar por deadlock
+                        local["reintentos"] += 1
+                        time.sleep(random.uniform(0.001, 0.01))
+                        continue
+                    break
+            finally:
+                connection.close()
+                with lock:
+                    for clave, valor in local.items():
+                        conteo[clave] += valor
+                    if bike_id is not None:
+                        asignadas.append(bike_id)
+
+        hilos = [threading.Thread(target=trabajador, args=(usuario,)) for usuario in usuarios]
+        inicio = time.perf_counter()
+        for hilo in hilos:
+            hilo.start()
+        for hilo in hilos:
+            hilo.join()
+        duracion = time.perf_counter() - inicio
+
+        solicitudes = conteo['reservadas'] + conteo['sin_bici']
+        self.stdout.write(
+            f"🚲 {solicitudes} solicitudes en {duracion:.2f}s "
+            f"({solicitudes / duracion:.1f} reservas/s, {connection.vendor}): "
+            f"{conteo['reservadas']} reservadas, {conteo['sin_bici']} sin bicicleta, "
+            f"{conteo['reintentos']} reintentos"
+        )
+
+        origen.refresh_from_db()
+        rentals = Rental.objects.filter(estacion_origen=origen).count()
+        consistente = (
+            len(asignadas) == len(set(asignadas)) == rentals == min(opts['usuarios'], opts['bicicletas'])
+            and origen.disponibles_electricas == opts['bicicletas'] - rentals
+            and not [e for e, _, _ in AvailabilityService.reconciliar(aplicar=False) if e.pk == origen.pk]
+        )
+        resumen = (f"{len(set(asignadas))} bicicletas distintas para {rentals} reservas, "
+                   f"{origen.disponibles_electricas} disponibles en la estación")
+        if consistente:
+            self.stdout.write(self.style.SUCCESS(f"✅ Sin dobles asignaciones: {resumen}"))
+        else:
+            self.stdout.write(self.style.ERROR(f"❌ Asignación inconsistente: {resumen}"))
+
+        if not opts['conservar']:
+            get_user_model().objects.filter(pk__in=[u.pk for u in usuarios]).delete()
+            Bike.objects.filter(station=origen).delete()
+            Station.objects.filter(pk__in=[origen.pk, destino.pk]).delete()
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.7 on 2026-10-17 20:28
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('bikes', '0003_bike_bateria_porcentaje_alter_bike_estado'),
+        ('stations', '0002_availability_counters'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='bike',
+            index=models.Index(fields=['station', 'tipo', 'estado', 'bateria_porcentaje'], name='bike_asignacion_idx'),
+        ),
+    ]
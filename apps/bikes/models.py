@@ -39,6 +39,39 @@ class Bike(models.Model):
     def __str__(self):
         return f"{self.numero_serie} - {self.get_tipo_display()} ({self.estado})"
 
+    # Campos de los que depende `aporte_disponibilidad`
+    CAMPOS_DISPONIBILIDAD = {"estado", "station_id", "tipo"}
+    # Marca de una instancia cargada con only()/defer() sin esos campos
+    DISPONIBILIDAD_SIN_LEER = object()
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        """
+        Guarda la disponibilidad leída de la BD para calcular deltas al guardar.
+        Si la carga difiere alguno de sus campos no se calcula aquí (leerlo
+        recargaría la instancia y volvería a entrar en from_db): la señal
+        pre_save/pre_delete la lee de la BD antes de escribir.
+        """
+        instance = super().from_db(db, field_names, values)
+        if cls.CAMPOS_DISPONIBILIDAD <= set(field_names):
+            instance._disponibilidad_original = instance.aporte_disponibilidad()
+        else:
+            instance._disponibilidad_original = cls.DISPONIBILIDAD_SIN_LEER
+        return instance
+
+    def aporte_disponibilidad(self):
+        """
+        (station_id, tipo) si la bicicleta cuenta como disponible en una estación, o None.
+        Usado por los contadores de Station (apps/stations/signals.py).
+        """
+        if self.estado == "available" and self.station_id and self.tipo in ("electric", "manual"):
+            return (self.station_id, self.tipo)
+        return None
+
     class Meta:
         verbose_name = "Bicicleta"
         verbose_name_plural = "Bicicletas"
+        indexes = [
+            # Búsqueda de candidatos al reservar (BikeAllocationService)
+            models.Index(fields=["station", "tipo", "estado", "bateria_porcentaje"], name="bike_asignacion_idx"),
+        ]
@@ -0,0 +1,67 @@
+from django.db import connection
+from django.utils import timezone
+
+from apps.bikes.models import Bike
+from apps.stations.services.availability_service import AvailabilityService
+
+
+class BikeAllocationService:
+    """
+    Asignación de bicicletas a reservas sin dobles asignaciones.
+
+    La garantía la da un UPDATE condicional (`... SET estado='reserved' WHERE
+    id=%s AND estado='available'`): de dos transacciones que compiten por la
+    misma bicicleta solo una afecta la fila; la otra pasa al siguiente candidato.
+
+    Para que las reservas simultáneas en una estación concurrida no hagan fila
+    detrás del mismo candidato, donde el motor lo soporta (MySQL 8, PostgreSQL)
+    el candidato se elige con SELECT ... FOR UPDATE SKIP LOCKED: cada
+    transacción salta las bicicletas que otra está reservando en ese instante.
+    Solo se bloquea la fila elegida, y hasta el commit de la reserva.
+    """
+
+    BATERIA_MINIMA = 40      # % mínimo para asignar una eléctrica
+    CANDIDATOS = 5           # candidatos probados por ronda sin SKIP LOCKED
+    RONDAS = 3
+
+    @staticmethod
+    def candidatos(station_id, tipo):
+        """Bicicletas asignables en orden de preferencia (eléctricas: mayor batería primero)."""
+        bicicletas = Bike.objects.filter(station_id=station_id, tipo=tipo, estado="available")
+        if tipo == "electric":
+            return bicicletas.filter(
+                bateria_porcentaje__gte=BikeAllocationService.BATERIA_MINIMA
+            ).order_by("-bateria_porcentaje", "id")
+        return bicicletas.order_by("id")
+
+    @staticmethod
+    def reclamar(station_id, tipo):
+        """
+        Marca como reservada la mejor bicicleta disponible y la retorna, o None
+        si no queda ninguna. Debe llamarse dentro de la transacción de la reserva:
+        si esta se revierte, la bicicleta vuelve a estar disponible.
+        """
+        candidatos = BikeAllocationService.candidatos(station_id, tipo)
+        salta_bloqueadas = connection.features.has_select_for_update_skip_locked
+
+        for _ in range(BikeAllocationService.RONDAS):
+            if salta_bloqueadas:
+                ids = list(candidatos.select_for_update(skip_locked=True).values_list("id", flat=True)[:1])
+            else:
+                ids = list(candidatos.values_list("id", flat=True)[:BikeAllocationService.CANDIDATOS])
+            if not ids:
+                return None
+
+            for bike_id in ids:
+                if BikeAllocationService._marcar_reservada(bike_id):
+                    # update() no dispara post_save: el contador de la estación se mueve aquí
+                    AvailabilityService.aplicar_cambio((station_id, tipo), None)
+                    return Bike.objects.select_related("station").get(pk=bike_id)
+        return None
+
+    @staticmethod
+    def _marcar_reservada(bike_id):
+        """UPDATE condicional: True solo para la transacción que ganó la bicicleta."""
+        return Bike.objects.filter(pk=bike_id, estado="available").update(
+            estado="reserved", fecha_actualizacion=timezone.now()
+        ) == 1
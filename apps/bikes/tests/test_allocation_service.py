@@ -0,0 +1,108 @@
+from decimal import Decimal
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.exceptions import ValidationError
+from django.core.management import call_command
+from django.test import TestCase, TransactionTestCase
+
+from apps.bikes.models import Bike
+from apps.bikes.services.allocation_service import BikeAllocationService
+from apps.core.tests.concurrencia import ejecutar_en_paralelo
+from apps.rentals.models import Rental
+from apps.rentals.services.reservation_service import ReservationService
+from apps.stations.models import Station
+from apps.stations.services.availability_service import AvailabilityService
+from apps.wallet.models import Wallet
+
+
+class TestBikeAllocationService(TestCase):
+    """Pruebas de la asignación atómica de bicicletas (apps/bikes/services/allocation_service.py)."""
+
+    def setUp(self):
+        self.estacion = Station.objects.create(nombre="Centro", direccion="Calle 1", latitud=4.6, longitud=-74.1)
+        for serie, bateria in [("E-50", 50), ("E-95", 95), ("E-30", 30), ("E-80", 80)]:
+            Bike.objects.create(numero_serie=serie, tipo="electric", estado="available",
+                                station=self.estacion, bateria_porcentaje=bateria)
+        Bike.objects.create(numero_serie="M-1", tipo="manual", estado="available", station=self.estacion)
+
+    def test_prefiere_la_electrica_con_mas_bateria(self):
+        orden = []
+        while (bike := BikeAllocationService.reclamar(self.estacion.id, "electric")) is not None:
+            orden.append(bike.numero_serie)
+            self.assertEqual(bike.estado, "reserved")
+        # La de 30 % nunca se asigna
+        self.assertEqual(orden, ["E-95", "E-80", "E-50"])
+
+    def test_actualiza_el_contador_de_la_estacion(self):
+        self.estacion.refresh_from_db()
+        self.assertEqual(self.estacion.disponibles_electricas, 4)
+
+        BikeAllocationService.reclamar(self.estacion.id, "electric")
+        BikeAllocationService.reclamar(self.estacion.id, "manual")
+
+        self.estacion.refresh_from_db()
+        self.assertEqual((self.estacion.disponibles_electricas, self.estacion.disponibles_mecanicas), (3, 0))
+        self.assertEqual(AvailabilityService.reconciliar(aplicar=False), [])
+
+    def test_una_bicicleta_ya_tomada_no_se_vuelve_a_marcar(self):
+        bike = Bike.objects.get(numero_serie="M-1")
+        self.assertTrue(BikeAllocationService._marcar_reservada(bike.id))
+        self.assertFalse(BikeAllocationService._marcar_reservada(bike.id))
+        self.assertIsNone(BikeAllocationService.reclamar(self.estacion.id, "manual"))
+
+
+class TestReservasConcurrentes(TransactionTestCase):
+    """Estrés: muchas reservas simultáneas sobre pocas bicicletas, sin dobles asignaciones."""
+
+    USUARIOS = 12
+    BICICLETAS = 5
+
+    def setUp(self):
+        self.origen = Station.objects.create(nombre="Origen", direccion="Calle 1", latitud=4.6, longitud=-74.1)
+        self.destino = Station.objects.create(nombre="Destino", direccion="Calle 2", latitud=4.7, longitud=-74.0)
+        for i in range(self.BICICLETAS):
+            Bike.objects.create(numero_serie=f"S-{i}", tipo="electric", estado="available",
+                                station=self.origen, bateria_porcentaje=60 + i)
+        Usuario = get_user_model()
+        self.usuarios = []
+        for i in range(self.USUARIOS):
+            usuario = Usuario.objects.create_user(email=f"u{i}@test.com", password="123456",
+                                                  nombre="U", apellido=str(i))
+            Wallet.objects.create(usuario=usuario, balance=Decimal("50000"))
+            self.usuarios.append(usuario)
+
+    def _reservar(self, usuario):
+        try:
+            rental = ReservationService.create_reservation(
+                usuario=usuario, estacion_origen_id=self.origen.id, tipo_bicicleta="electric",
+                tipo_viaje="ultima_milla", metodo_pago="wallet", estacion_destino_id=self.destino.id,
+            )
+            return ("ok", rental.bike_id)
+        except ValidationError:
+            return ("sin_bici", None)
+
+    def test_sin_dobles_reservas(self):
+        resultados = ejecutar_en_paralelo(self._reservar, [(u,) for u in self.usuarios])
+        self.assertNotIn("error", resultados)
+        asignadas = [bike_id for estado, bike_id in resultados if estado == "ok"]
+
+        self.assertEqual(len(resultados), self.USUARIOS)
+        self.assertEqual(len(asignadas), self.BICICLETAS)
+        self.assertEqual(len(set(asignadas)), self.BICICLETAS)
+        self.assertEqual(Rental.objects.count(), self.BICICLETAS)
+        self.assertEqual(Bike.objects.filter(estado="reserved").count(), self.BICICLETAS)
+
+        self.origen.refresh_from_db()
+        self.assertEqual(self.origen.disponibles_electricas, 0)
+        self.assertEqual(AvailabilityService.reconciliar(aplicar=False), [])
+
+    def test_comando_benchmark(self):
+        """benchmark_reservas reporta reservas/s y no deja datos de prueba."""
+        salida = StringIO()
+        call_command("benchmark_reservas", usuarios=6, bicicletas=3, stdout=salida)
+
+        self.assertIn("reservas/s", salida.getvalue())
+        self.assertIn("Sin dobles asignaciones", salida.getvalue())
+        self.assertEqual(Station.objects.count(), 2)
+        self.assertEqual(Bike.objects.count(), self.BICICLETAS)
@@ -0,0 +1,21 @@
+from django.core.management.base import BaseCommand
+
+from apps.core.services.cache_service import cache_datos
+
+
+class Command(BaseCommand):
+    help = ("Precarga la caché de datos (estaciones, KPIs del panel...). Útil con CACHE_BACKEND=archivo o redis, "
+            "donde la caché es compartida; con 'memoria' cada worker se precarga al iniciar (gunicorn.conf.py)")
+
+    def add_arguments(self, parser):
+        parser.add_argument('--espacio', action='append', dest='espacios',
+                            help='Espacio a precargar (se puede repetir). Por defecto todos.')
+
+    def handle(self, *args, **options):
+        resultado = cache_datos.calentar(options['espacios'])
+        for espacio, segundos in resultado.items():
+            if isinstance(segundos, str):
+                self.stdout.write(self.style.WARNING(f"⚠️ {espacio}: {segundos}"))
+            else:
+                self.stdout.write(f"🔥 {espacio}: {segundos:.3f}s")
+        self.stdout.write(self.style.SUCCESS(f"✅ {len(resultado)} espacios precargados."))
@@ -0,0 +1,174 @@
+import secrets
+import threading
+import time
+
+from django.core.cache import caches
+from django.db import connection, transaction
+from django.db.models.signals import post_delete, post_save
+
+
+# Distingue "no está en caché" de un valor None guardado
+_FALTA = object()
+
+
+class CacheService:
+    """
+    Caché de datos calientes y poco cambiantes (estaciones, roles de administrador,
+    KPIs del panel) sobre el backend configurado en CACHES.
+
+    - Cache-aside por espacio de nombres: `obtener(espacio, clave, calcular, tipo)`
+      lee de la caché y solo si falta (o el valor no es del tipo esperado, p. ej.
+      tras un despliegue que cambió su forma) llama a `calcular` y lo guarda.
+    - Claves versionadas: cada espacio tiene un número de versión guardado en la
+      propia caché. `invalidar(espacio)` lo incrementa, con lo que todas las claves
+      del espacio dejan de leerse a la vez (las viejas expiran por TTL) y el cambio
+      lo ven todos los procesos que comparten el backend.
+    - `registrar(espacio, modelos=...)` conecta post_save/post_delete de esos
+      modelos para invalidar el espacio tras el commit de la transacción.
+    - No se guarda lo leído dentro de una transacción abierta: podría revertirse
+      (el rollback no emite señales) y quedaría en caché un dato que nunca existió.
+    - `calentar()` precarga los espacios registrados (al iniciar cada worker) y
+      `estadisticas()` da aciertos/fallos del proceso.
+    """
+
+    def __init__(self, alias="default"):
+        self.alias = alias
+        self._espacios = {}  # espacio → {"ttl", "calentar"}
+        self._lock = threading.Lock()
+        self._metricas = {}  # espacio → {"aciertos", "fallos"}
+
+    @property
+    def backend(self):
+        return caches[self.alias]
+
+    # ============================================================
+    # 🗝️ Claves versionadas
+    # ============================================================
+    def _clave_version(self, espacio):
+        return f"{espacio}:version"
+
+    def version(self, espacio):
+        """
+        Versión vigente del espacio. Si el backend la perdió (reinicio, desalojo),
+        se reinicia con un entero aleatorio de 62 bits: la probabilidad de repetir
+        una versión anterior es despreciable, así que no resucitan valores viejos
+        (una semilla basada en la hora podía repetirse dentro del mismo milisegundo).
+        """
+        clave = self._clave_version(espacio)
+        version = self.backend.get(clave)
+        if version is None:
+            self.backend.add(clave, secrets.randbits(62), None)
+            version = self.backend.get(clave)
+        return version
+
+    def clave(self, espacio, clave):
+        return f"{espacio}:{clave}"
+
+    # ============================================================
+    # 📥 Cache-aside
+    # ============================================================
+    def obtener(self, espacio, clave, calcular, tipo=None, ttl=None):
+        """
+        Valor de `espacio:clave`; si no está (o no es instancia de `tipo`) se
+        calcula con `calcular()` y se guarda `ttl` segundos (por defecto el del
+        espacio registrado, o el TIMEOUT del backend).
+        """
+        version = self.version(espacio)
+        valor = self.backend.get(self.clave(espacio, clave), _FALTA, version=version)
+        if valor is not _FALTA and (tipo is None or isinstance(valor, tipo)):
+            self._contar(espacio, "aciertos")
+            return valor
+
+        self._contar(espacio, "fallos")
+        valor = calcular()
+        if tipo is not None and not isinstance(valor, tipo):
+            raise TypeError(f"Caché '{espacio}': se esperaba {tipo.__name__} y se obtuvo {type(valor).__name__}.")
+        if not connection.in_atomic_block:
+            if ttl is None:
+                ttl = self._espacios.get(espacio, {}).get("ttl")
+            argumentos = {"version": version} if ttl is None else {"version": version, "timeout": ttl}
+            self.backend.set(self.clave(espacio, clave), valor, **argumentos)
+        return valor
+
+    def invalidar(self, espacio):
+        """Descarta todo el espacio (nueva versión de sus claves)."""
+        clave = self._clave_version(espacio)
+        try:
+            self.backend.incr(clave)
+        except ValueError:
+            # Sin versión guardada: la próxima lectura crea una nueva
+            pass
+
+    # ============================================================
+    # 🔔 Registro de espacios e invalidación por señales
+    # ============================================================
+    def registrar(self, espacio, modelos=(), ttl=None, calentar=None):
+        """
+        Declara un espacio. Cualquier save()/delete() de `modelos` lo invalida
+        cuando la transacción se confirma. `calentar` (sin argumentos) lo precarga.
+        Se llama desde `ready()` de cada app.
+        """
+        self._espacios[espacio] = {"ttl": ttl, "calentar": calentar}
+
+        def invalidar_espacio(sender, **kwargs):
+            transaction.on_commit(lambda: self.invalidar(espacio))
+
+        for modelo in modelos:
+            uid = f"cache:{espacio}:{modelo._meta.label}"
+            post_save.connect(invalidar_espacio, sender=modelo, weak=False, dispatch_uid=f"{uid}:save")
+            post_delete.connect(invalidar_espacio, sender=modelo, weak=False, dispatch_uid=f"{uid}:delete")
+
+    def espacios(self):
+        return sorted(self._espacios)
+
+    # ============================================================
+    # 🔥 Precarga
+    # ============================================================
+    def calentar(self, espacios=None):
+        """
+        Precarga los espacios registrados con función de calentamiento.
+        Retorna {espacio: segundos | "error: ..."}; un fallo no detiene al resto.
+        """
+        resultado = {}
+        for espacio in espacios or self.espacios():
+            calentar = self._espacios.get(espacio, {}).get("calentar")
+            if calentar is None:
+                continue
+            inicio = time.perf_counter()
+            try:
+                calentar()
+                resultado[espacio] = round(time.perf_counter() - inicio, 3)
+            except Exception as e:
+                resultado[espacio] = f"error: {e}"
+                print(f"⚠️ No se pudo precargar la caché '{espacio}': {e}")
+        return resultado
+
+    # ============================================================
+    # 📊 Métricas
+    # ============================================================
+    def _contar(self, espacio, tipo):
+        with self._lock:
+            metricas = self._metricas.setdefault(espacio, {"aciertos": 0, "fallos": 0})
+            metricas[tipo] += 1
+
+    def estadisticas(self):
+        """Aciertos, fallos y tasa de aciertos por espacio y en total (de este proceso)."""
+        with self._lock:
+            por_espacio = {espacio: dict(datos) for espacio, datos in self._metricas.items()}
+
+        total = {"aciertos": 0, "fallos": 0}
+        for datos in por_espacio.values():
+            total["aciertos"] += datos["aciertos"]
+            total["fallos"] += datos["fallos"]
+        for datos in [*por_espacio.values(), total]:
+            lecturas = datos["aciertos"] + datos["fallos"]
+            datos["tasa_aciertos"] = round(datos["aciertos"] / lecturas, 3) if lecturas else 0.0
+        return {"espacios": por_espacio, "total": total}
+
+    def reiniciar_estadisticas(self):
+        with self._lock:
+            self._metricas = {}
+
+
+# Instancia compartida por el proceso (los espacios se registran en ready() de cada app)
+cache_datos = CacheService()
@@ -0,0 +1,40 @@
+import random
+import threading
+import time
+
+from django.db import OperationalError, connection
+
+
+def ejecutar_en_paralelo(operacion, argumentos, limite=30):
+    """
+    Lanza un hilo por cada tupla de `argumentos` y los suelta a la vez con una barrera.
+
+    Cada hilo llama `operacion(*args)` y guarda lo que retorna. Si la base de datos
+    lanza OperationalError (SQLite en memoria bloquea la tabla entera) se reintenta
+    la operación completa hasta `limite` segundos; agotado el plazo se guarda "error".
+    Cada hilo cierra su conexión al terminar. Retorna los resultados en orden de llegada.
+    """
+    argumentos = list(argumentos)
+    barrera = threading.Barrier(len(argumentos))
+    resultados = []
+
+    def trabajador(args):
+        barrera.wait()
+        fin = time.perf_counter() + limite
+        try:
+            while time.perf_counter() < fin:
+                try:
+                    resultados.append(operacion(*args))
+                    return
+                except OperationalError:
+                    time.sleep(random.uniform(0.005, 0.03))
+            resultados.append("error")
+        finally:
+            connection.close()
+
+    hilos = [threading.Thread(target=trabajador, args=(args,)) for args in argumentos]
+    for hilo in hilos:
+        hilo.start()
+    for hilo in hilos:
+        hilo.join(limite * 2)
+    return resultados
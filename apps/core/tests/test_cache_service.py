@@ -0,0 +1,138 @@
+from io import StringIO
+
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import transaction
+from django.test import SimpleTestCase, TransactionTestCase
+
+from apps.admin_dashboard.models import Administrador
+from apps.admin_dashboard.services.auth_service import AdminAuthService
+from apps.bikes.models import Bike
+from apps.core.services.cache_service import CacheService, cache_datos
+from apps.stations.models import Station
+from apps.stations.services.station_cache_service import StationCacheService
+from apps.users.models import Usuario
+
+
+class TestCacheService(SimpleTestCase):
+    """Pruebas de la caché de datos (apps/core/services/cache_service.py) sin base de datos."""
+
+    def setUp(self):
+        cache.clear()
+        self.addCleanup(cache.clear)
+        self.servicio = CacheService()
+        self.llamadas = 0
+
+    def calcular(self):
+        self.llamadas += 1
+        return {"valor": self.llamadas}
+
+    def test_cache_aside_y_estadisticas(self):
+        self.assertEqual(self.servicio.obtener("prueba", "a", self.calcular, tipo=dict), {"valor": 1})
+        self.assertEqual(self.servicio.obtener("prueba", "a", self.calcular, tipo=dict), {"valor": 1})
+        self.assertEqual(self.llamadas, 1)
+
+        estadisticas = self.servicio.estadisticas()
+        self.assertEqual(estadisticas["espacios"]["prueba"], {"aciertos": 1, "fallos": 1, "tasa_aciertos": 0.5})
+        self.assertEqual(estadisticas["total"]["tasa_aciertos"], 0.5)
+
+    def test_guarda_none(self):
+        self.servicio.obtener("prueba", "nada", lambda: None)
+        self.assertIsNone(self.servicio.obtener("prueba", "nada", self.calcular))
+        self.assertEqual(self.llamadas, 0)
+
+    def test_invalidar_cambia_la_version_del_espacio(self):
+        version = self.servicio.version("prueba")
+        self.servicio.obtener("prueba", "a", self.calcular)
+        self.servicio.obtener("otro", "a", self.calcular)
+
+        self.servicio.invalidar("prueba")
+        self.assertEqual(self.servicio.version("prueba"), version + 1)
+        self.assertEqual(self.servicio.obtener("prueba", "a", self.calcular), {"valor": 3})
+        # Los demás espacios no se tocan
+        self.assertEqual(self.servicio.obtener("otro", "a", self.calcular), {"valor": 2})
+
+    def test_version_perdida_no_resucita_valores_viejos(self):
+        self.servicio.obtener("prueba", "a", self.calcular)
+        cache.delete("prueba:version")
+        self.assertEqual(self.servicio.obtener("prueba", "a", self.calcular), {"valor": 2})
+
+    def test_tipo_inesperado(self):
+        cache.set("prueba:a", ["forma vieja"], version=self.servicio.version("prueba"))
+        self.assertEqual(self.servicio.obtener("prueba", "a", self.calcular, tipo=dict), {"valor": 1})
+        with self.assertRaises(TypeError):
+            self.servicio.obtener("prueba", "b", lambda: "texto", tipo=dict)
+
+    def test_calentar(self):
+        self.servicio.registrar("bueno", calentar=lambda: self.servicio.obtener("bueno", "x", self.calcular))
+        self.servicio.registrar("malo", calentar=lambda: 1 / 0)
+        self.servicio.registrar("sin_precarga")
+
+        resultado = self.servicio.calentar()
+        self.assertEqual(sorted(resultado), ["bueno", "malo"])
+        self.assertIsInstance(resultado["bueno"], float)
+        self.assertTrue(resultado["malo"].startswith("error"))
+        self.assertEqual(self.llamadas, 1)
+
+
+class TestInvalidacionPorSenales(TransactionTestCase):
+    """Espacios registrados por las apps: se invalidan tras el commit de cambios en sus modelos."""
+
+    def setUp(self):
+        cache.clear()
+        self.addCleanup(cache.clear)
+        self.estacion = Station.objects.create(nombre="Estación Central", direccion="Calle 1", latitud=6.25,
+                                               longitud=-75.56)
+
+    def test_listado_de_estaciones(self):
+        respuesta = self.client.get("/estaciones/stations/")
+        self.assertEqual([e["nombre"] for e in respuesta.json()], ["Estación Central"])
+        with self.assertNumQueries(0):
+            self.assertEqual(self.client.get("/estaciones/stations/").json(), respuesta.json())
+
+        # Una bicicleta nueva mueve los contadores de la estación
+        Bike.objects.create(numero_serie="C-1", tipo="manual", estado="available", station=self.estacion)
+        self.assertEqual(self.client.get("/estaciones/stations/").json()[0]["total_disponibles"], 1)
+
+    def test_lectura_dentro_de_transaccion_no_se_guarda(self):
+        with transaction.atomic():
+            Station.objects.create(nombre="Estación Fantasma", direccion="Calle 0")
+            self.assertEqual(len(StationCacheService.listado()), 2)
+            transaction.set_rollback(True)
+        self.assertEqual(len(StationCacheService.listado()), 1)
+
+    def test_coordenadas_solo_dependen_de_station(self):
+        StationCacheService.coordenadas()
+        Bike.objects.create(numero_serie="C-2", tipo="manual", estado="available", station=self.estacion)
+        with self.assertNumQueries(0):
+            self.assertEqual(StationCacheService.coordenadas(), {self.estacion.pk: (6.25, -75.56)})
+
+        self.estacion.latitud = 6.3
+        self.estacion.save()
+        self.assertEqual(StationCacheService.coordenadas()[self.estacion.pk][0], 6.3)
+
+    def test_rol_de_administrador(self):
+        usuario = Usuario.objects.create_user(email="rol@example.com", nombre="A", apellido="B", password="12345")
+        self.assertFalse(AdminAuthService.es_admin(usuario))
+        with self.assertNumQueries(0):
+            self.assertFalse(AdminAuthService.es_admin(usuario))
+
+        admin = Administrador.objects.create(usuario=usuario)
+        self.assertTrue(AdminAuthService.es_admin(usuario))
+        admin.activo = False
+        admin.save()
+        self.assertFalse(AdminAuthService.es_admin(usuario))
+
+    def test_comando_y_estadisticas(self):
+        salida = StringIO()
+        call_command("warm_cache", stdout=salida)
+        self.assertIn("🔥 estaciones:", salida.getvalue())
+        self.assertIn("🔥 kpis:", salida.getvalue())
+
+        usuario = Usuario.objects.create_user(email="est@example.com", nombre="A", apellido="B", password="12345")
+        Administrador.objects.create(usuario=usuario)
+        self.client.force_login(usuario)
+        datos = self.client.get("/admin-dashboard/cache/estadisticas/").json()
+        self.assertIn("estaciones", datos["espacios_registrados"])
+        self.assertIn("tasa_aciertos", datos["total"])
+        self.assertGreaterEqual(cache_datos.estadisticas()["espacios"]["admins"]["fallos"], 1)
@@ -1,5 +1,5 @@
 from django.contrib import admin
-from .models import BikeTelemetry
+from .models import BikeTelemetry, BikeTelemetryMinute, BikeLatestState
 
 @admin.register(BikeTelemetry)
 class BikeTelemetryAdmin(admin.ModelAdmin):
@@ -7,3 +7,19 @@ class BikeTelemetryAdmin(admin.ModelAdmin):
     list_filter = ("lock_status", "bike_id")
     search_fields = ("bike_id",)
     ordering = ("-timestamp",)
+
+
+@admin.register(BikeTelemetryMinute)
+class BikeTelemetryMinuteAdmin(admin.ModelAdmin):
+    list_display = ("bike_id", "minuto", "latitude", "longitude", "battery", "battery_min", "lock_status", "muestras")
+    list_filter = ("lock_status",)
+    search_fields = ("bike_id",)
+    ordering = ("-minuto",)
+
+
+@admin.register(BikeLatestState)
+class BikeLatestStateAdmin(admin.ModelAdmin):
+    list_display = ("bike_id", "latitude", "longitude", "battery", "lock_status", "timestamp", "updated_at")
+    list_filter = ("lock_status",)
+    search_fields = ("bike_id",)
+    ordering = ("bike_id",)
@@ -3,4 +3,6 @@ from django.apps import AppConfig
 class IotConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'apps.iot'   # ✅ muy importante
-   
+
+    def ready(self):
+        from apps.iot import signals  # noqa: F401  (registra los receptores)
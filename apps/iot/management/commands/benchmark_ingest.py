@@ -0,0 +1,128 @@
+import resource
+import threading
+import time
+
+import paho.mqtt.client as mqtt
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+
+from apps.iot.models import BikeLatestState, BikeTelemetry
+from apps.iot.services.fleet_generator import FleetGenerator
+from apps.iot.services.telemetry_buffer import TelemetryBuffer
+
+
+def _percentil(valores, p):
+    if not valores:
+        return 0.0
+    return valores[min(len(valores) - 1, int(round(p / 100 * (len(valores) - 1))))]
+
+
+class Command(BaseCommand):
+    help = (
+        "Mide la ingesta de telemetría: flota sintética multiproceso → listener (on_message + "
+        "TelemetryBuffer) → BD. Reporta throughput, retraso envío→commit y CPU del listener."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--bicis', type=int, default=1000, help='Bicicletas simuladas')
+        parser.add_argument('--tasa', type=float, default=1.0, help='Mensajes por segundo por bicicleta')
+        parser.add_argument('--procesos', type=int, default=4, help='Procesos generadores')
+        parser.add_argument('--duracion', type=float, default=10.0, help='Segundos de generación')
+        parser.add_argument('--broker', choices=['local', 'mqtt'], default='local',
+                            help="'local' = cola en memoria entre procesos; 'mqtt' = broker real")
+        parser.add_argument('--host', default='localhost')
+        parser.add_argument('--port', type=int, default=1883)
+        parser.add_argument('--formato', choices=['json', 'binario'], default='json',
+                            help='Formato de los paquetes (binario = TelemetryCodec v1)')
+        parser.add_argument('--topic', default=None, help='Por defecto según el formato')
+        parser.add_argument('--bike-id-base', type=int, default=900000,
+                            help='Primer bike_id sintético (rango separado de la flota real)')
+        parser.add_argument('--conservar', action='store_true', help='No borra la telemetría generada')
+
+    def handle(self, *args, **opts):
+        from apps.iot.services.mqtt_listener import on_message
+
+        rango = (opts['bike_id_base'], opts['bike_id_base'] + opts['bicis'] - 1)
+        generador = FleetGenerator(
+            opts['bicis'], tasa=opts['tasa'], procesos=opts['procesos'], duracion=opts['duracion'],
+            broker=opts['broker'], host=opts['host'], port=opts['port'], topic=opts['topic'],
+            bike_id_base=opts['bike_id_base'], formato=opts['formato'],
+        )
+        buffer = TelemetryBuffer()
+
+        # ------------------------------------------------------------
+        # 🎧 Listener (en este proceso, para medir su CPU)
+        # ------------------------------------------------------------
+        cliente = None
+        consumidor = None
+        if opts['broker'] == 'mqtt':
+            cliente = mqtt.Client()
+            cliente.user_data_set(buffer)
+            cliente.on_message = on_message
+            cliente.connect(opts['host'], opts['port'], 60)
+            cliente.subscribe(generador.opciones['topic'] or "bikes/telemetry/#")
+            cliente.loop_start()
+        else:
+            def consumir():
+                while generador.activo() or not generador.cola.empty():
+                    msg = generador.recibir()
+                    if msg is not None:
+                        on_message(None, buffer, msg)
+
+            consumidor = threading.Thread(target=consumir, name="benchmark-consumer", daemon=True)
+
+        uso_inicial = resource.getrusage(resource.RUSAGE_SELF)
+        inicio = time.perf_counter()
+        buffer.iniciar()
+        generador.iniciar()
+        if consumidor:
+            consumidor.start()
+
+        generador.esperar(opts['duracion'] + 30)
+        if consumidor:
+            consumidor.join()
+        else:
+            # Broker real: esperar a que dejen de llegar mensajes
+            limite = time.time() + 10
+            while buffer.metricas()['recibidos'] < generador.total_enviados() and time.time() < limite:
+                time.sleep(0.1)
+            cliente.loop_stop()
+            cliente.disconnect()
+
+        buffer.detener()
+        duracion = time.perf_counter() - inicio
+        uso_final = resource.getrusage(resource.RUSAGE_SELF)
+        cpu = (uso_final.ru_utime - uso_inicial.ru_utime) + (uso_final.ru_stime - uso_inicial.ru_stime)
+
+        # ------------------------------------------------------------
+        # 📊 Reporte
+        # ------------------------------------------------------------
+        close_old_connections()
+        generados = BikeTelemetry.objects.filter(bike_id__range=rango)
+        retrasos = sorted(
+            (recibido - enviado).total_seconds() * 1000
+            for enviado, recibido in generados.values_list('timestamp', 'received_at').iterator()
+        )
+        metricas = buffer.metricas()
+        enviados = generador.total_enviados()
+
+        self.stdout.write("📊 Resultado del benchmark de ingesta")
+        self.stdout.write(f"   Objetivo:     {opts['bicis'] * opts['tasa']:.0f} msg/s "
+                          f"({opts['bicis']} bicis × {opts['tasa']} msg/s, {opts['procesos']} procesos, "
+                          f"{opts['broker']}, {opts['formato']})")
+        self.stdout.write(f"   Enviados:     {enviados}")
+        self.stdout.write(f"   Recibidos:    {metricas['recibidos']}")
+        self.stdout.write(f"   Guardados:    {metricas['guardados']} (descartados {metricas['descartados']}, "
+                          f"errores {metricas['errores']})")
+        self.stdout.write(f"   Throughput:   {metricas['guardados'] / duracion:.0f} msg/s guardados en {duracion:.1f}s")
+        self.stdout.write(f"   Retraso envío→commit (ms): p50={_percentil(retrasos, 50):.0f} "
+                          f"p95={_percentil(retrasos, 95):.0f} p99={_percentil(retrasos, 99):.0f} "
+                          f"max={retrasos[-1] if retrasos else 0:.0f}")
+        self.stdout.write(f"   Lotes:        {metricas['lotes']} (promedio {metricas['promedio_flush_ms']} ms, "
+                          f"máximo {metricas['max_flush_ms']} ms)")
+        self.stdout.write(f"   CPU listener: {cpu:.2f}s ({cpu / duracion * 100:.0f}% de un núcleo)")
+
+        if not opts['conservar']:
+            generados.delete()
+            BikeLatestState.objects.filter(bike_id__range=rango).delete()
+            self.stdout.write(self.style.SUCCESS("🧹 Telemetría sintética eliminada."))
@@ -0,0 +1,29 @@
+from django.core.management.base import BaseCommand
+
+from apps.iot.services.telemetry_retention_service import TelemetryRetentionService
+
+
+class Command(BaseCommand):
+    help = "Agrega por minuto la telemetría cruda más vieja que N días y elimina los registros crudos"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--dias', type=int, default=None,
+                            help='Días de telemetría cruda a conservar (por defecto IOT_TELEMETRY_RETENTION_DAYS)')
+        parser.add_argument('--dry-run', action='store_true', help='Solo muestra lo que se compactaría')
+
+    def handle(self, *args, **options):
+        simular = options['dry_run']
+        resumen = TelemetryRetentionService.compactar(dias=options['dias'], simular=simular)
+
+        if not resumen:
+            self.stdout.write(self.style.SUCCESS("✅ No hay telemetría cruda fuera del periodo de retención."))
+            return
+
+        for dia, datos in sorted(resumen.items()):
+            self.stdout.write(f"📅 {dia}: {datos['crudos']} registros crudos → {datos['minutos']} minutos")
+
+        total = sum(d['crudos'] for d in resumen.values())
+        if simular:
+            self.stdout.write(self.style.WARNING(f"🧪 Simulación: se compactarían {total} registros crudos."))
+        else:
+            self.stdout.write(self.style.SUCCESS(f"✅ Compactados y eliminados {total} registros crudos."))
@@ -0,0 +1,47 @@
+import time
+from itertools import permutations
+
+from django.core.management.base import BaseCommand
+
+from apps.iot.services.route_engine import motor_rutas
+from apps.stations.models import Station
+
+
+class Command(BaseCommand):
+    help = "Precalcula y guarda en disco las rutas entre todos los pares de estaciones"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--forzar', action='store_true', help='Recalcula también los pares ya guardados')
+        parser.add_argument('--sin-osrm', action='store_true', help='Usa solo el grafo vial local')
+        parser.add_argument('--pausa', type=float, default=0.2,
+                            help='Segundos entre consultas a OSRM (servidor público con límite de uso)')
+
+    def handle(self, *args, **options):
+        estaciones = [
+            (e.nombre, float(e.latitud), float(e.longitud))
+            for e in Station.objects.exclude(latitud=None).exclude(longitud=None).order_by('id')
+        ]
+        pares = list(permutations(estaciones, 2))
+        self.stdout.write(f"🗺️ {len(estaciones)} estaciones → {len(pares)} pares")
+
+        resumen = {"grafo": 0, "osrm": 0, "existentes": 0, "fallidos": 0}
+        for (origen, lat1, lon1), (destino, lat2, lon2) in pares:
+            if not options['forzar'] and motor_rutas.en_cache(lat1, lon1, lat2, lon2):
+                resumen["existentes"] += 1
+                continue
+
+            puntos, fuente = motor_rutas.calcular(lat1, lon1, lat2, lon2, usar_osrm=not options['sin_osrm'])
+            if puntos is None:
+                resumen["fallidos"] += 1
+                self.stdout.write(self.style.WARNING(f"⚠️ Sin ruta: {origen} → {destino}"))
+                continue
+
+            motor_rutas.guardar(lat1, lon1, lat2, lon2, puntos, fuente)
+            resumen[fuente] += 1
+            if fuente == "osrm" and options['pausa']:
+                time.sleep(options['pausa'])
+
+        self.stdout.write(self.style.SUCCESS(
+            f"✅ Rutas: {resumen['grafo']} por grafo, {resumen['osrm']} por OSRM, "
+            f"{resumen['existentes']} ya existentes, {resumen['fallidos']} fallidas."
+        ))
@@ -0,0 +1,56 @@
+import json
+import os
+
+from django.core.management.base import BaseCommand
+
+from apps.iot.services.listener_supervisor import ListenerSupervisor
+
+
+class Command(BaseCommand):
+    help = (
+        "Ejecuta N listeners MQTT en procesos separados (particionados por bike_id o con "
+        "suscripción compartida) y reporta periódicamente su salud y lag"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--procesos', type=int, default=None,
+                            help='Número de workers (por defecto IOT_MQTT_PARTITIONS)')
+        parser.add_argument('--compartido', action='store_true',
+                            help="Usa suscripción compartida $share/ en lugar de particiones por bike_id")
+        parser.add_argument('--host', default=None)
+        parser.add_argument('--port', type=int, default=None)
+        parser.add_argument('--intervalo', type=float, default=None,
+                            help='Segundos entre latidos/reportes (por defecto IOT_LISTENER_HEALTH_INTERVAL)')
+        parser.add_argument('--estado-archivo', default=None,
+                            help='Ruta de un JSON con el último resumen (para monitoreo externo)')
+        parser.add_argument('--duracion', type=float, default=None,
+                            help='Segundos de ejecución (por defecto, hasta Ctrl+C)')
+
+    def handle(self, *args, **opts):
+        supervisor = ListenerSupervisor(
+            procesos=opts['procesos'], compartido=opts['compartido'],
+            host=opts['host'], port=opts['port'], intervalo=opts['intervalo'],
+        )
+
+        def reportar(filas):
+            self.stdout.write("📊 worker  estado        msg/s   pendientes  lag_ms   guardados  descartados  reinicios")
+            for fila in filas:
+                self.stdout.write(
+                    f"   {fila['worker']:>6}  {fila['estado']:<12} {fila['ritmo_msg_s']:>7}   "
+                    f"{fila['pendientes'] or 0:>10}  {fila['retraso_ms'] or 0:>6}   {fila['guardados'] or 0:>9}  "
+                    f"{fila['descartados'] or 0:>11}  {fila['reinicios']:>9}"
+                )
+            if opts['estado_archivo']:
+                temporal = f"{opts['estado_archivo']}.tmp"
+                with open(temporal, "w", encoding="utf-8") as archivo:
+                    json.dump({"workers": filas}, archivo, indent=2)
+                os.replace(temporal, opts['estado_archivo'])
+
+        supervisor.iniciar()
+        try:
+            supervisor.vigilar(duracion=opts['duracion'], al_reportar=reportar)
+        except KeyboardInterrupt:
+            self.stdout.write("\n🛑 Deteniendo listeners...")
+        finally:
+            supervisor.detener()
+            reportar(supervisor.resumen())
@@ -0,0 +1,50 @@
+# Generated by Django 5.2.7 on 2026-10-17 19:53
+
+from django.db import migrations, models
+from django.db.models import Max
+
+
+def poblar_estado_actual(apps, schema_editor):
+    """Carga el último registro de cada bicicleta a partir del histórico existente."""
+    BikeTelemetry = apps.get_model('iot', 'BikeTelemetry')
+    BikeLatestState = apps.get_model('iot', 'BikeLatestState')
+
+    ultimos_ids = (
+        BikeTelemetry.objects.values('bike_id')
+        .annotate(last_id=Max('id'))
+        .values_list('last_id', flat=True)
+    )
+    campos = ('bike_id', 'timestamp', 'latitude', 'longitude', 'battery', 'lock_status')
+    estados = [
+        BikeLatestState(**dict(zip(campos, fila)))
+        for fila in BikeTelemetry.objects.filter(id__in=list(ultimos_ids)).values_list(*campos).iterator()
+    ]
+    BikeLatestState.objects.bulk_create(estados, batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('iot', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='BikeLatestState',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('bike_id', models.PositiveIntegerField(unique=True)),
+                ('timestamp', models.DateTimeField()),
+                ('latitude', models.FloatField()),
+                ('longitude', models.FloatField()),
+                ('battery', models.FloatField(help_text='Porcentaje de batería (0–100%)')),
+                ('lock_status', models.CharField(choices=[('LOCKED', 'Candado cerrado'), ('UNLOCKED', 'Candado abierto')], max_length=20)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'verbose_name': 'Estado actual de Bicicleta',
+                'verbose_name_plural': 'Estados actuales de Bicicletas',
+            },
+        ),
+        migrations.RunPython(poblar_estado_actual, migrations.RunPython.noop),
+    ]
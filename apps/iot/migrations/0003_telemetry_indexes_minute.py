@@ -0,0 +1,51 @@
+# Generated by Django 5.2.7 on 2026-10-17 19:55
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('iot', '0002_bike_latest_state'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='BikeTelemetryMinute',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('bike_id', models.PositiveIntegerField()),
+                ('minuto', models.DateTimeField(help_text='Inicio del minuto (UTC)')),
+                ('latitude', models.FloatField(help_text='Latitud promedio del minuto')),
+                ('longitude', models.FloatField(help_text='Longitud promedio del minuto')),
+                ('battery', models.FloatField(help_text='Batería promedio del minuto (0–100%)')),
+                ('battery_min', models.FloatField(help_text='Batería mínima registrada en el minuto')),
+                ('lock_status', models.CharField(choices=[('LOCKED', 'Candado cerrado'), ('UNLOCKED', 'Candado abierto')], help_text='UNLOCKED si hubo al menos un paquete con candado abierto', max_length=20)),
+                ('muestras', models.PositiveIntegerField(default=0)),
+            ],
+            options={
+                'verbose_name': 'Telemetría por minuto',
+                'verbose_name_plural': 'Telemetrías por minuto',
+            },
+        ),
+        migrations.AlterModelOptions(
+            name='biketelemetry',
+            options={'verbose_name': 'Telemetría de Bicicleta', 'verbose_name_plural': 'Telemetrías de Bicicletas'},
+        ),
+        migrations.AddIndex(
+            model_name='biketelemetry',
+            index=models.Index(fields=['bike_id', 'timestamp'], name='iot_tel_bike_ts_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='biketelemetry',
+            index=models.Index(fields=['timestamp'], name='iot_tel_ts_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='biketelemetryminute',
+            index=models.Index(fields=['minuto'], name='iot_tel_min_minuto_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='biketelemetryminute',
+            constraint=models.UniqueConstraint(fields=('bike_id', 'minuto'), name='iot_tel_min_bike_minuto_uniq'),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.7 on 2026-10-17 19:59
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('iot', '0003_telemetry_indexes_minute'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='bikelateststate',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True, db_index=True),
+        ),
+    ]
@@ -23,9 +23,76 @@ class BikeTelemetry(models.Model):
     received_at = models.DateTimeField(auto_now_add=True)
 
     class Meta:
-        ordering = ["-received_at"]
+        # Sin ordering por defecto: ordenar todo el histórico en cada consulta es costoso.
+        # Quien necesite orden debe pedirlo explícitamente con order_by().
         verbose_name = "Telemetría de Bicicleta"
         verbose_name_plural = "Telemetrías de Bicicletas"
+        indexes = [
+            models.Index(fields=["bike_id", "timestamp"], name="iot_tel_bike_ts_idx"),
+            models.Index(fields=["timestamp"], name="iot_tel_ts_idx"),
+        ]
 
     def __str__(self):
         return f"Bike {self.bike_id} @ {self.latitude:.4f}, {self.longitude:.4f} ({self.lock_status})"
+
+
+class BikeTelemetryMinute(models.Model):
+    """
+    Telemetría agregada por bicicleta y minuto.
+    La genera el comando `compact_telemetry` a partir de los registros crudos
+    que superan el periodo de retención (los crudos se eliminan después).
+    """
+
+    bike_id = models.PositiveIntegerField()
+    minuto = models.DateTimeField(help_text="Inicio del minuto (UTC)")
+
+    latitude = models.FloatField(help_text="Latitud promedio del minuto")
+    longitude = models.FloatField(help_text="Longitud promedio del minuto")
+
+    battery = models.FloatField(help_text="Batería promedio del minuto (0–100%)")
+    battery_min = models.FloatField(help_text="Batería mínima registrada en el minuto")
+    lock_status = models.CharField(
+        max_length=20,
+        choices=BikeTelemetry._meta.get_field("lock_status").choices,
+        help_text="UNLOCKED si hubo al menos un paquete con candado abierto",
+    )
+    muestras = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        verbose_name = "Telemetría por minuto"
+        verbose_name_plural = "Telemetrías por minuto"
+        constraints = [
+            models.UniqueConstraint(fields=["bike_id", "minuto"], name="iot_tel_min_bike_minuto_uniq"),
+        ]
+        indexes = [
+            models.Index(fields=["minuto"], name="iot_tel_min_minuto_idx"),
+        ]
+
+    def __str__(self):
+        return f"Bike {self.bike_id} @ {self.minuto:%Y-%m-%d %H:%M} ({self.muestras} muestras)"
+
+
+class BikeLatestState(models.Model):
+    """
+    Proyección con el último estado conocido de cada bicicleta (una fila por bike_id).
+    La actualiza la ruta de ingesta, de modo que consultar "la última posición"
+    depende del tamaño de la flota y no del largo del histórico.
+    """
+
+    bike_id = models.PositiveIntegerField(unique=True)
+    timestamp = models.DateTimeField()
+
+    latitude = models.FloatField()
+    longitude = models.FloatField()
+
+    battery = models.FloatField(help_text="Porcentaje de batería (0–100%)")
+    lock_status = models.CharField(max_length=20, choices=BikeTelemetry._meta.get_field("lock_status").choices)
+
+    updated_at = models.DateTimeField(auto_now=True, db_index=True)  # cursor del feed en vivo
+
+    class Meta:
+        verbose_name = "Estado actual de Bicicleta"
+        verbose_name_plural = "Estados actuales de Bicicletas"
+
+    def __str__(self):
+        return f"Bike {self.bike_id} → {self.latitude:.4f}, {self.longitude:.4f} ({self.lock_status})"
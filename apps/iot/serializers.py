@@ -1,5 +1,5 @@
 from rest_framework import serializers
-from .models import BikeTelemetry
+from .models import BikeTelemetry, BikeLatestState
 
 class BikeTelemetrySerializer(serializers.ModelSerializer):
     class Meta:
@@ -12,3 +12,11 @@ class BikeTelemetrySerializer(serializers.ModelSerializer):
             "lock_status",
             "timestamp",
         ]
+
+
+class BikeLatestStateSerializer(serializers.ModelSerializer):
+    """Mismo formato que BikeTelemetrySerializer, leído desde la proyección."""
+
+    class Meta:
+        model = BikeLatestState
+        fields = BikeTelemetrySerializer.Meta.fields
@@ -0,0 +1,173 @@
+import json
+import multiprocessing
+import queue
+import random
+import time
+from datetime import datetime, timezone as dt_timezone
+from types import SimpleNamespace
+
+import paho.mqtt.client as mqtt
+
+from apps.iot.services.telemetry_codec import TelemetryCodec
+from apps.iot.services.telemetry_partitions import TelemetryPartitioner
+
+
+CENTRO = (4.65, -74.10)  # Bogotá
+
+
+class BiciSintetica:
+    """Bicicleta simulada: caminata aleatoria alrededor del centro con descarga de batería."""
+
+    __slots__ = ("bike_id", "lat", "lon", "bateria")
+
+    def __init__(self, bike_id, rnd):
+        self.bike_id = bike_id
+        self.lat = CENTRO[0] + rnd.uniform(-0.08, 0.08)
+        self.lon = CENTRO[1] + rnd.uniform(-0.08, 0.08)
+        self.bateria = rnd.uniform(40, 100)
+
+    def paquete(self, rnd, formato="json"):
+        self.lat += rnd.uniform(-0.0002, 0.0002)
+        self.lon += rnd.uniform(-0.0002, 0.0002)
+        self.bateria = max(5.0, self.bateria - rnd.uniform(0, 0.05))
+        if formato == "binario":
+            return TelemetryCodec.codificar(self.bike_id, self.lat, self.lon, self.bateria, rnd.uniform(0, 25))
+        return json.dumps({
+            "bike_id": self.bike_id,
+            "lat": round(self.lat, 6),
+            "lon": round(self.lon, 6),
+            "bateria": round(self.bateria, 1),
+            "velocidad": round(rnd.uniform(0, 25), 1),
+            # Marca de envío: permite medir el retraso hasta el commit en la BD
+            "timestamp": datetime.now(dt_timezone.utc).isoformat(),
+        }).encode()
+
+
+def _proceso_flota(bike_ids, tasa, duracion, destino, enviados, opciones):
+    """
+    Cuerpo de cada proceso generador. Publica a ritmo constante
+    `len(bike_ids) * tasa` mensajes por segundo durante `duracion` segundos.
+    `destino` es una multiprocessing.Queue (broker local) o None (MQTT real).
+    """
+    rnd = random.Random(bike_ids[0] if bike_ids else 0)
+    bicis = [BiciSintetica(bike_id, rnd) for bike_id in bike_ids]
+    if not bicis:
+        return
+
+    cliente = None
+    if destino is None:
+        cliente = mqtt.Client()
+        cliente.connect(opciones["host"], opciones["port"], 60)
+        cliente.loop_start()
+
+    intervalo = 1.0 / (len(bicis) * tasa)
+    inicio = time.perf_counter()
+    fin = inicio + duracion
+    siguiente = inicio
+    pendientes = 0
+    i = 0
+    try:
+        while True:
+            ahora = time.perf_counter()
+            if ahora >= fin:
+                break
+            bici = bicis[i % len(bicis)]
+            carga = bici.paquete(rnd, opciones["formato"])
+            topic = opciones["topic"] or TelemetryPartitioner.topic_para(
+                bici.bike_id, opciones["formato"] == "binario", opciones["particiones"]
+            )
+            if cliente:
+                cliente.publish(topic, carga)
+            else:
+                destino.put((topic, carga))
+            i += 1
+            pendientes += 1
+
+            if pendientes >= 500:
+                with enviados.get_lock():
+                    enviados.value += pendientes
+                pendientes = 0
+
+            siguiente += intervalo
+            espera = siguiente - time.perf_counter()
+            if espera > 0.002:  # evita dormir por intervalos menores a la resolución del reloj
+                time.sleep(espera)
+    finally:
+        with enviados.get_lock():
+            enviados.value += pendientes
+        if cliente:
+            cliente.loop_stop()
+            cliente.disconnect()
+
+
+class FleetGenerator:
+    """
+    Generador de carga multiproceso: emula `n_bicis` bicicletas que publican
+    `tasa` mensajes por segundo cada una, repartidas entre `procesos` procesos.
+
+    - broker="mqtt": publica en un broker real (host/port).
+    - broker="local": usa una multiprocessing.Queue como broker sustituto; el
+      consumidor (p. ej. `benchmark_ingest`) lee con `recibir()`.
+    - formato="json" | "binario" (TelemetryCodec v1, topic bikes/telemetry/bin).
+    - Sin `topic` explícito cada bici publica en el topic de su partición
+      (`particiones`, por defecto IOT_MQTT_PARTITIONS), como la flota real.
+    """
+
+    def __init__(self, n_bicis, tasa=1.0, procesos=2, duracion=10.0, broker="local",
+                 host="localhost", port=1883, topic=None, bike_id_base=1, formato="json", particiones=None):
+        if broker not in ("local", "mqtt"):
+            raise ValueError("broker debe ser 'local' o 'mqtt'.")
+        if formato not in ("json", "binario"):
+            raise ValueError("formato debe ser 'json' o 'binario'.")
+        particiones = TelemetryPartitioner.total(particiones)
+        if topic is None and particiones == 1:
+            topic = TelemetryPartitioner.topic_para(0, formato == "binario", particiones)
+        self.n_bicis = n_bicis
+        self.tasa = tasa
+        self.procesos = max(1, min(procesos, n_bicis))
+        self.duracion = duracion
+        self.broker = broker
+        self.opciones = {"host": host, "port": port, "topic": topic, "formato": formato,
+                         "particiones": particiones}
+        self.bike_ids = list(range(bike_id_base, bike_id_base + n_bicis))
+
+        self.cola = multiprocessing.Queue(maxsize=200000) if broker == "local" else None
+        self.enviados = multiprocessing.Value("q", 0)
+        self._procesos = []
+
+    def iniciar(self):
+        for indice in range(self.procesos):
+            ids = self.bike_ids[indice::self.procesos]
+            proceso = multiprocessing.Process(
+                target=_proceso_flota,
+                args=(ids, self.tasa, self.duracion, self.cola, self.enviados, self.opciones),
+                name=f"fleet-{indice}",
+                daemon=True,
+            )
+            proceso.start()
+            self._procesos.append(proceso)
+        print(f"🚲 Flota sintética: {self.n_bicis} bicis × {self.tasa} msg/s en {self.procesos} procesos ({self.broker})")
+
+    def activo(self):
+        return any(p.is_alive() for p in self._procesos)
+
+    def esperar(self, timeout=None):
+        for proceso in self._procesos:
+            proceso.join(timeout)
+
+    def detener(self):
+        for proceso in self._procesos:
+            if proceso.is_alive():
+                proceso.terminate()
+        self.esperar(1)
+
+    def total_enviados(self):
+        return self.enviados.value
+
+    def recibir(self, timeout=0.1):
+        """Broker local: siguiente mensaje con la forma de paho (topic, payload), o None."""
+        try:
+            topic, payload = self.cola.get(timeout=timeout)
+        except queue.Empty:
+            return None
+        return SimpleNamespace(topic=topic, payload=payload)
@@ -0,0 +1,130 @@
+from datetime import datetime, timedelta, timezone as dt_timezone
+
+from django.db import connection
+from django.db.models import Count, Max
+from django.utils import timezone
+
+from apps.iot.models import BikeLatestState, BikeTelemetry
+
+
+class LatestStateService:
+    """
+    Mantiene la tabla BikeLatestState (último estado por bicicleta).
+
+    Cada lote de telemetría se reduce al registro más reciente por bike_id y se
+    aplica con un único upsert (`bulk_create(update_conflicts=True)`), que en
+    MySQL se traduce a INSERT ... ON DUPLICATE KEY UPDATE.
+    """
+
+    CAMPOS_ESTADO = ["timestamp", "latitude", "longitude", "battery", "lock_status"]
+
+    @staticmethod
+    def actualizar(registros):
+        """
+        Aplica un lote de registros normalizados (dicts con las claves de BikeTelemetry).
+        Ignora paquetes más viejos que el estado ya guardado. Retorna las filas escritas.
+        """
+        ultimos = {}
+        for datos in registros:
+            datos = dict(datos, timestamp=LatestStateService._normalizar_timestamp(datos["timestamp"]))
+            actual = ultimos.get(datos["bike_id"])
+            if actual is None or datos["timestamp"] >= actual["timestamp"]:
+                ultimos[datos["bike_id"]] = datos
+
+        if not ultimos:
+            return 0
+
+        # Un paquete atrasado no debe pisar una posición más nueva
+        vigentes = dict(
+            BikeLatestState.objects.filter(bike_id__in=ultimos.keys()).values_list("bike_id", "timestamp")
+        )
+        objetos = [
+            BikeLatestState(bike_id=bike_id, **{campo: datos[campo] for campo in LatestStateService.CAMPOS_ESTADO})
+            for bike_id, datos in ultimos.items()
+            if bike_id not in vigentes or datos["timestamp"] >= vigentes[bike_id]
+        ]
+        if not objetos:
+            return 0
+
+        # MySQL no admite indicar la columna del conflicto (usa cualquier UNIQUE)
+        unique_fields = ["bike_id"] if connection.features.supports_update_conflicts_with_target else None
+        BikeLatestState.objects.bulk_create(
+            objetos,
+            update_conflicts=True,
+            unique_fields=unique_fields,
+            update_fields=LatestStateService.CAMPOS_ESTADO + ["updated_at"],
+        )
+        return len(objetos)
+
+    @staticmethod
+    def desde_telemetria(telemetria: BikeTelemetry):
+        """Convierte una instancia de BikeTelemetry al formato que recibe `actualizar`."""
+        return {
+            "bike_id": telemetria.bike_id,
+            **{campo: getattr(telemetria, campo) for campo in LatestStateService.CAMPOS_ESTADO},
+        }
+
+    @staticmethod
+    def _normalizar_timestamp(valor):
+        valor = BikeTelemetry._meta.get_field("timestamp").to_python(valor)
+        if valor is None:
+            return timezone.now()
+        if timezone.is_naive(valor):
+            valor = timezone.make_aware(valor)
+        return valor
+
+    # ============================================================
+    # 🔖 Cursor de cambios (?since=)
+    # ============================================================
+    EPOCH = datetime(1970, 1, 1, tzinfo=dt_timezone.utc)
+
+    # `updated_at` se sella en Python antes del commit: un worker puede confirmar
+    # una fila con un sello anterior al cursor que otro cliente ya leyó. Se asume
+    # que ninguna transacción tarda más que este margen en confirmarse (el mismo
+    # que usa LiveFeedHub).
+    SOLAPE = timedelta(seconds=2)
+
+    @staticmethod
+    def cursor_de(fecha):
+        """Cursor opaco para clientes: microsegundos desde epoch de `updated_at` ("0" si no hay datos)."""
+        if fecha is None:
+            return "0"
+        return str((fecha - LatestStateService.EPOCH) // timedelta(microseconds=1))
+
+    @staticmethod
+    def fecha_de_cursor(cursor):
+        """Inverso de `cursor_de`. Lanza ValueError si el cursor no es válido."""
+        try:
+            micros = int(cursor)
+        except (TypeError, ValueError):
+            raise ValueError("Cursor inválido.")
+        if micros < 0:
+            raise ValueError("Cursor inválido.")
+        return LatestStateService.EPOCH + timedelta(microseconds=micros)
+
+    @staticmethod
+    def desde_cursor(desde):
+        """
+        Límite inferior de `updated_at` para un `?since=`: el cursor menos SOLAPE.
+        Las filas del margen se reenvían aunque el cliente ya las tenga (las
+        descarta por bike_id), a cambio de no perder las que confirmaron tarde.
+        """
+        return desde - LatestStateService.SOLAPE
+
+    @staticmethod
+    def version():
+        """
+        Versión actual de la proyección: (cursor, etag).
+        Cambia con cada actualización (updated_at) o con la aparición de una bicicleta nueva.
+        Mientras la última actualización tenga menos de SOLAPE, aún puede confirmarse
+        una fila con un sello anterior sin mover Max/Count: el ETag incluye entonces
+        la hora actual y no se responde 304 hasta que la proyección se asiente.
+        """
+        datos = BikeLatestState.objects.aggregate(ultimo=Max("updated_at"), total=Count("id"))
+        cursor = LatestStateService.cursor_de(datos["ultimo"])
+        etag = f'{cursor}-{datos["total"]}'
+
+        ahora = timezone.now()
+        if datos["ultimo"] is not None and ahora - datos["ultimo"] < LatestStateService.SOLAPE:
+            etag = f"{etag}-{LatestStateService.cursor_de(ahora)}"
+        return cursor, f'W/"{etag}"'
@@ -0,0 +1,223 @@
+import multiprocessing
+import os
+import queue
+import signal
+import threading
+import time
+
+from django.conf import settings
+
+from apps.iot.services.telemetry_partitions import TelemetryPartitioner
+
+
+# ============================================================
+# 👷 Proceso worker
+# ============================================================
+def proceso_listener(indice, particiones, compartido, host, port, salud, parar, intervalo):
+    """
+    Un listener completo (cliente MQTT + TelemetryBuffer propios) en su propio
+    proceso. Cada `intervalo` segundos envía un latido con sus métricas a la
+    cola `salud` del supervisor; termina (vaciando el buffer) cuando se activa `parar`.
+    """
+    from django.db import connections
+
+    from apps.iot.services.mqtt_listener import crear_cliente
+    from apps.iot.services.telemetry_buffer import TelemetryBuffer
+
+    # Ctrl+C lo gestiona el supervisor; el worker solo obedece a `parar`
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    # No reutilizar las conexiones heredadas del proceso padre
+    connections.close_all()
+
+    topics = TelemetryPartitioner.topics_de_worker(indice, particiones, compartido)
+    buffer = TelemetryBuffer()
+    conectado = threading.Event()
+    cliente = crear_cliente(buffer, topics, client_id=f"twomove-ingest-{indice}-{os.getpid()}")
+
+    suscribir = cliente.on_connect
+
+    def on_connect(client, userdata, flags, rc):
+        suscribir(client, userdata, flags, rc)
+        if rc == 0:
+            conectado.set()
+
+    cliente.on_connect = on_connect
+    cliente.on_disconnect = lambda client, userdata, rc: conectado.clear()
+
+    def latido(activo=True):
+        salud.put({
+            "worker": indice,
+            "pid": os.getpid(),
+            "ts": time.time(),
+            "activo": activo,
+            "conectado": conectado.is_set(),
+            "topics": [topic for topic, _ in topics],
+            **buffer.metricas(),
+        })
+
+    buffer.iniciar()
+    # connect_async + loop_start: el hilo de paho reintenta si el broker no está disponible
+    cliente.connect_async(host, port, 60)
+    cliente.loop_start()
+    try:
+        while not parar.wait(intervalo):
+            latido()
+    finally:
+        cliente.loop_stop()
+        cliente.disconnect()
+        conectado.clear()
+        buffer.detener()
+        latido(activo=False)
+
+
+class ListenerSupervisor:
+    """
+    Ejecuta N procesos listener y vigila su salud.
+
+    - Modo particionado (por defecto): el worker k consume la partición k de
+      `TelemetryPartitioner`; los publicadores deben usar IOT_MQTT_PARTITIONS = N.
+      Como cada bicicleta cae siempre en la misma partición, el orden por
+      bicicleta se conserva.
+    - Modo compartido: todos los workers usan una suscripción compartida
+      (`$share/...`) y el broker reparte la carga sin tocar a los publicadores.
+
+    Los workers caídos se relanzan. `resumen()` da, por worker, ritmo de
+    ingesta, pendientes, lag (`retraso_ms`) y un estado: ok, atrasado,
+    desconectado, sin_latido o caido.
+    """
+
+    def __init__(self, procesos=None, compartido=False, host=None, port=None, intervalo=None,
+                 max_retraso_ms=None, objetivo=None):
+        self.procesos = max(1, procesos or TelemetryPartitioner.total())
+        self.compartido = compartido
+        self.host = host or getattr(settings, "IOT_MQTT_HOST", "localhost")
+        self.port = port or getattr(settings, "IOT_MQTT_PORT", 1883)
+        self.intervalo = intervalo or getattr(settings, "IOT_LISTENER_HEALTH_INTERVAL", 5.0)
+        self.max_retraso_ms = max_retraso_ms or getattr(settings, "IOT_LISTENER_MAX_LAG_MS", 5000)
+        self._objetivo = objetivo or proceso_listener
+
+        self.salud = multiprocessing.Queue()
+        self.parar = multiprocessing.Event()
+        self._workers = {}       # índice → Process
+        self._iniciado_en = {}   # índice → time.time() del último arranque
+        self._reportes = {}      # índice → último latido
+        self._ritmo = {}         # índice → msg/s entre los dos últimos latidos
+        self._reinicios = {}     # índice → veces relanzado
+
+    # ============================================================
+    # ▶️ Ciclo de vida
+    # ============================================================
+    def iniciar(self):
+        if not self.compartido and self.procesos != TelemetryPartitioner.total():
+            print(f"⚠️ IOT_MQTT_PARTITIONS={TelemetryPartitioner.total()} pero hay {self.procesos} workers: "
+                  f"los publicadores deben usar {self.procesos} particiones.")
+        for indice in range(self.procesos):
+            self._reinicios.setdefault(indice, 0)
+            self._lanzar(indice)
+        modo = "compartido" if self.compartido else "particionado"
+        print(f"👷 {self.procesos} listeners MQTT en marcha ({modo}, {self.host}:{self.port})")
+
+    def _lanzar(self, indice):
+        proceso = multiprocessing.Process(
+            target=self._objetivo,
+            args=(indice, self.procesos, self.compartido, self.host, self.port,
+                  self.salud, self.parar, self.intervalo),
+            name=f"mqtt-listener-{indice}",
+        )
+        proceso.start()
+        self._workers[indice] = proceso
+        self._iniciado_en[indice] = time.time()
+
+    def revisar(self):
+        """Relanza los workers que hayan terminado inesperadamente. Retorna los relanzados."""
+        relanzados = []
+        if self.parar.is_set():
+            return relanzados
+        for indice, proceso in self._workers.items():
+            if not proceso.is_alive():
+                self._reinicios[indice] += 1
+                print(f"♻️ Listener {indice} terminó (código {proceso.exitcode}); relanzando...")
+                self._lanzar(indice)
+                relanzados.append(indice)
+        return relanzados
+
+    def detener(self, timeout=15):
+        """Pide a todos los workers que vacíen su buffer y terminen."""
+        self.parar.set()
+        limite = time.time() + timeout
+        for proceso in self._workers.values():
+            proceso.join(max(0.1, limite - time.time()))
+        for proceso in self._workers.values():
+            if proceso.is_alive():
+                proceso.terminate()
+                proceso.join(1)
+        self.recoger_latidos()
+        print("🛑 Listeners detenidos.")
+
+    # ============================================================
+    # ❤️ Salud y lag
+    # ============================================================
+    def recoger_latidos(self, espera=0):
+        """Procesa los latidos pendientes (esperando hasta `espera` s por el primero)."""
+        recibidos = 0
+        while True:
+            try:
+                reporte = self.salud.get(timeout=espera) if espera and not recibidos else self.salud.get_nowait()
+            except queue.Empty:
+                return recibidos
+            recibidos += 1
+            anterior = self._reportes.get(reporte["worker"])
+            if anterior and anterior.get("pid") == reporte.get("pid") and reporte["ts"] > anterior["ts"]:
+                self._ritmo[reporte["worker"]] = round(
+                    (reporte["recibidos"] - anterior["recibidos"]) / (reporte["ts"] - anterior["ts"]), 1
+                )
+            self._reportes[reporte["worker"]] = reporte
+
+    def vigilar(self, duracion=None, al_reportar=None):
+        """Bucle del supervisor: latidos, relanzamientos y reporte cada `intervalo`."""
+        fin = time.time() + duracion if duracion else None
+        siguiente = time.time() + self.intervalo
+        while not self.parar.is_set() and (fin is None or time.time() < fin):
+            self.recoger_latidos(espera=max(0.05, min(siguiente, fin or siguiente) - time.time()))
+            if time.time() >= siguiente:
+                self.revisar()
+                if al_reportar:
+                    al_reportar(self.resumen())
+                siguiente += self.intervalo
+
+    def resumen(self):
+        """Estado por worker, listo para imprimir o volcar a JSON."""
+        ahora = time.time()
+        filas = []
+        for indice in sorted(self._workers):
+            proceso = self._workers[indice]
+            reporte = self._reportes.get(indice)
+            if reporte and reporte.get("pid") != proceso.pid:
+                reporte = None  # latido de una instancia anterior del worker
+
+            if not proceso.is_alive():
+                estado = "caido"
+            elif ahora - (reporte["ts"] if reporte else self._iniciado_en[indice]) > 3 * self.intervalo:
+                estado = "sin_latido"
+            elif reporte is None:
+                estado = "iniciando"
+            elif not reporte["conectado"]:
+                estado = "desconectado"
+            elif reporte["retraso_ms"] > self.max_retraso_ms:
+                estado = "atrasado"
+            else:
+                estado = "ok"
+
+            reporte = reporte or {}
+            filas.append({
+                "worker": indice,
+                "pid": proceso.pid,
+                "estado": estado,
+                "reinicios": self._reinicios.get(indice, 0),
+                "ultimo_latido_s": round(ahora - reporte["ts"], 1) if reporte else None,
+                "ritmo_msg_s": self._ritmo.get(indice, 0.0) if reporte else 0.0,
+                **{clave: reporte.get(clave) for clave in (
+                    "recibidos", "guardados", "descartados", "errores", "pendientes", "retraso_ms", "inactivo_s",
+                )},
+            })
+        return filas
@@ -0,0 +1,140 @@
+import json
+import queue
+import threading
+import time
+
+from django.conf import settings
+from django.db import close_old_connections
+
+from apps.iot.models import BikeLatestState
+from apps.iot.services.latest_state_service import LatestStateService
+
+
+CAMPOS = ("bike_id", "latitude", "longitude", "battery", "lock_status", "timestamp")
+RESYNC = object()  # marca para un suscriptor que se quedó atrás
+
+
+class LiveFeedHub:
+    """
+    Difusión en vivo de posiciones de bicicletas (Server-Sent Events).
+
+    Un único hilo por proceso consulta BikeLatestState por `updated_at` y
+    reparte a cada navegador conectado solo las bicicletas que cambiaron.
+    Así, N paneles abiertos cuestan una consulta incremental por intervalo
+    en lugar de N agregaciones completas cada 2 segundos.
+
+    El hilo arranca con el primer suscriptor y termina cuando no queda ninguno.
+    """
+
+    # Margen para no perder filas cuyo commit llegó después de leer el cursor
+    SOLAPE = LatestStateService.SOLAPE
+
+    def __init__(self, intervalo=None, max_cola=None, autoiniciar=True):
+        self.intervalo = intervalo or getattr(settings, "IOT_LIVE_FEED_INTERVAL", 1.0)
+        self.max_cola = max_cola or getattr(settings, "IOT_LIVE_FEED_MAX_QUEUE", 100)
+        self.autoiniciar = autoiniciar
+
+        self._estado = {}         # bike_id → último dict enviado
+        self._cursor = None       # mayor updated_at visto
+        self._suscriptores = set()
+        self._lock = threading.Lock()
+        self._worker = None
+
+    # ============================================================
+    # 👥 Suscripciones
+    # ============================================================
+    def suscribir(self):
+        """
+        Registra un suscriptor. Retorna (cola, snapshot): el snapshot es el estado
+        completo en memoria y la cola recibirá los deltas posteriores.
+        """
+        cola = queue.Queue(maxsize=self.max_cola)
+        with self._lock:
+            self._suscriptores.add(cola)
+            snapshot = list(self._estado.values())
+        if self.autoiniciar:
+            self._asegurar_worker()
+        return cola, snapshot
+
+    def cancelar(self, cola):
+        with self._lock:
+            self._suscriptores.discard(cola)
+
+    def total_suscriptores(self):
+        with self._lock:
+            return len(self._suscriptores)
+
+    # ============================================================
+    # 🔁 Sondeo incremental
+    # ============================================================
+    def _asegurar_worker(self):
+        with self._lock:
+            if self._worker is not None:
+                return
+            self._worker = threading.Thread(target=self._loop, name="iot-live-feed", daemon=True)
+            self._worker.start()
+
+    def _loop(self):
+        try:
+            while True:
+                with self._lock:
+                    if not self._suscriptores:
+                        self._worker = None  # el próximo suscriptor lo vuelve a lanzar
+                        return
+                close_old_connections()
+                try:
+                    self.sondear()
+                except Exception as e:
+                    print(f"❌ Error en el feed en vivo: {e}")
+                time.sleep(self.intervalo)
+        finally:
+            close_old_connections()
+
+    def sondear(self):
+        """Lee los cambios desde el cursor y los reparte. Retorna la lista de cambios."""
+        filas = BikeLatestState.objects.order_by("updated_at")
+        if self._cursor is not None:
+            filas = filas.filter(updated_at__gte=self._cursor - self.SOLAPE)
+
+        leidas = list(filas.values(*CAMPOS, "updated_at"))
+
+        cambios = []
+        with self._lock:
+            for fila in leidas:
+                actualizado = fila.pop("updated_at")
+                if self._cursor is None or actualizado > self._cursor:
+                    self._cursor = actualizado
+                fila["timestamp"] = fila["timestamp"].isoformat()
+                if self._estado.get(fila["bike_id"]) != fila:
+                    self._estado[fila["bike_id"]] = fila
+                    cambios.append(fila)
+            suscriptores = list(self._suscriptores)
+
+        # En la primera carga también se difunde: quien se suscribió antes recibió un snapshot vacío
+        if cambios:
+            self._difundir(cambios, suscriptores)
+        return cambios
+
+    def _difundir(self, cambios, suscriptores):
+        for cola in suscriptores:
+            try:
+                cola.put_nowait(cambios)
+            except queue.Full:
+                # Cliente lento: se vacía su cola y se le pide volver a cargar el estado
+                with cola.mutex:
+                    cola.queue.clear()
+                cola.put_nowait(RESYNC)
+
+    def snapshot(self):
+        with self._lock:
+            return list(self._estado.values())
+
+    # ============================================================
+    # 📨 Formato SSE
+    # ============================================================
+    @staticmethod
+    def evento(nombre, datos):
+        return f"event: {nombre}\ndata: {json.dumps(datos)}\n\n"
+
+
+hub = LiveFeedHub()
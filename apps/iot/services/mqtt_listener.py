@@ -1,10 +1,8 @@
 import os
 import sys
 import django
-import json
 import time
 import paho.mqtt.client as mqtt
-from datetime import datetime
 
 # ============================================================
 #  Inicialización del entorno Django
@@ -19,48 +17,46 @@ os.environ.setdefault("DJANGO_SETTINGS_MODULE", "TwoMove.settings")
 print("⚙️  Inicializando entorno Django...")
 django.setup()
 
-from apps.iot.models import BikeTelemetry
+from django.conf import settings
+
+from apps.iot.services.telemetry_buffer import TelemetryBuffer
+from apps.iot.services.telemetry_codec import TelemetryCodec
+from apps.iot.services.telemetry_ingest_service import TelemetryIngestService
+from apps.iot.services.telemetry_partitions import TelemetryPartitioner
 
 
 # ============================================================
 # 🔄 Callback: recepción de mensajes MQTT
 # ============================================================
 def on_message(client, userdata, msg):
+    """
+    Decodifica el paquete y lo persiste.
+    Si el cliente fue creado con un TelemetryBuffer como userdata, el registro
+    solo se encola (modo por lotes) y el hilo de red de paho nunca toca la BD.
+    Acepta JSON (firmware antiguo) y el formato binario v1 (topic /bin o cabecera 0x01).
+    """
     try:
-        payload = json.loads(msg.payload.decode())
-        print("📥 Telemetría recibida:", payload)
-
-        # Extraer datos del mensaje MQTT
-        bike_id = payload.get("bike_id")
-        lat = payload.get("lat")
-        lon = payload.get("lon")
-        bateria = payload.get("bateria") or payload.get("battery")
-        velocidad = payload.get("velocidad") or payload.get("speed")
-        timestamp = payload.get("timestamp")
-
-        # Validaciones básicas
-        if lat is None or lon is None:
-            print("⚠️ Coordenadas inválidas, mensaje ignorado.")
+        if TelemetryCodec.es_binario(msg.topic, msg.payload):
+            if isinstance(userdata, TelemetryBuffer):
+                userdata.agregar_binario(msg.payload)
+            else:
+                TelemetryIngestService.guardar_lote(TelemetryCodec.decodificar_lote(msg.payload))
             return
 
-        if bike_id is None:
-            print("⚠️ ID de bicicleta no especificado.")
+        datos = TelemetryIngestService.parsear_payload(msg.payload)
+        if datos is None:
             return
 
-        # Determinar estado del candado (simplemente para ejemplo)
-        lock_status = "UNLOCKED" if velocidad and velocidad > 0 else "LOCKED"
-
-        # Crear registro en la base de datos
-        telemetria = BikeTelemetry.objects.create(
-            bike_id=bike_id,
-            latitude=lat,
-            longitude=lon,
-            battery=bateria or 100.0,  # ✅ usa 'battery' real del modelo
-            lock_status=lock_status,
-            timestamp=timestamp or datetime.now(),
-        )
+        if isinstance(userdata, TelemetryBuffer):
+            userdata.agregar(datos)
+            return
 
-        print(f"💾 Telemetría guardada correctamente → Bike {bike_id} ({lat}, {lon}) [{lock_status}]")
+        # Modo directo: un INSERT por mensaje
+        TelemetryIngestService.guardar_lote([datos])
+        print(
+            f"💾 Telemetría guardada correctamente → Bike {datos['bike_id']} "
+            f"({datos['latitude']}, {datos['longitude']}) [{datos['lock_status']}]"
+        )
 
     except Exception as e:
         print(f"❌ Error procesando mensaje: {e}")
@@ -69,27 +65,47 @@ def on_message(client, userdata, msg):
 # ============================================================
 # ⚙️ Configuración del cliente MQTT
 # ============================================================
-def main():
-    client = mqtt.Client()
+def crear_cliente(buffer=None, topics=None, client_id=""):
+    """
+    Cliente paho con el callback de ingesta. `topics` es la lista (topic, qos)
+    que se (re)suscribe en cada conexión; por defecto los topics sin particionar.
+    """
+    topics = topics or TelemetryPartitioner.topics_de_worker(0, 1)
+    client = mqtt.Client(client_id=client_id)
+    client.user_data_set(buffer)
 
     def on_connect(client, userdata, flags, rc):
         if rc == 0:
-            print("✅ Conectado a MQTT (localhost:1883) — Suscrito a 'bikes/telemetry'")
-            client.subscribe("bikes/telemetry")
+            print(f"✅ Conectado a MQTT — Suscrito a {[topic for topic, _ in topics]}")
+            client.subscribe(topics)
         else:
             print(f"❌ Error de conexión MQTT: código {rc}")
 
     client.on_connect = on_connect
     client.on_message = on_message
+    return client
+
+
+def main(por_lotes=True):
+    buffer = TelemetryBuffer() if por_lotes else None
+    client = crear_cliente(buffer)
 
     # Conexión al broker local Mosquitto
-    client.connect("localhost", 1883, 60)
+    client.connect(settings.IOT_MQTT_HOST, settings.IOT_MQTT_PORT, 60)
     print("🎧 Esperando mensajes MQTT...\n")
 
+    if buffer:
+        buffer.iniciar()
+
     try:
         client.loop_forever()
     except KeyboardInterrupt:
         print("\n🛑 Listener detenido manualmente.")
+    finally:
+        client.disconnect()
+        # Vaciar lo pendiente antes de salir
+        if buffer:
+            buffer.detener()
 
 
 # ============================================================
@@ -0,0 +1,203 @@
+import heapq
+import json
+import os
+import threading
+from collections import OrderedDict
+
+import requests
+from django.conf import settings
+
+from apps.stations.services.geo_index import haversine_km
+
+
+OSRM_URL = "https://router.project-osrm.org/route/v1/bike/{lon1},{lat1};{lon2},{lat2}?overview=full&geometries=geojson"
+
+
+class RoadGraph:
+    """
+    Grafo vial local cargado desde un JSON:
+        {"nodos": {"id": [lat, lon], ...}, "aristas": [[a, b], [a, b, peso_km], ...]}
+    Las aristas son bidireccionales; sin peso se usa la distancia haversine.
+    """
+
+    def __init__(self, nodos, aristas):
+        self.nodos = {str(k): (float(v[0]), float(v[1])) for k, v in nodos.items()}
+        self.vecinos = {nodo: [] for nodo in self.nodos}
+        for arista in aristas:
+            a, b = str(arista[0]), str(arista[1])
+            peso = float(arista[2]) if len(arista) > 2 else haversine_km(*self.nodos[a], *self.nodos[b])
+            self.vecinos[a].append((b, peso))
+            self.vecinos[b].append((a, peso))
+
+    @classmethod
+    def desde_archivo(cls, ruta):
+        with open(ruta, encoding="utf-8") as f:
+            datos = json.load(f)
+        return cls(datos["nodos"], datos["aristas"])
+
+    def nodo_mas_cercano(self, lat, lon):
+        return min(self.nodos, key=lambda n: haversine_km(lat, lon, *self.nodos[n]))
+
+    def camino_mas_corto(self, origen, destino):
+        """Dijkstra. Retorna la lista de nodos de origen a destino, o None si no hay camino."""
+        distancias = {origen: 0.0}
+        previo = {}
+        pendientes = [(0.0, origen)]
+        while pendientes:
+            distancia, nodo = heapq.heappop(pendientes)
+            if nodo == destino:
+                camino = [nodo]
+                while nodo in previo:
+                    nodo = previo[nodo]
+                    camino.append(nodo)
+                return camino[::-1]
+            if distancia > distancias[nodo]:
+                continue
+            for vecino, peso in self.vecinos[nodo]:
+                nueva = distancia + peso
+                if nueva < distancias.get(vecino, float("inf")):
+                    distancias[vecino] = nueva
+                    previo[vecino] = nodo
+                    heapq.heappush(pendientes, (nueva, vecino))
+        return None
+
+    def ruta(self, lat1, lon1, lat2, lon2):
+        camino = self.camino_mas_corto(self.nodo_mas_cercano(lat1, lon1), self.nodo_mas_cercano(lat2, lon2))
+        if camino is None:
+            return None
+        return [(lat1, lon1)] + [self.nodos[n] for n in camino] + [(lat2, lon2)]
+
+
+class RouteEngine:
+    """
+    Motor de rutas local para la simulación IoT.
+
+    Orden de búsqueda al iniciar un viaje:
+      1. memoria (LRU por proceso)
+      2. disco (`IOT_ROUTE_CACHE_DIR`, un JSON por par origen→destino)
+      3. grafo vial local (`IOT_ROAD_GRAPH_FILE`, opcional) con Dijkstra
+      4. proveedor remoto (OSRM con timeout), sin guardar el resultado
+      5. línea recta
+
+    `precompute_routes` llena el disco para todos los pares de estaciones,
+    así que en operación normal un viaje nunca espera a la red.
+    """
+
+    def __init__(self, directorio=None, archivo_grafo=None, max_memoria=None):
+        self.directorio = directorio or getattr(settings, "IOT_ROUTE_CACHE_DIR", None)
+        self.archivo_grafo = archivo_grafo or getattr(settings, "IOT_ROAD_GRAPH_FILE", None)
+        self.max_memoria = max_memoria or getattr(settings, "IOT_ROUTE_MEMORY_MAX", 5000)
+        self._memoria = OrderedDict()
+        self._grafo = None
+        self._lock = threading.Lock()
+
+    # ============================================================
+    # 🔑 Claves y caché
+    # ============================================================
+    @staticmethod
+    def clave(lat1, lon1, lat2, lon2):
+        return f"{float(lat1):.6f}_{float(lon1):.6f}__{float(lat2):.6f}_{float(lon2):.6f}"
+
+    def _archivo(self, clave):
+        return os.path.join(self.directorio, f"{clave}.json") if self.directorio else None
+
+    def _recordar(self, clave, puntos):
+        with self._lock:
+            self._memoria[clave] = puntos
+            self._memoria.move_to_end(clave)
+            while len(self._memoria) > self.max_memoria:
+                self._memoria.popitem(last=False)
+
+    def _leer_disco(self, clave):
+        archivo = self._archivo(clave)
+        if not archivo or not os.path.exists(archivo):
+            return None
+        try:
+            with open(archivo, encoding="utf-8") as f:
+                return [tuple(p) for p in json.load(f)["puntos"]]
+        except (OSError, ValueError, KeyError) as e:
+            print(f"⚠️ Ruta en caché ilegible ({archivo}): {e}")
+            return None
+
+    def guardar(self, lat1, lon1, lat2, lon2, puntos, fuente):
+        """Escribe la ruta en disco (de forma atómica) y en memoria."""
+        clave = self.clave(lat1, lon1, lat2, lon2)
+        archivo = self._archivo(clave)
+        if archivo:
+            os.makedirs(self.directorio, exist_ok=True)
+            temporal = f"{archivo}.tmp"
+            with open(temporal, "w", encoding="utf-8") as f:
+                json.dump({"fuente": fuente, "puntos": [list(p) for p in puntos]}, f)
+            os.replace(temporal, archivo)
+        self._recordar(clave, puntos)
+
+    def en_cache(self, lat1, lon1, lat2, lon2):
+        clave = self.clave(lat1, lon1, lat2, lon2)
+        archivo = self._archivo(clave)
+        return clave in self._memoria or bool(archivo and os.path.exists(archivo))
+
+    # ============================================================
+    # 🗺️ Fuentes de rutas
+    # ============================================================
+    def grafo(self):
+        if self._grafo is None and self.archivo_grafo and os.path.exists(self.archivo_grafo):
+            with self._lock:
+                if self._grafo is None:
+                    self._grafo = RoadGraph.desde_archivo(self.archivo_grafo)
+                    print(f"🛣️ Grafo vial cargado: {len(self._grafo.nodos)} nodos")
+        return self._grafo
+
+    @staticmethod
+    def osrm(lat1, lon1, lat2, lon2, timeout=None):
+        """Consulta OSRM con timeout. Retorna la lista de puntos o None."""
+        timeout = timeout or getattr(settings, "IOT_OSRM_TIMEOUT", 3)
+        url = OSRM_URL.format(lat1=lat1, lon1=lon1, lat2=lat2, lon2=lon2)
+        try:
+            data = requests.get(url, timeout=timeout).json()
+            if data.get("routes"):
+                return [(lat, lon) for lon, lat in data["routes"][0]["geometry"]["coordinates"]]
+        except Exception as e:
+            print(f"⚠️ Error obteniendo ruta OSRM: {e}")
+        return None
+
+    # ============================================================
+    # 🚴 Consultas
+    # ============================================================
+    def obtener_ruta(self, lat1, lon1, lat2, lon2, remoto=None):
+        """
+        Ruta para iniciar un viaje. `remoto(lat1, lon1, lat2, lon2)` solo se usa
+        si el par no está en memoria, disco ni grafo (y su resultado no se guarda).
+        """
+        clave = self.clave(lat1, lon1, lat2, lon2)
+        with self._lock:
+            puntos = self._memoria.get(clave)
+            if puntos is not None:
+                self._memoria.move_to_end(clave)
+                return puntos
+
+        puntos = self._leer_disco(clave)
+        if puntos is None and self.grafo():
+            puntos = self.grafo().ruta(lat1, lon1, lat2, lon2)
+        if puntos is not None:
+            self._recordar(clave, puntos)
+            return puntos
+
+        print(f"⚠️ Ruta {clave} sin precalcular (ejecute precompute_routes).")
+        if remoto:
+            return remoto(lat1, lon1, lat2, lon2)
+        return [(lat1, lon1), (lat2, lon2)]
+
+    def calcular(self, lat1, lon1, lat2, lon2, usar_osrm=True):
+        """Calcula (sin caché) una ruta con grafo u OSRM. Retorna (puntos, fuente) o (None, None)."""
+        if self.grafo():
+            puntos = self.grafo().ruta(lat1, lon1, lat2, lon2)
+            if puntos:
+                return puntos, "grafo"
+        if usar_osrm:
+            puntos = self.osrm(lat1, lon1, lat2, lon2)
+            if puntos:
+                return puntos, "osrm"
+        return None, None
+
+
+motor_rutas = RouteEngine()
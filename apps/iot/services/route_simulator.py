@@ -2,7 +2,6 @@ import os
 import sys
 import json
 import time
-import requests
 import django
 import paho.mqtt.client as mqtt
 from django.utils import timezone
@@ -21,6 +20,8 @@ django.setup()
 from apps.stations.models import Station
 from apps.bikes.models import Bike
 from apps.rentals.models import Rental
+from apps.iot.services.route_engine import RouteEngine, motor_rutas
+from apps.iot.services.telemetry_partitions import TelemetryPartitioner
 
 
 # ============================================================
@@ -30,29 +31,16 @@ from apps.rentals.models import Rental
 def get_route_points(lat1, lon1, lat2, lon2):
     """
     Obtiene una ruta real entre dos coordenadas usando el motor
-    de rutas de OpenStreetMap (OSRM).
+    de rutas de OpenStreetMap (OSRM, vía RouteEngine.osrm).
+    Solo se usa cuando el motor local no tiene la ruta (ver route_engine).
     """
-    url = (
-        f"https://router.project-osrm.org/route/v1/bike/"
-        f"{lon1},{lat1};{lon2},{lat2}?overview=full&geometries=geojson"
-    )
-
-    try:
-        response = requests.get(url)
-        data = response.json()
-
-        if "routes" in data and len(data["routes"]) > 0:
-            coords = data["routes"][0]["geometry"]["coordinates"]
-            # OSRM devuelve [lon, lat] — los convertimos a [lat, lon]
-            print(f"🗺️ Ruta OSRM obtenida con {len(coords)} puntos.")
-            return [(lat, lon) for lon, lat in coords]
-
-        print("⚠️ No se obtuvo ruta OSRM, usando línea recta.")
-        return [(lat1, lon1), (lat2, lon2)]
+    puntos = RouteEngine.osrm(lat1, lon1, lat2, lon2)
+    if puntos:
+        print(f"🗺️ Ruta OSRM obtenida con {len(puntos)} puntos.")
+        return puntos
 
-    except Exception as e:
-        print(f"❌ Error obteniendo ruta OSRM: {e}")
-        return [(lat1, lon1), (lat2, lon2)]
+    print("⚠️ No se obtuvo ruta OSRM, usando línea recta.")
+    return [(lat1, lon1), (lat2, lon2)]
 
 
 # ============================================================
@@ -86,12 +74,13 @@ def simulate_bike_route(rental_id):
     client.connect("localhost", 1883, 60)
     print("✅ Conectado al broker MQTT (localhost:1883)")
 
-    # Obtener ruta real
-    route_points = get_route_points(
+    # Obtener ruta real (caché local; OSRM solo si el par no fue precalculado)
+    route_points = motor_rutas.obtener_ruta(
         float(start_station.latitud),
         float(start_station.longitud),
         float(end_station.latitud),
         float(end_station.longitud),
+        remoto=get_route_points,
     )
 
     # Simulación punto a punto
@@ -106,7 +95,7 @@ def simulate_bike_route(rental_id):
             "timestamp": timezone.now().isoformat(),
         }
 
-        client.publish("bikes/telemetry", json.dumps(payload))
+        client.publish(TelemetryPartitioner.topic_para(bike.id), json.dumps(payload))
         print(f"📡 [{i+1}/{len(route_points)}] → {lat:.5f}, {lon:.5f}")
         time.sleep(1)  # segundos entre puntos
 
@@ -0,0 +1,266 @@
+import heapq
+import itertools
+import json
+import threading
+import time
+from collections import deque
+
+import paho.mqtt.client as mqtt
+from django.conf import settings
+from django.db import close_old_connections
+from django.utils import timezone
+
+from apps.iot.services.route_engine import RouteEngine, motor_rutas
+from apps.iot.services.telemetry_partitions import TelemetryPartitioner
+
+
+class SimulacionActiva:
+    """Estado de un viaje simulado: ruta y siguiente punto a publicar."""
+
+    __slots__ = ("rental_id", "bike_id", "puntos", "indice")
+
+    def __init__(self, rental_id, bike_id, puntos):
+        self.rental_id = rental_id
+        self.bike_id = bike_id
+        self.puntos = puntos
+        self.indice = 0
+
+
+def cargar_simulacion(rental_id):
+    """Lee el alquiler y resuelve su ruta. Retorna SimulacionActiva o None."""
+    from apps.rentals.models import Rental
+
+    try:
+        rental = Rental.objects.select_related("bike", "estacion_origen", "estacion_destino").get(id=rental_id)
+    except Rental.DoesNotExist:
+        print(f"❌ No se encontró la reserva #{rental_id}")
+        return None
+
+    origen, destino = rental.estacion_origen, rental.estacion_destino
+    if not origen or not destino or origen.latitud is None or destino.latitud is None:
+        print(f"⚠️ Reserva #{rental_id} sin estaciones válidas.")
+        return None
+
+    coords = (float(origen.latitud), float(origen.longitud), float(destino.latitud), float(destino.longitud))
+    puntos = motor_rutas.obtener_ruta(*coords, remoto=RouteEngine.osrm) or [coords[:2], coords[2:]]
+    return SimulacionActiva(rental.id, rental.bike_id, puntos)
+
+
+class SimulationScheduler:
+    """
+    Planificador único de simulaciones IoT.
+
+    Un solo hilo recorre un heap ordenado por "próximo envío" y publica un
+    punto de cada viaje activo por intervalo, usando una conexión MQTT compartida.
+    Así, 500 viajes simultáneos son 500 entradas en el heap, no 500 hilos
+    ni 500 conexiones al broker.
+
+    - `max_activas`: viajes simulados a la vez; el resto espera en cola FIFO.
+    - `cancelar(rental_id)`: detiene la simulación (p. ej. al finalizar el viaje).
+    - `metricas()`: activas, en espera, publicados, completadas, canceladas, errores.
+
+    El hilo arranca con la primera simulación y termina cuando no queda ninguna.
+    """
+
+    def __init__(self, max_activas=None, intervalo=None, crear_cliente=None, cargar=None):
+        self.max_activas = max_activas or getattr(settings, "IOT_SIM_MAX_ACTIVE", 200)
+        self.intervalo = intervalo or getattr(settings, "IOT_SIM_INTERVAL", 1.0)
+        self._crear_cliente = crear_cliente or self._cliente_mqtt
+        self._cargar = cargar or cargar_simulacion
+
+        self._cond = threading.Condition()
+        self._heap = []                 # (instante, secuencia, rental_id)
+        self._secuencia = itertools.count()
+        self._activas = {}              # rental_id → SimulacionActiva
+        self._entrantes = deque()       # solicitudes aún sin cargar
+        self._cargando = set()          # sacadas de `_entrantes`, cargándose fuera del lock
+        self._espera = deque()          # cargadas pero fuera del cupo
+        self._cancelados = set()
+        self._worker = None
+        self._cliente = None
+
+        self._metricas = {"publicados": 0, "completadas": 0, "canceladas": 0, "errores": 0}
+
+    # ============================================================
+    # 📥 API pública (cualquier hilo)
+    # ============================================================
+    def programar(self, rental_id):
+        """Encola la simulación de un viaje. Ignora duplicados."""
+        with self._cond:
+            if rental_id in self._activas or rental_id in self._entrantes or rental_id in self._cargando or \
+                    any(s.rental_id == rental_id for s in self._espera):
+                return False
+            self._cancelados.discard(rental_id)
+            self._entrantes.append(rental_id)
+            if self._worker is None:
+                self._worker = threading.Thread(target=self._loop, name="iot-simulation", daemon=True)
+                self._worker.start()
+            self._cond.notify()
+        print(f"🚴 Simulación IoT programada para alquiler #{rental_id}")
+        return True
+
+    def cancelar(self, rental_id):
+        """Detiene una simulación activa o pendiente."""
+        with self._cond:
+            if rental_id in self._entrantes:
+                self._entrantes.remove(rental_id)
+                self._metricas["canceladas"] += 1
+            elif rental_id in self._cargando:
+                # `_cargar_entrantes` la descarta al terminar de cargarla
+                self._cargando.discard(rental_id)
+                self._metricas["canceladas"] += 1
+            elif any(s.rental_id == rental_id for s in self._espera):
+                self._espera = deque(s for s in self._espera if s.rental_id != rental_id)
+                self._metricas["canceladas"] += 1
+            elif rental_id in self._activas:
+                self._cancelados.add(rental_id)
+                self._cond.notify()
+
+    def metricas(self):
+        with self._cond:
+            return dict(
+                self._metricas,
+                activas=len(self._activas),
+                en_espera=len(self._espera) + len(self._entrantes) + len(self._cargando),
+                max_activas=self.max_activas,
+            )
+
+    # ============================================================
+    # 🔁 Bucle del planificador
+    # ============================================================
+    def _loop(self):
+        try:
+            while True:
+                with self._cond:
+                    if not (self._heap or self._entrantes or self._espera):
+                        self._worker = None  # el próximo `programar` lo vuelve a lanzar
+                        return
+                    espera = self._heap[0][0] - time.monotonic() if self._heap else None
+                    if not self._entrantes and not self._cancelados and (espera is None or espera > 0):
+                        self._cond.wait(espera)
+                    entrantes = list(self._entrantes)
+                    self._entrantes.clear()
+                    self._cargando.update(entrantes)
+
+                self._aplicar_cancelaciones()
+                self._cargar_entrantes(entrantes)
+                self._publicar_vencidos()
+        finally:
+            self._desconectar()
+            close_old_connections()
+
+    def _aplicar_cancelaciones(self):
+        with self._cond:
+            if not self._cancelados:
+                return
+            for rental_id in self._cancelados:
+                # Su entrada en el heap queda huérfana y se descarta al salir
+                if self._activas.pop(rental_id, None) is not None:
+                    self._metricas["canceladas"] += 1
+                    print(f"🛑 Simulación cancelada → alquiler #{rental_id}")
+            self._cancelados.clear()
+        self._promover()
+
+    def _cargar_entrantes(self, entrantes):
+        if not entrantes:
+            return
+        close_old_connections()
+        for rental_id in entrantes:
+            try:
+                simulacion = self._cargar(rental_id)
+            except Exception as e:
+                print(f"❌ Error preparando simulación #{rental_id}: {e}")
+                simulacion = None
+            with self._cond:
+                if rental_id not in self._cargando:
+                    continue  # cancelada mientras se cargaba
+                self._cargando.discard(rental_id)
+                if simulacion is None:
+                    self._metricas["errores"] += 1
+                else:
+                    self._espera.append(simulacion)
+        self._promover()
+
+    def _promover(self):
+        """Mueve simulaciones de la cola de espera al heap mientras haya cupo."""
+        with self._cond:
+            ahora = time.monotonic()
+            while self._espera and len(self._activas) < self.max_activas:
+                simulacion = self._espera.popleft()
+                self._activas[simulacion.rental_id] = simulacion
+                heapq.heappush(self._heap, (ahora, next(self._secuencia), simulacion.rental_id))
+
+    def _publicar_vencidos(self):
+        liberadas = False
+        while True:
+            with self._cond:
+                if not self._heap or self._heap[0][0] > time.monotonic():
+                    break
+                instante, _, rental_id = heapq.heappop(self._heap)
+                simulacion = self._activas.get(rental_id)
+                if simulacion is None:
+                    continue
+
+            self._publicar_punto(simulacion)
+
+            with self._cond:
+                simulacion.indice += 1
+                if rental_id not in self._activas:
+                    pass  # cancelada mientras se publicaba
+                elif simulacion.indice < len(simulacion.puntos):
+                    heapq.heappush(self._heap, (instante + self.intervalo, next(self._secuencia), rental_id))
+                else:
+                    del self._activas[rental_id]
+                    self._metricas["completadas"] += 1
+                    liberadas = True
+                    print(f"✅ Simulación completada → Bike {simulacion.bike_id}")
+
+        if liberadas:
+            self._promover()
+
+    # ============================================================
+    # 📡 MQTT compartido
+    # ============================================================
+    def _publicar_punto(self, simulacion):
+        i = simulacion.indice
+        lat, lon = simulacion.puntos[i]
+        payload = {
+            "bike_id": simulacion.bike_id,
+            "rental_id": simulacion.rental_id,
+            "lat": lat,
+            "lon": lon,
+            "bateria": max(10.0, 100 - i * 0.2),
+            "velocidad": 15 + (i % 4),
+            "timestamp": timezone.now().isoformat(),
+        }
+        try:
+            if self._cliente is None:
+                self._cliente = self._crear_cliente()
+            self._cliente.publish(TelemetryPartitioner.topic_para(simulacion.bike_id), json.dumps(payload))
+            with self._cond:
+                self._metricas["publicados"] += 1
+        except Exception as e:
+            with self._cond:
+                self._metricas["errores"] += 1
+            print(f"⚠️ Error publicando telemetría simulada: {e}")
+            self._desconectar()
+
+    @staticmethod
+    def _cliente_mqtt():
+        cliente = mqtt.Client()
+        cliente.connect(getattr(settings, "IOT_MQTT_HOST", "localhost"), getattr(settings, "IOT_MQTT_PORT", 1883), 60)
+        cliente.loop_start()  # hilo de red de paho (uno solo, compartido)
+        return cliente
+
+    def _desconectar(self):
+        if self._cliente is None:
+            return
+        try:
+            self._cliente.loop_stop()
+            self._cliente.disconnect()
+        except Exception:
+            pass
+        self._cliente = None
+
+
+planificador = SimulationScheduler()
@@ -1,39 +1,30 @@
-import threading
 import json
 import time
-import requests
 import paho.mqtt.client as mqtt
+from django.db import transaction
 from django.utils import timezone
 from apps.stations.models import Station
 from apps.rentals.models import Rental
+from apps.iot.services.route_engine import RouteEngine, motor_rutas
+from apps.iot.services.simulation_scheduler import planificador
+from apps.iot.services.telemetry_partitions import TelemetryPartitioner
 
 
 def get_route_points(lat1, lon1, lat2, lon2):
     """
-    Obtiene una ruta real entre dos coordenadas usando OSRM.
+    Obtiene una ruta real entre dos coordenadas usando OSRM (RouteEngine.osrm),
+    con línea recta si falla. Solo se usa cuando el motor local no tiene la ruta.
     """
-    url = f"https://router.project-osrm.org/route/v1/bike/{lon1},{lat1};{lon2},{lat2}?overview=full&geometries=geojson"
-    try:
-        response = requests.get(url)
-        data = response.json()
-        if "routes" in data and len(data["routes"]) > 0:
-            coords = data["routes"][0]["geometry"]["coordinates"]
-            return [(lat, lon) for lon, lat in coords]
-    except Exception as e:
-        print(f"⚠️ Error obteniendo ruta OSRM: {e}")
-
-    # Fallback: línea recta
-    return [(lat1, lon1), (lat2, lon2)]
+    return RouteEngine.osrm(lat1, lon1, lat2, lon2) or [(lat1, lon1), (lat2, lon2)]
 
 
 def simulate_route_async(rental_id):
     """
-    Lanza un hilo para simular la ruta sin bloquear Django.
+    Programa la simulación de la ruta en el planificador compartido sin bloquear Django.
+    Se encola al confirmar la transacción, para que el planificador vea el viaje activo.
     """
-    thread = threading.Thread(target=simulate_bike_route, args=(rental_id,))
-    thread.daemon = True
-    thread.start()
-    print(f"🚴 Simulación IoT lanzada en background para alquiler #{rental_id}")
+    transaction.on_commit(lambda: planificador.programar(rental_id))
+    print(f"🚴 Simulación IoT solicitada para alquiler #{rental_id}")
 
 
 def simulate_bike_route(rental_id):
@@ -60,10 +51,11 @@ def simulate_bike_route(rental_id):
     client = mqtt.Client()
     client.connect("localhost", 1883, 60)
 
-    # Obtener ruta
-    route_points = get_route_points(
+    # Obtener ruta (caché local; OSRM solo si el par no fue precalculado)
+    route_points = motor_rutas.obtener_ruta(
         float(estacion_origen.latitud), float(estacion_origen.longitud),
         float(estacion_destino.latitud), float(estacion_destino.longitud),
+        remoto=get_route_points,
     )
 
     for i, (lat, lon) in enumerate(route_points):
@@ -76,7 +68,7 @@ def simulate_bike_route(rental_id):
             "velocidad": 15 + (i % 4),
             "timestamp": timezone.now().isoformat(),
         }
-        client.publish("bikes/telemetry", json.dumps(payload))
+        client.publish(TelemetryPartitioner.topic_para(bike.id), json.dumps(payload))
         time.sleep(1)
 
     client.disconnect()
@@ -0,0 +1,211 @@
+import threading
+import time
+from collections import deque
+
+from django.conf import settings
+from django.db import close_old_connections
+
+from apps.iot.services.telemetry_codec import TelemetryCodec
+from apps.iot.services.telemetry_ingest_service import TelemetryIngestService
+
+
+class TelemetryBuffer:
+    """
+    Buffer en memoria para la ingesta de telemetría por lotes.
+
+    El hilo de red de paho solo encola paquetes ya decodificados (`agregar`);
+    un hilo trabajador independiente los persiste con `bulk_create` cuando se
+    alcanza `batch_size` o cuando pasan `flush_interval` segundos.
+    Si la cola supera `max_pendientes`, los paquetes nuevos se descartan y se
+    contabilizan en las métricas en lugar de bloquear al broker.
+
+    Los paquetes binarios (`agregar_binario`) se guardan crudos y se decodifican
+    todos juntos en el vaciado, con una sola pasada vectorizada.
+    """
+
+    def __init__(self, batch_size=None, flush_interval=None, max_pendientes=None, persistir=None):
+        self.batch_size = batch_size or getattr(settings, "IOT_TELEMETRY_BATCH_SIZE", 500)
+        self.flush_interval = flush_interval or getattr(settings, "IOT_TELEMETRY_FLUSH_INTERVAL", 1.0)
+        self.max_pendientes = max_pendientes or getattr(settings, "IOT_TELEMETRY_MAX_PENDING", 50000)
+        self._persistir = persistir or TelemetryIngestService.guardar_lote
+
+        self._pendientes = deque()
+        self._binarios = []        # payloads binarios crudos (uno o más paquetes cada uno)
+        self._n_binarios = 0       # paquetes contenidos en _binarios
+        self._pendiente_desde = None   # monotonic del pendiente más viejo (cota superior)
+        self._ultimo_recibido = None   # monotonic del último paquete recibido
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._hay_lote = threading.Event()
+        self._detener = threading.Event()
+        self._worker = None
+
+        self._metricas = {
+            "recibidos": 0,
+            "guardados": 0,
+            "descartados": 0,
+            "errores": 0,
+            "lotes": 0,
+            "ultimo_flush_ms": 0.0,
+            "max_flush_ms": 0.0,
+            "total_flush_ms": 0.0,
+        }
+
+    # ============================================================
+    # ▶️ Ciclo de vida del trabajador
+    # ============================================================
+    def iniciar(self):
+        """Arranca el hilo trabajador (idempotente)."""
+        if self._worker and self._worker.is_alive():
+            return
+        self._detener.clear()
+        self._worker = threading.Thread(target=self._loop, name="telemetry-flush", daemon=True)
+        self._worker.start()
+        print(f"🧺 Buffer de telemetría activo (lote={self.batch_size}, intervalo={self.flush_interval}s)")
+
+    def detener(self, timeout=10):
+        """Detiene el trabajador y vacía lo pendiente antes de salir."""
+        self._detener.set()
+        self._hay_lote.set()
+        if self._worker:
+            self._worker.join(timeout)
+            self._worker = None
+        # Por si el hilo no llegó a drenar (timeout o nunca se inició)
+        self.flush()
+        print(f"🛑 Buffer de telemetría detenido → {self.metricas()}")
+
+    def _loop(self):
+        try:
+            while not self._detener.is_set():
+                self._hay_lote.wait(self.flush_interval)
+                self._hay_lote.clear()
+                close_old_connections()
+                self.flush()
+            self.flush()
+        finally:
+            close_old_connections()
+
+    # ============================================================
+    # 📥 Encolado (hilo de paho)
+    # ============================================================
+    def agregar(self, datos):
+        """Encola un registro normalizado. Retorna False si fue descartado."""
+        with self._lock:
+            self._metricas["recibidos"] += 1
+            self._ultimo_recibido = time.monotonic()
+            if self._total_pendientes() >= self.max_pendientes:
+                self._metricas["descartados"] += 1
+                return False
+            self._pendientes.append(datos)
+            if self._pendiente_desde is None:
+                self._pendiente_desde = self._ultimo_recibido
+            lleno = self._total_pendientes() >= self.batch_size
+        if lleno:
+            self._hay_lote.set()
+        return True
+
+    def agregar_binario(self, payload):
+        """Encola un payload binario sin decodificarlo. Retorna False si fue descartado."""
+        paquetes = len(payload) // TelemetryCodec.TAMANO
+        with self._lock:
+            self._metricas["recibidos"] += paquetes
+            self._ultimo_recibido = time.monotonic()
+            if self._total_pendientes() + paquetes > self.max_pendientes:
+                self._metricas["descartados"] += paquetes
+                return False
+            self._binarios.append(bytes(payload))
+            self._n_binarios += paquetes
+            if self._pendiente_desde is None:
+                self._pendiente_desde = self._ultimo_recibido
+            lleno = self._total_pendientes() >= self.batch_size
+        if lleno:
+            self._hay_lote.set()
+        return True
+
+    def _total_pendientes(self):
+        return len(self._pendientes) + self._n_binarios
+
+    # ============================================================
+    # 💾 Vaciado hacia la base de datos
+    # ============================================================
+    def flush(self):
+        """Persiste todo lo pendiente en lotes de `batch_size`. Retorna lo guardado."""
+        guardados = 0
+        with self._flush_lock:
+            inicio = time.monotonic()
+            with self._lock:
+                binarios, self._binarios, self._n_binarios = self._binarios, [], 0
+            if binarios:
+                guardados += self._persistir_binarios(binarios)
+
+            while True:
+                with self._lock:
+                    if not self._pendientes:
+                        break
+                    lote = [self._pendientes.popleft() for _ in range(min(self.batch_size, len(self._pendientes)))]
+                guardados += self._persistir_lote(lote)
+
+            # Lo que quede llegó durante este vaciado
+            with self._lock:
+                self._pendiente_desde = inicio if self._total_pendientes() else None
+        return guardados
+
+    def _persistir_binarios(self, binarios):
+        try:
+            registros = TelemetryCodec.decodificar_lote(b"".join(binarios))
+        except ValueError:
+            # Algún payload corrupto: se decodifican por separado para salvar el resto
+            registros = []
+            for payload in binarios:
+                try:
+                    registros.extend(TelemetryCodec.decodificar_lote(payload))
+                except ValueError as e:
+                    with self._lock:
+                        self._metricas["errores"] += 1
+                        self._metricas["descartados"] += len(payload) // TelemetryCodec.TAMANO
+                    print(f"❌ Paquete binario inválido: {e}")
+
+        guardados = 0
+        for i in range(0, len(registros), self.batch_size):
+            guardados += self._persistir_lote(registros[i:i + self.batch_size])
+        return guardados
+
+    def _persistir_lote(self, lote):
+        inicio = time.perf_counter()
+        try:
+            self._persistir(lote)
+        except Exception as e:
+            with self._lock:
+                self._metricas["errores"] += 1
+                self._metricas["descartados"] += len(lote)
+            print(f"❌ Error guardando lote de telemetría ({len(lote)} registros): {e}")
+            return 0
+
+        duracion_ms = (time.perf_counter() - inicio) * 1000
+        with self._lock:
+            self._metricas["guardados"] += len(lote)
+            self._metricas["lotes"] += 1
+            self._metricas["ultimo_flush_ms"] = round(duracion_ms, 2)
+            self._metricas["max_flush_ms"] = round(max(self._metricas["max_flush_ms"], duracion_ms), 2)
+            self._metricas["total_flush_ms"] += duracion_ms
+        return len(lote)
+
+    # ============================================================
+    # 📊 Métricas
+    # ============================================================
+    def metricas(self):
+        """
+        Copia de los contadores para dimensionar el lote frente al ritmo del broker.
+        `retraso_ms` es la antigüedad del paquete pendiente más viejo (lag de ingesta)
+        e `inactivo_s` el tiempo desde el último paquete recibido.
+        """
+        with self._lock:
+            datos = dict(self._metricas)
+            datos["pendientes"] = self._total_pendientes()
+            ahora = time.monotonic()
+            desde, ultimo = self._pendiente_desde, self._ultimo_recibido
+        datos["retraso_ms"] = round((ahora - desde) * 1000, 1) if desde is not None else 0.0
+        datos["inactivo_s"] = round(ahora - ultimo, 1) if ultimo is not None else None
+        total_ms = datos.pop("total_flush_ms")
+        datos["promedio_flush_ms"] = round(total_ms / datos["lotes"], 2) if datos["lotes"] else 0.0
+        return datos
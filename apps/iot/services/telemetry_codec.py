@@ -0,0 +1,101 @@
+import struct
+from datetime import datetime, timezone as dt_timezone
+
+import numpy as np
+
+
+class TelemetryCodec:
+    """
+    Formato binario de telemetría, versión 1 (26 bytes, little-endian):
+
+        B  versión (0x01)          — también es el byte de cabecera
+        B  flags (bit 0 = candado abierto)
+        I  bike_id (uint32)
+        q  timestamp en milisegundos desde epoch (UTC)
+        i  latitud  × 1e6
+        i  longitud × 1e6
+        H  batería  × 100 (0–10000)
+        H  velocidad km/h × 100
+
+    Un mensaje MQTT puede traer varios paquetes concatenados. Un payload JSON
+    siempre empieza por '{', así que el primer byte distingue ambos formatos.
+    """
+
+    VERSION = 0x01
+    FORMATO = struct.Struct("<BBIqiiHH")
+    TAMANO = FORMATO.size  # 26
+    TOPIC_BINARIO = "bikes/telemetry/bin"
+    FLAG_DESBLOQUEADO = 0x01
+
+    DTYPE = np.dtype([
+        ("version", "u1"), ("flags", "u1"), ("bike_id", "<u4"), ("ts_ms", "<i8"),
+        ("lat", "<i4"), ("lon", "<i4"), ("bateria", "<u2"), ("velocidad", "<u2"),
+    ])
+
+    # ============================================================
+    # 🔎 Detección de formato
+    # ============================================================
+    @staticmethod
+    def es_binario(topic, payload):
+        """True si el mensaje viene por el topic binario o trae la cabecera de versión."""
+        if isinstance(topic, str) and topic.endswith("/bin"):
+            return True
+        return bool(payload) and payload[0] == TelemetryCodec.VERSION
+
+    # ============================================================
+    # 📦 Codificación (firmware / simuladores)
+    # ============================================================
+    @staticmethod
+    def codificar(bike_id, lat, lon, bateria=100.0, velocidad=0.0, timestamp=None, desbloqueado=None):
+        """Empaqueta una lectura. `timestamp` es un datetime aware (por defecto ahora)."""
+        timestamp = timestamp or datetime.now(dt_timezone.utc)
+        if desbloqueado is None:
+            desbloqueado = velocidad > 0
+        return TelemetryCodec.FORMATO.pack(
+            TelemetryCodec.VERSION,
+            TelemetryCodec.FLAG_DESBLOQUEADO if desbloqueado else 0,
+            int(bike_id),
+            int(timestamp.timestamp() * 1000),
+            round(lat * 1e6),
+            round(lon * 1e6),
+            max(0, min(10000, round(bateria * 100))),
+            max(0, min(65535, round(velocidad * 100))),
+        )
+
+    # ============================================================
+    # 📭 Decodificación vectorizada
+    # ============================================================
+    @staticmethod
+    def decodificar_lote(payload):
+        """
+        Decodifica uno o varios paquetes concatenados con una sola pasada de numpy.
+        Retorna la lista de diccionarios normalizados (mismas claves que parsear_payload).
+        Lanza ValueError si el tamaño o la versión no son válidos.
+        """
+        if len(payload) % TelemetryCodec.TAMANO:
+            raise ValueError(f"Payload binario de {len(payload)} bytes no es múltiplo de {TelemetryCodec.TAMANO}.")
+        paquetes = np.frombuffer(payload, dtype=TelemetryCodec.DTYPE)
+        if paquetes.size == 0:
+            return []
+        if (paquetes["version"] != TelemetryCodec.VERSION).any():
+            raise ValueError("Versión de paquete binario no soportada.")
+
+        bike_ids = paquetes["bike_id"].tolist()
+        latitudes = (paquetes["lat"] / 1e6).tolist()
+        longitudes = (paquetes["lon"] / 1e6).tolist()
+        baterias = (paquetes["bateria"] / 100).tolist()
+        desbloqueados = (paquetes["flags"] & TelemetryCodec.FLAG_DESBLOQUEADO).astype(bool).tolist()
+        timestamps = paquetes["ts_ms"].astype("datetime64[ms]").astype(datetime).tolist()
+
+        return [
+            {
+                "bike_id": bike_id,
+                "latitude": lat,
+                "longitude": lon,
+                "battery": bateria,
+                "lock_status": "UNLOCKED" if desbloqueado else "LOCKED",
+                "timestamp": ts.replace(tzinfo=dt_timezone.utc),
+            }
+            for bike_id, lat, lon, bateria, desbloqueado, ts
+            in zip(bike_ids, latitudes, longitudes, baterias, desbloqueados, timestamps)
+        ]
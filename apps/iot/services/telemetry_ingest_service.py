@@ -0,0 +1,102 @@
+import json
+from datetime import datetime
+
+from django.db import transaction
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from apps.iot.models import BikeTelemetry
+from apps.iot.services.latest_state_service import LatestStateService
+
+
+class TelemetryIngestService:
+    """
+    Punto único de entrada para persistir telemetría recibida por MQTT.
+
+    - Normaliza el payload JSON (alias `bateria`/`battery`, `velocidad`/`speed`,
+      `lat`/`latitude`, `bike_id`/`bikeId`, `lock_status`/`lockStatus`).
+    - Guarda registros en lote con `bulk_create` (un solo INSERT por lote).
+    - Mantiene al día la proyección BikeLatestState en la misma transacción.
+    """
+
+    # ============================================================
+    # 🔎 Normalización del mensaje
+    # ============================================================
+    @staticmethod
+    def parsear_payload(raw):
+        """
+        Convierte el payload crudo en un diccionario listo para BikeTelemetry.
+        Devuelve None si el mensaje no trae coordenadas o bike_id.
+        Lanza ValueError si el JSON está malformado.
+        """
+        if isinstance(raw, (bytes, bytearray)):
+            raw = raw.decode()
+        payload = json.loads(raw)
+
+        bike_id = TelemetryIngestService._primero(payload, "bike_id", "bikeId")
+        lat = TelemetryIngestService._primero(payload, "lat", "latitude")
+        lon = TelemetryIngestService._primero(payload, "lon", "longitude")
+        bateria = payload.get("bateria") or payload.get("battery")
+        velocidad = payload.get("velocidad") or payload.get("speed")
+        candado = TelemetryIngestService._primero(payload, "lock_status", "lockStatus")
+
+        # Validaciones básicas
+        if lat is None or lon is None:
+            print("⚠️ Coordenadas inválidas, mensaje ignorado.")
+            return None
+
+        if bike_id is None:
+            print("⚠️ ID de bicicleta no especificado.")
+            return None
+
+        # Estado del candado: el reportado por la bici o, si no viene, inferido de la velocidad
+        if isinstance(candado, str) and candado.upper() in ("LOCKED", "UNLOCKED"):
+            lock_status = candado.upper()
+        else:
+            lock_status = "UNLOCKED" if velocidad and velocidad > 0 else "LOCKED"
+
+        return {
+            "bike_id": bike_id,
+            "latitude": lat,
+            "longitude": lon,
+            "battery": bateria or 100.0,
+            "lock_status": lock_status,
+            "timestamp": TelemetryIngestService._parsear_timestamp(payload.get("timestamp")),
+        }
+
+    @staticmethod
+    def _primero(payload, *claves):
+        """Valor de la primera clave presente y no nula (alias de firmware antiguos)."""
+        for clave in claves:
+            if payload.get(clave) is not None:
+                return payload[clave]
+        return None
+
+    @staticmethod
+    def _parsear_timestamp(valor):
+        """Acepta ISO-8601 (con o sin zona horaria); si falta usa la hora actual."""
+        if isinstance(valor, str):
+            valor = parse_datetime(valor)
+        if not isinstance(valor, datetime):
+            return timezone.now()
+        if timezone.is_naive(valor):
+            valor = timezone.make_aware(valor)
+        return valor
+
+    # ============================================================
+    # 💾 Persistencia por lotes
+    # ============================================================
+    @staticmethod
+    def guardar_lote(registros, batch_size=None):
+        """
+        Inserta una lista de diccionarios normalizados con un único bulk_create
+        y actualiza el último estado de cada bicicleta del lote.
+        Retorna la cantidad de registros insertados.
+        """
+        if not registros:
+            return 0
+        objetos = [BikeTelemetry(**datos) for datos in registros]
+        with transaction.atomic():
+            BikeTelemetry.objects.bulk_create(objetos, batch_size=batch_size)
+            LatestStateService.actualizar(registros)
+        return len(objetos)
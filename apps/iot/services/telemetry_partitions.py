@@ -0,0 +1,60 @@
+from django.conf import settings
+
+from apps.iot.services.telemetry_codec import TelemetryCodec
+
+
+TOPIC_BASE = "bikes/telemetry"
+
+
+class TelemetryPartitioner:
+    """
+    Reparto de la telemetría entre N listeners por hash de bike_id.
+
+    Con N particiones cada bicicleta publica siempre en
+    `bikes/telemetry/p/<bike_id % N>` (o `.../bin` en binario), y cada
+    partición la consume un único worker: el orden por bicicleta se conserva
+    igual que con un solo listener. Con N = 1 se usan los topics de siempre.
+    """
+
+    @staticmethod
+    def total(particiones=None):
+        return max(1, int(particiones or getattr(settings, "IOT_MQTT_PARTITIONS", 1)))
+
+    @staticmethod
+    def particion(bike_id, particiones=None):
+        """Partición estable de una bicicleta (no depende del proceso ni del arranque)."""
+        return int(bike_id) % TelemetryPartitioner.total(particiones)
+
+    @staticmethod
+    def topic_para(bike_id, binario=False, particiones=None):
+        """Topic donde debe publicar una bicicleta."""
+        n = TelemetryPartitioner.total(particiones)
+        if n == 1:
+            return TelemetryCodec.TOPIC_BINARIO if binario else TOPIC_BASE
+        topic = f"{TOPIC_BASE}/p/{TelemetryPartitioner.particion(bike_id, n)}"
+        return f"{topic}/bin" if binario else topic
+
+    @staticmethod
+    def topics_de_worker(indice, particiones, compartido=False, grupo="twomove-ingest"):
+        """
+        Suscripciones (topic, qos) del worker `indice` de `particiones`.
+
+        - Particionado: solo los topics de su partición. El worker 0 además
+          atiende los topics sin particionar de publicadores antiguos.
+        - Compartido: todos los workers usan la misma suscripción compartida
+          (`$share/<grupo>/...`, Mosquitto >= 1.6) y el broker reparte los mensajes.
+          No garantiza orden por bicicleta entre workers; el último estado
+          sigue siendo correcto porque LatestStateService ignora paquetes viejos.
+        """
+        legado = [(TOPIC_BASE, 0), (TelemetryCodec.TOPIC_BINARIO, 0)]
+        if compartido:
+            return [(f"$share/{grupo}/{topic}", qos) for topic, qos in legado] + [
+                (f"$share/{grupo}/{TOPIC_BASE}/p/+", 0),
+                (f"$share/{grupo}/{TOPIC_BASE}/p/+/bin", 0),
+            ]
+
+        n = TelemetryPartitioner.total(particiones)
+        if n == 1:
+            return legado
+        propios = [(f"{TOPIC_BASE}/p/{indice}", 0), (f"{TOPIC_BASE}/p/{indice}/bin", 0)]
+        return propios + legado if indice == 0 else propios
@@ -0,0 +1,171 @@
+from datetime import timedelta, timezone as dt_timezone
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models import Avg, Count, Max, Min
+from django.db.models.functions import TruncMinute
+from django.utils import timezone
+
+from apps.iot.models import BikeTelemetry, BikeTelemetryMinute
+
+
+class TelemetryRetentionService:
+    """
+    Retención y downsampling de la telemetría cruda.
+
+    Los registros de BikeTelemetry más viejos que el periodo de retención se
+    agregan por bicicleta y minuto en BikeTelemetryMinute y luego se eliminan.
+    El trabajo se hace en cubetas por día, recorridas en ventanas de una hora:
+    cada ventana es una transacción corta (agregar + upsert + borrar), así que
+    el comando puede interrumpirse y relanzarse sin perder ni duplicar datos.
+    """
+
+    CAMPOS_AGREGADOS = ["latitude", "longitude", "battery", "battery_min", "lock_status", "muestras"]
+
+    @staticmethod
+    def compactar(dias=None, ventana=timedelta(hours=1), ahora=None, simular=False):
+        """
+        Compacta todo lo anterior a `ahora - dias`.
+        Retorna un resumen por día: {fecha: {"minutos": n, "crudos": n}}.
+        Con `simular=True` solo cuenta lo que se procesaría, sin escribir.
+        """
+        dias = getattr(settings, "IOT_TELEMETRY_RETENTION_DAYS", 7) if dias is None else dias
+        limite = TelemetryRetentionService._inicio_de_hora((ahora or timezone.now()) - timedelta(days=dias))
+        resumen = {}
+
+        inicio = TelemetryRetentionService._siguiente_crudo(None, limite)
+        while inicio is not None:
+            fin = min(inicio + ventana, limite)
+            if simular:
+                minutos, crudos = TelemetryRetentionService._contar_ventana(inicio, fin)
+            else:
+                minutos, crudos = TelemetryRetentionService._compactar_ventana(inicio, fin)
+
+            dia = resumen.setdefault(inicio.date(), {"minutos": 0, "crudos": 0})
+            dia["minutos"] += minutos
+            dia["crudos"] += crudos
+
+            # Saltar directamente a la siguiente hora con datos (evita recorrer huecos)
+            inicio = TelemetryRetentionService._siguiente_crudo(fin, limite)
+        return resumen
+
+    # ============================================================
+    # 🪣 Ventanas
+    # ============================================================
+    @staticmethod
+    def _compactar_ventana(inicio, fin):
+        with transaction.atomic():
+            crudos = BikeTelemetry.objects.filter(timestamp__gte=inicio, timestamp__lt=fin)
+            filas = list(TelemetryRetentionService._agregar(crudos))
+            if not filas:
+                return 0, 0
+
+            # Solo se borra lo que entró en el agregado (los ids posteriores llegaron durante la ventana)
+            ultimo_id = max(fila["ultimo_id"] for fila in filas)
+            minutos = TelemetryRetentionService._guardar_minutos(filas, inicio, fin)
+            borrados, _ = crudos.filter(id__lte=ultimo_id).delete()
+        return minutos, borrados
+
+    @staticmethod
+    def _contar_ventana(inicio, fin):
+        crudos = BikeTelemetry.objects.filter(timestamp__gte=inicio, timestamp__lt=fin)
+        filas = list(TelemetryRetentionService._agregar(crudos))
+        return len(filas), sum(fila["muestras"] for fila in filas)
+
+    @staticmethod
+    def _agregar(crudos):
+        """Una fila por (bike_id, minuto) con las claves de BikeTelemetryMinute + `ultimo_id`."""
+        # tzinfo UTC: en MySQL evita CONVERT_TZ (y la dependencia de las tablas de zonas horarias)
+        filas = (
+            crudos.annotate(minuto=TruncMinute("timestamp", tzinfo=dt_timezone.utc))
+            .values("bike_id", "minuto")
+            .annotate(
+                lat_prom=Avg("latitude"),
+                lon_prom=Avg("longitude"),
+                bat_prom=Avg("battery"),
+                bat_min=Min("battery"),
+                candado=Max("lock_status"),  # "UNLOCKED" > "LOCKED"
+                muestras=Count("id"),
+                ultimo_id=Max("id"),
+            )
+            .order_by()
+        )
+        for fila in filas:
+            yield {
+                "bike_id": fila["bike_id"],
+                "minuto": fila["minuto"],
+                "latitude": fila["lat_prom"],
+                "longitude": fila["lon_prom"],
+                "battery": fila["bat_prom"],
+                "battery_min": fila["bat_min"],
+                "lock_status": fila["candado"],
+                "muestras": fila["muestras"],
+                "ultimo_id": fila["ultimo_id"],
+            }
+
+    @staticmethod
+    def _guardar_minutos(filas, inicio, fin):
+        """Upsert de los agregados; si el minuto ya existía se combinan de forma ponderada."""
+        existentes = {
+            (m.bike_id, m.minuto): m
+            for m in BikeTelemetryMinute.objects.filter(
+                bike_id__in={fila["bike_id"] for fila in filas}, minuto__gte=inicio, minuto__lt=fin
+            )
+        }
+
+        objetos = []
+        for fila in filas:
+            previo = existentes.get((fila["bike_id"], fila["minuto"]))
+            if previo:
+                fila = TelemetryRetentionService._combinar(previo, fila)
+            objetos.append(BikeTelemetryMinute(
+                bike_id=fila["bike_id"],
+                minuto=fila["minuto"],
+                **{campo: fila[campo] for campo in TelemetryRetentionService.CAMPOS_AGREGADOS},
+            ))
+
+        # MySQL no admite indicar la columna del conflicto (usa cualquier UNIQUE)
+        unique_fields = ["bike_id", "minuto"] if connection.features.supports_update_conflicts_with_target else None
+        BikeTelemetryMinute.objects.bulk_create(
+            objetos,
+            update_conflicts=True,
+            unique_fields=unique_fields,
+            update_fields=TelemetryRetentionService.CAMPOS_AGREGADOS,
+        )
+        return len(objetos)
+
+    @staticmethod
+    def _combinar(previo, fila):
+        total = previo.muestras + fila["muestras"]
+
+        def ponderado(campo):
+            return (getattr(previo, campo) * previo.muestras + fila[campo] * fila["muestras"]) / total
+
+        return dict(
+            fila,
+            latitude=ponderado("latitude"),
+            longitude=ponderado("longitude"),
+            battery=ponderado("battery"),
+            battery_min=min(previo.battery_min, fila["battery_min"]),
+            lock_status=max(previo.lock_status, fila["lock_status"]),
+            muestras=total,
+        )
+
+    # ============================================================
+    # 🕐 Utilidades de tiempo
+    # ============================================================
+    @staticmethod
+    def _siguiente_crudo(desde, limite):
+        """Inicio de la hora (UTC) del próximo registro crudo anterior a `limite`, o None."""
+        crudos = BikeTelemetry.objects.filter(timestamp__lt=limite)
+        if desde is not None:
+            crudos = crudos.filter(timestamp__gte=desde)
+        primero = crudos.order_by("timestamp").values_list("timestamp", flat=True).first()
+        if primero is None:
+            return None
+        inicio = TelemetryRetentionService._inicio_de_hora(primero)
+        return max(inicio, desde) if desde is not None else inicio
+
+    @staticmethod
+    def _inicio_de_hora(valor):
+        return valor.astimezone(dt_timezone.utc).replace(minute=0, second=0, microsecond=0)
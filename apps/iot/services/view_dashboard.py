@@ -1,15 +1,12 @@
 from django.shortcuts import render
-from apps.iot.models import BikeTelemetry
+from apps.iot.models import BikeLatestState
 
 def iot_dashboard(request):
     """
     Muestra el mapa con la posición actual de todas las bicicletas simuladas.
     """
-    # Obtenemos la última telemetría por bicicleta (agrupada)
-    ultimos_registros = (
-        BikeTelemetry.objects.order_by("bike_id", "-timestamp")
-        .distinct("bike_id")
-    )
+    # Última telemetría por bicicleta (proyección mantenida en la ingesta)
+    ultimos_registros = BikeLatestState.objects.order_by("bike_id")
 
     context = {
         "telemetria": ultimos_registros,
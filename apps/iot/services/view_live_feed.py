@@ -0,0 +1,39 @@
+import queue
+
+from django.conf import settings
+from django.http import StreamingHttpResponse
+
+from apps.iot.services import live_feed
+
+
+def iot_live_feed(request):
+    """
+    Stream SSE con las posiciones de las bicicletas.
+    Envía un evento `snapshot` al conectar y luego eventos `delta` solo con
+    las bicicletas que cambiaron. Cada conexión ocupa un hilo del servidor.
+    """
+    hub = live_feed.hub
+    latido = getattr(settings, "IOT_LIVE_FEED_HEARTBEAT", 15)
+
+    def eventos():
+        cola, snapshot = hub.suscribir()
+        try:
+            yield "retry: 3000\n\n"
+            yield hub.evento("snapshot", snapshot)
+            while True:
+                try:
+                    cambios = cola.get(timeout=latido)
+                except queue.Empty:
+                    yield ": ping\n\n"  # mantiene viva la conexión a través de proxies
+                    continue
+                if cambios is live_feed.RESYNC:
+                    yield hub.evento("snapshot", hub.snapshot())
+                else:
+                    yield hub.evento("delta", cambios)
+        finally:
+            hub.cancelar(cola)
+
+    response = StreamingHttpResponse(eventos(), content_type="text/event-stream")
+    response["Cache-Control"] = "no-cache"
+    response["X-Accel-Buffering"] = "no"  # nginx: no bufferizar el stream
+    return response
@@ -0,0 +1,19 @@
+from django.db.models.signals import post_save
+from django.dispatch import receiver
+
+from apps.iot.models import BikeTelemetry
+from apps.iot.services.latest_state_service import LatestStateService
+
+
+# ============================================================
+# 📍 Último estado por bicicleta
+# ============================================================
+@receiver(post_save, sender=BikeTelemetry)
+def actualizar_estado_actual(sender, instance, created, **kwargs):
+    """
+    Cubre las escrituras individuales (admin, scripts, pruebas).
+    La ingesta por lotes usa bulk_create, que no emite señales, y actualiza
+    la proyección directamente desde TelemetryIngestService.guardar_lote.
+    """
+    if created and not kwargs.get("raw"):
+        LatestStateService.actualizar([LatestStateService.desde_telemetria(instance)])
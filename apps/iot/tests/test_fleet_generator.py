@@ -0,0 +1,52 @@
+import json
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import TestCase, TransactionTestCase
+
+from apps.iot.models import BikeTelemetry
+from apps.iot.services.fleet_generator import FleetGenerator
+from apps.iot.services.telemetry_ingest_service import TelemetryIngestService
+
+
+class TestFleetGenerator(TestCase):
+    """Pruebas del generador de flota sintética (apps/iot/services/fleet_generator.py)."""
+
+    def test_broker_local_entrega_paquetes_validos(self):
+        """Los procesos publican en la cola local paquetes que el listener sabe parsear."""
+        generador = FleetGenerator(10, tasa=20, procesos=2, duracion=0.3, broker="local", bike_id_base=500)
+        generador.iniciar()
+
+        mensajes = []
+        while generador.activo() or not generador.cola.empty():
+            msg = generador.recibir()
+            if msg is not None:
+                mensajes.append(msg)
+        generador.esperar()
+
+        self.assertGreater(len(mensajes), 10)
+        self.assertEqual(len(mensajes), generador.total_enviados())
+        datos = TelemetryIngestService.parsear_payload(mensajes[0].payload)
+        self.assertTrue(500 <= datos["bike_id"] < 510)
+        self.assertEqual({json.loads(m.payload)["bike_id"] for m in mensajes}, set(range(500, 510)))
+
+    def test_broker_invalido(self):
+        with self.assertRaises(ValueError):
+            FleetGenerator(1, broker="kafka")
+
+
+class TestBenchmarkIngest(TransactionTestCase):
+    """El comando benchmark_ingest recorre la ruta completa hasta la BD y limpia al final."""
+
+    def test_benchmark_local(self):
+        out = StringIO()
+        call_command(
+            "benchmark_ingest", "--bicis", "5", "--tasa", "10", "--procesos", "1",
+            "--duracion", "0.3", "--broker", "local", stdout=out,
+        )
+
+        salida = out.getvalue()
+        self.assertIn("Throughput", salida)
+        self.assertIn("Retraso envío→commit", salida)
+        self.assertIn("errores 0", salida)
+        self.assertEqual(BikeTelemetry.objects.count(), 0)
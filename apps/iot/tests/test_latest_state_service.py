@@ -0,0 +1,91 @@
+from datetime import timedelta
+
+from django.test import TestCase
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from apps.iot.models import BikeLatestState, BikeTelemetry
+from apps.iot.services.latest_state_service import LatestStateService
+from apps.iot.services.telemetry_ingest_service import TelemetryIngestService
+
+
+def _registro(bike_id=1, lat=6.25, timestamp=None, battery=90.0):
+    return {
+        "bike_id": bike_id,
+        "latitude": lat,
+        "longitude": -75.56,
+        "battery": battery,
+        "lock_status": "UNLOCKED",
+        "timestamp": timestamp or timezone.now(),
+    }
+
+
+class TestLatestStateService(TestCase):
+    """Pruebas de la proyección BikeLatestState (apps/iot/services/latest_state_service.py)."""
+
+    # ============================================================
+    # 💾 Ingesta por lotes
+    # ============================================================
+    def test_guardar_lote_actualiza_una_fila_por_bicicleta(self):
+        """El lote guarda todo el histórico pero solo el último estado por bike_id."""
+        ahora = timezone.now()
+        TelemetryIngestService.guardar_lote([
+            _registro(bike_id=1, lat=1.0, timestamp=ahora),
+            _registro(bike_id=1, lat=2.0, timestamp=ahora + timedelta(seconds=5)),
+            _registro(bike_id=2, lat=3.0, timestamp=ahora),
+        ])
+
+        self.assertEqual(BikeTelemetry.objects.count(), 3)
+        self.assertEqual(BikeLatestState.objects.count(), 2)
+        self.assertEqual(BikeLatestState.objects.get(bike_id=1).latitude, 2.0)
+
+    def test_lote_siguiente_sobrescribe_estado(self):
+        """Un lote posterior hace upsert sobre la fila existente."""
+        ahora = timezone.now()
+        TelemetryIngestService.guardar_lote([_registro(bike_id=1, lat=1.0, timestamp=ahora)])
+        TelemetryIngestService.guardar_lote([
+            _registro(bike_id=1, lat=5.0, battery=40.0, timestamp=ahora + timedelta(seconds=1))
+        ])
+
+        estado = BikeLatestState.objects.get(bike_id=1)
+        self.assertEqual(estado.latitude, 5.0)
+        self.assertEqual(estado.battery, 40.0)
+        self.assertEqual(BikeLatestState.objects.count(), 1)
+
+    def test_paquete_atrasado_no_pisa_estado_nuevo(self):
+        """Un mensaje con timestamp anterior al guardado se ignora en la proyección."""
+        ahora = timezone.now()
+        LatestStateService.actualizar([_registro(bike_id=1, lat=9.0, timestamp=ahora)])
+        escritos = LatestStateService.actualizar([
+            _registro(bike_id=1, lat=1.0, timestamp=ahora - timedelta(minutes=1))
+        ])
+
+        self.assertEqual(escritos, 0)
+        self.assertEqual(BikeLatestState.objects.get(bike_id=1).latitude, 9.0)
+
+    # ============================================================
+    # 📡 Señal post_save
+    # ============================================================
+    def test_save_individual_actualiza_por_senal(self):
+        """Un BikeTelemetry creado con save() también actualiza la proyección."""
+        BikeTelemetry.objects.create(**_registro(bike_id=4, lat=7.5))
+
+        self.assertEqual(BikeLatestState.objects.get(bike_id=4).latitude, 7.5)
+
+    # ============================================================
+    # 🌐 API
+    # ============================================================
+    def test_api_lee_desde_la_proyeccion(self):
+        """El endpoint devuelve una fila por bicicleta, ordenadas por bike_id."""
+        TelemetryIngestService.guardar_lote([
+            _registro(bike_id=2), _registro(bike_id=1), _registro(bike_id=1)
+        ])
+        client = APIClient()
+
+        response = client.get("/iot/api/telemetry/")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([r["bike_id"] for r in response.json()], [1, 2])
+
+        detalle = client.get("/iot/api/telemetry/2/")
+        self.assertEqual(detalle.status_code, 200)
+        self.assertEqual(detalle.json()["bike_id"], 2)
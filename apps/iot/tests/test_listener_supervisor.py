@@ -0,0 +1,85 @@
+import os
+import time
+
+from django.test import SimpleTestCase, override_settings
+
+from apps.iot.services.listener_supervisor import ListenerSupervisor
+from apps.iot.services.telemetry_partitions import TelemetryPartitioner
+
+
+def worker_falso(indice, particiones, compartido, host, port, salud, parar, intervalo):
+    """Worker de prueba: late con métricas sintéticas hasta que se lo detiene."""
+    recibidos = 0
+    while not parar.wait(intervalo):
+        recibidos += 100
+        salud.put({
+            "worker": indice, "pid": os.getpid(), "ts": time.time(), "activo": True,
+            "conectado": True, "recibidos": recibidos, "guardados": recibidos, "descartados": 0,
+            "errores": 0, "pendientes": 0, "retraso_ms": 9000.0 if indice == 1 else 10.0, "inactivo_s": 0.0,
+        })
+
+
+def worker_que_falla(indice, particiones, compartido, host, port, salud, parar, intervalo):
+    os._exit(1)
+
+
+class TestTelemetryPartitioner(SimpleTestCase):
+    """Reparto por bike_id (apps/iot/services/telemetry_partitions.py)."""
+
+    def test_una_particion_usa_los_topics_de_siempre(self):
+        self.assertEqual(TelemetryPartitioner.topic_para(17, particiones=1), "bikes/telemetry")
+        self.assertEqual(TelemetryPartitioner.topic_para(17, binario=True, particiones=1), "bikes/telemetry/bin")
+        self.assertEqual(
+            [t for t, _ in TelemetryPartitioner.topics_de_worker(0, 1)], ["bikes/telemetry", "bikes/telemetry/bin"]
+        )
+
+    def test_cada_bici_cae_siempre_en_la_misma_particion(self):
+        self.assertEqual(TelemetryPartitioner.topic_para(17, particiones=4), "bikes/telemetry/p/1")
+        self.assertEqual(TelemetryPartitioner.topic_para(17, binario=True, particiones=4), "bikes/telemetry/p/1/bin")
+        self.assertEqual({TelemetryPartitioner.particion(b, 4) for b in range(100)}, {0, 1, 2, 3})
+
+    def test_topics_por_worker(self):
+        worker_1 = [t for t, _ in TelemetryPartitioner.topics_de_worker(1, 4)]
+        self.assertEqual(worker_1, ["bikes/telemetry/p/1", "bikes/telemetry/p/1/bin"])
+        # El worker 0 atiende además a los publicadores sin particionar
+        self.assertIn("bikes/telemetry", [t for t, _ in TelemetryPartitioner.topics_de_worker(0, 4)])
+
+        compartidos = [t for t, _ in TelemetryPartitioner.topics_de_worker(2, 4, compartido=True)]
+        self.assertTrue(all(t.startswith("$share/twomove-ingest/") for t in compartidos))
+
+    @override_settings(IOT_MQTT_PARTITIONS=3)
+    def test_toma_las_particiones_de_settings(self):
+        self.assertEqual(TelemetryPartitioner.total(), 3)
+        self.assertEqual(TelemetryPartitioner.topic_para(5), "bikes/telemetry/p/2")
+
+
+class TestListenerSupervisor(SimpleTestCase):
+    """Supervisor de workers (apps/iot/services/listener_supervisor.py) con workers falsos."""
+
+    def test_reporta_salud_y_lag_por_worker(self):
+        supervisor = ListenerSupervisor(procesos=2, intervalo=0.1, max_retraso_ms=5000, objetivo=worker_falso)
+        supervisor.iniciar()
+        reportes = []
+        try:
+            supervisor.vigilar(duracion=0.8, al_reportar=reportes.append)
+        finally:
+            supervisor.detener()
+
+        self.assertTrue(reportes)
+        filas = {fila["worker"]: fila for fila in reportes[-1]}
+        self.assertEqual(filas[0]["estado"], "ok")
+        self.assertEqual(filas[1]["estado"], "atrasado")
+        self.assertGreater(filas[0]["recibidos"], 0)
+        self.assertGreater(filas[0]["ritmo_msg_s"], 0)
+        self.assertEqual(filas[0]["reinicios"], 0)
+
+    def test_relanza_workers_caidos(self):
+        supervisor = ListenerSupervisor(procesos=1, intervalo=0.1, objetivo=worker_que_falla)
+        supervisor.iniciar()
+        try:
+            supervisor._workers[0].join(5)
+            self.assertEqual(supervisor.resumen()[0]["estado"], "caido")
+            self.assertEqual(supervisor.revisar(), [0])
+        finally:
+            supervisor.detener()
+        self.assertEqual(supervisor.resumen()[0]["reinicios"], 1)
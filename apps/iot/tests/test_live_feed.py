@@ -0,0 +1,92 @@
+import json
+from datetime import timedelta
+from unittest.mock import patch
+
+from django.test import RequestFactory, TestCase
+from django.utils import timezone
+
+from apps.iot.services import live_feed
+from apps.iot.services.latest_state_service import LatestStateService
+from apps.iot.services.live_feed import LiveFeedHub
+from apps.iot.services.view_live_feed import iot_live_feed
+
+
+def _registro(bike_id=1, lat=6.25, timestamp=None):
+    return {
+        "bike_id": bike_id,
+        "latitude": lat,
+        "longitude": -75.56,
+        "battery": 90.0,
+        "lock_status": "UNLOCKED",
+        "timestamp": timestamp or timezone.now(),
+    }
+
+
+class TestLiveFeedHub(TestCase):
+    """Pruebas del feed SSE (apps/iot/services/live_feed.py)."""
+
+    def setUp(self):
+        # Sin hilo: el sondeo se invoca a mano dentro de la transacción del test
+        self.hub = LiveFeedHub(intervalo=0.01, autoiniciar=False)
+
+    def test_solo_difunde_bicicletas_que_cambiaron(self):
+        """Tras la carga inicial, un sondeo solo envía las bicicletas modificadas."""
+        ahora = timezone.now()
+        LatestStateService.actualizar([_registro(1, timestamp=ahora), _registro(2, timestamp=ahora)])
+        cola, snapshot = self.hub.suscribir()
+        self.assertEqual(snapshot, [])
+
+        self.assertEqual(len(self.hub.sondear()), 2)
+        self.assertEqual(len(cola.get_nowait()), 2)
+
+        LatestStateService.actualizar([_registro(2, lat=7.0, timestamp=ahora + timedelta(seconds=1))])
+        delta = self.hub.sondear()
+
+        self.assertEqual([b["bike_id"] for b in delta], [2])
+        self.assertEqual(cola.get_nowait()[0]["latitude"], 7.0)
+        self.assertTrue(cola.empty())
+
+    def test_sin_cambios_no_envia_nada(self):
+        """Repetir el sondeo sin escrituras nuevas no genera deltas."""
+        LatestStateService.actualizar([_registro(1)])
+        cola, _ = self.hub.suscribir()
+        self.hub.sondear()
+        cola.get_nowait()
+
+        self.assertEqual(self.hub.sondear(), [])
+        self.assertTrue(cola.empty())
+
+    def test_cliente_lento_recibe_resync(self):
+        """Si la cola del cliente se llena, se reemplaza por una marca de resincronización."""
+        hub = LiveFeedHub(max_cola=1, autoiniciar=False)
+        cola, _ = hub.suscribir()
+        ahora = timezone.now()
+        for i in range(3):
+            LatestStateService.actualizar([_registro(1, lat=i, timestamp=ahora + timedelta(seconds=i))])
+            hub.sondear()
+
+        self.assertIs(cola.get_nowait(), live_feed.RESYNC)
+
+    def test_vista_envia_snapshot_y_delta(self):
+        """El endpoint SSE emite el snapshot inicial y luego los cambios."""
+        LatestStateService.actualizar([_registro(3)])
+        self.hub.sondear()
+        request = RequestFactory().get("/iot/stream/")
+
+        with patch.object(live_feed, "hub", self.hub):
+            response = iot_live_feed(request)
+            stream = iter(response.streaming_content)
+            self.assertEqual(response["Content-Type"], "text/event-stream")
+
+            next(stream)  # retry
+            evento = next(stream).decode()
+            self.assertTrue(evento.startswith("event: snapshot"))
+            self.assertEqual(json.loads(evento.split("data: ")[1])[0]["bike_id"], 3)
+
+            LatestStateService.actualizar([_registro(3, lat=1.5, timestamp=timezone.now() + timedelta(seconds=1))])
+            self.hub.sondear()
+            evento = next(stream).decode()
+            self.assertTrue(evento.startswith("event: delta"))
+
+            response.close()
+        self.assertEqual(self.hub.total_suscriptores(), 0)
@@ -0,0 +1,90 @@
+import json
+import os
+import tempfile
+from io import StringIO
+from unittest.mock import MagicMock, patch
+
+from django.core.management import call_command
+from django.test import TestCase
+
+from apps.iot.services import route_engine
+from apps.iot.services.route_engine import RoadGraph, RouteEngine
+from apps.stations.models import Station
+
+
+# Cuadrícula pequeña: A-B-C en línea y un atajo largo A-C
+GRAFO = {
+    "nodos": {"A": [6.250, -75.560], "B": [6.255, -75.565], "C": [6.260, -75.570], "D": [6.300, -75.600]},
+    "aristas": [["A", "B"], ["B", "C"], ["A", "C", 50.0]],
+}
+
+
+class TestRouteEngine(TestCase):
+    """Pruebas del motor de rutas local (apps/iot/services/route_engine.py)."""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.archivo_grafo = os.path.join(self.tmp.name, "grafo.json")
+        with open(self.archivo_grafo, "w") as f:
+            json.dump(GRAFO, f)
+
+    def _motor(self, con_grafo=False):
+        return RouteEngine(
+            directorio=os.path.join(self.tmp.name, "rutas"),
+            archivo_grafo=self.archivo_grafo if con_grafo else os.path.join(self.tmp.name, "no-existe.json"),
+        )
+
+    def test_dijkstra_prefiere_el_camino_mas_corto(self):
+        grafo = RoadGraph(GRAFO["nodos"], GRAFO["aristas"])
+        self.assertEqual(grafo.camino_mas_corto("A", "C"), ["A", "B", "C"])
+        self.assertIsNone(grafo.camino_mas_corto("A", "D"))
+
+    def test_ruta_por_grafo_incluye_extremos(self):
+        puntos = self._motor(con_grafo=True).obtener_ruta(6.2501, -75.5601, 6.2599, -75.5699)
+        self.assertEqual(puntos[0], (6.2501, -75.5601))
+        self.assertEqual(puntos[-1], (6.2599, -75.5699))
+        self.assertEqual(len(puntos), 5)
+
+    def test_disco_sobrevive_a_un_motor_nuevo(self):
+        """Lo guardado por un proceso se lee desde disco en otro, sin llamar al remoto."""
+        self._motor().guardar(1.0, 2.0, 3.0, 4.0, [(1.0, 2.0), (2.0, 3.0), (3.0, 4.0)], "osrm")
+        remoto = MagicMock()
+
+        puntos = self._motor().obtener_ruta(1.0, 2.0, 3.0, 4.0, remoto=remoto)
+
+        self.assertEqual(puntos, [(1.0, 2.0), (2.0, 3.0), (3.0, 4.0)])
+        remoto.assert_not_called()
+
+    def test_sin_cache_usa_remoto_sin_guardarlo(self):
+        motor = self._motor()
+        remoto = MagicMock(return_value=[(1.0, 2.0), (3.0, 4.0)])
+
+        motor.obtener_ruta(1.0, 2.0, 3.0, 4.0, remoto=remoto)
+        motor.obtener_ruta(1.0, 2.0, 3.0, 4.0, remoto=remoto)
+
+        self.assertEqual(remoto.call_count, 2)
+        self.assertFalse(motor.en_cache(1.0, 2.0, 3.0, 4.0))
+
+    def test_osrm_usa_timeout(self):
+        with patch.object(route_engine.requests, "get", side_effect=Exception("timeout")) as mock_get:
+            self.assertIsNone(RouteEngine.osrm(1.0, 2.0, 3.0, 4.0, timeout=2))
+        self.assertEqual(mock_get.call_args.kwargs["timeout"], 2)
+
+    def test_comando_precompute_routes(self):
+        """El comando guarda todos los pares ordenados y omite los existentes al repetir."""
+        for i, (lat, lon) in enumerate([(6.2501, -75.5601), (6.2599, -75.5699), (6.2551, -75.5649)]):
+            Station.objects.create(nombre=f"E{i}", direccion="X", latitud=lat, longitud=lon)
+        motor = self._motor(con_grafo=True)
+
+        with patch.object(route_engine, "motor_rutas", motor), \
+                patch("apps.iot.management.commands.precompute_routes.motor_rutas", motor):
+            out = StringIO()
+            call_command("precompute_routes", "--sin-osrm", stdout=out)
+            self.assertIn("6 por grafo", out.getvalue())
+
+            out = StringIO()
+            call_command("precompute_routes", "--sin-osrm", stdout=out)
+            self.assertIn("6 ya existentes", out.getvalue())
+
+        self.assertEqual(len(os.listdir(os.path.join(self.tmp.name, "rutas"))), 6)
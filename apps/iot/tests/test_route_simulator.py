@@ -52,7 +52,7 @@ class TestSimulateBikeRoute(TestCase):
     # =========================================================
     # 🗺️ Prueba de rutas OSRM
     # =========================================================
-    @patch("apps.iot.services.route_simulator.requests.get")
+    @patch("apps.iot.services.route_engine.requests.get")
     def test_get_route_points_valido(self, mock_get):
         """Debe devolver coordenadas válidas convertidas de OSRM."""
         mock_response = MagicMock()
@@ -76,7 +76,7 @@ class TestSimulateBikeRoute(TestCase):
         self.assertEqual(coords[0], (6.25184, -75.56359))
         self.assertEqual(coords[-1], (6.26000, -75.57000))
 
-    @patch("apps.iot.services.route_simulator.requests.get", side_effect=Exception("Error de red"))
+    @patch("apps.iot.services.route_engine.requests.get", side_effect=Exception("Error de red"))
     def test_get_route_points_falla_y_devuelve_linea_recta(self, _):
         """Si OSRM falla, debe retornar una línea recta simple."""
         coords = get_route_points(1.0, 2.0, 3.0, 4.0)
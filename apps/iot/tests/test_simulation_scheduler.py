@@ -0,0 +1,106 @@
+import threading
+import time
+from unittest.mock import MagicMock
+
+from django.test import SimpleTestCase
+
+from apps.iot.services.simulation_scheduler import SimulacionActiva, SimulationScheduler
+
+
+def _esperar(condicion, limite=3.0):
+    fin = time.time() + limite
+    while not condicion() and time.time() < fin:
+        time.sleep(0.01)
+    return condicion()
+
+
+class TestSimulationScheduler(SimpleTestCase):
+    """Pruebas del planificador único de simulaciones (apps/iot/services/simulation_scheduler.py)."""
+
+    def setUp(self):
+        self.cliente = MagicMock()
+        self.rutas = {}
+
+    def _planificador(self, **kwargs):
+        def cargar(rental_id):
+            return SimulacionActiva(rental_id, bike_id=rental_id, puntos=self.rutas[rental_id])
+
+        return SimulationScheduler(crear_cliente=lambda: self.cliente, cargar=cargar, **kwargs)
+
+    def test_publica_todos_los_puntos_con_un_solo_cliente(self):
+        """Varios viajes comparten la conexión MQTT y el hilo termina al acabar."""
+        self.rutas = {1: [(0, 0)] * 3, 2: [(1, 1)] * 2}
+        crear = MagicMock(return_value=self.cliente)
+        planificador = SimulationScheduler(
+            intervalo=0.01, crear_cliente=crear,
+            cargar=lambda r: SimulacionActiva(r, r, self.rutas[r]),
+        )
+
+        planificador.programar(1)
+        planificador.programar(2)
+
+        self.assertTrue(_esperar(lambda: planificador.metricas()["completadas"] == 2))
+        self.assertEqual(self.cliente.publish.call_count, 5)
+        crear.assert_called_once()
+        self.assertTrue(_esperar(lambda: planificador._worker is None))
+
+    def test_respeta_el_cupo_de_activas(self):
+        """Con max_activas=1 el segundo viaje espera a que termine el primero."""
+        self.rutas = {1: [(0, 0)] * 20, 2: [(1, 1)] * 2}
+        planificador = self._planificador(max_activas=1, intervalo=0.01)
+
+        planificador.programar(1)
+        planificador.programar(2)
+        self.assertTrue(_esperar(lambda: planificador.metricas()["publicados"] > 0))
+        metricas = planificador.metricas()
+        self.assertEqual(metricas["activas"], 1)
+        self.assertEqual(metricas["en_espera"], 1)
+
+        self.assertTrue(_esperar(lambda: planificador.metricas()["completadas"] == 2))
+
+    def test_cancelar_detiene_la_simulacion(self):
+        """Un viaje cancelado deja de publicar y libera su cupo."""
+        self.rutas = {1: [(0, 0)] * 1000}
+        planificador = self._planificador(intervalo=0.01)
+
+        planificador.programar(1)
+        self.assertTrue(_esperar(lambda: planificador.metricas()["publicados"] >= 2))
+        planificador.cancelar(1)
+
+        self.assertTrue(_esperar(lambda: planificador.metricas()["canceladas"] == 1))
+        self.assertEqual(planificador.metricas()["activas"], 0)
+        self.assertLess(self.cliente.publish.call_count, 1000)
+
+    def test_cancelar_durante_la_carga(self):
+        """Un viaje cancelado mientras se carga su ruta no llega a simularse."""
+        cargando, continuar = threading.Event(), threading.Event()
+
+        def cargar(rental_id):
+            cargando.set()
+            continuar.wait(3)
+            return SimulacionActiva(rental_id, rental_id, [(0, 0)] * 3)
+
+        planificador = SimulationScheduler(intervalo=0.01, crear_cliente=lambda: self.cliente, cargar=cargar)
+        planificador.programar(1)
+        self.assertTrue(cargando.wait(3))
+        self.assertFalse(planificador.programar(1))
+
+        planificador.cancelar(1)
+        continuar.set()
+
+        self.assertTrue(_esperar(lambda: planificador._worker is None))
+        metricas = planificador.metricas()
+        self.assertEqual((metricas["canceladas"], metricas["activas"], metricas["en_espera"]), (1, 0, 0))
+        self.cliente.publish.assert_not_called()
+
+    def test_duplicados_y_errores_de_carga(self):
+        """No programa dos veces el mismo viaje; un fallo al cargar cuenta como error."""
+        planificador = SimulationScheduler(
+            intervalo=0.01, crear_cliente=lambda: self.cliente, cargar=MagicMock(return_value=None)
+        )
+        with planificador._cond:  # retiene el hilo para encolar ambos antes de que cargue
+            self.assertTrue(planificador.programar(7))
+            self.assertFalse(planificador.programar(7))
+
+        self.assertTrue(_esperar(lambda: planificador.metricas()["errores"] == 1))
+        self.cliente.publish.assert_not_called()
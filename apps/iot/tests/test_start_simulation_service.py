@@ -1,5 +1,4 @@
 import json
-import threading
 from unittest.mock import patch, MagicMock
 from django.test import TestCase
 from django.contrib.auth import get_user_model
@@ -56,7 +55,7 @@ class TestStartSimulationService(TestCase):
     # ============================================================
     # 🗺️ Pruebas para get_route_points
     # ============================================================
-    @patch("apps.iot.services.start_simulation_service.requests.get")
+    @patch("apps.iot.services.route_engine.requests.get")
     def test_get_route_points_valido(self, mock_get):
         """Debe devolver coordenadas válidas desde OSRM."""
         mock_response = MagicMock()
@@ -77,7 +76,7 @@ class TestStartSimulationService(TestCase):
         coords = get_route_points(6.25184, -75.56359, 6.26000, -75.57000)
         self.assertEqual(coords, [(6.25184, -75.56359), (6.26000, -75.57000)])
 
-    @patch("apps.iot.services.start_simulation_service.requests.get", side_effect=Exception("error"))
+    @patch("apps.iot.services.route_engine.requests.get", side_effect=Exception("error"))
     def test_get_route_points_fallback(self, _):
         """Si OSRM falla, debe devolver línea recta."""
         coords = get_route_points(1.0, 2.0, 3.0, 4.0)
@@ -114,16 +113,14 @@ class TestStartSimulationService(TestCase):
         mock_mqtt_client.assert_not_called()
 
     # ============================================================
-    # 🧵 Prueba para simulate_route_async
+    # 🗓️ Prueba para simulate_route_async
     # ============================================================
-    @patch("apps.iot.services.start_simulation_service.threading.Thread")
-    def test_simulate_route_async_crea_hilo(self, mock_thread):
-        """Debe crear y lanzar un hilo en background."""
-        mock_thread_instance = MagicMock()
-        mock_thread.return_value = mock_thread_instance
-
-        simulate_route_async(123)
-
-        mock_thread.assert_called_once()
-        mock_thread_instance.start.assert_called_once()
-        self.assertTrue(mock_thread_instance.daemon)
+    @patch("apps.iot.services.start_simulation_service.planificador")
+    def test_simulate_route_async_programa_al_confirmar(self, mock_planificador):
+        """Debe encolar en el planificador compartido al confirmar la transacción (sin crear hilos)."""
+        with self.captureOnCommitCallbacks(execute=False) as callbacks:
+            simulate_route_async(123)
+        mock_planificador.programar.assert_not_called()
+
+        callbacks[0]()
+        mock_planificador.programar.assert_called_once_with(123)
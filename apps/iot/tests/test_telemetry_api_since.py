@@ -0,0 +1,94 @@
+from datetime import timedelta
+
+from django.test import TestCase
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from apps.iot.models import BikeLatestState
+from apps.iot.services.latest_state_service import LatestStateService
+
+
+def _registro(bike_id=1, lat=6.25, timestamp=None):
+    return {
+        "bike_id": bike_id,
+        "latitude": lat,
+        "longitude": -75.56,
+        "battery": 90.0,
+        "lock_status": "UNLOCKED",
+        "timestamp": timestamp or timezone.now(),
+    }
+
+
+class TestTelemetryApiSince(TestCase):
+    """Pruebas del modo incremental (?since=) y ETag del endpoint de telemetría."""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.ahora = timezone.now()
+        LatestStateService.actualizar([_registro(1, timestamp=self.ahora), _registro(2, timestamp=self.ahora)])
+        # Proyección asentada: la última escritura queda fuera del margen de solape
+        BikeLatestState.objects.filter(bike_id=1).update(updated_at=self.ahora - timedelta(minutes=2))
+        BikeLatestState.objects.filter(bike_id=2).update(updated_at=self.ahora - timedelta(minutes=1))
+
+    def test_since_devuelve_solo_cambios(self):
+        """Con el cursor devuelto vuelven las bicicletas actualizadas después (y las del margen)."""
+        inicial = self.client.get("/iot/api/telemetry/", {"since": "0"}).json()
+        self.assertEqual(len(inicial["cambios"]), 2)
+
+        # Fuerza un updated_at posterior al cursor
+        BikeLatestState.objects.filter(bike_id=2).update(
+            latitude=7.0, updated_at=self.ahora - timedelta(seconds=30)
+        )
+        delta = self.client.get("/iot/api/telemetry/", {"since": inicial["cursor"]}).json()
+
+        self.assertEqual([b["bike_id"] for b in delta["cambios"]], [2])
+        self.assertNotEqual(delta["cursor"], inicial["cursor"])
+
+        # Sin cambios nuevos solo se repite lo que cae en el margen; el cursor no avanza
+        repetido = self.client.get("/iot/api/telemetry/latest/", {"since": delta["cursor"]}).json()
+        self.assertEqual([b["bike_id"] for b in repetido["cambios"]], [2])
+        self.assertEqual(repetido["cursor"], delta["cursor"])
+
+    def test_commit_tardio_con_sello_anterior_no_se_pierde(self):
+        """Una fila sellada antes del cursor pero confirmada después llega en el siguiente sondeo."""
+        BikeLatestState.objects.filter(bike_id=2).update(updated_at=self.ahora - timedelta(seconds=30))
+        leido = self.client.get("/iot/api/telemetry/", {"since": "0"}).json()
+        desde = LatestStateService.fecha_de_cursor(leido["cursor"])
+
+        # Otro worker selló la bicicleta 1 justo antes del cursor y confirmó después de la lectura
+        BikeLatestState.objects.filter(bike_id=1).update(latitude=8.0, updated_at=desde - timedelta(seconds=1))
+        siguiente = self.client.get("/iot/api/telemetry/", {"since": leido["cursor"]}).json()
+
+        self.assertEqual(sorted(b["bike_id"] for b in siguiente["cambios"]), [1, 2])
+        tardia = next(b for b in siguiente["cambios"] if b["bike_id"] == 1)
+        self.assertEqual(tardia["latitude"], 8.0)
+
+    def test_sin_304_mientras_la_proyeccion_no_se_asienta(self):
+        """Con escrituras de hace menos de SOLAPE, el ETag no se repite (no hay 304)."""
+        BikeLatestState.objects.filter(bike_id=1).update(updated_at=timezone.now())
+        etag = self.client.get("/iot/api/telemetry/")["ETag"]
+
+        # Commit tardío que no mueve Max(updated_at) ni Count(id)
+        BikeLatestState.objects.filter(bike_id=2).update(
+            latitude=9.0, updated_at=timezone.now() - timedelta(milliseconds=500)
+        )
+        respuesta = self.client.get("/iot/api/telemetry/", HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(respuesta.status_code, 200)
+
+    def test_etag_responde_304_sin_cambios(self):
+        """Si la proyección no cambió, If-None-Match produce 304 sin cuerpo."""
+        primera = self.client.get("/iot/api/telemetry/")
+        etag = primera["ETag"]
+
+        segunda = self.client.get("/iot/api/telemetry/", HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(segunda.status_code, 304)
+
+        LatestStateService.actualizar([_registro(3)])
+        tercera = self.client.get("/iot/api/telemetry/", HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(tercera.status_code, 200)
+        self.assertEqual(len(tercera.json()), 3)
+
+    def test_cursor_invalido(self):
+        """Un cursor no numérico responde 400."""
+        response = self.client.get("/iot/api/telemetry/", {"since": "abc"})
+        self.assertEqual(response.status_code, 400)
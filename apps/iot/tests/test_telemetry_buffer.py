@@ -0,0 +1,119 @@
+import time
+from unittest.mock import MagicMock
+from django.test import TestCase
+from django.utils import timezone
+
+from apps.iot.models import BikeTelemetry
+from apps.iot.services import mqtt_listener
+from apps.iot.services.telemetry_buffer import TelemetryBuffer
+
+
+def _registro(bike_id=1):
+    return {
+        "bike_id": bike_id,
+        "latitude": 6.25,
+        "longitude": -75.56,
+        "battery": 90.0,
+        "lock_status": "UNLOCKED",
+        "timestamp": timezone.now(),
+    }
+
+
+class TestTelemetryBuffer(TestCase):
+    """Pruebas del buffer de ingesta por lotes (apps/iot/services/telemetry_buffer.py)."""
+
+    def test_flush_guarda_con_bulk_create(self):
+        """Un flush manual debe persistir todo lo pendiente en la BD."""
+        buffer = TelemetryBuffer(batch_size=2, flush_interval=60)
+        for i in range(5):
+            buffer.agregar(_registro(bike_id=i))
+
+        guardados = buffer.flush()
+
+        self.assertEqual(guardados, 5)
+        self.assertEqual(BikeTelemetry.objects.count(), 5)
+        metricas = buffer.metricas()
+        self.assertEqual(metricas["recibidos"], 5)
+        self.assertEqual(metricas["guardados"], 5)
+        self.assertEqual(metricas["lotes"], 3)  # 2 + 2 + 1
+        self.assertEqual(metricas["pendientes"], 0)
+
+    def test_descarta_cuando_la_cola_esta_llena(self):
+        """Si se supera max_pendientes, los paquetes nuevos se descartan."""
+        buffer = TelemetryBuffer(batch_size=100, max_pendientes=3, persistir=MagicMock())
+        resultados = [buffer.agregar(_registro()) for _ in range(5)]
+
+        self.assertEqual(resultados, [True, True, True, False, False])
+        metricas = buffer.metricas()
+        self.assertEqual(metricas["descartados"], 2)
+        self.assertEqual(metricas["pendientes"], 3)
+
+    def test_worker_vacia_por_tamano_de_lote(self):
+        """Al llegar a batch_size el trabajador vacía sin esperar el intervalo."""
+        persistir = MagicMock()
+        buffer = TelemetryBuffer(batch_size=3, flush_interval=60, persistir=persistir)
+        buffer.iniciar()
+        try:
+            for _ in range(3):
+                buffer.agregar(_registro())
+            limite = time.time() + 2
+            while not persistir.called and time.time() < limite:
+                time.sleep(0.01)
+        finally:
+            buffer.detener()
+
+        persistir.assert_called_once()
+        self.assertEqual(len(persistir.call_args[0][0]), 3)
+
+    def test_detener_vacia_lo_pendiente(self):
+        """Al apagar, lo que quedó en memoria se persiste."""
+        persistir = MagicMock()
+        buffer = TelemetryBuffer(batch_size=100, flush_interval=60, persistir=persistir)
+        buffer.iniciar()
+        buffer.agregar(_registro())
+        buffer.agregar(_registro())
+        buffer.detener()
+
+        guardados = sum(len(c[0][0]) for c in persistir.call_args_list)
+        self.assertEqual(guardados, 2)
+        self.assertEqual(buffer.metricas()["guardados"], 2)
+
+    def test_error_en_persistencia_cuenta_descartados(self):
+        """Un fallo de BD no debe romper el buffer; se registra como error."""
+        buffer = TelemetryBuffer(batch_size=10, persistir=MagicMock(side_effect=Exception("db caída")))
+        buffer.agregar(_registro())
+        buffer.flush()
+
+        metricas = buffer.metricas()
+        self.assertEqual(metricas["errores"], 1)
+        self.assertEqual(metricas["descartados"], 1)
+        self.assertEqual(metricas["guardados"], 0)
+
+    def test_on_message_con_buffer_solo_encola(self):
+        """Con un buffer como userdata, on_message no escribe en la BD."""
+        buffer = TelemetryBuffer(batch_size=100, flush_interval=60)
+        msg = MagicMock()
+        msg.payload = b'{"bike_id": 7, "lat": 6.25, "lon": -75.56, "velocidad": 10}'
+
+        mqtt_listener.on_message(None, buffer, msg)
+
+        self.assertEqual(BikeTelemetry.objects.count(), 0)
+        self.assertEqual(buffer.metricas()["pendientes"], 1)
+
+        buffer.flush()
+        self.assertEqual(BikeTelemetry.objects.get().bike_id, 7)
+
+    def test_metricas_de_lag(self):
+        """retraso_ms mide la antigüedad de lo pendiente y vuelve a 0 tras el vaciado."""
+        buffer = TelemetryBuffer(batch_size=100, flush_interval=60)
+        self.assertEqual(buffer.metricas()["retraso_ms"], 0.0)
+        self.assertIsNone(buffer.metricas()["inactivo_s"])
+
+        buffer.agregar(_registro())
+        time.sleep(0.05)
+        self.assertGreaterEqual(buffer.metricas()["retraso_ms"], 40)
+
+        buffer.flush()
+        metricas = buffer.metricas()
+        self.assertEqual(metricas["retraso_ms"], 0.0)
+        self.assertIsNotNone(metricas["inactivo_s"])
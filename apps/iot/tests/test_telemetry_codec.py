@@ -0,0 +1,94 @@
+import json
+from datetime import datetime, timezone as dt_timezone
+from types import SimpleNamespace
+
+from django.test import TestCase
+
+from apps.iot.models import BikeLatestState, BikeTelemetry
+from apps.iot.services.fleet_generator import FleetGenerator
+from apps.iot.services.mqtt_listener import on_message
+from apps.iot.services.telemetry_buffer import TelemetryBuffer
+from apps.iot.services.telemetry_codec import TelemetryCodec
+
+
+class TestTelemetryCodec(TestCase):
+    """Pruebas del formato binario v1 (apps/iot/services/telemetry_codec.py)."""
+
+    def setUp(self):
+        self.ts = datetime(2025, 3, 1, 12, 30, 15, 250000, tzinfo=dt_timezone.utc)
+
+    def test_ida_y_vuelta(self):
+        paquete = TelemetryCodec.codificar(42, 4.653311, -74.083456, 87.5, 12.3, timestamp=self.ts)
+        self.assertEqual(len(paquete), TelemetryCodec.TAMANO)
+        self.assertEqual(paquete[0], TelemetryCodec.VERSION)
+
+        [datos] = TelemetryCodec.decodificar_lote(paquete)
+        self.assertEqual(datos["bike_id"], 42)
+        self.assertAlmostEqual(datos["latitude"], 4.653311, places=6)
+        self.assertAlmostEqual(datos["longitude"], -74.083456, places=6)
+        self.assertAlmostEqual(datos["battery"], 87.5)
+        self.assertEqual(datos["lock_status"], "UNLOCKED")
+        self.assertEqual(datos["timestamp"], self.ts)
+
+    def test_lote_concatenado(self):
+        payload = b"".join(
+            TelemetryCodec.codificar(i, 4.6 + i / 1000, -74.1, 50 + i, 0, timestamp=self.ts) for i in range(1, 6)
+        )
+        registros = TelemetryCodec.decodificar_lote(payload)
+        self.assertEqual([r["bike_id"] for r in registros], [1, 2, 3, 4, 5])
+        self.assertTrue(all(r["lock_status"] == "LOCKED" for r in registros))
+        self.assertAlmostEqual(registros[-1]["battery"], 55.0)
+
+    def test_tamano_o_version_invalidos(self):
+        paquete = TelemetryCodec.codificar(1, 4.6, -74.1, timestamp=self.ts)
+        with self.assertRaises(ValueError):
+            TelemetryCodec.decodificar_lote(paquete[:-1])
+        with self.assertRaises(ValueError):
+            TelemetryCodec.decodificar_lote(b"\x02" + paquete[1:])
+
+    def test_deteccion_de_formato(self):
+        paquete = TelemetryCodec.codificar(1, 4.6, -74.1)
+        self.assertTrue(TelemetryCodec.es_binario("bikes/telemetry", paquete))
+        self.assertTrue(TelemetryCodec.es_binario(TelemetryCodec.TOPIC_BINARIO, b""))
+        self.assertFalse(TelemetryCodec.es_binario("bikes/telemetry", b'{"bike_id": 1}'))
+
+
+class TestOnMessageBinario(TestCase):
+    """El listener acepta ambos formatos, con y sin buffer."""
+
+    def _msg(self, payload, topic=TelemetryCodec.TOPIC_BINARIO):
+        return SimpleNamespace(topic=topic, payload=payload)
+
+    def test_modo_directo_guarda_lote_binario(self):
+        payload = TelemetryCodec.codificar(7, 4.6, -74.1, 80) + TelemetryCodec.codificar(8, 4.7, -74.2, 60)
+        on_message(None, None, self._msg(payload))
+
+        self.assertEqual(BikeTelemetry.objects.count(), 2)
+        self.assertEqual(set(BikeLatestState.objects.values_list("bike_id", flat=True)), {7, 8})
+
+    def test_buffer_decodifica_al_vaciar(self):
+        buffer = TelemetryBuffer(batch_size=100, max_pendientes=100)
+        on_message(None, buffer, self._msg(TelemetryCodec.codificar(7, 4.6, -74.1)))
+        on_message(None, buffer, self._msg(json.dumps({"bike_id": 9, "lat": 4.6, "lon": -74.1}).encode(),
+                                           topic="bikes/telemetry"))
+        self.assertEqual(buffer.metricas()["pendientes"], 2)
+        self.assertEqual(BikeTelemetry.objects.count(), 0)
+
+        self.assertEqual(buffer.flush(), 2)
+        self.assertEqual(set(BikeTelemetry.objects.values_list("bike_id", flat=True)), {7, 9})
+
+    def test_buffer_descarta_solo_el_payload_corrupto(self):
+        buffer = TelemetryBuffer(batch_size=100, max_pendientes=100)
+        buffer.agregar_binario(TelemetryCodec.codificar(7, 4.6, -74.1))
+        buffer.agregar_binario(b"\x01" * (TelemetryCodec.TAMANO + 3))
+
+        self.assertEqual(buffer.flush(), 1)
+        metricas = buffer.metricas()
+        self.assertEqual(metricas["errores"], 1)
+        self.assertEqual(metricas["descartados"], 1)
+
+    def test_generador_en_formato_binario(self):
+        generador = FleetGenerator(1, formato="binario", bike_id_base=300)
+        self.assertEqual(generador.opciones["topic"], TelemetryCodec.TOPIC_BINARIO)
+        with self.assertRaises(ValueError):
+            FleetGenerator(1, formato="protobuf")
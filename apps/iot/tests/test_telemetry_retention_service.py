@@ -0,0 +1,77 @@
+from datetime import datetime, timedelta, timezone as dt_timezone
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import TestCase
+
+from apps.iot.models import BikeTelemetry, BikeTelemetryMinute
+from apps.iot.services.telemetry_retention_service import TelemetryRetentionService
+
+
+AHORA = datetime(2025, 3, 20, 12, 30, tzinfo=dt_timezone.utc)
+VIEJO = datetime(2025, 3, 10, 8, 15, tzinfo=dt_timezone.utc)
+
+
+def _crear(bike_id, timestamp, lat=6.0, battery=80.0, lock_status="LOCKED"):
+    return BikeTelemetry.objects.create(
+        bike_id=bike_id, timestamp=timestamp, latitude=lat, longitude=-75.0,
+        battery=battery, lock_status=lock_status,
+    )
+
+
+class TestTelemetryRetentionService(TestCase):
+    """Pruebas de la compactación de telemetría (apps/iot/services/telemetry_retention_service.py)."""
+
+    def test_agrega_por_minuto_y_borra_crudos(self):
+        """Los crudos viejos se resumen por bike/minuto y se eliminan; los recientes quedan."""
+        _crear(1, VIEJO, lat=6.0, battery=80.0)
+        _crear(1, VIEJO + timedelta(seconds=20), lat=8.0, battery=70.0, lock_status="UNLOCKED")
+        _crear(1, VIEJO + timedelta(minutes=1), lat=9.0)
+        _crear(2, VIEJO + timedelta(hours=3), lat=1.0)
+        reciente = _crear(1, AHORA - timedelta(hours=1))
+
+        resumen = TelemetryRetentionService.compactar(dias=7, ahora=AHORA)
+
+        self.assertEqual(list(BikeTelemetry.objects.values_list("id", flat=True)), [reciente.id])
+        self.assertEqual(BikeTelemetryMinute.objects.count(), 3)
+        self.assertEqual(resumen[VIEJO.date()], {"minutos": 3, "crudos": 4})
+
+        minuto = BikeTelemetryMinute.objects.get(bike_id=1, minuto=VIEJO.replace(second=0))
+        self.assertEqual(minuto.muestras, 2)
+        self.assertAlmostEqual(minuto.latitude, 7.0)
+        self.assertAlmostEqual(minuto.battery, 75.0)
+        self.assertEqual(minuto.battery_min, 70.0)
+        self.assertEqual(minuto.lock_status, "UNLOCKED")
+
+    def test_reejecucion_combina_con_minuto_existente(self):
+        """Un crudo atrasado para un minuto ya compactado se combina de forma ponderada."""
+        _crear(1, VIEJO, lat=6.0)
+        TelemetryRetentionService.compactar(dias=7, ahora=AHORA)
+        _crear(1, VIEJO + timedelta(seconds=30), lat=9.0)
+        TelemetryRetentionService.compactar(dias=7, ahora=AHORA)
+
+        minuto = BikeTelemetryMinute.objects.get()
+        self.assertEqual(minuto.muestras, 2)
+        self.assertAlmostEqual(minuto.latitude, 7.5)
+        self.assertEqual(BikeTelemetry.objects.count(), 0)
+
+    def test_simulacion_no_modifica_datos(self):
+        """Con simular=True solo se cuenta."""
+        _crear(1, VIEJO)
+
+        resumen = TelemetryRetentionService.compactar(dias=7, ahora=AHORA, simular=True)
+
+        self.assertEqual(resumen[VIEJO.date()]["crudos"], 1)
+        self.assertEqual(BikeTelemetry.objects.count(), 1)
+        self.assertEqual(BikeTelemetryMinute.objects.count(), 0)
+
+    def test_comando_compact_telemetry(self):
+        """El comando compacta usando --dias y reporta por día."""
+        _crear(1, VIEJO)
+        out = StringIO()
+
+        call_command("compact_telemetry", "--dias", "0", stdout=out)
+
+        self.assertIn("Compactados y eliminados 1", out.getvalue())
+        self.assertEqual(BikeTelemetry.objects.count(), 0)
+        self.assertEqual(BikeTelemetryMinute.objects.count(), 1)
@@ -2,6 +2,7 @@ from django.urls import path, include
 from rest_framework.routers import DefaultRouter
 from .views import BikeTelemetryViewSet
 from apps.iot.services.view_dashboard import iot_dashboard
+from apps.iot.services.view_live_feed import iot_live_feed
 
 router = DefaultRouter()
 router.register(r"telemetry", BikeTelemetryViewSet, basename="telemetry")
@@ -9,4 +10,5 @@ router.register(r"telemetry", BikeTelemetryViewSet, basename="telemetry")
 urlpatterns = [
     path("api/", include(router.urls)),
     path("monitor/", iot_dashboard, name="iot_dashboard"),
+    path("stream/", iot_live_feed, name="iot_live_feed"),
 ]
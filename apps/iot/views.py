@@ -1,35 +1,65 @@
-from rest_framework import viewsets
+from rest_framework import status, viewsets
 from rest_framework.response import Response
 from rest_framework.decorators import action
 from rest_framework.permissions import AllowAny
-from django.db.models import Max
 
-from .models import BikeTelemetry
-from .serializers import BikeTelemetrySerializer
+from .models import BikeLatestState
+from .serializers import BikeLatestStateSerializer
+from apps.iot.services.latest_state_service import LatestStateService
 
 
 class BikeTelemetryViewSet(viewsets.ReadOnlyModelViewSet):
     """
     API pública para consultar la telemetría más reciente de cada bicicleta.
+
+    Modo incremental: `?since=<cursor>` devuelve las bicicletas que cambiaron
+    después del cursor, junto con el cursor nuevo ({"cursor", "cambios"}). Se
+    relee un margen (LatestStateService.SOLAPE) antes del cursor para no perder
+    filas confirmadas tarde, así que una bicicleta puede repetirse entre sondeos:
+    el cliente se queda con la última por bike_id.
+    Ambos modos envían `ETag`; con `If-None-Match` y sin cambios se responde 304.
     """
-    serializer_class = BikeTelemetrySerializer
+    serializer_class = BikeLatestStateSerializer
     permission_classes = [AllowAny]  # puedes cambiar a IsAuthenticated si lo prefieres
+    lookup_field = "bike_id"
 
     def get_queryset(self):
         """
         Devuelve la última telemetría registrada por cada bicicleta.
+        Se lee de la proyección BikeLatestState (una fila por bicicleta),
+        sin agrupar el histórico completo de BikeTelemetry.
         """
-        # Subconsulta para obtener el último registro por bike_id
-        subquery = (
-            BikeTelemetry.objects.values("bike_id")
-            .annotate(last_id=Max("id"))
-            .values_list("last_id", flat=True)
-        )
-        return BikeTelemetry.objects.filter(id__in=subquery).order_by("bike_id")
+        return BikeLatestState.objects.order_by("bike_id")
+
+    def list(self, request, *args, **kwargs):
+        # La versión se calcula antes de leer; los cambios con sello anterior al
+        # cursor que se confirmen después los recoge el margen del próximo sondeo.
+        cursor, etag = LatestStateService.version()
+
+        if etag in request.headers.get("If-None-Match", ""):
+            response = Response(status=status.HTTP_304_NOT_MODIFIED)
+        else:
+            since = request.query_params.get("since")
+            queryset = self.get_queryset()
+
+            if since is None:
+                response = Response(self.get_serializer(queryset, many=True).data)
+            else:
+                try:
+                    desde = LatestStateService.fecha_de_cursor(since)
+                except ValueError as e:
+                    return Response({"detail": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+                cambios = queryset.filter(updated_at__gt=LatestStateService.desde_cursor(desde))
+                response = Response({
+                    "cursor": cursor,
+                    "cambios": self.get_serializer(cambios, many=True).data,
+                })
+
+        response["ETag"] = etag
+        response["X-Telemetry-Cursor"] = cursor
+        return response
 
     @action(detail=False, methods=["get"])
     def latest(self, request):
-        """Alias directo para obtener los últimos registros (igual a list)."""
-        queryset = self.get_queryset()
-        serializer = self.get_serializer(queryset, many=True)
-        return Response(serializer.data)
+        """Alias directo para obtener los últimos registros (igual a list, acepta ?since=)."""
+        return self.list(request)
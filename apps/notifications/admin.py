@@ -0,0 +1,21 @@
+from django.contrib import admin
+from django.utils import timezone
+
+from .models import OutboxMensaje
+
+
+@admin.register(OutboxMensaje)
+class OutboxMensajeAdmin(admin.ModelAdmin):
+    list_display = ('id', 'tarea', 'estado', 'intentos', 'disponible_en', 'creado_en', 'procesado_en')
+    list_filter = ('estado',)
+    search_fields = ('tarea', 'ultimo_error')
+    # La tarea y sus argumentos solo los escribe el código (lista blanca de OutboxService)
+    readonly_fields = ('tarea', 'argumentos', 'creado_en', 'procesado_en')
+    actions = ['reintentar']
+
+    @admin.action(description="Reintentar ahora")
+    def reintentar(self, request, queryset):
+        actualizados = queryset.exclude(estado="completado").update(
+            estado="pendiente", intentos=0, disponible_en=timezone.now()
+        )
+        self.message_user(request, f"{actualizados} mensajes reprogramados.")
@@ -0,0 +1,57 @@
+import tempfile
+import time
+
+from django.conf import settings
+from django.core.mail import EmailMessage
+from django.core.management.base import BaseCommand
+
+from apps.notifications.services.mail_dispatcher import MailDispatcher
+
+
+class Command(BaseCommand):
+    help = "Compara el envío de N correos con una conexión por mensaje frente al despachador con conexión persistente"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--mensajes', type=int, default=100)
+        parser.add_argument('--sumidero', choices=list(MailDispatcher.SUMIDEROS), default='archivo',
+                            help="'smtp' usa el servidor configurado: ¡envía correos reales!")
+        parser.add_argument('--destinatario', default='benchmark@twomove.local')
+        parser.add_argument('--solo-despachador', action='store_true',
+                            help='No mide el envío ingenuo (útil con smtp para no duplicar correos)')
+
+    def handle(self, *args, **opts):
+        opciones = {}
+        if opts['sumidero'] == 'archivo':
+            opciones['file_path'] = tempfile.mkdtemp(prefix="twomove_mail_")
+            self.stdout.write(f"📁 Correos en {opciones['file_path']}")
+
+        def mensajes():
+            return [
+                EmailMessage(f"Benchmark #{i}", "Correo de prueba de TwoMove.", settings.DEFAULT_FROM_EMAIL,
+                             [opts['destinatario']])
+                for i in range(opts['mensajes'])
+            ]
+
+        if not opts['solo_despachador']:
+            # Lo que hace hoy cada servicio: send() abre y cierra su propia conexión
+            ingenuo = MailDispatcher(opts['sumidero'], **opciones)
+            inicio = time.perf_counter()
+            fallidos = 0
+            for mensaje in mensajes():
+                try:
+                    mensaje.connection = ingenuo._nueva_conexion()
+                    mensaje.send()
+                except Exception:
+                    fallidos += 1
+            duracion = time.perf_counter() - inicio
+            self.stdout.write(f"🐢 Una conexión por mensaje: {opts['mensajes'] / duracion:.1f} msg/s "
+                              f"({duracion:.2f}s, {fallidos} fallidos)")
+
+        despachador = MailDispatcher(opts['sumidero'], **opciones)
+        resultado = despachador.enviar_lote(mensajes())
+        metricas = despachador.metricas()
+        self.stdout.write(self.style.SUCCESS(
+            f"🚀 Despachador: {metricas['mensajes_s']} msg/s, {metricas['conexiones']} conexiones, "
+            f"{resultado['enviados']} enviados, {resultado['fallidos']} fallidos, "
+            f"{metricas['reconexiones']} reconexiones"
+        ))
@@ -0,0 +1,42 @@
+from django.core.management.base import BaseCommand
+
+from apps.notifications.services.outbox_service import OutboxService
+
+
+class Command(BaseCommand):
+    help = "Ejecuta los trabajos pendientes del outbox (correos, facturas) con reintentos"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--limite', type=int, default=50, help='Mensajes reclamados por lote')
+        parser.add_argument('--continuo', action='store_true',
+                            help='Sigue esperando trabajo nuevo (modo worker) en lugar de salir')
+        parser.add_argument('--intervalo', type=float, default=None,
+                            help='Segundos de espera con la cola vacía (por defecto OUTBOX_INTERVALO)')
+        parser.add_argument('--purgar-dias', type=int, default=None,
+                            help='Elimina los mensajes completados hace más de N días y termina')
+
+    def handle(self, *args, **opts):
+        if opts['purgar_dias'] is not None:
+            borrados = OutboxService.purgar(opts['purgar_dias'])
+            self.stdout.write(self.style.SUCCESS(f"🧹 {borrados} mensajes completados eliminados."))
+            return
+
+        if opts['continuo']:
+            self.stdout.write("📤 Worker de outbox en marcha (Ctrl+C para salir)...")
+            try:
+                OutboxService.drenar(limite=opts['limite'], intervalo=opts['intervalo'])
+            except KeyboardInterrupt:
+                self.stdout.write("\n🛑 Worker de outbox detenido.")
+            return
+
+        total = {"completados": 0, "reintentos": 0, "fallidos": 0}
+        while True:
+            resumen = OutboxService.procesar(opts['limite'])
+            for clave, valor in resumen.items():
+                total[clave] += valor
+            if sum(resumen.values()) < opts['limite']:
+                break
+        self.stdout.write(self.style.SUCCESS(
+            f"✅ Outbox: {total['completados']} completados, {total['reintentos']} para reintento, "
+            f"{total['fallidos']} fallidos."
+        ))
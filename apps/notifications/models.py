@@ -0,0 +1,43 @@
+from django.db import models
+from django.utils import timezone
+
+
+class OutboxMensaje(models.Model):
+    """
+    Trabajo diferido (correo, factura PDF, ...) registrado en la misma
+    transacción que el cambio de negocio que lo origina.
+
+    Si la transacción se revierte, el mensaje desaparece con ella; si se
+    confirma, el comando `process_outbox` lo ejecuta fuera de la petición,
+    con reintentos y espera exponencial. La entrega es "al menos una vez".
+    """
+
+    ESTADOS = [
+        ("pendiente", "Pendiente"),
+        ("procesando", "Procesando"),
+        ("completado", "Completado"),
+        ("fallido", "Fallido"),
+    ]
+
+    tarea = models.CharField(max_length=255, help_text="Ruta importable de la función a ejecutar")
+    argumentos = models.JSONField(default=dict, blank=True)
+    estado = models.CharField(max_length=20, choices=ESTADOS, default="pendiente")
+
+    intentos = models.PositiveIntegerField(default=0)
+    max_intentos = models.PositiveIntegerField(default=5)
+    # Pendiente: cuándo puede ejecutarse. Procesando: hasta cuándo dura la reserva del worker.
+    disponible_en = models.DateTimeField(default=timezone.now)
+    ultimo_error = models.TextField(blank=True, default="")
+
+    creado_en = models.DateTimeField(auto_now_add=True)
+    procesado_en = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        verbose_name = "Mensaje de outbox"
+        verbose_name_plural = "Outbox"
+        indexes = [
+            models.Index(fields=["estado", "disponible_en"], name="outbox_estado_disp_idx"),
+        ]
+
+    def __str__(self):
+        return f"#{self.pk} {self.tarea.rsplit('.', 1)[-1]} ({self.estado}, {self.intentos} intentos)"
@@ -0,0 +1,152 @@
+import smtplib
+import threading
+import time
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.core.mail import get_connection
+
+
+# Errores tras los que vale la pena reabrir la conexión y reintentar una vez
+ERRORES_DE_CONEXION = (smtplib.SMTPServerDisconnected, ConnectionError, TimeoutError)
+
+
+class MailDispatcher:
+    """
+    Envío de correo reutilizando una conexión SMTP persistente.
+
+    Cada `EmailMessage.send()` sin conexión explícita abre una sesión nueva
+    (TCP + STARTTLS + LOGIN) y la cierra al terminar. Dentro de `sesion()` el
+    despachador mantiene una única conexión abierta por hilo y la entrega vía
+    `conexion()`, de modo que N correos pagan un solo handshake. La conexión se
+    renueva cada `max_por_conexion` mensajes (límite típico de Gmail por sesión)
+    o si estuvo inactiva más de `max_inactiva` segundos.
+
+    `backend` permite cambiar el sumidero (ver SUMIDEROS) sin tocar EMAIL_BACKEND.
+    """
+
+    SUMIDEROS = {
+        "smtp": "django.core.mail.backends.smtp.EmailBackend",
+        "archivo": "django.core.mail.backends.filebased.EmailBackend",
+        "consola": "django.core.mail.backends.console.EmailBackend",
+        "memoria": "django.core.mail.backends.locmem.EmailBackend",
+    }
+
+    def __init__(self, backend=None, max_por_conexion=None, max_inactiva=None, **opciones_backend):
+        backend = backend or getattr(settings, "MAIL_DISPATCHER_BACKEND", None)
+        self.backend = self.SUMIDEROS.get(backend, backend)  # None → EMAIL_BACKEND
+        self.opciones_backend = opciones_backend
+        self.max_por_conexion = max_por_conexion or getattr(settings, "MAIL_MENSAJES_POR_CONEXION", 100)
+        self.max_inactiva = max_inactiva or getattr(settings, "MAIL_CONEXION_MAX_INACTIVA", 60)
+
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._metricas = {"enviados": 0, "fallidos": 0, "conexiones": 0, "reconexiones": 0, "segundos": 0.0}
+
+    # ============================================================
+    # 🔌 Conexión persistente por hilo
+    # ============================================================
+    @contextmanager
+    def sesion(self):
+        """Mantiene abierta una conexión para todos los envíos del bloque (anidable)."""
+        self._local.profundidad = getattr(self._local, "profundidad", 0) + 1
+        try:
+            yield self
+        finally:
+            self._local.profundidad -= 1
+            if self._local.profundidad == 0:
+                self.cerrar_conexion()
+
+    def conexion(self):
+        """
+        Conexión abierta para el próximo mensaje si hay una `sesion()` activa en
+        este hilo; None en caso contrario (Django abrirá una propia, como siempre).
+        Pensado para `EmailMultiAlternatives(..., connection=despachador.conexion())`.
+        """
+        if not getattr(self._local, "profundidad", 0):
+            return None
+        ahora = time.monotonic()
+        actual = getattr(self._local, "conexion", None)
+        if actual is not None and (
+            self._local.mensajes >= self.max_por_conexion or ahora - self._local.usada_en > self.max_inactiva
+        ):
+            self.cerrar_conexion()
+            actual = None
+        if actual is None:
+            actual = self._nueva_conexion()
+            actual.open()
+            self._local.conexion = actual
+            self._local.mensajes = 0
+            with self._lock:
+                self._metricas["conexiones"] += 1
+        self._local.mensajes += 1
+        self._local.usada_en = ahora
+        return actual
+
+    def _nueva_conexion(self):
+        return get_connection(self.backend, fail_silently=False, **self.opciones_backend)
+
+    def cerrar_conexion(self):
+        """Cierra la conexión del hilo (p. ej. tras un error); la próxima se abre de cero."""
+        actual = getattr(self._local, "conexion", None)
+        self._local.conexion = None
+        if actual is not None:
+            try:
+                actual.close()
+            except Exception as e:
+                print(f"⚠️ Error cerrando conexión de correo: {e}")
+
+    # ============================================================
+    # 📨 Envío por lotes
+    # ============================================================
+    def enviar_lote(self, mensajes):
+        """
+        Envía una lista de EmailMessage por la misma conexión. Un destinatario
+        rechazado no detiene el lote; si el servidor corta la sesión se reabre
+        y se reintenta ese mensaje una vez.
+        Retorna {"enviados", "fallidos", "errores": [(destinatarios, error)]}.
+        """
+        resultado = {"enviados": 0, "fallidos": 0, "errores": []}
+        inicio = time.perf_counter()
+        with self.sesion():
+            for mensaje in mensajes:
+                try:
+                    self._enviar_uno(mensaje)
+                    resultado["enviados"] += 1
+                except Exception as e:
+                    resultado["fallidos"] += 1
+                    resultado["errores"].append((mensaje.to, f"{type(e).__name__}: {e}"))
+                    print(f"⚠️ No se pudo enviar correo a {mensaje.to}: {e}")
+
+        with self._lock:
+            self._metricas["enviados"] += resultado["enviados"]
+            self._metricas["fallidos"] += resultado["fallidos"]
+            self._metricas["segundos"] += time.perf_counter() - inicio
+        return resultado
+
+    def _enviar_uno(self, mensaje):
+        try:
+            self.conexion().send_messages([mensaje])
+        except ERRORES_DE_CONEXION:
+            self.cerrar_conexion()
+            with self._lock:
+                self._metricas["reconexiones"] += 1
+            self.conexion().send_messages([mensaje])
+
+    # ============================================================
+    # 📊 Métricas
+    # ============================================================
+    def metricas(self):
+        """Rendimiento acumulado de `enviar_lote` (los envíos vía `conexion()` solo suman conexiones)."""
+        with self._lock:
+            datos = dict(self._metricas)
+        segundos = datos.pop("segundos")
+        datos["mensajes_s"] = round(datos["enviados"] / segundos, 1) if segundos else 0.0
+        datos["mensajes_por_conexion"] = (
+            round(datos["enviados"] / datos["conexiones"], 1) if datos["conexiones"] else 0.0
+        )
+        return datos
+
+
+# Instancia compartida por el proceso (servicios de correo y worker del outbox)
+despachador = MailDispatcher()
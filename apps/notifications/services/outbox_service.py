@@ -0,0 +1,180 @@
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import close_old_connections, transaction
+from django.utils import timezone
+
+from apps.notifications.models import OutboxMensaje
+from apps.notifications.services.mail_dispatcher import despachador
+
+
+class OutboxService:
+    """
+    Cola de trabajos persistida en la base de datos (patrón outbox).
+
+    - `encolar` se llama dentro de la transacción del caso de uso: la petición
+      solo paga un INSERT, y el trabajo existe si y solo si el cambio se confirmó.
+    - `procesar` (comando `process_outbox`) reclama lotes con
+      SELECT ... FOR UPDATE SKIP LOCKED, de modo que varios workers pueden
+      drenar la misma tabla sin pisarse, y ejecuta cada tarea fuera de la transacción.
+    - Una tarea que lanza excepción se reintenta con espera exponencial hasta
+      `max_intentos`; después queda en estado "fallido" para revisión en el admin.
+    - Solo se ejecutan tareas registradas con `registrar` (en `ready()` de cada
+      app): la ruta guardada en la fila se busca en esa lista blanca y nunca se
+      importa, así que editar una fila no permite invocar código arbitrario.
+    """
+
+    _tareas = {}  # ruta → función registrada
+
+    # ============================================================
+    # 📋 Lista blanca de tareas
+    # ============================================================
+    @staticmethod
+    def registrar(*funciones):
+        """Autoriza funciones (o métodos estáticos) como tareas del outbox."""
+        for funcion in funciones:
+            OutboxService._tareas[OutboxService.ruta_de(funcion)] = funcion
+
+    @staticmethod
+    def tareas():
+        return sorted(OutboxService._tareas)
+
+    # ============================================================
+    # 📥 Encolado (dentro de la transacción de negocio)
+    # ============================================================
+    @staticmethod
+    def encolar(tarea, max_intentos=None, **argumentos):
+        """
+        Registra un trabajo. `tarea` es una función/método estático registrado (o
+        su ruta); `argumentos` debe ser serializable a JSON (ids, no instancias).
+        Lanza ValueError si la tarea no está en la lista blanca.
+        """
+        ruta = tarea if isinstance(tarea, str) else OutboxService.ruta_de(tarea)
+        if ruta not in OutboxService._tareas:
+            raise ValueError(f"La tarea '{ruta}' no está registrada en el outbox.")
+        return OutboxMensaje.objects.create(
+            tarea=ruta,
+            argumentos=argumentos,
+            max_intentos=max_intentos or getattr(settings, "OUTBOX_MAX_INTENTOS", 5),
+        )
+
+    @staticmethod
+    def ruta_de(funcion):
+        return f"{funcion.__module__}.{funcion.__qualname__}"
+
+    @staticmethod
+    def resolver(ruta):
+        """Función registrada para 'paquete.modulo.Clase.metodo'. Lanza LookupError si no lo está."""
+        try:
+            return OutboxService._tareas[ruta]
+        except KeyError:
+            raise LookupError(f"La tarea '{ruta}' no está registrada en el outbox.")
+
+    # ============================================================
+    # 🔒 Reclamo de lotes
+    # ============================================================
+    @staticmethod
+    def reclamar(limite=50, reserva_segundos=None):
+        """
+        Marca como "procesando" hasta `limite` mensajes vencidos y los retorna.
+        Los mensajes de un worker que murió a mitad de lote vuelven a estar
+        disponibles cuando expira su reserva (`disponible_en`).
+        """
+        reserva = reserva_segundos or getattr(settings, "OUTBOX_RESERVA_SEGUNDOS", 300)
+        ahora = timezone.now()
+        with transaction.atomic():
+            mensajes = list(
+                OutboxMensaje.objects.select_for_update(skip_locked=True)
+                .filter(estado__in=["pendiente", "procesando"], disponible_en__lte=ahora)
+                .order_by("disponible_en", "id")[:limite]
+            )
+            if not mensajes:
+                return []
+            for mensaje in mensajes:
+                mensaje.estado = "procesando"
+                mensaje.intentos += 1
+                mensaje.disponible_en = ahora + timedelta(seconds=reserva)
+            OutboxMensaje.objects.bulk_update(mensajes, ["estado", "intentos", "disponible_en"])
+        return mensajes
+
+    # ============================================================
+    # ⚙️ Ejecución
+    # ============================================================
+    @staticmethod
+    def procesar(limite=50):
+        """
+        Ejecuta un lote. Retorna {"completados", "reintentos", "fallidos"}.
+        Todos los correos del lote comparten una conexión SMTP (`despachador.sesion()`).
+        """
+        resumen = {"completados": 0, "reintentos": 0, "fallidos": 0}
+        mensajes = OutboxService.reclamar(limite)
+        if not mensajes:
+            return resumen
+        with despachador.sesion():
+            for mensaje in mensajes:
+                resultado = OutboxService.ejecutar(mensaje)
+                resumen[resultado] += 1
+        return resumen
+
+    @staticmethod
+    def ejecutar(mensaje):
+        try:
+            OutboxService.resolver(mensaje.tarea)(**mensaje.argumentos)
+        except Exception as e:
+            # La conexión SMTP compartida puede haber quedado inservible
+            despachador.cerrar_conexion()
+            mensaje.ultimo_error = f"{type(e).__name__}: {e}"[:2000]
+            if mensaje.intentos >= mensaje.max_intentos:
+                mensaje.estado = "fallido"
+                resultado = "fallidos"
+                print(f"❌ Outbox #{mensaje.pk} falló definitivamente tras {mensaje.intentos} intentos: {e}")
+            else:
+                mensaje.estado = "pendiente"
+                mensaje.disponible_en = timezone.now() + OutboxService.espera(mensaje.intentos)
+                resultado = "reintentos"
+                print(f"⚠️ Outbox #{mensaje.pk} falló (intento {mensaje.intentos}), reintento a las "
+                      f"{mensaje.disponible_en:%H:%M:%S}: {e}")
+            mensaje.save(update_fields=["estado", "disponible_en", "ultimo_error"])
+            return resultado
+
+        mensaje.estado = "completado"
+        mensaje.procesado_en = timezone.now()
+        mensaje.ultimo_error = ""
+        mensaje.save(update_fields=["estado", "procesado_en", "ultimo_error"])
+        return "completados"
+
+    @staticmethod
+    def espera(intentos):
+        """Espera exponencial: base, 2·base, 4·base... con tope."""
+        base = getattr(settings, "OUTBOX_BACKOFF_BASE", 30)
+        tope = getattr(settings, "OUTBOX_BACKOFF_MAX", 3600)
+        return timedelta(seconds=min(tope, base * 2 ** max(0, intentos - 1)))
+
+    # ============================================================
+    # 🔁 Worker continuo y limpieza
+    # ============================================================
+    @staticmethod
+    def drenar(limite=50, intervalo=None, detener=None):
+        """
+        Procesa lotes sin pausa mientras haya trabajo y duerme `intervalo`
+        segundos cuando la cola está vacía. `detener` es un threading.Event opcional.
+        """
+        intervalo = intervalo or getattr(settings, "OUTBOX_INTERVALO", 2.0)
+        while not (detener and detener.is_set()):
+            close_old_connections()
+            resumen = OutboxService.procesar(limite)
+            if sum(resumen.values()):
+                print(f"📤 Outbox: {resumen}")
+            if sum(resumen.values()) < limite:
+                if detener:
+                    detener.wait(intervalo)
+                else:
+                    time.sleep(intervalo)
+
+    @staticmethod
+    def purgar(dias):
+        """Elimina los mensajes completados hace más de `dias` días."""
+        limite = timezone.now() - timedelta(days=dias)
+        borrados, _ = OutboxMensaje.objects.filter(estado="completado", procesado_en__lt=limite).delete()
+        return borrados
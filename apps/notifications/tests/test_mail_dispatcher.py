@@ -0,0 +1,128 @@
+import smtplib
+from io import StringIO
+
+from django.core import mail
+from django.core.mail import EmailMessage
+from django.core.mail.backends.base import BaseEmailBackend
+from django.core.management import call_command
+from django.test import SimpleTestCase, TestCase
+
+from apps.notifications.services.mail_dispatcher import MailDispatcher, despachador
+from apps.notifications.services.outbox_service import OutboxService
+from apps.users.services.email_service import EmailService
+
+
+class BackendContador(BaseEmailBackend):
+    """Backend falso: cuenta aperturas y simula rechazos o cortes del servidor."""
+
+    aperturas = 0
+    enviados = []
+    cortar_una_vez = False
+
+    def open(self):
+        if getattr(self, "_abierta", False):
+            return False
+        BackendContador.aperturas += 1
+        self._abierta = True
+        return True
+
+    def close(self):
+        self._abierta = False
+
+    def send_messages(self, email_messages):
+        for mensaje in email_messages:
+            if BackendContador.cortar_una_vez:
+                BackendContador.cortar_una_vez = False
+                raise smtplib.SMTPServerDisconnected("conexión cerrada por el servidor")
+            if "rechazado" in mensaje.to[0]:
+                raise smtplib.SMTPRecipientsRefused({mensaje.to[0]: (550, b"no existe")})
+            BackendContador.enviados.append(mensaje.to[0])
+        return len(email_messages)
+
+
+BACKEND = "apps.notifications.tests.test_mail_dispatcher.BackendContador"
+
+
+def _mensajes(*destinatarios):
+    return [EmailMessage("Hola", "Texto", "twomove@test.com", [d]) for d in destinatarios]
+
+
+def tarea_con_correo(destinatario):
+    EmailMessage("Aviso", "Texto", "twomove@test.com", [destinatario], connection=despachador.conexion()).send()
+
+
+OutboxService.registrar(tarea_con_correo)
+
+
+class TestMailDispatcher(SimpleTestCase):
+    """Pruebas del despachador de correo (apps/notifications/services/mail_dispatcher.py)."""
+
+    def setUp(self):
+        BackendContador.aperturas = 0
+        BackendContador.enviados = []
+        BackendContador.cortar_una_vez = False
+
+    def test_lote_usa_una_sola_conexion(self):
+        despachador_local = MailDispatcher(BACKEND)
+        resultado = despachador_local.enviar_lote(_mensajes(*[f"u{i}@test.com" for i in range(20)]))
+
+        self.assertEqual((resultado["enviados"], resultado["fallidos"]), (20, 0))
+        self.assertEqual(BackendContador.aperturas, 1)
+        metricas = despachador_local.metricas()
+        self.assertEqual(metricas["conexiones"], 1)
+        self.assertEqual(metricas["mensajes_por_conexion"], 20.0)
+        self.assertGreater(metricas["mensajes_s"], 0)
+
+    def test_renueva_la_conexion_cada_n_mensajes(self):
+        despachador_local = MailDispatcher(BACKEND, max_por_conexion=4)
+        despachador_local.enviar_lote(_mensajes(*[f"u{i}@test.com" for i in range(10)]))
+        self.assertEqual(BackendContador.aperturas, 3)
+
+    def test_rechazo_no_detiene_el_lote(self):
+        despachador_local = MailDispatcher(BACKEND)
+        resultado = despachador_local.enviar_lote(_mensajes("a@test.com", "rechazado@test.com", "b@test.com"))
+
+        self.assertEqual((resultado["enviados"], resultado["fallidos"]), (2, 1))
+        self.assertEqual(resultado["errores"][0][0], ["rechazado@test.com"])
+        self.assertEqual(BackendContador.enviados, ["a@test.com", "b@test.com"])
+        self.assertEqual(despachador_local.metricas()["fallidos"], 1)
+
+    def test_reconecta_si_el_servidor_corta(self):
+        despachador_local = MailDispatcher(BACKEND)
+        BackendContador.cortar_una_vez = True
+        resultado = despachador_local.enviar_lote(_mensajes("a@test.com", "b@test.com"))
+
+        self.assertEqual(resultado["enviados"], 2)
+        self.assertEqual(BackendContador.aperturas, 2)
+        self.assertEqual(despachador_local.metricas()["reconexiones"], 1)
+
+    def test_fuera_de_sesion_no_impone_conexion(self):
+        self.assertIsNone(MailDispatcher(BACKEND).conexion())
+
+    def test_comando_benchmark(self):
+        salida = StringIO()
+        call_command("benchmark_mail", mensajes=5, sumidero="memoria", stdout=salida)
+        self.assertIn("5 enviados, 0 fallidos", salida.getvalue())
+
+
+class TestCorreoConConexionCompartida(TestCase):
+    """El worker del outbox y EmailService reutilizan la conexión del despachador."""
+
+    def test_lote_del_outbox_comparte_conexion(self):
+        for i in range(3):
+            OutboxService.encolar(tarea_con_correo, destinatario=f"u{i}@test.com")
+
+        conexiones_antes = despachador.metricas()["conexiones"]
+        self.assertEqual(OutboxService.procesar()["completados"], 3)
+
+        self.assertEqual(len(mail.outbox), 3)
+        self.assertEqual(despachador.metricas()["conexiones"] - conexiones_antes, 1)
+
+    def test_envio_masivo(self):
+        resultado = EmailService.enviar_correo_masivo(
+            "Estado de cuenta",
+            "users/email_recuperar_contrasena.html",
+            [(f"u{i}@test.com", {"user": None, "enlace": "#", "year": 2025}) for i in range(4)],
+        )
+        self.assertEqual(resultado["enviados"], 4)
+        self.assertEqual(sorted(m.to[0] for m in mail.outbox), [f"u{i}@test.com" for i in range(4)])
@@ -0,0 +1,155 @@
+from datetime import timedelta
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.core import mail
+from django.db import transaction
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from apps.bikes.models import Bike
+from apps.notifications.models import OutboxMensaje
+from apps.notifications.services.outbox_service import OutboxService
+from apps.rentals.services.reservation_service import ReservationService
+from apps.stations.models import Station
+from apps.wallet.models import Wallet
+
+
+LLAMADAS = []
+
+
+def tarea_ok(**kwargs):
+    LLAMADAS.append(kwargs)
+
+
+def tarea_que_falla(**kwargs):
+    raise ConnectionError("SMTP caído")
+
+
+OutboxService.registrar(tarea_ok, tarea_que_falla)
+
+
+def tarea_sin_registrar(**kwargs):
+    LLAMADAS.append(kwargs)
+
+
+@override_settings(OUTBOX_BACKOFF_BASE=30, OUTBOX_BACKOFF_MAX=3600)
+class TestOutboxService(TestCase):
+    """Pruebas del outbox de trabajos diferidos (apps/notifications/services/outbox_service.py)."""
+
+    def setUp(self):
+        LLAMADAS.clear()
+
+    def test_encolar_y_procesar(self):
+        mensaje = OutboxService.encolar(tarea_ok, rental_id=7)
+        self.assertEqual(mensaje.tarea, "apps.notifications.tests.test_outbox_service.tarea_ok")
+        self.assertEqual(LLAMADAS, [])
+
+        self.assertEqual(OutboxService.procesar(), {"completados": 1, "reintentos": 0, "fallidos": 0})
+        self.assertEqual(LLAMADAS, [{"rental_id": 7}])
+
+        mensaje.refresh_from_db()
+        self.assertEqual(mensaje.estado, "completado")
+        self.assertIsNotNone(mensaje.procesado_en)
+        # Ya no se vuelve a ejecutar
+        self.assertEqual(sum(OutboxService.procesar().values()), 0)
+
+    def test_resuelve_metodos_estaticos(self):
+        ruta = OutboxService.ruta_de(ReservationService.tarea_correo_confirmacion)
+        self.assertEqual(ruta, "apps.rentals.services.reservation_service.ReservationService.tarea_correo_confirmacion")
+        self.assertEqual(OutboxService.resolver(ruta), ReservationService.tarea_correo_confirmacion)
+
+    def test_solo_ejecuta_tareas_registradas(self):
+        """Una ruta fuera de la lista blanca no se encola ni, si se edita la fila, se importa."""
+        with self.assertRaises(ValueError):
+            OutboxService.encolar(tarea_sin_registrar, rental_id=1)
+        with self.assertRaises(ValueError):
+            OutboxService.encolar("os.system", command="true")
+
+        mensaje = OutboxService.encolar(tarea_ok, max_intentos=1)
+        ruta = OutboxService.ruta_de(tarea_sin_registrar)
+        OutboxMensaje.objects.filter(pk=mensaje.pk).update(tarea=ruta, argumentos={"rental_id": 2})
+
+        self.assertEqual(OutboxService.procesar(), {"completados": 0, "reintentos": 0, "fallidos": 1})
+        self.assertEqual(LLAMADAS, [])
+        mensaje.refresh_from_db()
+        self.assertIn("no está registrada", mensaje.ultimo_error)
+
+    def test_rollback_descarta_el_mensaje(self):
+        with self.assertRaises(RuntimeError):
+            with transaction.atomic():
+                OutboxService.encolar(tarea_ok, rental_id=1)
+                raise RuntimeError("la reserva falló")
+        self.assertFalse(OutboxMensaje.objects.exists())
+
+    def test_reintentos_con_espera_exponencial(self):
+        mensaje = OutboxService.encolar(tarea_que_falla, max_intentos=3)
+
+        self.assertEqual(OutboxService.procesar()["reintentos"], 1)
+        mensaje.refresh_from_db()
+        self.assertEqual((mensaje.estado, mensaje.intentos), ("pendiente", 1))
+        self.assertIn("SMTP caído", mensaje.ultimo_error)
+        self.assertGreater(mensaje.disponible_en, timezone.now() + timedelta(seconds=25))
+        # Mientras no pase la espera, nadie lo reclama
+        self.assertEqual(sum(OutboxService.procesar().values()), 0)
+
+        self.assertEqual(OutboxService.espera(1), timedelta(seconds=30))
+        self.assertEqual(OutboxService.espera(2), timedelta(seconds=60))
+        self.assertEqual(OutboxService.espera(20), timedelta(seconds=3600))
+
+        for _ in range(2):
+            OutboxMensaje.objects.update(disponible_en=timezone.now())
+            OutboxService.procesar()
+        mensaje.refresh_from_db()
+        self.assertEqual((mensaje.estado, mensaje.intentos), ("fallido", 3))
+
+    def test_reserva_vencida_se_puede_reclamar_de_nuevo(self):
+        """Si el worker muere a mitad de lote, el mensaje vuelve a la cola al vencer la reserva."""
+        OutboxService.encolar(tarea_ok, rental_id=3)
+        [reclamado] = OutboxService.reclamar(reserva_segundos=60)
+        self.assertEqual(reclamado.estado, "procesando")
+        self.assertEqual(OutboxService.reclamar(), [])
+
+        OutboxMensaje.objects.update(disponible_en=timezone.now() - timedelta(seconds=1))
+        self.assertEqual(OutboxService.procesar()["completados"], 1)
+        self.assertEqual(OutboxMensaje.objects.get().intentos, 2)
+
+    def test_purgar_completados(self):
+        OutboxService.encolar(tarea_ok)
+        OutboxService.procesar()
+        OutboxMensaje.objects.update(procesado_en=timezone.now() - timedelta(days=10))
+        OutboxService.encolar(tarea_ok)
+
+        self.assertEqual(OutboxService.purgar(dias=7), 1)
+        self.assertEqual(OutboxMensaje.objects.get().estado, "pendiente")
+
+
+class TestCorreoReservaPorOutbox(TestCase):
+    """La reserva ya no envía SMTP dentro de la transacción: lo hace el worker."""
+
+    def setUp(self):
+        self.usuario = get_user_model().objects.create_user(
+            email="outbox@test.com", password="123456", nombre="Ana", apellido="Ruiz"
+        )
+        self.origen = Station.objects.create(nombre="Estación A", direccion="Calle 1", latitud=6.25, longitud=-75.56)
+        self.destino = Station.objects.create(nombre="Estación B", direccion="Calle 2", latitud=6.26, longitud=-75.57)
+        Bike.objects.create(numero_serie="OB-1", tipo="electric", estado="available", station=self.origen,
+                            bateria_porcentaje=90)
+        Wallet.objects.create(usuario=self.usuario, balance=Decimal("50000"))
+
+    def test_correo_de_confirmacion_sale_del_outbox(self):
+        rental = ReservationService.create_reservation(
+            usuario=self.usuario,
+            estacion_origen_id=self.origen.id,
+            tipo_bicicleta="electric",
+            tipo_viaje="ultima_milla",
+            metodo_pago="wallet",
+            estacion_destino_id=self.destino.id,
+        )
+        self.assertEqual(len(mail.outbox), 0)
+        mensaje = OutboxMensaje.objects.get()
+        self.assertEqual(mensaje.argumentos, {"rental_id": rental.id})
+
+        self.assertEqual(OutboxService.procesar()["completados"], 1)
+        self.assertEqual(len(mail.outbox), 1)
+        self.assertEqual(mail.outbox[0].to, ["outbox@test.com"])
@@ -3,3 +3,18 @@ from django.apps import AppConfig
 class RentalsConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'apps.rentals'
+
+    def ready(self):
+        # Tareas diferidas que el outbox puede ejecutar (lista blanca de OutboxService)
+        from apps.notifications.services.outbox_service import OutboxService
+        from apps.rentals.services.cancellation_service import CancellationService
+        from apps.rentals.services.reservation_service import ReservationService
+        from apps.rentals.services.trip_end_service import TripEndService
+        from apps.rentals.services.trip_start_service import TripStartService
+
+        OutboxService.registrar(
+            ReservationService.tarea_correo_confirmacion,
+            TripStartService.tarea_correo_inicio,
+            TripEndService.tarea_factura,
+            CancellationService.tarea_correo_cancelacion,
+        )
@@ -0,0 +1,35 @@
+from django.core.management.base import BaseCommand
+from django.db import models
+from django.db.models import F
+from django.db.models.functions import Cast, Round
+
+from apps.rentals.models import DuracionMinutos, Rental
+
+
+class Command(BaseCommand):
+    help = ("Completa Rental.duracion_minutos de los viajes terminados a partir de hora_fin - hora_inicio "
+            "(UPDATE por lotes, calculado en la base de datos)")
+
+    def add_arguments(self, parser):
+        parser.add_argument('--lote', type=int, default=1000, help='Viajes actualizados por sentencia')
+        parser.add_argument('--recalcular', action='store_true',
+                            help='Recalcula también los viajes que ya tienen duración')
+
+    def handle(self, *args, **options):
+        pendientes = Rental.objects.filter(
+            hora_inicio__isnull=False, hora_fin__isnull=False, hora_fin__gte=F('hora_inicio')
+        )
+        if not options['recalcular']:
+            pendientes = pendientes.filter(duracion_minutos__isnull=True)
+
+        duracion = Cast(Round(DuracionMinutos('hora_inicio', 'hora_fin')), models.PositiveIntegerField())
+        ultimo_id, total = 0, 0
+        while True:
+            # Lotes por id: cada UPDATE bloquea pocas filas y el recorrido no repite trabajo
+            ids = list(pendientes.filter(pk__gt=ultimo_id).order_by('pk').values_list('pk', flat=True)[:options['lote']])
+            if not ids:
+                break
+            ultimo_id = ids[-1]
+            total += Rental.objects.filter(pk__in=ids).update(duracion_minutos=duracion)
+
+        self.stdout.write(self.style.SUCCESS(f"✅ {total} viajes con duración completada."))
@@ -0,0 +1,21 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from apps.rentals.services.user_stats_service import UserStatsService
+
+
+class Command(BaseCommand):
+    help = "Reconstruye el resumen de viajes por usuario (EstadisticasUsuario) a partir del historial"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--usuario', type=int, action='append', dest='usuarios',
+                            help='ID de usuario a reconstruir (se puede repetir). Por defecto todos.')
+        parser.add_argument('--lote', type=int, default=UserStatsService.LOTE, help='Usuarios por consulta')
+
+    def handle(self, *args, **options):
+        inicio = time.perf_counter()
+        total = UserStatsService.reconstruir(options['usuarios'], lote=options['lote'])
+        self.stdout.write(self.style.SUCCESS(
+            f"✅ Estadísticas reconstruidas para {total} usuarios en {time.perf_counter() - inicio:.2f}s."
+        ))
@@ -0,0 +1,25 @@
+# Generated by Django 5.2.7 on 2026-10-17 20:38
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('bikes', '0004_bike_asignacion_idx'),
+        ('rentals', '0002_rental_bike_dock_reservado_and_more'),
+        ('stations', '0002_availability_counters'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='rental',
+            index=models.Index(fields=['usuario', 'creado_en', 'id'], name='rental_hist_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='rental',
+            index=models.Index(fields=['usuario', 'estado', 'creado_en', 'id'], name='rental_hist_estado_idx'),
+        ),
+    ]
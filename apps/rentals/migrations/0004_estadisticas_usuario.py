@@ -0,0 +1,47 @@
+# Generated by Django 5.2.7 on 2026-10-17 20:44
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('rentals', '0003_historial_indexes'),
+        ('stations', '0002_availability_counters'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='EstadisticasUsuario',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('viajes_finalizados', models.PositiveIntegerField(default=0)),
+                ('viajes_cancelados', models.PositiveIntegerField(default=0)),
+                ('viajes_ultima_milla', models.PositiveIntegerField(default=0)),
+                ('viajes_recorrido_largo', models.PositiveIntegerField(default=0)),
+                ('minutos_totales', models.FloatField(default=0)),
+                ('gasto_total', models.DecimalField(decimal_places=2, default=0, max_digits=12)),
+                ('mes_actual', models.DateField(blank=True, null=True)),
+                ('viajes_mes', models.PositiveIntegerField(default=0)),
+                ('estacion_favorita_viajes', models.PositiveIntegerField(default=0)),
+                ('actualizado_en', models.DateTimeField(auto_now=True)),
+                ('estacion_favorita', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='stations.station')),
+                ('usuario', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='estadisticas_viajes', to=settings.AUTH_USER_MODEL)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='ViajesUsuarioEstacion',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('viajes', models.PositiveIntegerField(default=0)),
+                ('estacion', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='stations.station')),
+                ('usuario', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('usuario', 'estacion'), name='rental_viajes_usr_est_uniq')],
+            },
+        ),
+    ]
@@ -0,0 +1,21 @@
+# Generated by Django 5.2.7 on 2026-10-17 20:49
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('bikes', '0004_bike_asignacion_idx'),
+        ('rentals', '0004_estadisticas_usuario'),
+        ('stations', '0002_availability_counters'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='rental',
+            index=models.Index(fields=['creado_en'], name='rental_creado_idx'),
+        ),
+    ]
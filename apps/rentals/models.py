@@ -3,6 +3,35 @@ from django.utils import timezone
 from decimal import Decimal
 
 
+class DuracionMinutos(models.Func):
+    """
+    Minutos (float) entre dos DateTimeField, calculados en la base de datos:
+    `DuracionMinutos("hora_inicio", "hora_fin")`. Permite Avg/Sum de duraciones
+    sin traer los viajes a Python. NULL si falta alguna de las dos horas.
+    """
+
+    output_field = models.FloatField()
+
+    def __init__(self, inicio, fin, **extra):
+        super().__init__(inicio, fin, **extra)
+
+    def _compilar(self, compiler):
+        return [compiler.compile(expresion) for expresion in self.get_source_expressions()]
+
+    def as_sql(self, compiler, connection, **extra_context):
+        # PostgreSQL (y motores con aritmética de intervalos estándar)
+        (inicio, p_inicio), (fin, p_fin) = self._compilar(compiler)
+        return f"(EXTRACT(EPOCH FROM ({fin} - {inicio})) / 60.0)", (*p_fin, *p_inicio)
+
+    def as_mysql(self, compiler, connection, **extra_context):
+        (inicio, p_inicio), (fin, p_fin) = self._compilar(compiler)
+        return f"(TIMESTAMPDIFF(MICROSECOND, {inicio}, {fin}) / 60000000.0)", (*p_inicio, *p_fin)
+
+    def as_sqlite(self, compiler, connection, **extra_context):
+        (inicio, p_inicio), (fin, p_fin) = self._compilar(compiler)
+        return f"((julianday({fin}) - julianday({inicio})) * 1440.0)", (*p_fin, *p_inicio)
+
+
 class Rental(models.Model):
     TIPO_VIAJE = [
         ('ultima_milla', 'Última Milla'),
@@ -43,6 +72,15 @@ class Rental(models.Model):
     creado_en = models.DateTimeField(auto_now_add=True)
     actualizado_en = models.DateTimeField(auto_now=True)
 
+    class Meta:
+        indexes = [
+            # Historial paginado por cursor: (usuario[, estado], creado_en, id)
+            models.Index(fields=["usuario", "creado_en", "id"], name="rental_hist_idx"),
+            models.Index(fields=["usuario", "estado", "creado_en", "id"], name="rental_hist_estado_idx"),
+            # Exportaciones por rango de fechas de toda la flota
+            models.Index(fields=["creado_en"], name="rental_creado_idx"),
+        ]
+
     def calcular_costo(self):
         """
         Calcula el costo total basado en el tipo de viaje y la duración (minutos).
@@ -60,3 +98,59 @@ class Rental(models.Model):
 
     def __str__(self):
         return f"Reserva #{self.id} - {self.usuario.email} ({self.estado})"
+
+
+class EstadisticasUsuario(models.Model):
+    """
+    Resumen de viajes por usuario, mantenido incrementalmente por
+    UserStatsService al finalizar o cancelar un viaje (en la misma transacción).
+    El dashboard y los reportes leen esta fila en lugar de recorrer el historial.
+    """
+
+    usuario = models.OneToOneField('users.Usuario', on_delete=models.CASCADE, related_name='estadisticas_viajes')
+
+    viajes_finalizados = models.PositiveIntegerField(default=0)
+    viajes_cancelados = models.PositiveIntegerField(default=0)
+    viajes_ultima_milla = models.PositiveIntegerField(default=0)
+    viajes_recorrido_largo = models.PositiveIntegerField(default=0)
+    minutos_totales = models.FloatField(default=0)
+    gasto_total = models.DecimalField(max_digits=12, decimal_places=2, default=0)
+
+    # viajes_mes cuenta los finalizados del mes que empieza en mes_actual
+    mes_actual = models.DateField(null=True, blank=True)
+    viajes_mes = models.PositiveIntegerField(default=0)
+
+    estacion_favorita = models.ForeignKey('stations.Station', null=True, blank=True, on_delete=models.SET_NULL,
+                                          related_name='+')
+    estacion_favorita_viajes = models.PositiveIntegerField(default=0)
+
+    actualizado_en = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"Estadísticas de {self.usuario_id}: {self.viajes_finalizados} viajes"
+
+    @property
+    def nivel(self):
+        total = self.viajes_finalizados
+        if total == 0:
+            return "Nuevo"
+        if total < 5:
+            return "Principiante"
+        if total < 20:
+            return "Intermedio"
+        if total < 50:
+            return "Avanzado"
+        return "Experto"
+
+
+class ViajesUsuarioEstacion(models.Model):
+    """Viajes finalizados de un usuario por estación de origen (para la estación favorita)."""
+
+    usuario = models.ForeignKey('users.Usuario', on_delete=models.CASCADE, related_name='+')
+    estacion = models.ForeignKey('stations.Station', on_delete=models.CASCADE, related_name='+')
+    viajes = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["usuario", "estacion"], name="rental_viajes_usr_est_uniq"),
+        ]
@@ -6,8 +6,11 @@ from django.conf import settings
 from decimal import Decimal
 
 from apps.rentals.models import Rental
+from apps.rentals.services.user_stats_service import UserStatsService
 from apps.wallet.models import Wallet
 from apps.transactions.services.transaction_service import TransactionService
+from apps.notifications.services.outbox_service import OutboxService
+from apps.notifications.services.mail_dispatcher import despachador
 
 
 class CancellationService:
@@ -17,7 +20,7 @@ class CancellationService:
     - Verifica que la reserva pertenezca al usuario autenticado.
     - Permite cancelar solo si la reserva está en estado 'reservado'.
     - Procesa reembolsos si el pago fue con wallet o stripe.
-    - Envía notificación por correo electrónico.
+    - Encola la notificación por correo electrónico (outbox).
     """
 
     @staticmethod
@@ -48,6 +51,7 @@ class CancellationService:
         rental.hora_fin = timezone.now()
         rental.actualizado_en = timezone.now()
         rental.save(update_fields=["estado", "hora_fin", "actualizado_en"])
+        UserStatsService.registrar_cancelacion(rental)
 
         # Procesar reembolso si aplica
         refund_amount = Decimal(rental.costo_estimado or 0)
@@ -65,8 +69,8 @@ class CancellationService:
                 # Aquí podrías implementar refund real si tienes payment_intent_id
                 pass
 
-        #  Enviar correo de notificación
-        CancellationService._enviar_correo_cancelacion(user, rental, reason)
+        #  Correo de notificación: se envía fuera de la petición (process_outbox)
+        OutboxService.encolar(CancellationService.tarea_correo_cancelacion, rental_id=rental.id, motivo=reason)
 
         print(f"❌ Reserva #{rental.id} cancelada correctamente por {user.email}")
 
@@ -87,7 +91,13 @@ class CancellationService:
     #  Envío de correo de cancelación
     # -----------------------------------------------------------
     @staticmethod
-    def _enviar_correo_cancelacion(usuario, rental, motivo=""):
+    def tarea_correo_cancelacion(rental_id, motivo=""):
+        """Tarea de outbox: envía el correo de cancelación (lanza si falla, para reintentar)."""
+        rental = Rental.objects.select_related("usuario", "estacion_origen", "estacion_destino").get(pk=rental_id)
+        CancellationService._enviar_correo_cancelacion(rental.usuario, rental, motivo, lanzar_errores=True)
+
+    @staticmethod
+    def _enviar_correo_cancelacion(usuario, rental, motivo="", lanzar_errores=False):
         """
         Envía un correo electrónico al usuario confirmando la cancelación de su reserva.
         Usa el template: rentals/reservation_cancelled.html
@@ -129,7 +139,7 @@ class CancellationService:
             from_email = settings.DEFAULT_FROM_EMAIL
             to_email = [usuario.email]
 
-            email = EmailMultiAlternatives(subject, text_content, from_email, to_email)
+            email = EmailMultiAlternatives(subject, text_content, from_email, to_email, connection=despachador.conexion())
             email.attach_alternative(html_content, "text/html")
             email.send(fail_silently=False)
 
@@ -137,3 +147,5 @@ class CancellationService:
 
         except Exception as e:
             print(f"⚠️ Error al enviar correo de cancelación: {e}")
+            if lanzar_errores:
+                raise
@@ -6,11 +6,13 @@ from decimal import Decimal
 import secrets
 
 from apps.rentals.models import Rental
-from apps.bikes.models import Bike
 from apps.stations.models import Station
-from apps.transactions.models import WalletTransaccion
+from apps.transactions.services.transaction_service import TransactionService
 from apps.wallet.models import Wallet
 from apps.payment.models import MetodoTarjeta
+from apps.bikes.services.allocation_service import BikeAllocationService
+from apps.notifications.services.outbox_service import OutboxService
+from apps.notifications.services.mail_dispatcher import despachador
 
 
 class ReservationService:
@@ -20,9 +22,9 @@ class ReservationService:
       2) Verificar disponibilidad en estación
       3) Validar método de pago (wallet o tarjeta)
       4) Crear Rental (con estación origen y destino)
-      5) Asignar bicicleta
+      5) Asignar bicicleta (reclamo atómico, ver BikeAllocationService)
       6) Registrar transacción (si aplica)
-      7) Enviar correo de confirmación
+      7) Encolar el correo de confirmación (outbox, se envía fuera de la petición)
     """
 
     @staticmethod
@@ -66,21 +68,7 @@ class ReservationService:
 
         print(f"📍 Origen: {estacion_origen.nombre}  →  Destino: {estacion_destino.nombre}")
 
-        # 4) Buscar bicicleta disponible en origen
-        bikes = Bike.objects.filter(
-            station=estacion_origen,
-            tipo=tipo_bicicleta,
-            estado="available"
-        )
-        if tipo_bicicleta == "electric" and hasattr(Bike, "bateria_porcentaje"):
-            bikes = bikes.filter(bateria_porcentaje__gte=40)
-
-        bike = bikes.first()
-        if not bike:
-            raise ValidationError("No hay bicicletas disponibles del tipo solicitado en la estación de origen.")
-        print(f"🚲 Bicicleta asignada: {getattr(bike, 'numero_serie', getattr(bike, 'serial', 'N/A'))} ({getattr(bike, 'tipo', 'N/A')})")
-
-        # 5) Validar método de pago
+        # 4) Validar método de pago (antes de tomar la bicicleta: el bloqueo dura lo mínimo)
         costo_estimado = Decimal("17500") if tipo_viaje == "ultima_milla" else Decimal("25000")
         print(f"💰 Costo estimado: {costo_estimado} COP")
 
@@ -101,6 +89,13 @@ class ReservationService:
         else:
             raise ValidationError("Método de pago no soportado.")
 
+        # 5) Reservar atómicamente una bicicleta del origen (eléctricas: la de mayor batería).
+        #    Dos reservas simultáneas nunca obtienen la misma bicicleta.
+        bike = BikeAllocationService.reclamar(estacion_origen.id, tipo_bicicleta)
+        if not bike:
+            raise ValidationError("No hay bicicletas disponibles del tipo solicitado en la estación de origen.")
+        print(f"🚲 Bicicleta asignada: {getattr(bike, 'numero_serie', getattr(bike, 'serial', 'N/A'))} ({getattr(bike, 'tipo', 'N/A')})")
+
         # 6) Generar código de desbloqueo
         codigo_desbloqueo = secrets.token_hex(3).upper()  # p.ej. 'A3F9D1'
         print(f"🔐 Código de desbloqueo generado: {codigo_desbloqueo}")
@@ -124,33 +119,37 @@ class ReservationService:
         )
         print(f"📝 Reserva creada con ID #{rental.id}")
 
-        # 8) Marcar bicicleta como reservada
-        bike.estado = "reserved"
-        bike.save(update_fields=["estado"])
-
-        # 9) Registrar transacción y actualizar saldo si paga con wallet
+        # 8) Cobrar la reserva si paga con wallet. La validación de fondos y el débito
+        #    son un único UPDATE condicional: un cobro simultáneo no puede sobregirar.
         if metodo_pago == "wallet" and wallet:
-            wallet.balance -= costo_estimado
-            wallet.save(update_fields=["balance"])
-            WalletTransaccion.objects.create(
-                wallet=wallet,
-                tipo="PAGO",
-                monto=-costo_estimado,
-                descripcion=f"Reserva anticipada de bicicleta ({tipo_viaje})",
-                saldo_resultante=wallet.balance,
-                referencia_externa=f"rental_{rental.id}"
-            )
+            try:
+                TransactionService.registrar_movimiento(
+                    wallet=wallet,
+                    tipo="PAGO",
+                    monto=costo_estimado,
+                    descripcion=f"Reserva anticipada de bicicleta ({tipo_viaje})",
+                    referencia_externa=f"rental_{rental.id}",
+                )
+            except ValueError:
+                # Se revierte la transacción completa (reserva y bicicleta incluidas)
+                raise ValidationError("Saldo insuficiente para cubrir la reserva.")
             print(f"💵 Transacción registrada. Nuevo saldo: {wallet.balance} COP")
 
-        # 10) Enviar correo de confirmación
-        ReservationService._enviar_correo_confirmacion(usuario, rental)
+        # 9) Correo de confirmación: se encola en la misma transacción y lo envía process_outbox
+        OutboxService.encolar(ReservationService.tarea_correo_confirmacion, rental_id=rental.id)
 
         print("✅ Proceso de reserva completado correctamente.")
         return rental
 
     # --------------------------------------------------------------------
     @staticmethod
-    def _enviar_correo_confirmacion(usuario, rental):
+    def tarea_correo_confirmacion(rental_id):
+        """Tarea de outbox: envía la confirmación de la reserva `rental_id` (lanza si falla, para reintentar)."""
+        rental = Rental.objects.select_related("usuario", "estacion_origen", "estacion_destino").get(pk=rental_id)
+        ReservationService._enviar_correo_confirmacion(rental.usuario, rental, lanzar_errores=True)
+
+    @staticmethod
+    def _enviar_correo_confirmacion(usuario, rental, lanzar_errores=False):
         """Envía un correo HTML al usuario confirmando su reserva (plantilla rentals/reservation_confirmed.html)."""
         try:
             subject = "✅ Tu reserva de bicicleta ha sido confirmada"
@@ -184,7 +183,7 @@ class ReservationService:
                 "¡Buen viaje!"
             )
 
-            email = EmailMultiAlternatives(subject, text_content, from_email, to)
+            email = EmailMultiAlternatives(subject, text_content, from_email, to, connection=despachador.conexion())
             email.attach_alternative(html_content, "text/html")
             email.send()
 
@@ -192,3 +191,5 @@ class ReservationService:
 
         except Exception as e:
             print(f"⚠️ Error al enviar correo de confirmación: {e}")
+            if lanzar_errores:
+                raise
@@ -6,10 +6,14 @@ from django.conf import settings
 from decimal import Decimal
 
 from apps.rentals.models import Rental
+from apps.rentals.services.user_stats_service import UserStatsService
 from apps.bikes.models import Bike
 from apps.stations.models import Station
-from apps.transactions.models import WalletTransaccion
+from apps.transactions.services.transaction_service import TransactionService
 from apps.wallet.models import Wallet
+from apps.iot.services.simulation_scheduler import planificador
+from apps.notifications.services.outbox_service import OutboxService
+from apps.notifications.services.mail_dispatcher import despachador
 
 # Decorators de costos
 from apps.rentals.services.cost_decorator import (
@@ -81,33 +85,39 @@ class TripEndService:
             rental.hora_fin = hora_fin
             rental.estacion_destino = estacion_destino
             rental.costo_total = Decimal(costo_total)
-            rental.save(update_fields=["estado", "hora_fin", "estacion_destino", "costo_total"])
+            rental.duracion_minutos = max(0, round(duracion))
+            rental.save(update_fields=["estado", "hora_fin", "estacion_destino", "costo_total", "duracion_minutos"])
+
+            # Resumen de viajes del usuario (misma transacción)
+            UserStatsService.registrar_fin(rental, duracion)
 
             bike.estado = "block"
             bike.station = estacion_destino if estacion_destino else bike.station
             bike.save(update_fields=["estado", "station"])
 
+            # Detener la telemetría simulada del viaje (si sigue en curso)
+            transaction.on_commit(lambda: planificador.cancelar(rental.id))
+
             wallet = Wallet.objects.filter(usuario=usuario).first()
             if wallet:
-                nuevo_saldo = wallet.balance - Decimal(costo_total)
-
-                WalletTransaccion.objects.create(
+                # El viaje ya ocurrió: se cobra aunque el saldo quede en negativo
+                TransactionService.registrar_movimiento(
                     wallet=wallet,
                     tipo="PAGO",
-                    monto=-Decimal(costo_total),
+                    monto=Decimal(costo_total),
                     descripcion=f"Pago por finalización de viaje #{rental.id}",
-                    saldo_resultante=nuevo_saldo,
-                    referencia_externa=f"rental_{rental.id}"
+                    referencia_externa=f"rental_{rental.id}",
+                    permitir_saldo_negativo=True,
                 )
 
-                wallet.balance = nuevo_saldo
-                wallet.save(update_fields=["balance"])
-
-            print("📄 Generando factura PDF…")
-            factura_pdf = TripEndService._generar_factura_pdf(rental, costo_total, duracion_min)
-
-            print("📧 Enviando correo…")
-            TripEndService._enviar_correo_factura(usuario, rental, costo_total, duracion_min, factura_pdf, fuera_estacion)
+            # Factura PDF + correo: fuera de la petición (process_outbox), tras el commit
+            OutboxService.encolar(
+                TripEndService.tarea_factura,
+                rental_id=rental.id,
+                costo_total=str(costo_total),
+                duracion_min=duracion_min,
+                fuera_estacion=fuera_estacion,
+            )
 
             print(f"✅ Viaje finalizado correctamente — Rental #{rental.id}")
 
@@ -123,6 +133,17 @@ class TripEndService:
             print(f"❌ Error general en TripEndService.end_trip: {e}")
             raise
 
+    @staticmethod
+    def tarea_factura(rental_id, costo_total, duracion_min, fuera_estacion):
+        """Tarea de outbox: genera la factura PDF y la envía por correo (lanza si falla, para reintentar)."""
+        rental = Rental.objects.select_related("usuario", "bike", "estacion_destino").get(pk=rental_id)
+        print("📄 Generando factura PDF…")
+        factura_pdf = TripEndService._generar_factura_pdf(rental, costo_total, duracion_min)
+        print("📧 Enviando correo…")
+        TripEndService._enviar_correo_factura(
+            rental.usuario, rental, costo_total, duracion_min, factura_pdf, fuera_estacion, lanzar_errores=True
+        )
+
     @staticmethod
     def _generar_factura_pdf(rental, costo_total, duracion):
         buffer = io.BytesIO()
@@ -186,7 +207,7 @@ class TripEndService:
     # Envío del correo
     # ----------------------------------------------------------------------
     @staticmethod
-    def _enviar_correo_factura(usuario, rental, costo_total, duracion, pdf_buffer, fuera_estacion):
+    def _enviar_correo_factura(usuario, rental, costo_total, duracion, pdf_buffer, fuera_estacion, lanzar_errores=False):
         try:
             context = {
                 "usuario": usuario,
@@ -203,7 +224,7 @@ class TripEndService:
             from_email = getattr(settings, "DEFAULT_FROM_EMAIL", None)
             to_email = [usuario.email]
 
-            msg = EmailMultiAlternatives(subject, "", from_email, to_email)
+            msg = EmailMultiAlternatives(subject, "", from_email, to_email, connection=despachador.conexion())
             msg.attach_alternative(html_content, "text/html")
             msg.attach(
                 f"Factura_TwoMove_{rental.id}.pdf",
@@ -214,3 +235,5 @@ class TripEndService:
 
         except Exception as e:
             print(f"⚠️ Error al enviar correo de factura: {e}")
+            if lanzar_errores:
+                raise
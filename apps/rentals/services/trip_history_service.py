@@ -0,0 +1,114 @@
+import base64
+from datetime import datetime, time, timedelta
+
+from django.core.exceptions import ValidationError
+from django.db.models import Q
+from django.utils import timezone
+
+from apps.rentals.models import Rental
+from apps.rentals.services.user_stats_service import UserStatsService
+
+
+class TripHistoryService:
+    """
+    Historial de viajes paginado por cursor (keyset) sobre (creado_en, id).
+
+    En lugar de OFFSET, cada página pide "los viajes anteriores al último que
+    vi": `WHERE creado_en < c OR (creado_en = c AND id < i) ORDER BY creado_en
+    DESC, id DESC LIMIT n+1`. Con los índices (usuario[, estado], creado_en, id)
+    la página 500 cuesta lo mismo que la primera, y un viaje nuevo no desplaza
+    ni duplica filas entre páginas. El id desempata viajes con el mismo
+    `creado_en`. El total es opcional (un único COUNT) y las estadísticas se
+    sirven aparte (`estadisticas`).
+    """
+
+    POR_PAGINA = 10
+    MAX_POR_PAGINA = 100
+
+    # ============================================================
+    # 🔖 Cursor opaco
+    # ============================================================
+    @staticmethod
+    def codificar_cursor(viaje):
+        crudo = f"{viaje.creado_en.isoformat()}|{viaje.id}"
+        return base64.urlsafe_b64encode(crudo.encode()).decode().rstrip("=")
+
+    @staticmethod
+    def decodificar_cursor(cursor):
+        try:
+            crudo = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode()
+            fecha, viaje_id = crudo.rsplit("|", 1)
+            return datetime.fromisoformat(fecha), int(viaje_id)
+        except (ValueError, UnicodeDecodeError):
+            raise ValidationError("Cursor de paginación inválido.")
+
+    # ============================================================
+    # 📜 Páginas
+    # ============================================================
+    @staticmethod
+    def filtrar(usuario, estado=None, tipo_viaje=None, fecha=None):
+        """Viajes del usuario con los filtros del historial. `fecha` es un date (día local)."""
+        viajes = Rental.objects.filter(usuario=usuario)
+        if estado:
+            viajes = viajes.filter(estado=estado)
+        if tipo_viaje:
+            viajes = viajes.filter(tipo_viaje=tipo_viaje)
+        if fecha:
+            # Rango en vez de creado_en__date: aprovecha el índice
+            desde = timezone.make_aware(datetime.combine(fecha, time.min))
+            viajes = viajes.filter(creado_en__gte=desde, creado_en__lt=desde + timedelta(days=1))
+        return viajes
+
+    @staticmethod
+    def pagina(usuario, cursor=None, por_pagina=None, con_total=False, **filtros):
+        """
+        Retorna {"viajes": [Rental], "siguiente_cursor": str|None, "total": int|None}.
+        `cursor` es el `siguiente_cursor` de la página anterior.
+        """
+        por_pagina = min(max(1, por_pagina or TripHistoryService.POR_PAGINA), TripHistoryService.MAX_POR_PAGINA)
+        base = TripHistoryService.filtrar(usuario, **filtros)
+
+        viajes = base.select_related("estacion_origen", "estacion_destino", "bike")
+        if cursor:
+            creado_en, viaje_id = TripHistoryService.decodificar_cursor(cursor)
+            viajes = viajes.filter(Q(creado_en__lt=creado_en) | Q(creado_en=creado_en, id__lt=viaje_id))
+        viajes = list(viajes.order_by("-creado_en", "-id")[:por_pagina + 1])
+
+        hay_mas = len(viajes) > por_pagina
+        viajes = viajes[:por_pagina]
+        return {
+            "viajes": viajes,
+            "siguiente_cursor": TripHistoryService.codificar_cursor(viajes[-1]) if hay_mas else None,
+            "total": base.count() if con_total else None,
+        }
+
+    @staticmethod
+    def serializar(viaje):
+        duracion_minutos = None
+        if viaje.hora_fin and viaje.hora_inicio:
+            duracion_minutos = round((viaje.hora_fin - viaje.hora_inicio).total_seconds() / 60, 1)
+        return {
+            'id': viaje.id,
+            'estado': viaje.estado,
+            'tipo_viaje': viaje.tipo_viaje,
+            'estacion_origen': viaje.estacion_origen.nombre if viaje.estacion_origen else 'N/A',
+            'estacion_destino': viaje.estacion_destino.nombre if viaje.estacion_destino else 'N/A',
+            'bike_serial_reservada': viaje.bike_serial_reservada or (viaje.bike.numero_serie if viaje.bike else 'N/A'),
+            'metodo_pago': viaje.metodo_pago or 'N/A',
+            'costo_total': float(viaje.costo_total) if viaje.costo_total else 0,
+            'duracion_minutos': duracion_minutos or 0,
+            'hora_inicio': viaje.hora_inicio.isoformat() if viaje.hora_inicio else viaje.creado_en.isoformat(),
+            'hora_fin': viaje.hora_fin.isoformat() if viaje.hora_fin else None,
+        }
+
+    # ============================================================
+    # 📊 Estadísticas (endpoint propio)
+    # ============================================================
+    @staticmethod
+    def estadisticas(usuario):
+        """Totales de los viajes finalizados del usuario (leídos de EstadisticasUsuario)."""
+        stats = UserStatsService.obtener(usuario)
+        return {
+            'total_viajes': stats.viajes_finalizados,
+            'total_gastado': float(stats.gasto_total),
+        }
@@ -5,6 +5,8 @@ from django.template.loader import render_to_string
 from django.conf import settings
 
 from apps.rentals.models import Rental
+from apps.notifications.services.outbox_service import OutboxService
+from apps.notifications.services.mail_dispatcher import despachador
 # ⛓️ Lanza la simulación MQTT en background cuando inicia el viaje
 from apps.iot.services.start_simulation_service import simulate_route_async
 
@@ -127,8 +129,8 @@ class TripStartService:
 
         print(f"✅ Viaje iniciado — Rental #{rental.id} | Bicicleta: {bike_serial}")
 
-        # ✅ Enviar correo de confirmación
-        TripStartService._enviar_correo_inicio(rental)
+        # ✅ Correo de confirmación: se encola y lo envía process_outbox tras el commit
+        OutboxService.encolar(TripStartService.tarea_correo_inicio, rental_id=rental.pk)
 
         # 🚀 Disparar simulación IoT en background (no bloquea la petición)
         try:
@@ -153,7 +155,13 @@ class TripStartService:
     # 📧 Envío de correo: Confirmación de inicio de viaje
     # -------------------------------------------------------------
     @staticmethod
-    def _enviar_correo_inicio(rental: Rental):
+    def tarea_correo_inicio(rental_id):
+        """Tarea de outbox: envía el correo de inicio de viaje (lanza si falla, para reintentar)."""
+        rental = Rental.objects.select_related("usuario", "bike", "estacion_origen").get(pk=rental_id)
+        TripStartService._enviar_correo_inicio(rental, lanzar_errores=True)
+
+    @staticmethod
+    def _enviar_correo_inicio(rental: Rental, lanzar_errores=False):
         """
         Envía un correo al usuario confirmando el inicio de su viaje.
         Usa el template: rentals/trip_started.html
@@ -174,10 +182,12 @@ class TripStartService:
             from_email = settings.DEFAULT_FROM_EMAIL
             to_email = [usuario.email]
 
-            msg = EmailMultiAlternatives(subject, "", from_email, to_email)
+            msg = EmailMultiAlternatives(subject, "", from_email, to_email, connection=despachador.conexion())
             msg.attach_alternative(html_content, "text/html")
             msg.send(fail_silently=False)
 
             print(f"📩 Correo de inicio de viaje enviado a {usuario.email}")
         except Exception as e:
             print(f"⚠️ Error al enviar correo de inicio de viaje: {e}")
+            if lanzar_errores:
+                raise
@@ -0,0 +1,212 @@
+from datetime import datetime, time
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.db import IntegrityError, connection, transaction
+from django.db.models import Case, Count, F, Q, Sum, Value, When
+from django.utils import timezone
+
+from apps.rentals.models import DuracionMinutos, EstadisticasUsuario, Rental, ViajesUsuarioEstacion
+
+
+class UserStatsService:
+    """
+    Mantiene EstadisticasUsuario (resumen de viajes por usuario).
+
+    - `registrar_fin` / `registrar_cancelacion` se llaman dentro de la
+      transacción de TripEndService / CancellationService y aplican
+      incrementos con F(): UPDATE ... SET viajes = viajes + 1, sin leer el historial.
+    - La estación favorita sale de un contador por (usuario, estación de origen).
+    - `reconstruir` recalcula desde Rental por lotes de usuarios (comando
+      `rebuild_user_stats`). Si un usuario aún no tiene fila, se construye
+      la primera vez que se lee o se actualiza.
+    """
+
+    LOTE = 500
+
+    @staticmethod
+    def inicio_de_mes(momento=None):
+        return timezone.localtime(momento or timezone.now()).date().replace(day=1)
+
+    # ============================================================
+    # 📖 Lectura
+    # ============================================================
+    @staticmethod
+    def obtener(usuario):
+        """Fila de estadísticas del usuario (una lectura; se construye si no existe)."""
+        usuario_id = getattr(usuario, "pk", usuario)
+        filas = EstadisticasUsuario.objects.select_related("estacion_favorita").filter(usuario_id=usuario_id)
+        stats = filas.first()
+        if stats is None:
+            UserStatsService.reconstruir([usuario_id])
+            stats = filas.get()
+        return stats
+
+    @staticmethod
+    def viajes_del_mes(stats):
+        """viajes_mes solo vale para el mes en que se contó."""
+        return stats.viajes_mes if stats.mes_actual == UserStatsService.inicio_de_mes() else 0
+
+    @staticmethod
+    def minutos_totales(stats):
+        """
+        Minutos acumulados en entero. Se redondea: la diferencia de fechas en la BD
+        (p. ej. julianday en SQLite) deja 74.99999 donde hubo 75 minutos.
+        """
+        return round(stats.minutos_totales)
+
+    @staticmethod
+    def duracion_promedio(stats):
+        return stats.minutos_totales / stats.viajes_finalizados if stats.viajes_finalizados else 0
+
+    # ============================================================
+    # ➕ Actualización incremental (en la transacción del caso de uso)
+    # ============================================================
+    @staticmethod
+    def registrar_fin(rental, duracion_min=None):
+        """Suma un viaje finalizado. `rental` ya debe estar guardado como finalizado."""
+        filas = EstadisticasUsuario.objects.filter(usuario_id=rental.usuario_id)
+        if not filas.exists():
+            # Primera vez: se construye desde el historial, que ya incluye este viaje
+            UserStatsService.reconstruir([rental.usuario_id])
+            return
+
+        if duracion_min is None and rental.hora_inicio and rental.hora_fin:
+            duracion_min = (rental.hora_fin - rental.hora_inicio).total_seconds() / 60
+        mes = UserStatsService.inicio_de_mes(rental.hora_fin)
+
+        cambios = {
+            "viajes_finalizados": F("viajes_finalizados") + 1,
+            "minutos_totales": F("minutos_totales") + (duracion_min or 0),
+            "gasto_total": F("gasto_total") + Decimal(rental.costo_total or 0),
+            # Debe ir antes de mes_actual: MySQL evalúa las asignaciones del SET en orden
+            "viajes_mes": Case(When(mes_actual=mes, then=F("viajes_mes") + 1), default=Value(1)),
+            "mes_actual": mes,
+        }
+        if rental.tipo_viaje in ("ultima_milla", "recorrido_largo"):
+            campo = f"viajes_{rental.tipo_viaje}"
+            cambios[campo] = F(campo) + 1
+        filas.update(**cambios)
+
+        # Estación favorita: contador por estación de origen y UPDATE condicional
+        contador = ViajesUsuarioEstacion.objects.filter(usuario_id=rental.usuario_id,
+                                                        estacion_id=rental.estacion_origen_id)
+        if not contador.update(viajes=F("viajes") + 1):
+            try:
+                # Savepoint: si otro viaje creó la fila a la vez, el error no revierte end_trip
+                with transaction.atomic():
+                    ViajesUsuarioEstacion.objects.create(usuario_id=rental.usuario_id,
+                                                         estacion_id=rental.estacion_origen_id, viajes=1)
+            except IntegrityError:
+                contador.update(viajes=F("viajes") + 1)
+        viajes = contador.values_list("viajes", flat=True).get()
+        filas.filter(estacion_favorita_viajes__lt=viajes).update(
+            estacion_favorita_id=rental.estacion_origen_id, estacion_favorita_viajes=viajes
+        )
+
+    @staticmethod
+    def registrar_cancelacion(rental):
+        filas = EstadisticasUsuario.objects.filter(usuario_id=rental.usuario_id)
+        if not filas.update(viajes_cancelados=F("viajes_cancelados") + 1):
+            UserStatsService.reconstruir([rental.usuario_id])
+
+    # ============================================================
+    # 🔁 Reconstrucción desde el historial
+    # ============================================================
+    @staticmethod
+    def reconstruir(usuario_ids=None, lote=None):
+        """
+        Recalcula las estadísticas de `usuario_ids` (o de todos los usuarios)
+        con dos agregaciones agrupadas por lote. Retorna cuántas filas escribió.
+        """
+        lote = lote or UserStatsService.LOTE
+        if usuario_ids is not None:
+            ids = sorted(set(usuario_ids))
+            lotes = (ids[i:i + lote] for i in range(0, len(ids), lote))
+        else:
+            lotes = UserStatsService._lotes_de_usuarios(lote)
+
+        total = 0
+        for ids in lotes:
+            total += UserStatsService._reconstruir_lote(ids)
+        return total
+
+    @staticmethod
+    def _lotes_de_usuarios(lote):
+        usuarios = get_user_model().objects.order_by("pk")
+        ultimo = None
+        while True:
+            filtro = usuarios if ultimo is None else usuarios.filter(pk__gt=ultimo)
+            ids = list(filtro.values_list("pk", flat=True)[:lote])
+            if not ids:
+                return
+            ultimo = ids[-1]
+            yield ids
+
+    @staticmethod
+    def _reconstruir_lote(ids):
+        mes = UserStatsService.inicio_de_mes()
+        desde_mes = timezone.make_aware(datetime.combine(mes, time.min))
+        finalizado = Q(estado="finalizado")
+
+        agregados = {
+            fila["usuario_id"]: fila
+            for fila in Rental.objects.filter(usuario_id__in=ids).values("usuario_id").annotate(
+                finalizados=Count("id", filter=finalizado),
+                cancelados=Count("id", filter=Q(estado="cancelado")),
+                ultima_milla=Count("id", filter=finalizado & Q(tipo_viaje="ultima_milla")),
+                recorrido_largo=Count("id", filter=finalizado & Q(tipo_viaje="recorrido_largo")),
+                minutos=Sum(DuracionMinutos("hora_inicio", "hora_fin"), filter=finalizado),
+                gasto=Sum("costo_total", filter=finalizado),
+                del_mes=Count("id", filter=finalizado & Q(hora_fin__gte=desde_mes)),
+            ).order_by()
+        }
+        por_estacion = list(
+            Rental.objects.filter(usuario_id__in=ids, estado="finalizado")
+            .values("usuario_id", "estacion_origen_id").annotate(viajes=Count("id")).order_by()
+        )
+
+        favoritas = {}
+        for fila in por_estacion:
+            actual = favoritas.get(fila["usuario_id"])
+            if actual is None or (fila["viajes"], -fila["estacion_origen_id"]) > (actual[1], -actual[0]):
+                favoritas[fila["usuario_id"]] = (fila["estacion_origen_id"], fila["viajes"])
+
+        filas = []
+        for usuario_id in ids:
+            datos = agregados.get(usuario_id, {})
+            favorita = favoritas.get(usuario_id, (None, 0))
+            filas.append(EstadisticasUsuario(
+                usuario_id=usuario_id,
+                viajes_finalizados=datos.get("finalizados", 0),
+                viajes_cancelados=datos.get("cancelados", 0),
+                viajes_ultima_milla=datos.get("ultima_milla", 0),
+                viajes_recorrido_largo=datos.get("recorrido_largo", 0),
+                minutos_totales=datos.get("minutos") or 0,
+                gasto_total=datos.get("gasto") or Decimal("0"),
+                mes_actual=mes,
+                viajes_mes=datos.get("del_mes", 0),
+                estacion_favorita_id=favorita[0],
+                estacion_favorita_viajes=favorita[1],
+            ))
+
+        # MySQL no admite indicar la columna del conflicto (usa cualquier UNIQUE)
+        unique_fields = ["usuario"] if connection.features.supports_update_conflicts_with_target else None
+        with transaction.atomic():
+            ViajesUsuarioEstacion.objects.filter(usuario_id__in=ids).delete()
+            ViajesUsuarioEstacion.objects.bulk_create([
+                ViajesUsuarioEstacion(usuario_id=fila["usuario_id"], estacion_id=fila["estacion_origen_id"],
+                                      viajes=fila["viajes"])
+                for fila in por_estacion
+            ])
+            EstadisticasUsuario.objects.bulk_create(
+                filas,
+                update_conflicts=True,
+                unique_fields=unique_fields,
+                update_fields=[
+                    "viajes_finalizados", "viajes_cancelados", "viajes_ultima_milla", "viajes_recorrido_largo",
+                    "minutos_totales", "gasto_total", "mes_actual", "viajes_mes",
+                    "estacion_favorita", "estacion_favorita_viajes", "actualizado_en",
+                ],
+            )
+        return len(filas)
@@ -6,6 +6,7 @@ from django.utils import timezone
 
 from apps.rentals.models import Rental
 from apps.rentals.services.cancellation_service import CancellationService
+from apps.notifications.services.outbox_service import OutboxService
 from apps.wallet.models import Wallet
 
 
@@ -65,6 +66,9 @@ class TestCancellationService(TestCase):
         self.assertEqual(result["status"], "cancelled")
         self.assertEqual(result["refunded_amount"], 10000.0)
         mock_transaccion.assert_called_once()
+        # El correo se envía fuera de la petición, al drenar el outbox
+        mock_correo.assert_not_called()
+        OutboxService.procesar()
         mock_correo.assert_called_once()
 
     # ============================================================
@@ -103,6 +107,7 @@ class TestCancellationService(TestCase):
         result = CancellationService.cancel_reservation(self.usuario, self.rental.id)
         self.assertEqual(result["status"], "cancelled")
         self.assertEqual(result["payment_method"], "stripe")
+        OutboxService.procesar()
         mock_correo.assert_called_once()
 
     # ============================================================
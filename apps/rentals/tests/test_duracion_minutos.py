@@ -0,0 +1,63 @@
+from datetime import timedelta
+from decimal import Decimal
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.db.models import Avg, Sum
+from django.test import TestCase
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from apps.bikes.models import Bike
+from apps.rentals.models import DuracionMinutos, Rental
+from apps.stations.models import Station
+
+
+class TestDuracionMinutos(TestCase):
+    """Duraciones calculadas en la base de datos (DuracionMinutos) y su backfill."""
+
+    def setUp(self):
+        self.usuario = get_user_model().objects.create_user(email="dur@test.com", password="123456",
+                                                            nombre="Ana", apellido="Ruiz")
+        estacion = Station.objects.create(nombre="Centro", direccion="Calle 1", latitud=4.6, longitud=-74.1)
+        bike = Bike.objects.create(numero_serie="D-1", tipo="manual", estado="available", station=estacion)
+        ahora = timezone.now()
+        for minutos in (10, 20, 45):
+            Rental.objects.create(usuario=self.usuario, bike=bike, estacion_origen=estacion, estado="finalizado",
+                                  tipo_viaje="ultima_milla", hora_inicio=ahora - timedelta(minutes=minutos),
+                                  hora_fin=ahora, costo_total=Decimal("1000"))
+        # Viaje sin terminar: no aporta duración
+        Rental.objects.create(usuario=self.usuario, bike=bike, estacion_origen=estacion, estado="activo",
+                              hora_inicio=ahora)
+
+    def test_agregados_en_la_base_de_datos(self):
+        datos = Rental.objects.aggregate(
+            promedio=Avg(DuracionMinutos("hora_inicio", "hora_fin")),
+            total=Sum(DuracionMinutos("hora_inicio", "hora_fin")),
+        )
+        self.assertAlmostEqual(datos["promedio"], 25.0, places=2)
+        self.assertAlmostEqual(datos["total"], 75.0, places=2)
+
+    def test_backfill(self):
+        salida = StringIO()
+        call_command("backfill_trip_durations", lote=2, stdout=salida)
+
+        self.assertIn("3 viajes", salida.getvalue())
+        self.assertEqual(sorted(Rental.objects.exclude(duracion_minutos=None)
+                                .values_list("duracion_minutos", flat=True)), [10, 20, 45])
+        # Idempotente
+        call_command("backfill_trip_durations", stdout=salida)
+        self.assertIn("0 viajes", salida.getvalue())
+
+    def test_estadisticas_del_usuario(self):
+        cliente = APIClient()
+        cliente.force_authenticate(self.usuario)
+
+        respuesta = cliente.get("/alquileres/api/rentals/estadisticas/")
+        self.assertEqual(respuesta.data["tiempo_total_minutos"], 75)
+        self.assertEqual((respuesta.data["total_viajes"], respuesta.data["viajes_mes"]), (3, 3))
+
+        detalladas = cliente.get("/alquileres/api/rentals/estadisticas_detalladas/")
+        self.assertEqual(detalladas.data["duracion_promedio_minutos"], 25.0)
+        self.assertEqual(detalladas.data["total_gastado"], 3000.0)
@@ -0,0 +1,103 @@
+from datetime import timedelta
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.core.exceptions import ValidationError
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from apps.bikes.models import Bike
+from apps.rentals.models import Rental
+from apps.rentals.services.trip_history_service import TripHistoryService
+from apps.stations.models import Station
+
+
+class TestTripHistoryService(TestCase):
+    """Pruebas del historial paginado por cursor (apps/rentals/services/trip_history_service.py)."""
+
+    def setUp(self):
+        Usuario = get_user_model()
+        self.usuario = Usuario.objects.create_user(email="historial@test.com", password="123456",
+                                                   nombre="Ana", apellido="Ruiz")
+        otro = Usuario.objects.create_user(email="otro@test.com", password="123456", nombre="B", apellido="C")
+        estacion = Station.objects.create(nombre="Centro", direccion="Calle 1", latitud=4.6, longitud=-74.1)
+        bike = Bike.objects.create(numero_serie="H-1", tipo="manual", estado="available", station=estacion)
+
+        ahora = timezone.now()
+        for i in range(25):
+            rental = Rental.objects.create(
+                usuario=self.usuario, bike=bike, estacion_origen=estacion, tipo_viaje="ultima_milla",
+                estado="finalizado" if i % 2 == 0 else "cancelado", costo_total=Decimal("1000"),
+            )
+            # Varios viajes comparten creado_en: el id desempata
+            Rental.objects.filter(pk=rental.pk).update(creado_en=ahora - timedelta(hours=i // 3))
+        Rental.objects.create(usuario=otro, bike=bike, estacion_origen=estacion, estado="finalizado")
+
+    def _recorrer(self, por_pagina, **filtros):
+        ids, cursor, paginas = [], None, 0
+        while True:
+            pagina = TripHistoryService.pagina(self.usuario, cursor=cursor, por_pagina=por_pagina, **filtros)
+            ids.extend(v.id for v in pagina["viajes"])
+            paginas += 1
+            cursor = pagina["siguiente_cursor"]
+            if cursor is None:
+                return ids, paginas
+
+    def test_recorre_todo_sin_duplicados_ni_huecos(self):
+        ids, paginas = self._recorrer(por_pagina=4)
+
+        esperado = list(Rental.objects.filter(usuario=self.usuario)
+                        .order_by("-creado_en", "-id").values_list("id", flat=True))
+        self.assertEqual(ids, esperado)
+        self.assertEqual(paginas, 7)
+
+    def test_filtros(self):
+        ids, _ = self._recorrer(por_pagina=5, estado="finalizado")
+        self.assertEqual(len(ids), 13)
+        self.assertEqual(set(Rental.objects.filter(pk__in=ids).values_list("estado", flat=True)), {"finalizado"})
+
+        hoy = timezone.localtime(Rental.objects.filter(usuario=self.usuario).latest("creado_en").creado_en).date()
+        self.assertGreater(len(self._recorrer(por_pagina=50, fecha=hoy)[0]), 0)
+
+    def test_paginas_profundas_cuestan_lo_mismo(self):
+        primera = TripHistoryService.pagina(self.usuario, por_pagina=3)
+        cursor = primera["siguiente_cursor"]
+        for _ in range(5):
+            cursor = TripHistoryService.pagina(self.usuario, cursor=cursor, por_pagina=3)["siguiente_cursor"]
+
+        with CaptureQueriesContext(connection) as consultas:
+            profunda = TripHistoryService.pagina(self.usuario, cursor=cursor, por_pagina=3)
+        self.assertEqual(len(consultas), 1)
+        self.assertNotIn("OFFSET", consultas[0]["sql"].upper())
+        self.assertIsNone(profunda["total"])
+
+        self.assertEqual(TripHistoryService.pagina(self.usuario, con_total=True)["total"], 25)
+
+    def test_cursor_invalido(self):
+        with self.assertRaises(ValidationError):
+            TripHistoryService.pagina(self.usuario, cursor="no-es-un-cursor")
+
+    def test_estadisticas(self):
+        self.assertEqual(TripHistoryService.estadisticas(self.usuario), {"total_viajes": 13, "total_gastado": 13000.0})
+
+    def test_endpoints(self):
+        cliente = APIClient()
+        cliente.force_authenticate(self.usuario)
+
+        respuesta = cliente.get("/alquileres/api/rentals/historial/", {"per_page": 10, "total": "1"})
+        self.assertEqual(respuesta.status_code, 200)
+        self.assertEqual(len(respuesta.data["viajes"]), 10)
+        self.assertEqual(respuesta.data["paginacion"]["total_registros"], 25)
+        self.assertNotIn("estadisticas", respuesta.data)
+
+        siguiente = cliente.get("/alquileres/api/rentals/historial/",
+                                {"cursor": respuesta.data["paginacion"]["siguiente_cursor"]})
+        self.assertEqual(len(siguiente.data["viajes"]), 10)
+        self.assertNotIn("total_registros", siguiente.data["paginacion"])
+        self.assertEqual(cliente.get("/alquileres/api/rentals/historial/", {"cursor": "xx"}).status_code, 400)
+
+        estadisticas = cliente.get("/alquileres/api/rentals/historial/estadisticas/")
+        self.assertEqual(estadisticas.data["total_viajes"], 13)
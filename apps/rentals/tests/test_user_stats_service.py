@@ -0,0 +1,142 @@
+from datetime import timedelta
+from decimal import Decimal
+from io import StringIO
+from unittest.mock import patch
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import TestCase
+from django.utils import timezone
+
+from apps.admin_dashboard.services.report_service import ReportService
+from apps.bikes.models import Bike
+from apps.rentals.models import EstadisticasUsuario, Rental, ViajesUsuarioEstacion
+from apps.rentals.services.cancellation_service import CancellationService
+from apps.rentals.services.trip_end_service import TripEndService
+from apps.rentals.services.user_stats_service import UserStatsService
+from apps.stations.models import Station
+from apps.users.services.user_info_service import UserInfoService
+from apps.wallet.models import Wallet
+
+
+class TestUserStatsService(TestCase):
+    """Pruebas del resumen incremental de viajes (apps/rentals/services/user_stats_service.py)."""
+
+    def setUp(self):
+        self.usuario = get_user_model().objects.create_user(email="stats@test.com", password="123456",
+                                                            nombre="Ana", apellido="Ruiz")
+        Wallet.objects.create(usuario=self.usuario, balance=Decimal("500000"))
+        self.centro = Station.objects.create(nombre="Centro", direccion="Calle 1", latitud=4.6, longitud=-74.1)
+        self.norte = Station.objects.create(nombre="Norte", direccion="Calle 2", latitud=4.7, longitud=-74.0)
+        self.bike = Bike.objects.create(numero_serie="ST-1", tipo="manual", estado="in_use", station=self.centro)
+
+    def _viaje(self, origen, minutos, tipo="ultima_milla", estado="activo"):
+        return Rental.objects.create(
+            usuario=self.usuario, bike=self.bike, estacion_origen=origen, estacion_destino=self.norte,
+            tipo_viaje=tipo, metodo_pago="wallet", estado=estado,
+            hora_inicio=timezone.now() - timedelta(minutes=minutos),
+        )
+
+    def _finalizar(self, origen, minutos, tipo="ultima_milla"):
+        rental = self._viaje(origen, minutos, tipo)
+        TripEndService.end_trip(usuario=self.usuario, rental_id=rental.id, estacion_destino_id=self.norte.id)
+        return rental
+
+    def test_fin_y_cancelacion_actualizan_el_resumen(self):
+        self._finalizar(self.centro, 10)
+        self._finalizar(self.norte, 20, tipo="recorrido_largo")
+        self._finalizar(self.norte, 30)
+        reserva = self._viaje(self.centro, 0, estado="reservado")
+        CancellationService.cancel_reservation(self.usuario, reserva.id)
+
+        stats = EstadisticasUsuario.objects.get(usuario=self.usuario)
+        esperado = UserStatsService.obtener(self.usuario)
+        self.assertEqual(stats.pk, esperado.pk)
+        self.assertEqual((stats.viajes_finalizados, stats.viajes_cancelados), (3, 1))
+        self.assertEqual((stats.viajes_ultima_milla, stats.viajes_recorrido_largo), (2, 1))
+        self.assertAlmostEqual(stats.minutos_totales, 60, delta=0.5)
+        self.assertEqual(stats.estacion_favorita, self.norte)
+        self.assertEqual(UserStatsService.viajes_del_mes(stats), 3)
+        self.assertEqual(stats.gasto_total, sum(Rental.objects.filter(estado="finalizado")
+                                                .values_list("costo_total", flat=True)))
+
+        # Lo incremental coincide con reconstruir desde el historial
+        UserStatsService.reconstruir([self.usuario.pk])
+        reconstruido = EstadisticasUsuario.objects.get(usuario=self.usuario)
+        for campo in ("viajes_finalizados", "viajes_cancelados", "viajes_ultima_milla", "viajes_recorrido_largo",
+                      "gasto_total", "viajes_mes", "estacion_favorita_id", "estacion_favorita_viajes"):
+            self.assertEqual(getattr(reconstruido, campo), getattr(stats, campo), campo)
+        self.assertAlmostEqual(reconstruido.minutos_totales, stats.minutos_totales, places=1)
+
+    def test_vistas_leen_una_fila(self):
+        self._finalizar(self.centro, 15)
+        UserStatsService.obtener(self.usuario)
+
+        with self.assertNumQueries(1):
+            stats = UserStatsService.obtener(self.usuario)
+        self.assertEqual(stats.nivel, "Principiante")
+
+        dashboard = UserInfoService.obtener_dashboard(self.usuario)
+        self.assertEqual((dashboard["viajes_mes"], dashboard["nivel"]), (1, "Principiante"))
+        self.assertEqual(dashboard["tiempo_total"], "0h 15min")
+
+        reporte = ReportService.reporte_por_usuario(self.usuario.pk)
+        self.assertEqual(reporte["total_viajes"], 1)
+        self.assertAlmostEqual(reporte["promedio_duracion"], 15, delta=0.2)
+
+    def test_contador_por_estacion_creado_a_la_vez(self):
+        """Si otro viaje crea el contador de la estación entre el UPDATE y el INSERT, se suma igual."""
+        self._finalizar(self.centro, 10)
+        filtrar = ViajesUsuarioEstacion.objects.filter
+
+        def filtrar_con_carrera(**kwargs):
+            contador = filtrar(**kwargs)
+            actualizar = contador.update
+
+            def actualizar_y_crear_en_paralelo(**cambios):
+                # Otro viaje del mismo usuario inserta la fila justo después de este UPDATE
+                filas = actualizar(**cambios)
+                ViajesUsuarioEstacion.objects.bulk_create([ViajesUsuarioEstacion(viajes=1, **kwargs)])
+                contador.update = actualizar
+                return filas
+
+            contador.update = actualizar_y_crear_en_paralelo
+            return contador
+
+        with patch.object(ViajesUsuarioEstacion.objects, "filter", side_effect=filtrar_con_carrera):
+            rental = self._finalizar(self.norte, 20)
+
+        rental.refresh_from_db()
+        self.assertEqual(rental.estado, "finalizado")
+        contador = ViajesUsuarioEstacion.objects.get(usuario=self.usuario, estacion=self.norte)
+        self.assertEqual(contador.viajes, 2)
+
+    def test_minutos_totales_se_redondean(self):
+        """74.99999 min (error de punto flotante de la BD) se muestran como 75, no 74."""
+        self._finalizar(self.centro, 15)
+        EstadisticasUsuario.objects.filter(usuario=self.usuario).update(minutos_totales=74.99999)
+
+        self.assertEqual(UserInfoService.obtener_dashboard(self.usuario)["tiempo_total"], "1h 15min")
+        self.client.force_login(self.usuario)
+        datos = self.client.get("/alquileres/api/rentals/estadisticas/").json()
+        self.assertEqual((datos["tiempo_total_minutos"], datos["tiempo_total"]), (75, "1h 15min"))
+
+    def test_mes_anterior_no_cuenta(self):
+        self._finalizar(self.centro, 5)
+        EstadisticasUsuario.objects.filter(usuario=self.usuario).update(mes_actual="2000-01-01")
+        self.assertEqual(UserStatsService.viajes_del_mes(UserStatsService.obtener(self.usuario)), 0)
+
+        self._finalizar(self.centro, 5)
+        self.assertEqual(UserStatsService.viajes_del_mes(UserStatsService.obtener(self.usuario)), 1)
+
+    def test_comando_reconstruir(self):
+        self._viaje(self.centro, 40, estado="finalizado")
+        Rental.objects.update(hora_fin=timezone.now(), costo_total=Decimal("17500"))
+        otro = get_user_model().objects.create_user(email="otro@test.com", password="1", nombre="B", apellido="C")
+
+        salida = StringIO()
+        call_command("rebuild_user_stats", lote=1, stdout=salida)
+
+        self.assertIn("2 usuarios", salida.getvalue())
+        self.assertEqual(EstadisticasUsuario.objects.get(usuario=self.usuario).viajes_finalizados, 1)
+        self.assertEqual(EstadisticasUsuario.objects.get(usuario=otro).viajes_finalizados, 0)
@@ -1,14 +1,14 @@
 from django.shortcuts import render, get_object_or_404, redirect
 from django.views.generic import TemplateView
 from django.contrib import messages
+from django.core.exceptions import ValidationError
 from django.contrib.auth.decorators import login_required
-from django.db.models import Q, Sum, Count
+from django.db.models import Q
 from django.db import connection
 from django.views import View
 from django.utils.decorators import method_decorator
 from django.views.decorators.csrf import csrf_exempt
 from django.http import JsonResponse
-from django.utils import timezone
 import json
 from datetime import datetime
 
@@ -23,6 +23,8 @@ from .services.reservation_service import ReservationService
 from .services.cancellation_service import CancellationService
 from .services.trip_start_service import TripStartService
 from .services.trip_end_service import TripEndService
+from .services.trip_history_service import TripHistoryService
+from .services.user_stats_service import UserStatsService
 
 
 # ---------------------------------------------------------------
@@ -230,113 +232,55 @@ class RentalViewSet(viewsets.ModelViewSet):
     def historial(self, request):
         """
         API para obtener el historial de viajes del usuario con filtros opcionales.
+        Paginación por cursor: cada página devuelve `siguiente_cursor`, que se
+        envía como `cursor` para pedir la siguiente (null = no hay más).
         
         Parámetros de query:
         - estado: filtrar por estado (finalizado, activo, cancelado)
         - tipo_viaje: filtrar por tipo (ultima_milla, recorrido_largo)
         - fecha: filtrar por fecha específica (formato: YYYY-MM-DD)
-        - page: número de página (default: 1)
-        - per_page: viajes por página (default: 10)
+        - cursor: posición devuelta por la página anterior
+        - per_page: viajes por página (default: 10, máximo: 100)
+        - total: "1" para incluir el total de registros (un COUNT adicional)
+        Las estadísticas se consultan en /historial/estadisticas/.
         """
         try:
-            usuario = request.user
-            
-            # Obtener parámetros de filtro
-            estado = request.GET.get('estado', None)
-            tipo_viaje = request.GET.get('tipo_viaje', None)
             fecha = request.GET.get('fecha', None)
-            page = int(request.GET.get('page', 1))
-            per_page = int(request.GET.get('per_page', 100))
-            
-            # Query base - TODOS los viajes del usuario
-            queryset = Rental.objects.filter(
-                usuario=usuario
-            ).select_related(
-                'estacion_origen',
-                'estacion_destino',
-                'bike'
-            ).order_by('-creado_en')
-            
-            print(f"📊 Total de viajes del usuario {usuario.email}: {queryset.count()}")
-            
-            # Aplicar filtros solo si se especifican
-            if estado:
-                queryset = queryset.filter(estado=estado)
-                print(f"🔍 Filtrado por estado '{estado}': {queryset.count()} viajes")
-            
-            if tipo_viaje:
-                queryset = queryset.filter(tipo_viaje=tipo_viaje)
-                print(f"🔍 Filtrado por tipo '{tipo_viaje}': {queryset.count()} viajes")
-            
+            fecha_obj = None
             if fecha:
                 try:
                     fecha_obj = datetime.strptime(fecha, '%Y-%m-%d').date()
-                    queryset = queryset.filter(creado_en__date=fecha_obj)
-                    print(f"🔍 Filtrado por fecha '{fecha}': {queryset.count()} viajes")
                 except ValueError:
                     print(f"⚠️ Fecha inválida: {fecha}")
-                    pass
-            
-            # Contar total de registros
-            total_viajes = queryset.count()
-            
-            # Calcular estadísticas solo de finalizados
-            stats = Rental.objects.filter(
-                usuario=usuario,
-                estado='finalizado'
-            ).aggregate(
-                total_gastado=Sum('costo_total'),
-                total_viajes_finalizados=Count('id')
+
+            try:
+                per_page = int(request.GET.get('per_page', TripHistoryService.POR_PAGINA))
+            except ValueError:
+                per_page = TripHistoryService.POR_PAGINA
+
+            pagina = TripHistoryService.pagina(
+                request.user,
+                cursor=request.GET.get('cursor') or None,
+                por_pagina=per_page,
+                con_total=request.GET.get('total') in ('1', 'true'),
+                estado=request.GET.get('estado') or None,
+                tipo_viaje=request.GET.get('tipo_viaje') or None,
+                fecha=fecha_obj,
             )
-            
-            # Paginación
-            start = (page - 1) * per_page
-            end = start + per_page
-            viajes_pagina = queryset[start:end]
-            
-            # Serializar datos
-            viajes_data = []
-            for viaje in viajes_pagina:
-                # Calcular duración si está finalizado
-                duracion_minutos = None
-                if viaje.hora_fin and viaje.hora_inicio:
-                    duracion = (viaje.hora_fin - viaje.hora_inicio).total_seconds() / 60
-                    duracion_minutos = round(duracion, 1)
-                
-                viaje_dict = {
-                    'id': viaje.id,
-                    'estado': viaje.estado,
-                    'tipo_viaje': viaje.tipo_viaje,
-                    'estacion_origen': viaje.estacion_origen.nombre if viaje.estacion_origen else 'N/A',
-                    'estacion_destino': viaje.estacion_destino.nombre if viaje.estacion_destino else 'N/A',
-                    'bike_serial_reservada': viaje.bike_serial_reservada or (viaje.bike.numero_serie if viaje.bike else 'N/A'),
-                    'metodo_pago': viaje.metodo_pago or 'N/A',
-                    'costo_total': float(viaje.costo_total) if viaje.costo_total else 0,
-                    'duracion_minutos': duracion_minutos or 0,
-                    'hora_inicio': viaje.hora_inicio.isoformat() if viaje.hora_inicio else viaje.creado_en.isoformat(),
-                    'hora_fin': viaje.hora_fin.isoformat() if viaje.hora_fin else None,
-                }
-                viajes_data.append(viaje_dict)
-            
-            print(f"✅ Enviando {len(viajes_data)} viajes al frontend")
-            
-            # Preparar respuesta
-            response_data = {
-                'viajes': viajes_data,
-                'estadisticas': {
-                    'total_viajes': stats['total_viajes_finalizados'] or 0,
-                    'total_gastado': float(stats['total_gastado']) if stats['total_gastado'] else 0,
-                },
-                'paginacion': {
-                    'pagina_actual': page,
-                    'total_paginas': max(1, (total_viajes + per_page - 1) // per_page),
-                    'total_registros': total_viajes,
-                    'por_pagina': per_page,
-                }
+            viajes_data = [TripHistoryService.serializar(viaje) for viaje in pagina['viajes']]
+
+            paginacion = {
+                'por_pagina': min(max(1, per_page), TripHistoryService.MAX_POR_PAGINA),
+                'siguiente_cursor': pagina['siguiente_cursor'],
+                'hay_mas': pagina['siguiente_cursor'] is not None,
             }
-            
-            return Response(response_data, status=status.HTTP_200_OK)
-            
+            if pagina['total'] is not None:
+                paginacion['total_registros'] = pagina['total']
+
+            return Response({'viajes': viajes_data, 'paginacion': paginacion}, status=status.HTTP_200_OK)
+
+        except ValidationError as e:
+            return Response({'error': e.messages[0]}, status=status.HTTP_400_BAD_REQUEST)
         except Exception as e:
             print(f"❌ Error en historial: {e}")
             import traceback
@@ -346,6 +290,11 @@ class RentalViewSet(viewsets.ModelViewSet):
                 status=status.HTTP_500_INTERNAL_SERVER_ERROR
             )
 
+    @action(detail=False, methods=["get"], url_path="historial/estadisticas")
+    def historial_estadisticas(self, request):
+        """Totales de viajes finalizados del historial (separados de la paginación)."""
+        return Response(TripHistoryService.estadisticas(request.user), status=status.HTTP_200_OK)
+
     # ----------------------------
     # Estadísticas del usuario
     # ----------------------------
@@ -353,53 +302,22 @@ class RentalViewSet(viewsets.ModelViewSet):
     def estadisticas(self, request):
         """
         Devuelve estadísticas del usuario: viajes del mes, tiempo total, etc.
+        Se leen del resumen EstadisticasUsuario (una fila).
         """
-        usuario = request.user
-        ahora = timezone.now()
-        inicio_mes = ahora.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
-        
-        # Viajes finalizados del usuario
-        viajes_finalizados = Rental.objects.filter(
-            usuario=usuario,
-            estado="finalizado"
-        )
-        
-        # Viajes este mes
-        viajes_mes = viajes_finalizados.filter(
-            hora_fin__gte=inicio_mes
-        ).count()
-        
-        # Tiempo total (calcular desde hora_inicio y hora_fin)
-        tiempo_total_minutos = 0
-        for viaje in viajes_finalizados:
-            if viaje.hora_inicio and viaje.hora_fin:
-                duracion = (viaje.hora_fin - viaje.hora_inicio).total_seconds() / 60
-                tiempo_total_minutos += duracion
+        stats = UserStatsService.obtener(request.user)
+        tiempo_total_minutos = UserStatsService.minutos_totales(stats)
         
         # Convertir minutos a horas y minutos
-        horas = int(tiempo_total_minutos // 60)
-        minutos = int(tiempo_total_minutos % 60)
+        horas = tiempo_total_minutos // 60
+        minutos = tiempo_total_minutos % 60
         tiempo_total_texto = f"{horas}h {minutos}min"
         
-        # Determinar nivel según cantidad de viajes
-        total_viajes = viajes_finalizados.count()
-        if total_viajes == 0:
-            nivel = "Nuevo"
-        elif total_viajes < 5:
-            nivel = "Principiante"
-        elif total_viajes < 20:
-            nivel = "Intermedio"
-        elif total_viajes < 50:
-            nivel = "Avanzado"
-        else:
-            nivel = "Experto"
-        
         return Response({
-            "viajes_mes": viajes_mes,
+            "viajes_mes": UserStatsService.viajes_del_mes(stats),
             "tiempo_total": tiempo_total_texto,
             "tiempo_total_minutos": int(tiempo_total_minutos),
-            "nivel": nivel,
-            "total_viajes": total_viajes,
+            "nivel": stats.nivel,
+            "total_viajes": stats.viajes_finalizados,
         }, status=status.HTTP_200_OK)
 
     # ----------------------------
@@ -411,49 +329,24 @@ class RentalViewSet(viewsets.ModelViewSet):
         API para obtener estadísticas detalladas del usuario.
         """
         try:
-            usuario = request.user
+            stats = UserStatsService.obtener(request.user)
             
-            # Estadísticas generales
-            viajes_finalizados = Rental.objects.filter(
-                usuario=usuario,
-                estado='finalizado'
-            )
-            
-            total_viajes = viajes_finalizados.count()
-            total_gastado = viajes_finalizados.aggregate(
-                total=Sum('costo_total')
-            )['total'] or 0
-            
-            # Viajes por tipo
-            viajes_por_tipo = viajes_finalizados.values('tipo_viaje').annotate(
-                cantidad=Count('id')
-            )
-            
-            # Estación más utilizada como origen
-            estacion_favorita = viajes_finalizados.values(
-                'estacion_origen__nombre'
-            ).annotate(
-                cantidad=Count('id')
-            ).order_by('-cantidad').first()
-            
-            # Duración promedio
-            duraciones = []
-            for viaje in viajes_finalizados:
-                if viaje.hora_fin and viaje.hora_inicio:
-                    duracion = (viaje.hora_fin - viaje.hora_inicio).total_seconds() / 60
-                    duraciones.append(duracion)
-            
-            duracion_promedio = sum(duraciones) / len(duraciones) if duraciones else 0
+            # Viajes por tipo (solo los tipos con viajes, como antes)
+            viajes_por_tipo = {
+                tipo: cantidad
+                for tipo, cantidad in (
+                    ('ultima_milla', stats.viajes_ultima_milla),
+                    ('recorrido_largo', stats.viajes_recorrido_largo),
+                )
+                if cantidad
+            }
             
             response_data = {
-                'total_viajes': total_viajes,
-                'total_gastado': float(total_gastado),
-                'viajes_por_tipo': {
-                    item['tipo_viaje']: item['cantidad'] 
-                    for item in viajes_por_tipo
-                },
-                'estacion_favorita': estacion_favorita['estacion_origen__nombre'] if estacion_favorita else None,
-                'duracion_promedio_minutos': round(duracion_promedio, 1),
+                'total_viajes': stats.viajes_finalizados,
+                'total_gastado': float(stats.gasto_total),
+                'viajes_por_tipo': viajes_por_tipo,
+                'estacion_favorita': stats.estacion_favorita.nombre if stats.estacion_favorita else None,
+                'duracion_promedio_minutos': round(UserStatsService.duracion_promedio(stats), 1),
             }
             
             return Response(response_data, status=status.HTTP_200_OK)
@@ -4,3 +4,6 @@ class StationsConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'apps.stations'  # 👈 Debe coincidir con la ruta de la carpeta
     verbose_name = 'Gestión de Estaciones'
+
+    def ready(self):
+        from apps.stations import signals  # noqa: F401  (contadores de disponibilidad)
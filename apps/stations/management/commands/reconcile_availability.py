@@ -0,0 +1,31 @@
+from django.core.management.base import BaseCommand
+
+from apps.stations.services.availability_service import AvailabilityService
+
+
+class Command(BaseCommand):
+    help = "Recalcula los contadores de disponibilidad de las estaciones a partir de las bicicletas"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--station', type=int, action='append', dest='stations',
+                            help='ID de estación a revisar (se puede repetir). Por defecto todas.')
+        parser.add_argument('--dry-run', action='store_true', help='Solo muestra las diferencias')
+
+    def handle(self, *args, **options):
+        aplicar = not options['dry_run']
+        correcciones = AvailabilityService.reconciliar(options['stations'], aplicar=aplicar)
+
+        if not correcciones:
+            self.stdout.write(self.style.SUCCESS("✅ Los contadores de disponibilidad están al día."))
+            return
+
+        for estacion, antes, despues in correcciones:
+            self.stdout.write(
+                f"🔧 {estacion.nombre}: eléctricas {antes[0]}→{despues[0]}, "
+                f"mecánicas {antes[1]}→{despues[1]}, total {antes[2]}→{despues[2]}"
+            )
+
+        if aplicar:
+            self.stdout.write(self.style.SUCCESS(f"✅ {len(correcciones)} estaciones corregidas."))
+        else:
+            self.stdout.write(self.style.WARNING(f"🧪 Simulación: {len(correcciones)} estaciones con diferencias."))
@@ -0,0 +1,57 @@
+# Generated by Django 5.2.7 on 2026-10-17 20:03
+
+from django.db import migrations, models
+from django.db.models import Count
+
+
+def poblar_contadores(apps, schema_editor):
+    """Calcula los contadores iniciales a partir de las bicicletas existentes."""
+    Bike = apps.get_model('bikes', 'Bike')
+    Station = apps.get_model('stations', 'Station')
+
+    conteos = {}
+    filas = (
+        Bike.objects.filter(estado='available', station__isnull=False)
+        .values('station_id', 'tipo').annotate(n=Count('id')).order_by()
+    )
+    for fila in filas:
+        electricas, mecanicas = conteos.get(fila['station_id'], (0, 0))
+        if fila['tipo'] == 'electric':
+            electricas += fila['n']
+        elif fila['tipo'] == 'manual':
+            mecanicas += fila['n']
+        conteos[fila['station_id']] = (electricas, mecanicas)
+
+    for station_id, (electricas, mecanicas) in conteos.items():
+        Station.objects.filter(pk=station_id).update(
+            disponibles_electricas=electricas,
+            disponibles_mecanicas=mecanicas,
+            total_disponibles=electricas + mecanicas,
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('stations', '0001_initial'),
+        ('bikes', '0003_bike_bateria_porcentaje_alter_bike_estado'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='station',
+            name='disponibles_electricas',
+            field=models.IntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='station',
+            name='disponibles_mecanicas',
+            field=models.IntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='station',
+            name='total_disponibles',
+            field=models.IntegerField(db_index=True, default=0, editable=False),
+        ),
+        migrations.RunPython(poblar_contadores, migrations.RunPython.noop),
+    ]
@@ -10,21 +10,27 @@ class Station(models.Model):
     capacidad_electricas = models.PositiveIntegerField(default=10)
     capacidad_mecanicas = models.PositiveIntegerField(default=10)
 
-    def __str__(self):
-        return self.nombre
+    # Disponibilidad desnormalizada (bicicletas en estado 'available' por tipo).
+    # La mantienen las señales de apps/stations/signals.py con incrementos F();
+    # `python manage.py reconcile_availability` la recalcula desde Bike.
+    disponibles_electricas = models.IntegerField(default=0, editable=False)
+    disponibles_mecanicas = models.IntegerField(default=0, editable=False)
+    total_disponibles = models.IntegerField(default=0, editable=False, db_index=True)
 
-    # Propiedades útiles para el sistema
-    @property
-    def disponibles_electricas(self):
-        """Cantidad de bicicletas eléctricas disponibles en esta estación"""
-        return self.bikes.filter(tipo='electric', estado='available').count()
+    CAMPOS_DISPONIBILIDAD = ("disponibles_electricas", "disponibles_mecanicas", "total_disponibles")
 
-    @property
-    def disponibles_mecanicas(self):
-        """Cantidad de bicicletas mecánicas disponibles en esta estación"""
-        return self.bikes.filter(tipo='manual', estado='available').count()
+    def __str__(self):
+        return self.nombre
 
-    @property
-    def total_disponibles(self):
-        """Total de bicicletas disponibles (sumando ambos tipos)"""
-        return self.disponibles_electricas + self.disponibles_mecanicas
+    def save(self, *args, **kwargs):
+        """
+        Al editar una estación (API, admin) no se reescriben los contadores: el valor
+        en memoria puede ser viejo y pisaría los incrementos F() aplicados entretanto.
+        Solo se guardan si `update_fields` los nombra (o al crear la estación).
+        """
+        if not self._state.adding and kwargs.get("update_fields") is None and not kwargs.get("force_insert"):
+            kwargs["update_fields"] = [
+                campo.attname for campo in self._meta.concrete_fields
+                if not campo.primary_key and campo.name not in self.CAMPOS_DISPONIBILIDAD
+            ]
+        super().save(*args, **kwargs)
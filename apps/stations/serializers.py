@@ -1,5 +1,6 @@
 from rest_framework import serializers
 from .models import Station
+from .services.availability_service import AvailabilityService
 
 class StationSerializer(serializers.ModelSerializer):
     class Meta:
@@ -16,3 +17,11 @@ class StationSerializer(serializers.ModelSerializer):
             'disponibles_mecanicas',
             'total_disponibles',
         ]
+
+    def to_representation(self, instance):
+        data = super().to_representation(instance)
+        # Si la vista pidió conteo exacto (?exacto=1), las anotaciones reemplazan a los contadores
+        for campo, anotacion in AvailabilityService.ANOTACIONES_EXACTAS.items():
+            if hasattr(instance, anotacion):
+                data[campo] = getattr(instance, anotacion)
+        return data
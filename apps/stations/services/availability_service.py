@@ -0,0 +1,110 @@
+from django.db import transaction
+from django.db.models import Count, F, Q
+
+from apps.bikes.models import Bike
+from apps.core.services.cache_service import cache_datos
+from apps.stations.models import Station
+from apps.stations.services.station_cache_service import StationCacheService
+
+
+class AvailabilityService:
+    """
+    Contadores de disponibilidad por estación (Station.disponibles_*).
+
+    - `aplicar_cambio`: ajusta los contadores con UPDATE ... SET x = x ± 1,
+      dentro de la transacción de quien guardó la bicicleta.
+    - `reconciliar`: recalcula todo desde Bike con una sola agregación y
+      corrige solo las estaciones desviadas.
+    """
+
+    CAMPO_POR_TIPO = {
+        "electric": "disponibles_electricas",
+        "manual": "disponibles_mecanicas",
+    }
+
+    # Columna desnormalizada → anotación exacta (nombres distintos: no se puede anotar sobre un campo)
+    ANOTACIONES_EXACTAS = {
+        "disponibles_electricas": "elec_exactas",
+        "disponibles_mecanicas": "mec_exactas",
+        "total_disponibles": "total_exacto",
+    }
+
+    @staticmethod
+    def anotar_exacto(queryset):
+        """
+        Agrega a un queryset de Station la disponibilidad contada en la misma consulta
+        (un LEFT JOIN a bikes con COUNT condicional), para lecturas que deben ser exactas.
+        """
+        disponible = Q(bikes__estado="available")
+        return queryset.annotate(
+            elec_exactas=Count("bikes", filter=disponible & Q(bikes__tipo="electric")),
+            mec_exactas=Count("bikes", filter=disponible & Q(bikes__tipo="manual")),
+        ).annotate(total_exacto=F("elec_exactas") + F("mec_exactas"))
+
+    @staticmethod
+    def aplicar_cambio(anterior, nuevo):
+        """
+        Recibe los aportes (station_id, tipo) o None antes y después de guardar
+        una bicicleta, y mueve la unidad de disponibilidad correspondiente.
+        """
+        if anterior == nuevo:
+            return
+        if anterior:
+            AvailabilityService._sumar(*anterior, delta=-1)
+        if nuevo:
+            AvailabilityService._sumar(*nuevo, delta=1)
+
+    @staticmethod
+    def _sumar(station_id, tipo, delta):
+        campo = AvailabilityService.CAMPO_POR_TIPO[tipo]
+        Station.objects.filter(pk=station_id).update(**{
+            campo: F(campo) + delta,
+            "total_disponibles": F("total_disponibles") + delta,
+        })
+
+    @staticmethod
+    def conteos_reales(station_ids=None):
+        """{station_id: (electricas, mecanicas)} contado directamente sobre Bike."""
+        bicicletas = Bike.objects.filter(estado="available", station__isnull=False)
+        if station_ids is not None:
+            bicicletas = bicicletas.filter(station_id__in=station_ids)
+
+        conteos = {}
+        for fila in bicicletas.values("station_id", "tipo").annotate(n=Count("id")).order_by():
+            electricas, mecanicas = conteos.get(fila["station_id"], (0, 0))
+            if fila["tipo"] == "electric":
+                electricas += fila["n"]
+            elif fila["tipo"] == "manual":
+                mecanicas += fila["n"]
+            conteos[fila["station_id"]] = (electricas, mecanicas)
+        return conteos
+
+    @staticmethod
+    def reconciliar(station_ids=None, aplicar=True):
+        """
+        Compara los contadores guardados con los reales.
+        Retorna la lista de correcciones [(estacion, (antes), (despues))].
+        """
+        conteos = AvailabilityService.conteos_reales(station_ids)
+        estaciones = Station.objects.order_by("id")
+        if station_ids is not None:
+            estaciones = estaciones.filter(id__in=station_ids)
+
+        correcciones = []
+        for estacion in estaciones.only("id", "nombre", "disponibles_electricas", "disponibles_mecanicas", "total_disponibles"):
+            electricas, mecanicas = conteos.get(estacion.id, (0, 0))
+            antes = (estacion.disponibles_electricas, estacion.disponibles_mecanicas, estacion.total_disponibles)
+            despues = (electricas, mecanicas, electricas + mecanicas)
+            if antes == despues:
+                continue
+            correcciones.append((estacion, antes, despues))
+            if aplicar:
+                Station.objects.filter(pk=estacion.pk).update(
+                    disponibles_electricas=electricas,
+                    disponibles_mecanicas=mecanicas,
+                    total_disponibles=electricas + mecanicas,
+                )
+        if aplicar and correcciones:
+            # update() no emite señales: el listado en caché se invalida aquí
+            transaction.on_commit(lambda: cache_datos.invalidar(StationCacheService.ESPACIO))
+        return correcciones
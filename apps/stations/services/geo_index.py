@@ -0,0 +1,149 @@
+import heapq
+import math
+import threading
+import time
+
+from django.conf import settings
+
+from apps.stations.models import Station
+from apps.stations.services.station_cache_service import StationCacheService
+
+
+RADIO_TIERRA_KM = 6371.0088
+KM_POR_GRADO_LAT = 111.32
+
+
+def haversine_km(lat1, lon1, lat2, lon2):
+    """Distancia en km sobre la esfera entre dos coordenadas en grados."""
+    lat1, lon1, lat2, lon2 = map(math.radians, (lat1, lon1, lat2, lon2))
+    a = math.sin((lat2 - lat1) / 2) ** 2 + math.cos(lat1) * math.cos(lat2) * math.sin((lon2 - lon1) / 2) ** 2
+    return 2 * RADIO_TIERRA_KM * math.asin(math.sqrt(a))
+
+
+class StationGeoIndex:
+    """
+    Índice espacial en memoria (rejilla regular) sobre las coordenadas de las estaciones.
+
+    Las estaciones se agrupan en celdas de ~`celda_km` de lado. Una búsqueda
+    recorre anillos de celdas alrededor del punto, así que solo mide distancias
+    a las estaciones cercanas y no recorre la tabla. No requiere extensiones
+    espaciales de MySQL.
+
+    El índice se construye perezosamente, se invalida con las señales de Station
+    y además caduca tras `ttl` segundos (para cambios hechos por otros procesos).
+    """
+
+    def __init__(self, celda_km=None, ttl=None):
+        self.celda_km = celda_km or getattr(settings, "STATIONS_GEO_CELL_KM", 0.5)
+        self.ttl = ttl if ttl is not None else getattr(settings, "STATIONS_GEO_INDEX_TTL", 300)
+        self._lock = threading.Lock()
+        self._datos = None  # (celdas, puntos, tam_lat, tam_lon, construido_en)
+
+    # ============================================================
+    # 🏗️ Construcción e invalidación
+    # ============================================================
+    def invalidar(self):
+        with self._lock:
+            self._datos = None
+
+    def _obtener(self):
+        with self._lock:
+            datos = self._datos
+            if datos is None or (self.ttl and time.monotonic() - datos[-1] > self.ttl):
+                datos = self._datos = self._construir()
+            return datos
+
+    def _construir(self):
+        # Coordenadas compartidas por todos los procesos vía la caché de datos
+        puntos = StationCacheService.coordenadas()
+        # El ancho en grados de longitud se calcula en la latitud más alejada del ecuador,
+        # así ninguna celda de la red mide menos de `celda_km` en ese eje
+        lat_extrema = max((abs(lat) for lat, _ in puntos.values()), default=0.0)
+        tam_lat = self.celda_km / KM_POR_GRADO_LAT
+        tam_lon = self.celda_km / (KM_POR_GRADO_LAT * max(math.cos(math.radians(lat_extrema)), 0.01))
+
+        celdas = {}
+        for pk, (lat, lon) in puntos.items():
+            celdas.setdefault((math.floor(lat / tam_lat), math.floor(lon / tam_lon)), []).append(pk)
+        return celdas, puntos, tam_lat, tam_lon, time.monotonic()
+
+    # ============================================================
+    # 🔎 Consultas
+    # ============================================================
+    def cercanas(self, lat, lon, radio_km=None):
+        """
+        Genera (distancia_km, station_id) en orden de distancia creciente,
+        opcionalmente limitado a `radio_km`. Es perezoso: quien consume puede
+        detenerse al tener suficientes resultados.
+        """
+        celdas, puntos, tam_lat, tam_lon, _ = self._obtener()
+        if not puntos:
+            return
+
+        ci, cj = math.floor(lat / tam_lat), math.floor(lon / tam_lon)
+        # Anillos necesarios: hasta la celda ocupada más lejana, o hasta cubrir el radio
+        anillo_max = max(max(abs(ci - i), abs(cj - j)) for i, j in celdas)
+        if radio_km is not None:
+            anillo_max = min(anillo_max, math.ceil(radio_km / self.celda_km) + 1)
+
+        pendientes = []
+        for anillo in range(anillo_max + 1):
+            for celda in self._celdas_del_anillo(ci, cj, anillo):
+                for pk in celdas.get(celda, ()):
+                    distancia = haversine_km(lat, lon, *puntos[pk])
+                    if radio_km is None or distancia <= radio_km:
+                        heapq.heappush(pendientes, (distancia, pk))
+            # Nada fuera de los anillos recorridos está a menos de anillo * celda_km
+            cota = anillo * self.celda_km
+            while pendientes and pendientes[0][0] <= cota:
+                yield heapq.heappop(pendientes)
+        while pendientes:
+            yield heapq.heappop(pendientes)
+
+    @staticmethod
+    def _celdas_del_anillo(ci, cj, anillo):
+        if anillo == 0:
+            yield (ci, cj)
+            return
+        for dj in range(-anillo, anillo + 1):
+            yield (ci - anillo, cj + dj)
+            yield (ci + anillo, cj + dj)
+        for di in range(-anillo + 1, anillo):
+            yield (ci + di, cj - anillo)
+            yield (ci + di, cj + anillo)
+
+
+indice = StationGeoIndex()
+
+
+class GeoSearchService:
+    """Búsqueda de estaciones cercanas con disponibilidad, sobre StationGeoIndex."""
+
+    FILTROS_TIPO = {
+        None: "total_disponibles__gt",
+        "electric": "disponibles_electricas__gt",
+        "manual": "disponibles_mecanicas__gt",
+    }
+
+    @staticmethod
+    def buscar(lat, lon, k=5, radio_km=None, tipo=None, solo_disponibles=True):
+        """
+        Retorna hasta `k` pares (Station, distancia_km) ordenados por distancia.
+        Con `solo_disponibles`, descarta estaciones sin bicicletas disponibles
+        (del `tipo` pedido) leyendo los contadores por lotes de candidatos.
+        """
+        if tipo not in GeoSearchService.FILTROS_TIPO:
+            raise ValueError("Tipo inválido. Use 'electric' o 'manual'.")
+
+        candidatos = indice.cercanas(lat, lon, radio_km)
+        resultados = []
+        while len(resultados) < k:
+            lote = [c for _, c in zip(range(max(k * 2, 10)), candidatos)]
+            if not lote:
+                break
+            estaciones = Station.objects.filter(pk__in=[pk for _, pk in lote])
+            if solo_disponibles:
+                estaciones = estaciones.filter(**{GeoSearchService.FILTROS_TIPO[tipo]: 0})
+            por_id = estaciones.in_bulk()
+            resultados.extend((por_id[pk], distancia) for distancia, pk in lote if pk in por_id)
+        return resultados[:k]
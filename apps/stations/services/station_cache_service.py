@@ -0,0 +1,56 @@
+from django.conf import settings
+
+from apps.core.services.cache_service import cache_datos
+from apps.stations.models import Station
+
+
+class StationCacheService:
+    """
+    Datos de estaciones servidos desde la caché (ver CacheService).
+
+    - "estaciones": listado serializado de /estaciones/stations/ (incluye los
+      contadores de disponibilidad, así que se invalida con cambios de Station,
+      Bike y Rental; la reserva mueve los contadores con UPDATE y la cubre el
+      save() del Rental que la acompaña).
+    - "estaciones_geo": coordenadas para el índice geográfico; solo cambian
+      cuando cambia una Station.
+    Los espacios se registran en apps/stations/signals.py.
+    """
+
+    ESPACIO = "estaciones"
+    ESPACIO_GEO = "estaciones_geo"
+
+    @staticmethod
+    def ttl():
+        return getattr(settings, "CACHE_ESTACIONES_TTL", 60)
+
+    @staticmethod
+    def ttl_geo():
+        return getattr(settings, "CACHE_ESTACIONES_GEO_TTL", 3600)
+
+    @staticmethod
+    def listado():
+        """Lista de dicts con el formato de StationSerializer, ordenada por nombre."""
+        return cache_datos.obtener(StationCacheService.ESPACIO, "listado", StationCacheService._listado, tipo=list)
+
+    @staticmethod
+    def _listado():
+        # Import diferido: el serializer importa AvailabilityService, que invalida este espacio
+        from apps.stations.serializers import StationSerializer
+
+        return [dict(fila) for fila in StationSerializer(Station.objects.order_by("nombre"), many=True).data]
+
+    @staticmethod
+    def coordenadas():
+        """{station_id: (lat, lon)} de las estaciones con ubicación."""
+        return cache_datos.obtener(
+            StationCacheService.ESPACIO_GEO, "coordenadas", StationCacheService._coordenadas, tipo=dict
+        )
+
+    @staticmethod
+    def _coordenadas():
+        return {
+            pk: (float(lat), float(lon))
+            for pk, lat, lon in Station.objects.filter(latitud__isnull=False, longitud__isnull=False)
+            .values_list("id", "latitud", "longitud")
+        }
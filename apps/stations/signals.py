@@ -0,0 +1,76 @@
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save, pre_delete, pre_save
+from django.dispatch import receiver
+
+from apps.bikes.models import Bike
+from apps.core.services.cache_service import cache_datos
+from apps.rentals.models import Rental
+from apps.stations.models import Station
+from apps.stations.services.availability_service import AvailabilityService
+from apps.stations.services.geo_index import indice
+from apps.stations.services.station_cache_service import StationCacheService
+
+
+# ============================================================
+# 🗄️ Espacios de caché de estaciones
+# ============================================================
+# Se registran antes que los receptores de abajo: al confirmar, la versión de la
+# caché cambia antes de invalidar el índice geográfico.
+cache_datos.registrar(
+    StationCacheService.ESPACIO,
+    modelos=(Station, Bike, Rental),
+    ttl=StationCacheService.ttl(),
+    calentar=StationCacheService.listado,
+)
+cache_datos.registrar(
+    StationCacheService.ESPACIO_GEO,
+    modelos=(Station,),
+    ttl=StationCacheService.ttl_geo(),
+    calentar=StationCacheService.coordenadas,
+)
+
+
+# ============================================================
+# 🚲 Contadores de disponibilidad por estación
+# ============================================================
+@receiver(pre_save, sender=Bike)
+@receiver(pre_delete, sender=Bike)
+def leer_disponibilidad_diferida(sender, instance, **kwargs):
+    """Bicicleta cargada con only()/defer(): se lee su disponibilidad guardada antes de escribir."""
+    if instance._state.adding or getattr(instance, "_disponibilidad_original", None) is not Bike.DISPONIBILIDAD_SIN_LEER:
+        return
+    fila = Bike.objects.filter(pk=instance.pk).values(*Bike.CAMPOS_DISPONIBILIDAD).first()
+    instance._disponibilidad_original = Bike(**fila).aporte_disponibilidad() if fila else None
+
+
+@receiver(post_save, sender=Bike)
+def actualizar_disponibilidad(sender, instance, created, **kwargs):
+    """
+    Cualquier save() de Bike (reserva, inicio/fin de viaje, admin, seeds)
+    mueve el contador de la estación según cambie estado, tipo o estación.
+    """
+    anterior = None if created else getattr(instance, "_disponibilidad_original", None)
+    nuevo = instance.aporte_disponibilidad()
+    AvailabilityService.aplicar_cambio(anterior, nuevo)
+    instance._disponibilidad_original = nuevo
+
+
+@receiver(post_delete, sender=Bike)
+def liberar_disponibilidad(sender, instance, **kwargs):
+    AvailabilityService.aplicar_cambio(getattr(instance, "_disponibilidad_original", None), None)
+
+
+# ============================================================
+# 🗺️ Índice geográfico de estaciones
+# ============================================================
+@receiver(post_save, sender=Station)
+@receiver(post_delete, sender=Station)
+def invalidar_indice_geo(sender, **kwargs):
+    """
+    Crear, mover o borrar una estación reconstruye el índice en la próxima búsqueda.
+    Se invalida otra vez tras el commit, cuando ya cambió la versión de las
+    coordenadas en caché (una reconstrucción intermedia las leería viejas).
+    """
+    indice.invalidar()
+    transaction.on_commit(indice.invalidar)
+
@@ -0,0 +1,143 @@
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import TestCase
+from rest_framework.test import APIClient
+
+from apps.bikes.models import Bike
+from apps.stations.models import Station
+from apps.stations.services.availability_service import AvailabilityService
+
+
+class TestAvailabilityCounters(TestCase):
+    """Pruebas de los contadores desnormalizados de disponibilidad por estación."""
+
+    def setUp(self):
+        self.norte = Station.objects.create(nombre="Norte", direccion="Calle 1")
+        self.sur = Station.objects.create(nombre="Sur", direccion="Calle 2")
+
+    def _bike(self, serie, tipo="electric", estado="available", station=None):
+        return Bike.objects.create(numero_serie=serie, tipo=tipo, estado=estado, station=station or self.norte)
+
+    def _contadores(self, estacion):
+        estacion.refresh_from_db()
+        return (estacion.disponibles_electricas, estacion.disponibles_mecanicas, estacion.total_disponibles)
+
+    # ============================================================
+    # 📈 Mantenimiento por señales
+    # ============================================================
+    def test_crear_bicicletas_incrementa(self):
+        self._bike("E-1")
+        self._bike("M-1", tipo="manual")
+        self._bike("E-2", estado="maintenance")
+
+        self.assertEqual(self._contadores(self.norte), (1, 1, 2))
+
+    def test_cambio_de_estado_y_estacion(self):
+        """Reservar descuenta; devolver en otra estación suma allí."""
+        bike = self._bike("E-1")
+
+        bike = Bike.objects.get(pk=bike.pk)
+        bike.estado = "reserved"
+        bike.save(update_fields=["estado"])
+        self.assertEqual(self._contadores(self.norte), (0, 0, 0))
+
+        bike.estado = "available"
+        bike.station = self.sur
+        bike.save()
+        self.assertEqual(self._contadores(self.norte), (0, 0, 0))
+        self.assertEqual(self._contadores(self.sur), (1, 0, 1))
+
+    def test_guardar_sin_cambios_no_duplica(self):
+        bike = self._bike("E-1")
+        Bike.objects.get(pk=bike.pk).save()
+        bike.bateria_porcentaje = 50
+        bike.save()
+
+        self.assertEqual(self._contadores(self.norte), (1, 0, 1))
+
+    def test_borrar_bicicleta_descuenta(self):
+        bike = self._bike("M-1", tipo="manual")
+        Bike.objects.get(pk=bike.pk).delete()
+
+        self.assertEqual(self._contadores(self.norte), (0, 0, 0))
+
+    def test_bicicletas_cargadas_con_only_y_defer(self):
+        """Una carga diferida no recursa y sus cambios mueven igual los contadores."""
+        self._bike("E-1")
+        self._bike("M-1", tipo="manual")
+        self.assertEqual(len(list(Bike.objects.only("id", "numero_serie"))), 2)
+
+        bike = Bike.objects.only("id", "estado").get(numero_serie="E-1")
+        bike.estado = "maintenance"
+        bike.save()
+        self.assertEqual(self._contadores(self.norte), (0, 1, 1))
+
+        Bike.objects.defer("tipo").get(numero_serie="M-1").delete()
+        self.assertEqual(self._contadores(self.norte), (0, 0, 0))
+
+    def test_editar_estacion_no_pisa_contadores(self):
+        """Un save() completo con la instancia vieja (API, admin) conserva los incrementos F()."""
+        vieja = Station.objects.get(pk=self.norte.pk)
+        self._bike("E-1")
+
+        vieja.direccion = "Calle 10"
+        vieja.save()
+        response = APIClient().patch(f"/estaciones/stations/{self.norte.pk}/", {"nombre": "Norte 2"}, format="json")
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self._contadores(self.norte), (1, 0, 1))
+        self.assertEqual((self.norte.nombre, self.norte.direccion), ("Norte 2", "Calle 10"))
+
+    # ============================================================
+    # 🔧 Reconciliación
+    # ============================================================
+    def test_reconciliar_corrige_desvios(self):
+        self._bike("E-1")
+        Station.objects.filter(pk=self.norte.pk).update(disponibles_electricas=7, total_disponibles=7)
+        Station.objects.filter(pk=self.sur.pk).update(disponibles_mecanicas=2, total_disponibles=2)
+
+        out = StringIO()
+        call_command("reconcile_availability", stdout=out)
+
+        self.assertIn("2 estaciones corregidas", out.getvalue())
+        self.assertEqual(self._contadores(self.norte), (1, 0, 1))
+        self.assertEqual(self._contadores(self.sur), (0, 0, 0))
+        self.assertEqual(AvailabilityService.reconciliar(), [])
+
+    # ============================================================
+    # 🌐 API
+    # ============================================================
+    def test_min_disponibles_filtra_en_sql(self):
+        self._bike("E-1")
+        self._bike("E-2")
+        self._bike("E-3", station=self.sur)
+
+        with self.assertNumQueries(1):
+            response = APIClient().get("/estaciones/stations/", {"min_disponibles": 2})
+
+        self.assertEqual([e["nombre"] for e in response.json()], ["Norte"])
+        self.assertEqual(response.json()[0]["total_disponibles"], 2)
+
+    def test_modo_exacto_cuenta_en_una_consulta(self):
+        """Con ?exacto=1 la lista cuesta una consulta sin importar cuántas estaciones haya."""
+        for i in range(5):
+            estacion = Station.objects.create(nombre=f"Extra {i}", direccion="Calle")
+            self._bike(f"E-X{i}", station=estacion)
+        self._bike("E-1")
+        self._bike("M-1", tipo="manual")
+        # Contadores desviados a propósito: el modo exacto no los usa
+        Station.objects.filter(pk=self.norte.pk).update(total_disponibles=0)
+
+        with self.assertNumQueries(1):
+            response = APIClient().get(
+                "/estaciones/stations/", {"exacto": "1", "min_disponibles": 1, "ordering": "-total_disponibles"}
+            )
+
+        datos = response.json()
+        self.assertEqual(len(datos), 6)
+        self.assertEqual(datos[0]["nombre"], "Norte")
+        self.assertEqual(
+            (datos[0]["disponibles_electricas"], datos[0]["disponibles_mecanicas"], datos[0]["total_disponibles"]),
+            (1, 1, 2),
+        )
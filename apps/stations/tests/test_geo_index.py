@@ -0,0 +1,68 @@
+import random
+
+from django.test import TestCase
+from rest_framework.test import APIClient
+
+from apps.bikes.models import Bike
+from apps.stations.models import Station
+from apps.stations.services.geo_index import StationGeoIndex, haversine_km, indice
+
+
+class TestStationGeoIndex(TestCase):
+    """Pruebas de la búsqueda geográfica de estaciones (apps/stations/services/geo_index.py)."""
+
+    def setUp(self):
+        indice.invalidar()
+        # Tres estaciones en Bogotá a distancias conocidas del punto de consulta
+        self.centro = Station.objects.create(nombre="Centro", direccion="A", latitud=4.6100, longitud=-74.0800)
+        self.cerca = Station.objects.create(nombre="Cerca", direccion="B", latitud=4.6150, longitud=-74.0800)
+        self.lejos = Station.objects.create(nombre="Lejos", direccion="C", latitud=4.7000, longitud=-74.0500)
+        Station.objects.create(nombre="Sin coordenadas", direccion="D")
+
+    def test_knn_coincide_con_fuerza_bruta(self):
+        """El orden por anillos debe coincidir con ordenar todas las distancias."""
+        rnd = random.Random(7)
+        for i in range(60):
+            Station.objects.create(
+                nombre=f"R{i}", direccion="X",
+                latitud=round(4.55 + rnd.random() * 0.2, 6), longitud=round(-74.15 + rnd.random() * 0.2, 6),
+            )
+        geo = StationGeoIndex(celda_km=0.7, ttl=0)
+        punto = (4.63, -74.07)
+
+        obtenido = [pk for _, pk in geo.cercanas(*punto)][:10]
+        esperado = sorted(
+            Station.objects.exclude(latitud=None).values_list("id", "latitud", "longitud"),
+            key=lambda e: haversine_km(*punto, float(e[1]), float(e[2])),
+        )[:10]
+        self.assertEqual(obtenido, [pk for pk, _, _ in esperado])
+
+    def test_radio_limita_resultados(self):
+        geo = StationGeoIndex(celda_km=0.5, ttl=0)
+        dentro = [pk for _, pk in geo.cercanas(4.6101, -74.0800, radio_km=0.8)]
+        self.assertEqual(dentro, [self.centro.id, self.cerca.id])
+
+    def test_senal_invalida_el_indice(self):
+        """Mover una estación se refleja en la siguiente búsqueda."""
+        self.assertEqual(next(indice.cercanas(4.70, -74.05))[1], self.lejos.id)
+        self.centro.latitud, self.centro.longitud = 4.7001, -74.0501
+        self.centro.save()
+        self.assertEqual(next(indice.cercanas(4.7002, -74.0502))[1], self.centro.id)
+
+    def test_endpoint_cercanas_filtra_por_tipo_disponible(self):
+        """Solo devuelve estaciones con una eléctrica disponible dentro del radio."""
+        Bike.objects.create(numero_serie="E-1", tipo="electric", estado="available", station=self.cerca)
+        Bike.objects.create(numero_serie="M-1", tipo="manual", estado="available", station=self.centro)
+
+        response = APIClient().get(
+            "/estaciones/stations/cercanas/", {"lat": 4.6100, "lon": -74.0800, "radio_m": 800, "tipo": "electric"}
+        )
+
+        self.assertEqual(response.status_code, 200)
+        datos = response.json()
+        self.assertEqual([e["nombre"] for e in datos], ["Cerca"])
+        self.assertAlmostEqual(datos[0]["distancia_m"], 556, delta=5)
+
+    def test_endpoint_parametros_invalidos(self):
+        response = APIClient().get("/estaciones/stations/cercanas/", {"lat": "x"})
+        self.assertEqual(response.status_code, 400)
@@ -1,34 +1,72 @@
-from rest_framework import viewsets, filters
+from rest_framework import viewsets, filters, status
+from rest_framework.decorators import action
 from rest_framework.permissions import AllowAny
+from rest_framework.response import Response
 from .models import Station
 from .serializers import StationSerializer  # ← importante
+from .services.availability_service import AvailabilityService
+from .services.geo_index import GeoSearchService
+from .services.station_cache_service import StationCacheService
+
+
+class DisponibilidadOrderingFilter(filters.OrderingFilter):
+    """Con ?exacto=1 ordena por las anotaciones exactas en lugar de los contadores."""
+
+    def get_ordering(self, request, queryset, view):
+        ordering = super().get_ordering(request, queryset, view)
+        if not ordering or not view.usa_conteo_exacto():
+            return ordering
+        mapeo = AvailabilityService.ANOTACIONES_EXACTAS
+        return [
+            ('-' if campo.startswith('-') else '') + mapeo.get(campo.lstrip('-'), campo.lstrip('-'))
+            for campo in ordering
+        ]
+
 
 class StationViewSet(viewsets.ModelViewSet):
     """
     API para gestionar estaciones del sistema.
     Permite listar, crear, editar y eliminar estaciones.
     Incluye filtros por nombre y ordenamiento por campos.
+
+    La disponibilidad se lee de los contadores desnormalizados; con ?exacto=1
+    se cuenta en la misma consulta (anotación condicional sobre bikes).
     """
     queryset = Station.objects.all().order_by('nombre')
     serializer_class = StationSerializer  # ← esta línea arregla el error
     permission_classes = [AllowAny]
 
-    filter_backends = [filters.SearchFilter, filters.OrderingFilter]
+    filter_backends = [filters.SearchFilter, DisponibilidadOrderingFilter]
     search_fields = ['nombre', 'direccion']
     ordering_fields = [
         'nombre', 
         'capacidad_electricas', 
         'capacidad_mecanicas', 
+        'disponibles_electricas',
+        'disponibles_mecanicas',
         'total_disponibles'
     ]
 
+    def list(self, request, *args, **kwargs):
+        """Sin filtros ni ordenamiento, el listado completo sale de la caché."""
+        if not request.query_params:
+            return Response(StationCacheService.listado())
+        return super().list(request, *args, **kwargs)
+
+    def usa_conteo_exacto(self):
+        return self.request.query_params.get('exacto') in ('1', 'true')
+
     def get_queryset(self):
         """
         Permite filtrar por nombre de estación o por disponibilidad mínima.
         Ejemplo:
           /api/stations/?min_disponibles=5
+          /api/stations/?min_disponibles=5&exacto=1
         """
         queryset = super().get_queryset()
+        exacto = self.usa_conteo_exacto()
+        if exacto:
+            queryset = AvailabilityService.anotar_exacto(queryset)
         nombre = self.request.query_params.get('nombre')
         min_disp = self.request.query_params.get('min_disponibles')
 
@@ -36,12 +74,47 @@ class StationViewSet(viewsets.ModelViewSet):
             queryset = queryset.filter(nombre__icontains=nombre)
         if min_disp:
             try:
-                min_disp = int(min_disp)
-                queryset = [
-                    s for s in queryset 
-                    if s.total_disponibles >= min_disp
-                ]
+                # Se resuelve en SQL (HAVING sobre la anotación en modo exacto)
+                campo = 'total_exacto' if exacto else 'total_disponibles'
+                queryset = queryset.filter(**{f'{campo}__gte': int(min_disp)})
             except ValueError:
                 pass
 
         return queryset
+
+    @action(detail=False, methods=["get"])
+    def cercanas(self, request):
+        """
+        Estaciones más cercanas a un punto, con disponibilidad.
+        Ejemplo:
+          /api/stations/cercanas/?lat=4.61&lon=-74.08&radio_m=800&tipo=electric&k=5
+        Con ?todas=1 incluye estaciones sin bicicletas disponibles.
+        """
+        params = request.query_params
+        try:
+            lat = float(params["lat"])
+            lon = float(params["lon"])
+            k = min(int(params.get("k", 5)), 50)
+            radio_m = params.get("radio_m")
+            radio_km = float(radio_m) / 1000 if radio_m else None
+        except (KeyError, ValueError):
+            return Response(
+                {"detail": "Parámetros inválidos: se requieren lat y lon numéricos (k y radio_m opcionales)."},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        try:
+            resultados = GeoSearchService.buscar(
+                lat, lon, k=k, radio_km=radio_km,
+                tipo=params.get("tipo") or None,
+                solo_disponibles=params.get("todas") not in ("1", "true"),
+            )
+        except ValueError as e:
+            return Response({"detail": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+        datos = []
+        for estacion, distancia_km in resultados:
+            fila = self.get_serializer(estacion).data
+            fila["distancia_m"] = round(distancia_km * 1000)
+            datos.append(fila)
+        return Response(datos)
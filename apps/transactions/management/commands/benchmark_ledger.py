@@ -0,0 +1,97 @@
+import random
+import threading
+import time
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db import OperationalError, connection
+from django.db.models import Sum
+
+from apps.transactions.models import WalletTransaccion
+from apps.transactions.services.transaction_service import TransactionService
+from apps.wallet.models import Wallet
+
+
+class Command(BaseCommand):
+    help = ("Lanza cobros y recargas concurrentes sobre una misma wallet y verifica que el saldo final "
+            "cuadre con el historial (sin actualizaciones perdidas ni sobregiros)")
+
+    def add_arguments(self, parser):
+        parser.add_argument('--hilos', type=int, default=8)
+        parser.add_argument('--movimientos', type=int, default=50, help='Movimientos por hilo')
+        parser.add_argument('--saldo-inicial', type=Decimal, default=Decimal("20000"))
+        parser.add_argument('--monto', type=Decimal, default=Decimal("1000"))
+        parser.add_argument('--proporcion-pagos', type=float, default=0.7,
+                            help='Fracción de movimientos que son débitos (el resto son recargas)')
+        parser.add_argument('--conservar', action='store_true', help='No borra el usuario de prueba al terminar')
+
+    def handle(self, *args, **opts):
+        usuario = get_user_model().objects.create_user(
+            email=f"benchmark-ledger-{time.time_ns()}@twomove.local", nombre="Benchmark", apellido="Ledger",
+        )
+        wallet = Wallet.objects.create(usuario=usuario, balance=opts['saldo_inicial'])
+        conteo = {"aplicados": 0, "rechazados": 0, "reintentos": 0}
+        lock = threading.Lock()
+        barrera = threading.Barrier(opts['hilos'])
+
+        def trabajador():
+            local = {"aplicados": 0, "rechazados": 0, "reintentos": 0}
+            mi_wallet = Wallet.objects.get(pk=wallet.pk)
+            barrera.wait()
+            try:
+                for _ in range(opts['movimientos']):
+                    tipo = "PAGO" if random.random() < opts['proporcion_pagos'] else "RECARGA"
+                    while True:
+                        try:
+                            TransactionService.registrar_movimiento(mi_wallet, tipo, opts['monto'], "Benchmark")
+                            local["aplicados"] += 1
+                        except ValueError:
+                            local["rechazados"] += 1
+                        except OperationalError:
+                            # SQLite bloquea la tabla completa; MySQL puede abortar por deadlock
+                            local["reintentos"] += 1
+                            time.sleep(random.uniform(0.001, 0.01))
+                            continue
+                        break
+            finally:
+                connection.close()
+                with lock:
+                    for clave, valor in local.items():
+                        conteo[clave] += valor
+
+        hilos = [threading.Thread(target=trabajador) for _ in range(opts['hilos'])]
+        inicio = time.perf_counter()
+        for hilo in hilos:
+            hilo.start()
+        for hilo in hilos:
+            hilo.join()
+        duracion = time.perf_counter() - inicio
+
+        wallet.refresh_from_db()
+        movimientos = WalletTransaccion.objects.filter(wallet=wallet)
+        suma = movimientos.aggregate(total=Sum("monto"))["total"] or Decimal("0")
+        esperado = opts['saldo_inicial'] + suma
+        ultimo = movimientos.order_by("-id").first()
+        negativos = movimientos.filter(saldo_resultante__lt=0).count()
+
+        self.stdout.write(
+            f"⚡ {conteo['aplicados'] + conteo['rechazados']} movimientos en {duracion:.2f}s "
+            f"({(conteo['aplicados'] + conteo['rechazados']) / duracion:.1f} mov/s, {connection.vendor}): "
+            f"{conteo['aplicados']} aplicados, {conteo['rechazados']} rechazados por fondos, "
+            f"{conteo['reintentos']} reintentos"
+        )
+        consistente = (
+            wallet.balance == esperado
+            and movimientos.count() == conteo['aplicados']
+            and negativos == 0
+            and (ultimo is None or ultimo.saldo_resultante == wallet.balance)
+        )
+        resumen = f"saldo final {wallet.balance} COP, esperado {esperado} COP, {negativos} saldos negativos"
+        if consistente:
+            self.stdout.write(self.style.SUCCESS(f"✅ Ledger consistente: {resumen}"))
+        else:
+            self.stdout.write(self.style.ERROR(f"❌ Ledger inconsistente: {resumen}"))
+
+        if not opts['conservar']:
+            usuario.delete()
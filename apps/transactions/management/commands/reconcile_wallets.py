@@ -0,0 +1,41 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from apps.transactions.services.reconciliation_service import ReconciliationService
+
+
+class Command(BaseCommand):
+    help = "Verifica que el saldo de cada wallet cuadre con su historial de movimientos (incremental por checkpoints)"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--wallet', type=int, action='append', dest='wallets',
+                            help='ID de wallet a revisar (se puede repetir). Por defecto todas.')
+        parser.add_argument('--lote', type=int, default=ReconciliationService.LOTE,
+                            help='Wallets por consulta')
+        parser.add_argument('--completa', action='store_true',
+                            help='Ignora los checkpoints y suma todo el historial (lento)')
+        parser.add_argument('--dry-run', action='store_true', help='No avanza los checkpoints')
+
+    def handle(self, *args, **options):
+        inicio = time.perf_counter()
+        resumen = ReconciliationService.conciliar(
+            options['wallets'],
+            lote=options['lote'],
+            avanzar=not options['dry_run'],
+            completa=options['completa'],
+        )
+        duracion = time.perf_counter() - inicio
+
+        for wallet_id, balance, esperado in resumen["diferencias"]:
+            self.stdout.write(
+                f"🔧 Wallet #{wallet_id}: saldo {balance} COP, historial {esperado} COP "
+                f"(diferencia {balance - esperado} COP)"
+            )
+
+        detalle = (f"{resumen['revisadas']} wallets revisadas en {duracion:.2f}s, "
+                   f"{resumen['checkpoints']} checkpoints actualizados")
+        if resumen["diferencias"]:
+            self.stdout.write(self.style.WARNING(f"⚠️ {len(resumen['diferencias'])} wallets descuadradas; {detalle}."))
+        else:
+            self.stdout.write(self.style.SUCCESS(f"✅ Todos los saldos cuadran; {detalle}."))
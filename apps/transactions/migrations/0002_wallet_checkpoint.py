@@ -0,0 +1,37 @@
+# Generated by Django 5.2.7 on 2026-10-17 20:35
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('transactions', '0001_initial'),
+        ('wallet', '0002_wallet_created_at_wallet_updated_at_and_more'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='WalletCheckpoint',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('balance', models.DecimalField(decimal_places=2, max_digits=12)),
+                ('ultima_transaccion_id', models.BigIntegerField(default=0, help_text='Id del último WalletTransaccion incluido en el balance')),
+                ('actualizado_en', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'verbose_name': 'Checkpoint de Wallet',
+                'verbose_name_plural': 'Checkpoints de Wallet',
+            },
+        ),
+        migrations.AddIndex(
+            model_name='wallettransaccion',
+            index=models.Index(fields=['wallet', 'id'], name='wallettx_wallet_id_idx'),
+        ),
+        migrations.AddField(
+            model_name='walletcheckpoint',
+            name='wallet',
+            field=models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='checkpoint', to='wallet.wallet'),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.7 on 2026-10-17 20:53
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('transactions', '0002_wallet_checkpoint'),
+        ('wallet', '0002_wallet_created_at_wallet_updated_at_and_more'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='wallettransaccion',
+            index=models.Index(fields=['creado_en'], name='wallettx_creado_idx'),
+        ),
+    ]
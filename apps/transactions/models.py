@@ -48,8 +48,46 @@ class WalletTransaccion(models.Model):
 
     class Meta:
         ordering = ['-creado_en']
+        indexes = [
+            # Conciliación incremental: movimientos de una wallet posteriores a su checkpoint
+            models.Index(fields=["wallet", "id"], name="wallettx_wallet_id_idx"),
+            # Exportaciones por rango de fechas (export_parquet)
+            models.Index(fields=["creado_en"], name="wallettx_creado_idx"),
+        ]
         verbose_name = "Transacción de Wallet"
         verbose_name_plural = "Transacciones de Wallet"
 
     def __str__(self):
         return f"{self.tipo} de {self.monto} COP – {self.wallet.usuario.username}"
+
+
+class WalletCheckpoint(models.Model):
+    """
+    Último punto de conciliación verificado de una wallet: su saldo era `balance`
+    incluyendo todos los movimientos hasta `ultima_transaccion_id`. La siguiente
+    conciliación solo suma los movimientos posteriores a ese id.
+    """
+
+    wallet = models.OneToOneField(
+        Wallet,
+        on_delete=models.CASCADE,
+        related_name="checkpoint"
+    )
+    balance = models.DecimalField(
+        max_digits=12,
+        decimal_places=2
+    )
+    ultima_transaccion_id = models.BigIntegerField(
+        default=0,
+        help_text="Id del último WalletTransaccion incluido en el balance"
+    )
+    actualizado_en = models.DateTimeField(
+        auto_now=True
+    )
+
+    class Meta:
+        verbose_name = "Checkpoint de Wallet"
+        verbose_name_plural = "Checkpoints de Wallet"
+
+    def __str__(self):
+        return f"Checkpoint wallet #{self.wallet_id}: {self.balance} COP hasta tx #{self.ultima_transaccion_id}"
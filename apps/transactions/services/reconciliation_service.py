@@ -0,0 +1,123 @@
+from decimal import Decimal
+
+from django.db import connection, transaction
+from django.db.models import F, Max, Q, Sum
+
+from apps.transactions.models import WalletCheckpoint, WalletTransaccion
+from apps.wallet.models import Wallet
+
+
+class ReconciliationService:
+    """
+    Conciliación incremental de saldos: verifica que `Wallet.balance` sea igual
+    al saldo del último checkpoint más los movimientos posteriores a él.
+
+    - Las wallets se recorren por lotes de ids (keyset), sin cargar la tabla.
+    - Por lote se lanza una única agregación, restringida a los movimientos con
+      id mayor que el checkpoint de cada wallet (índice wallet+id): el costo
+      depende de lo que se movió desde la última corrida, no del historial.
+    - La primera pasada no bloquea nada. Solo las wallets que no cuadran se
+      vuelven a revisar con su fila bloqueada (un cobro pudo confirmarse entre
+      las dos lecturas); si siguen sin cuadrar se reportan como diferencia.
+    - Las wallets que cuadran avanzan su checkpoint. Las que no, lo conservan
+      para que la diferencia se siga reportando hasta corregirla.
+
+    Avanzar por id es seguro porque los movimientos de una misma wallet se
+    serializan en TransactionService (el UPDATE bloquea la fila hasta el commit),
+    así que sus ids se confirman en orden.
+    """
+
+    LOTE = 500
+
+    @staticmethod
+    def conciliar(wallet_ids=None, lote=None, avanzar=True, completa=False):
+        """
+        Retorna {"revisadas", "diferencias": [(wallet_id, balance, esperado)], "checkpoints"}.
+        `completa` ignora los checkpoints (auditoría desde el primer movimiento).
+        `avanzar=False` no modifica checkpoints (simulación).
+        """
+        lote = lote or ReconciliationService.LOTE
+        resumen = {"revisadas": 0, "diferencias": [], "checkpoints": 0}
+        wallets = Wallet.objects.order_by("pk")
+        if wallet_ids:
+            wallets = wallets.filter(pk__in=wallet_ids)
+
+        ultimo_id = 0
+        while True:
+            saldos = dict(wallets.filter(pk__gt=ultimo_id).values_list("pk", "balance")[:lote])
+            if not saldos:
+                break
+            ultimo_id = max(saldos)
+            resumen["revisadas"] += len(saldos)
+
+            checkpoints = {} if completa else {
+                wallet_id: (balance, ultima)
+                for wallet_id, balance, ultima in WalletCheckpoint.objects.filter(
+                    wallet_id__in=saldos
+                ).values_list("wallet_id", "balance", "ultima_transaccion_id")
+            }
+            movimientos = ReconciliationService._movimientos(saldos, completa)
+
+            nuevos = []
+            for wallet_id, balance in saldos.items():
+                base, desde = checkpoints.get(wallet_id, (Decimal("0"), 0))
+                suma, ultima = movimientos.get(wallet_id, (Decimal("0"), desde))
+                if balance == base + suma:
+                    if ultima != desde or wallet_id not in checkpoints:
+                        nuevos.append(WalletCheckpoint(wallet_id=wallet_id, balance=balance,
+                                                       ultima_transaccion_id=ultima))
+                    continue
+
+                diferencia = ReconciliationService._revisar_con_bloqueo(wallet_id, base, desde)
+                if isinstance(diferencia, WalletCheckpoint):
+                    nuevos.append(diferencia)
+                else:
+                    resumen["diferencias"].append(diferencia)
+
+            if avanzar and nuevos and not completa:
+                resumen["checkpoints"] += ReconciliationService._guardar_checkpoints(nuevos)
+        return resumen
+
+    @staticmethod
+    def _movimientos(wallet_ids, completa=False):
+        """{wallet_id: (suma, último id)} de los movimientos posteriores al checkpoint de cada wallet."""
+        filas = WalletTransaccion.objects.filter(wallet_id__in=wallet_ids)
+        if not completa:
+            filas = filas.filter(
+                Q(wallet__checkpoint__isnull=True)
+                | Q(id__gt=F("wallet__checkpoint__ultima_transaccion_id"))
+            )
+        return {
+            fila["wallet_id"]: (fila["suma"], fila["ultima"])
+            for fila in filas.order_by().values("wallet_id").annotate(suma=Sum("monto"), ultima=Max("id"))
+        }
+
+    @staticmethod
+    def _revisar_con_bloqueo(wallet_id, base, desde):
+        """
+        Segunda lectura con la fila de la wallet bloqueada (ningún movimiento en
+        curso). Retorna el checkpoint nuevo si cuadra, o (wallet_id, balance, esperado).
+        """
+        with transaction.atomic():
+            balance = Wallet.objects.select_for_update().values_list("balance", flat=True).get(pk=wallet_id)
+            agregado = WalletTransaccion.objects.filter(wallet_id=wallet_id, id__gt=desde).aggregate(
+                suma=Sum("monto"), ultima=Max("id")
+            )
+        esperado = base + (agregado["suma"] or Decimal("0"))
+        if balance == esperado:
+            return WalletCheckpoint(wallet_id=wallet_id, balance=balance,
+                                    ultima_transaccion_id=agregado["ultima"] or desde)
+        print(f"⚠️ Wallet #{wallet_id} descuadrada: saldo {balance} COP, según el historial {esperado} COP")
+        return (wallet_id, balance, esperado)
+
+    @staticmethod
+    def _guardar_checkpoints(checkpoints):
+        # MySQL no admite indicar la columna del conflicto (usa cualquier UNIQUE)
+        unique_fields = ["wallet"] if connection.features.supports_update_conflicts_with_target else None
+        WalletCheckpoint.objects.bulk_create(
+            checkpoints,
+            update_conflicts=True,
+            unique_fields=unique_fields,
+            update_fields=["balance", "ultima_transaccion_id", "actualizado_en"],
+        )
+        return len(checkpoints)
@@ -1,39 +1,62 @@
 # apps/transactions/services/transaction_service.py
 from decimal import Decimal
 from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
 from apps.transactions.models import WalletTransaccion
+from apps.wallet.models import Wallet
 
 
 class TransactionService:
     """
     Servicio central para registrar movimientos en la wallet.
     Maneja el signo, tipos de operación y actualización del saldo de forma segura.
+
+    El saldo nunca se calcula en Python: cada movimiento es un único
+    `UPDATE wallet SET balance = balance + %s WHERE id = %s [AND balance >= %s]`.
+    La validación de fondos y el débito ocurren en la misma sentencia, así que
+    dos cobros simultáneos no pueden dejar la wallet en negativo ni pisarse
+    (lost update). El bloqueo es solo de la fila de esa wallet y dura lo que
+    la transacción que registra el movimiento.
     """
 
+    DEBITOS = ("PAGO", "PENALIDAD")
+    CREDITOS = ("RECARGA", "REEMBOLSO", "AJUSTE")
+
     @staticmethod
     @transaction.atomic
-    def registrar_movimiento(wallet, tipo, monto: Decimal, descripcion=""):
+    def registrar_movimiento(wallet, tipo, monto: Decimal, descripcion="", referencia_externa=None,
+                             permitir_saldo_negativo=False):
+        """
+        Aplica el movimiento y registra el WalletTransaccion con el saldo resultante.
+        `permitir_saldo_negativo` es para cobros que no se pueden rechazar
+        (p. ej. el fin de un viaje ya realizado). Lanza ValueError si el tipo
+        no es válido o no hay fondos suficientes.
+        """
         # Validar tipo
         if tipo not in dict(WalletTransaccion.TIPOS):
             raise ValueError(f"Tipo de transacción no válido: {tipo}")
 
         # Normalizar monto (asegurar que siempre sea positivo internamente)
-        monto = abs(monto)
+        monto = abs(Decimal(monto))
 
         # Determinar el signo según el tipo
-        if tipo in ("PAGO", "PENALIDAD"):
+        if tipo in TransactionService.DEBITOS:
             monto_final = -monto
-        elif tipo in ("RECARGA", "REEMBOLSO", "AJUSTE"):
+        elif tipo in TransactionService.CREDITOS:
             monto_final = monto
         else:
             raise ValueError(f"Tipo de movimiento desconocido: {tipo}")
 
-        # Validar fondos en caso de débito
-        if monto_final < 0 and wallet.balance + monto_final < 0:
+        # Validar fondos y aplicar el movimiento en una sola sentencia
+        filas = Wallet.objects.filter(pk=wallet.pk)
+        if monto_final < 0 and not permitir_saldo_negativo:
+            filas = filas.filter(balance__gte=monto)
+        if not filas.update(balance=F("balance") + monto_final, updated_at=timezone.now()):
             raise ValueError("Saldo insuficiente en la wallet para realizar esta operación.")
 
-        # Calcular nuevo saldo
-        nuevo_saldo = wallet.balance + monto_final
+        # La fila quedó bloqueada por el UPDATE hasta el commit: este saldo es exactamente el nuestro
+        nuevo_saldo = Wallet.objects.filter(pk=wallet.pk).values_list("balance", flat=True).get()
 
         # Registrar la transacción
         transaccion = WalletTransaccion.objects.create(
@@ -41,13 +64,13 @@ class TransactionService:
             tipo=tipo,
             monto=monto_final,
             descripcion=descripcion,
-            saldo_resultante=nuevo_saldo
+            saldo_resultante=nuevo_saldo,
+            referencia_externa=referencia_externa,
         )
 
-        # Actualizar balance de wallet
+        # Mantener coherente la instancia del llamador
         wallet.balance = nuevo_saldo
-        wallet.save(update_fields=["balance"])
 
-        print(f"💰 [{tipo}] {monto_final} COP → Nuevo saldo: {nuevo_saldo} (Usuario: {wallet.usuario.email})")
+        print(f"💰 [{tipo}] {monto_final} COP → Nuevo saldo: {nuevo_saldo} (Wallet #{wallet.pk})")
 
         return transaccion
@@ -0,0 +1,83 @@
+from decimal import Decimal
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.db import connection
+
+from apps.transactions.models import WalletCheckpoint, WalletTransaccion
+from apps.transactions.services.reconciliation_service import ReconciliationService
+from apps.transactions.services.transaction_service import TransactionService
+from apps.wallet.models import Wallet
+
+
+class TestReconciliationService(TestCase):
+    """Pruebas de la conciliación incremental (apps/transactions/services/reconciliation_service.py)."""
+
+    def setUp(self):
+        Usuario = get_user_model()
+        self.wallets = []
+        for i in range(5):
+            usuario = Usuario.objects.create_user(email=f"c{i}@test.com", password="123456",
+                                                  nombre="C", apellido=str(i))
+            wallet = Wallet.objects.create(usuario=usuario)
+            TransactionService.registrar_movimiento(wallet, "RECARGA", Decimal("10000"))
+            TransactionService.registrar_movimiento(wallet, "PAGO", Decimal("2500"))
+            self.wallets.append(wallet)
+
+    def test_saldos_correctos_crean_checkpoints(self):
+        resumen = ReconciliationService.conciliar(lote=2)
+
+        self.assertEqual((resumen["revisadas"], resumen["diferencias"], resumen["checkpoints"]), (5, [], 5))
+        checkpoint = WalletCheckpoint.objects.get(wallet=self.wallets[0])
+        self.assertEqual(checkpoint.balance, Decimal("7500"))
+        self.assertEqual(checkpoint.ultima_transaccion_id,
+                         WalletTransaccion.objects.filter(wallet=self.wallets[0]).order_by("-id").first().id)
+
+    def test_solo_suma_movimientos_posteriores_al_checkpoint(self):
+        ReconciliationService.conciliar()
+        wallet = self.wallets[1]
+        nueva = TransactionService.registrar_movimiento(wallet, "RECARGA", Decimal("500"))
+
+        # Un movimiento anterior al checkpoint que se alterara ya no se vuelve a leer
+        WalletTransaccion.objects.filter(wallet=wallet).exclude(pk=nueva.pk).update(monto=Decimal("1"))
+
+        resumen = ReconciliationService.conciliar()
+        self.assertEqual((resumen["diferencias"], resumen["checkpoints"]), ([], 1))
+        checkpoint = WalletCheckpoint.objects.get(wallet=wallet)
+        self.assertEqual((checkpoint.balance, checkpoint.ultima_transaccion_id), (Decimal("8000"), nueva.id))
+
+        # ...pero una auditoría completa sí lo detecta
+        completa = ReconciliationService.conciliar(completa=True)
+        self.assertEqual([d[0] for d in completa["diferencias"]], [wallet.id])
+
+    def test_reporta_diferencias_sin_avanzar_el_checkpoint(self):
+        ReconciliationService.conciliar()
+        wallet = self.wallets[2]
+        Wallet.objects.filter(pk=wallet.pk).update(balance=Decimal("99999"))
+
+        for _ in range(2):
+            resumen = ReconciliationService.conciliar()
+            self.assertEqual(resumen["diferencias"], [(wallet.id, Decimal("99999"), Decimal("7500"))])
+        self.assertEqual(WalletCheckpoint.objects.get(wallet=wallet).balance, Decimal("7500"))
+
+    def test_consultas_por_lote_constantes(self):
+        ReconciliationService.conciliar()
+        for wallet in self.wallets:
+            TransactionService.registrar_movimiento(wallet, "PAGO", Decimal("100"))
+
+        with CaptureQueriesContext(connection) as consultas:
+            ReconciliationService.conciliar(lote=10, avanzar=False)
+        # saldos del lote + checkpoints + agregación + lote vacío final
+        self.assertEqual(len(consultas), 4)
+
+    def test_comando(self):
+        Wallet.objects.filter(pk=self.wallets[0].pk).update(balance=Decimal("1"))
+        salida = StringIO()
+        call_command("reconcile_wallets", dry_run=True, stdout=salida)
+
+        self.assertIn(f"Wallet #{self.wallets[0].id}: saldo 1.00 COP, historial 7500", salida.getvalue())
+        self.assertIn("1 wallets descuadradas", salida.getvalue())
+        self.assertFalse(WalletCheckpoint.objects.exists())
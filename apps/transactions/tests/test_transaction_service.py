@@ -1,7 +1,10 @@
 from decimal import Decimal
-from django.test import TestCase
+from io import StringIO
+from django.test import TestCase, TransactionTestCase
 from django.contrib.auth import get_user_model
+from django.core.management import call_command
 
+from apps.core.tests.concurrencia import ejecutar_en_paralelo
 from apps.wallet.models import Wallet
 from apps.transactions.models import WalletTransaccion
 from apps.transactions.services.transaction_service import TransactionService
@@ -130,3 +133,83 @@ class TestTransactionService(TestCase):
         self.wallet.refresh_from_db()
         self.assertEqual(self.wallet.balance, Decimal("57000"))
         self.assertEqual(WalletTransaccion.objects.count(), 3)
+
+    # ============================================================
+    # ✅ Caso 8: Instancias desactualizadas no pierden movimientos
+    # ============================================================
+    def test_instancia_desactualizada_no_pisa_el_saldo(self):
+        """El saldo se calcula en la base de datos, no con el balance cargado en memoria."""
+        otra_copia = Wallet.objects.get(pk=self.wallet.pk)
+        TransactionService.registrar_movimiento(self.wallet, "PAGO", Decimal("20000"))
+        tx = TransactionService.registrar_movimiento(otra_copia, "PAGO", Decimal("20000"))
+
+        self.wallet.refresh_from_db()
+        self.assertEqual(self.wallet.balance, Decimal("10000"))
+        self.assertEqual(tx.saldo_resultante, Decimal("10000"))
+        self.assertEqual(otra_copia.balance, Decimal("10000"))
+
+        # La copia aún "cree" tener saldo suficiente, pero el UPDATE condicional lo rechaza
+        with self.assertRaises(ValueError):
+            TransactionService.registrar_movimiento(otra_copia, "PAGO", Decimal("15000"))
+        self.wallet.refresh_from_db()
+        self.assertEqual(self.wallet.balance, Decimal("10000"))
+        self.assertEqual(WalletTransaccion.objects.count(), 2)
+
+    # ============================================================
+    # ✅ Caso 9: Referencia externa y cobros que admiten saldo negativo
+    # ============================================================
+    def test_cobro_con_saldo_negativo_permitido(self):
+        tx = TransactionService.registrar_movimiento(
+            self.wallet, "PAGO", Decimal("60000"), "Fin de viaje",
+            referencia_externa="rental_1", permitir_saldo_negativo=True,
+        )
+        self.wallet.refresh_from_db()
+        self.assertEqual(self.wallet.balance, Decimal("-10000"))
+        self.assertEqual((tx.saldo_resultante, tx.referencia_externa), (Decimal("-10000"), "rental_1"))
+
+
+class TestLedgerConcurrente(TransactionTestCase):
+    """Cobros y recargas simultáneos sobre la misma wallet: ni sobregiros ni actualizaciones perdidas."""
+
+    HILOS = 12
+
+    def setUp(self):
+        self.usuario = get_user_model().objects.create_user(
+            email="concurrente@test.com", password="123456", nombre="Ana", apellido="Ruiz"
+        )
+        self.wallet = Wallet.objects.create(usuario=self.usuario, balance=Decimal("5000"))
+
+    def _mover(self, tipo):
+        wallet = Wallet.objects.get(pk=self.wallet.pk)
+        try:
+            TransactionService.registrar_movimiento(wallet, tipo, Decimal("1000"))
+            return (tipo, "ok")
+        except ValueError:
+            return (tipo, "sin_fondos")
+
+    def test_debitos_simultaneos_no_sobregiran(self):
+        resultados = ejecutar_en_paralelo(self._mover, [("PAGO",)] * self.HILOS)
+        self.assertNotIn("error", resultados)
+
+        self.assertEqual(len(resultados), self.HILOS)
+        self.assertEqual(sum(1 for _, estado in resultados if estado == "ok"), 5)
+        self.wallet.refresh_from_db()
+        self.assertEqual(self.wallet.balance, Decimal("0"))
+        saldos = sorted(WalletTransaccion.objects.values_list("saldo_resultante", flat=True))
+        self.assertEqual(saldos, [Decimal(v) for v in ("0", "1000", "2000", "3000", "4000")])
+
+    def test_debitos_y_recargas_cuadran_con_el_historial(self):
+        tipos = ["PAGO", "RECARGA"] * (self.HILOS // 2)
+        resultados = ejecutar_en_paralelo(self._mover, [(tipo,) for tipo in tipos])
+        self.assertNotIn("error", resultados)
+        self.assertEqual(len(resultados), self.HILOS)
+        self.wallet.refresh_from_db()
+        suma = sum(WalletTransaccion.objects.values_list("monto", flat=True))
+        self.assertEqual(self.wallet.balance, Decimal("5000") + suma)
+        self.assertGreaterEqual(self.wallet.balance, 0)
+        self.assertFalse(WalletTransaccion.objects.filter(saldo_resultante__lt=0).exists())
+
+    def test_comando_benchmark(self):
+        salida = StringIO()
+        call_command("benchmark_ledger", hilos=3, movimientos=5, stdout=salida)
+        self.assertIn("Ledger consistente", salida.getvalue())
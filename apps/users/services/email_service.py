@@ -1,8 +1,11 @@
 # apps/users/services/email_service.py
 from django.conf import settings
-from django.core.mail import send_mail
+from django.core.mail import EmailMultiAlternatives, send_mail
 from django.template.loader import render_to_string
 
+from apps.notifications.services.mail_dispatcher import despachador
+
+
 class EmailService:
 
     @staticmethod
@@ -13,6 +16,7 @@ class EmailService:
             from_email=settings.DEFAULT_FROM_EMAIL,
             recipient_list=[destinatario],
             fail_silently=False,
+            connection=despachador.conexion(),
         )
 
     @staticmethod
@@ -25,4 +29,19 @@ class EmailService:
             recipient_list=[destinatario],
             html_message=html_message,
             fail_silently=False,
+            connection=despachador.conexion(),
         )
+
+    @staticmethod
+    def enviar_correo_masivo(asunto, template, destinatarios):
+        """
+        Envía el mismo template a muchos usuarios con una sola conexión SMTP.
+        `destinatarios` es una lista de (email, contexto). Retorna el resultado
+        de `despachador.enviar_lote` (enviados, fallidos, errores).
+        """
+        mensajes = []
+        for email, context in destinatarios:
+            mensaje = EmailMultiAlternatives(asunto, "", settings.DEFAULT_FROM_EMAIL, [email])
+            mensaje.attach_alternative(render_to_string(template, context), "text/html")
+            mensajes.append(mensaje)
+        return despachador.enviar_lote(mensajes)
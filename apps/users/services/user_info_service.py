@@ -1,9 +1,7 @@
 # apps/users/services/user_info_service.py
 
-from django.db.models import Sum
-from django.utils import timezone
 from apps.wallet.models import Wallet
-from apps.rentals.models import Rental
+from apps.rentals.services.user_stats_service import UserStatsService
 from apps.payment.models import MetodoTarjeta
 from apps.stations.models import Station
 from apps.users.services.email_service import EmailService
@@ -14,31 +12,16 @@ class UserInfoService:
     @staticmethod
     def obtener_dashboard(user):
         wallet, _ = Wallet.objects.get_or_create(usuario=user)
-        hoy = timezone.now()
-        inicio_mes = hoy.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
 
-        viajes_mes = Rental.objects.filter(
-            usuario=user,
-            hora_inicio__gte=inicio_mes,
-            estado="finalizado"
-        ).count()
-
-        minutos = Rental.objects.filter(
-            usuario=user,
-            estado="finalizado",
-            duracion_minutos__isnull=False
-        ).aggregate(total=Sum('duracion_minutos'))['total'] or 0
+        # Resumen de viajes: una fila en lugar de recorrer el historial
+        stats = UserStatsService.obtener(user)
+        viajes_mes = UserStatsService.viajes_del_mes(stats)
 
+        minutos = UserStatsService.minutos_totales(stats)
         horas = minutos // 60
         tiempo_total = f"{horas}h {minutos % 60}min"
 
-        total_viajes = Rental.objects.filter(usuario=user, estado="finalizado").count()
-        nivel = (
-            "Nuevo" if total_viajes == 0 else
-            "Principiante" if total_viajes < 5 else
-            "Intermedio" if total_viajes < 20 else
-            "Avanzado" if total_viajes < 50 else "Experto"
-        )
+        nivel = stats.nivel
 
         return {
             "wallet": wallet,
@@ -7,6 +7,11 @@ class WalletService:
         wallet, _ = Wallet.objects.get_or_create(usuario=usuario)
         return wallet
 
+    @staticmethod
+    def obtener_o_crear_wallet_by_id(usuario_id):
+        wallet, _ = Wallet.objects.get_or_create(usuario_id=usuario_id)
+        return wallet
+
     @staticmethod
     def agregar_saldo(usuario, monto, descripcion="Recarga de saldo"):
         wallet = WalletService.obtener_o_crear_wallet(usuario)
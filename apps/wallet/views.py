@@ -5,6 +5,7 @@ from decimal import Decimal
 from django.contrib.auth.decorators import login_required
 from .services.wallet_service import WalletService
 from apps.wallet.models import Wallet
+from apps.transactions.services.transaction_service import TransactionService
 
 
 @api_view(['GET'])
@@ -41,8 +42,14 @@ def recargar_wallet(request):
 
         # Crear o recuperar la wallet del usuario
         wallet = WalletService.obtener_o_crear_wallet_by_id(usuario_id)
-        wallet.balance += monto_decimal
-        wallet.save()
+
+        # Abono atómico (UPDATE balance = balance + monto) con su registro en el historial
+        TransactionService.registrar_movimiento(
+            wallet=wallet,
+            tipo="RECARGA",
+            monto=monto_decimal,
+            descripcion="Recarga vía payment-service",
+        )
 
         return Response({
             "mensaje": "Recarga aplicada correctamente.",
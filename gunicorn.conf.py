@@ -0,0 +1,16 @@
+# Configuración de Gunicorn (se carga sola al ejecutar `gunicorn TwoMove.wsgi:application`
+# desde la raíz del proyecto).
+
+
+def post_worker_init(worker):
+    """Precarga la caché de datos en cada worker antes de que reciba peticiones."""
+    from django.conf import settings
+
+    if getattr(settings, "CACHE_CALENTAR_AL_INICIAR", True):
+        from django.db import connections
+
+        from apps.core.services.cache_service import cache_datos
+
+        resultado = cache_datos.calentar()
+        connections.close_all()  # no dejar abierta la conexión usada para precargar
+        worker.log.info("Caché precargada: %s", resultado)
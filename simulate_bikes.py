@@ -5,16 +5,16 @@ import json
 import time
 import random
 import paho.mqtt.client as mqtt
-from decimal import Decimal
 
 # ======================================================
 # CONFIGURACIÓN DEL ENTORNO DJANGO
 # ======================================================
-BASE_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), "../../../"))
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
 sys.path.append(BASE_DIR)
 os.environ.setdefault("DJANGO_SETTINGS_MODULE", "TwoMove.settings")
 django.setup()
 
+from django.utils import timezone
 from apps.bikes.models import Bike
 
 # ======================================================
@@ -41,39 +41,47 @@ def simulate_bikes():
     client.loop_start()
 
     print("🔍 Cargando bicicletas activas desde la base de datos...")
-    bikes = list(Bike.objects.filter(estado__in=["available", "reserved", "en_uso"]))
+    bikes = list(
+        Bike.objects.filter(estado__in=["available", "reserved", "en_uso"]).select_related("station")
+    )
     print(f"📦 Bicicletas activas encontradas: {len(bikes)}")
 
     if not bikes:
         print("⚠️ No hay bicicletas activas para simular.")
         return
 
+    # Bike no guarda coordenadas: se parte de su estación y la posición vive en memoria
+    posiciones = {}
+    for bike in bikes:
+        station = bike.station
+        if station and station.latitud is not None and station.longitud is not None:
+            posiciones[bike.id] = [float(station.latitud), float(station.longitud)]
+        else:
+            posiciones[bike.id] = [4.65 + random.uniform(-0.05, 0.05), -74.10 + random.uniform(-0.05, 0.05)]
+    baterias = {bike.id: float(bike.bateria_porcentaje or 100) for bike in bikes}
+
     try:
         while True:
             for bike in bikes:
                 try:
-                    # Convierte Decimals a float para cálculos
-                    lat = float(bike.latitud)
-                    lon = float(bike.longitud)
-
                     # Movimiento aleatorio pequeño (simula desplazamiento)
-                    lat += random.uniform(-0.0002, 0.0002)
-                    lon += random.uniform(-0.0002, 0.0002)
+                    posicion = posiciones[bike.id]
+                    posicion[0] += random.uniform(-0.0002, 0.0002)
+                    posicion[1] += random.uniform(-0.0002, 0.0002)
 
                     # Batería baja lentamente
-                    battery = max(0, getattr(bike, "bateria_porcentaje", 100) - random.uniform(0, 0.2))
-                    bike.bateria_porcentaje = Decimal(str(round(battery, 2)))
-                    bike.latitud = Decimal(str(lat))
-                    bike.longitud = Decimal(str(lon))
-                    bike.save(update_fields=["latitud", "longitud", "bateria_porcentaje"])
+                    baterias[bike.id] = max(0.0, baterias[bike.id] - random.uniform(0, 0.2))
+                    en_uso = bike.estado == "en_uso"
 
-                    # Publicar telemetría MQTT
+                    # Publicar telemetría MQTT (mismo formato que espera mqtt_listener)
                     payload = json.dumps({
                         "bike_id": bike.id,
-                        "latitude": float(bike.latitud),
-                        "longitude": float(bike.longitud),
-                        "battery": float(bike.bateria_porcentaje),
-                        "lock_status": "unlocked" if bike.estado == "en_uso" else "locked",
+                        "lat": round(posicion[0], 6),
+                        "lon": round(posicion[1], 6),
+                        "bateria": round(baterias[bike.id], 2),
+                        "velocidad": round(random.uniform(8, 20), 1) if en_uso else 0,
+                        "lock_status": "UNLOCKED" if en_uso else "LOCKED",
+                        "timestamp": timezone.now().isoformat(),
                     })
                     client.publish(TOPIC, payload)
                     print(f"📡 Enviando telemetría: {payload}")
@@ -73,28 +73,43 @@ function animateNumbers() {
 }
 
 // ==================== AUTO REFRESH ====================
+// Los KPIs vienen de la caché del servidor (KpiService): refrescar seguido no carga la base de datos.
+const INTERVALO_KPIS_MS = 30000;
+
 function initAutoRefresh() {
-  // Actualizar la hora cada segundo
-  const updateInfo = document.querySelector(".update-info span");
-  if (updateInfo) {
-    setInterval(() => {
-      const now = new Date();
-      const formatted = now.toLocaleString("es-CO", {
-        day: "2-digit",
-        month: "2-digit",
-        year: "numeric",
-        hour: "2-digit",
-        minute: "2-digit",
-        second: "2-digit",
-      });
-      updateInfo.textContent = `Última actualización: ${formatted}`;
-    }, 1000);
-  }
+  const updateInfo = document.querySelector(".update-info");
+  const url = updateInfo ? updateInfo.dataset.kpisUrl : null;
+  if (!url) return;
 
-  // Notificación de auto-refresh cada 5 minutos
   setInterval(() => {
-    mostrarNotificacion("Datos actualizados automáticamente", "success");
-  }, 300000); // 5 minutos
+    if (document.hidden) return; // pestaña en segundo plano: no consultar
+    fetch(url, { headers: { Accept: "application/json" }, credentials: "same-origin" })
+      .then((resp) => (resp.ok ? resp.json() : Promise.reject(resp.status)))
+      .then(actualizarKpis)
+      .catch((error) => console.warn("No se pudieron actualizar los KPIs:", error));
+  }, INTERVALO_KPIS_MS);
+}
+
+function actualizarKpis(kpis) {
+  document.querySelectorAll("[data-kpi]").forEach((element) => {
+    const valor = kpis[element.dataset.kpi];
+    if (valor === undefined) return;
+    const numero = Math.floor(parseFloat(valor));
+    element.textContent = (element.dataset.prefijo || "") + numero.toLocaleString("es-CO");
+  });
+
+  const updateInfo = document.querySelector(".update-info span");
+  if (updateInfo && kpis.calculado_en) {
+    const formatted = new Date(kpis.calculado_en).toLocaleString("es-CO", {
+      day: "2-digit",
+      month: "2-digit",
+      year: "numeric",
+      hour: "2-digit",
+      minute: "2-digit",
+      second: "2-digit",
+    });
+    updateInfo.textContent = `Última actualización: ${formatted}`;
+  }
 }
 
 // ==================== INTERACCIONES DE CARDS ====================
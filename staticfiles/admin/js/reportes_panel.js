@@ -74,10 +74,22 @@ function initFormLogic() {
   const tipoSelect = document.getElementById("tipo_reporte");
   const wrapUsuario = document.getElementById("wrap_usuario");
   const usuarioSelect = document.getElementById("usuario_id");
+  const wrapFiltros = document.getElementById("wrap_filtros");
+  const formatoSelect = document.getElementById("formato");
 
-  // Función para alternar visibilidad del selector de usuario
+  // Función para alternar visibilidad del selector de usuario y de los filtros
   window.toggleUsuario = function () {
     const esUsuario = tipoSelect.value === "usuario";
+    const esViajes = tipoSelect.value === "viajes";
+
+    // El detalle de viajes solo existe en CSV; los filtros aplican a los CSV de viajes
+    if (esViajes) {
+      formatoSelect.value = "csv";
+    }
+    if (wrapFiltros) {
+      wrapFiltros.style.display =
+        esViajes || (esUsuario && formatoSelect.value === "csv") ? "grid" : "none";
+    }
 
     if (esUsuario) {
       wrapUsuario.style.display = "block";
@@ -98,8 +110,9 @@ function initFormLogic() {
     }
   };
 
-  // Escuchar cambios en el tipo de reporte
+  // Escuchar cambios en el tipo de reporte y el formato
   tipoSelect.addEventListener("change", toggleUsuario);
+  formatoSelect.addEventListener("change", toggleUsuario);
 
   // Ejecutar al cargar
   toggleUsuario();
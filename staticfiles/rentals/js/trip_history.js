@@ -4,8 +4,12 @@ console.log("1. Archivo trip_history.js cargado");
 const API_BASE = "/alquileres/api/rentals";
 
 // Variables globales
-let allTrips = [];
-let filteredTrips = [];
+// El servidor pagina por cursor: cursores[n] es el cursor que devuelve la página n+1
+let trips = [];
+let cursores = [null];
+let siguienteCursor = null;
+let totalRegistros = null;
+let filtros = {};
 let currentPage = 1;
 const tripsPerPage = 10;
 
@@ -19,8 +23,9 @@ document.addEventListener("DOMContentLoaded", function () {
   // Inicializar scroll header
   initScrollHeader();
 
-  // Cargar historial de viajes
+  // Cargar historial de viajes y estadísticas (endpoints separados)
   cargarHistorial();
+  cargarEstadisticas();
 
   // Event Listeners
   initEventListeners();
@@ -118,12 +123,20 @@ function initEventListeners() {
 
 // ==================== CARGAR HISTORIAL ====================
 async function cargarHistorial() {
-  console.log("3. Cargando historial de viajes...");
+  console.log(`3. Cargando página ${currentPage} del historial...`);
   const listContainer = document.getElementById("tripsList");
 
+  const params = new URLSearchParams({ per_page: tripsPerPage, ...filtros });
+  const cursor = cursores[currentPage - 1];
+  if (cursor) {
+    params.set("cursor", cursor);
+  } else {
+    // El total solo se pide en la primera página (un COUNT en el servidor)
+    params.set("total", "1");
+  }
+
   try {
-    // ✅ URL correcta de la API
-    const response = await fetch(`${API_BASE}/historial/`, {
+    const response = await fetch(`${API_BASE}/historial/?${params.toString()}`, {
       credentials: "include",
     });
 
@@ -134,19 +147,14 @@ async function cargarHistorial() {
     const data = await response.json();
     console.log("4. Datos obtenidos del servidor:", data);
 
-    // ✅ Usar la estructura correcta de la respuesta
-    allTrips = data.viajes || [];
-    filteredTrips = [...allTrips];
-
-    console.log(`5. Total de viajes cargados: ${allTrips.length}`);
-
-    // Actualizar estadísticas con los datos reales de la API
-    if (data.estadisticas) {
-      document.getElementById("totalViajes").textContent = data.estadisticas.total_viajes;
-      document.getElementById("totalGastado").textContent = 
-        `$${data.estadisticas.total_gastado.toLocaleString("es-CO")}`;
+    trips = data.viajes || [];
+    siguienteCursor = data.paginacion ? data.paginacion.siguiente_cursor : null;
+    if (data.paginacion && data.paginacion.total_registros !== undefined) {
+      totalRegistros = data.paginacion.total_registros;
     }
 
+    console.log(`5. Viajes recibidos en esta página: ${trips.length}`);
+
     // Mostrar viajes
     mostrarViajes();
   } catch (error) {
@@ -161,18 +169,38 @@ async function cargarHistorial() {
   }
 }
 
+// ==================== ESTADÍSTICAS ====================
+async function cargarEstadisticas() {
+  try {
+    const response = await fetch(`${API_BASE}/historial/estadisticas/`, {
+      credentials: "include",
+    });
+    if (!response.ok) {
+      throw new Error(`Error HTTP ${response.status}`);
+    }
+
+    const estadisticas = await response.json();
+    document.getElementById("totalViajes").textContent = estadisticas.total_viajes;
+    document.getElementById("totalGastado").textContent =
+      `$${estadisticas.total_gastado.toLocaleString("es-CO")}`;
+  } catch (error) {
+    console.error("❌ Error al cargar estadísticas:", error);
+  }
+}
+
 // ==================== MOSTRAR VIAJES ====================
 function mostrarViajes() {
   const listContainer = document.getElementById("tripsList");
   const tripsCount = document.getElementById("tripsCount");
 
   // Actualizar contador
-  tripsCount.textContent = `${filteredTrips.length} viaje${filteredTrips.length !== 1 ? "s" : ""}`;
+  const total = totalRegistros !== null ? totalRegistros : trips.length;
+  tripsCount.textContent = `${total} viaje${total !== 1 ? "s" : ""}`;
 
-  console.log(`6. Mostrando ${filteredTrips.length} viajes`);
+  console.log(`6. Mostrando ${trips.length} viajes`);
 
   // Si no hay viajes
-  if (filteredTrips.length === 0) {
+  if (trips.length === 0) {
     listContainer.innerHTML = `
       <div class="empty-state">
         <div class="empty-state-icon">📭</div>
@@ -184,18 +212,11 @@ function mostrarViajes() {
     return;
   }
 
-  // Calcular paginación
-  const startIndex = (currentPage - 1) * tripsPerPage;
-  const endIndex = startIndex + tripsPerPage;
-  const tripsToShow = filteredTrips.slice(startIndex, endIndex);
-
-  console.log(`7. Mostrando viajes ${startIndex + 1} a ${Math.min(endIndex, filteredTrips.length)}`);
-
   // Limpiar contenedor
   listContainer.innerHTML = "";
 
   // Crear cards de viajes
-  tripsToShow.forEach((trip) => {
+  trips.forEach((trip) => {
     const tripCard = crearTripCard(trip);
     listContainer.appendChild(tripCard);
   });
@@ -269,55 +290,47 @@ function crearTripCard(trip) {
 }
 
 // ==================== APLICAR FILTROS ====================
-function aplicarFiltros() {
-  console.log("8. Aplicando filtros...");
-
-  const filterEstado = document.getElementById("filterEstado").value;
-  const filterTipo = document.getElementById("filterTipo").value;
-  const filterFecha = document.getElementById("filterFecha").value;
-
-  filteredTrips = allTrips.filter((trip) => {
-    // Filtro por estado
-    if (filterEstado && trip.estado !== filterEstado) {
-      return false;
-    }
+function leerFiltros() {
+  const nuevos = {
+    estado: document.getElementById("filterEstado").value,
+    tipo_viaje: document.getElementById("filterTipo").value,
+    fecha: document.getElementById("filterFecha").value,
+  };
+  // Solo se envían los filtros con valor
+  return Object.fromEntries(Object.entries(nuevos).filter(([, valor]) => valor));
+}
 
-    // Filtro por tipo
-    if (filterTipo && trip.tipo_viaje !== filterTipo) {
-      return false;
-    }
+function reiniciarPaginacion() {
+  cursores = [null];
+  siguienteCursor = null;
+  totalRegistros = null;
+  currentPage = 1;
+}
 
-    // Filtro por fecha
-    if (filterFecha) {
-      const tripDate = trip.hora_fin 
-        ? new Date(trip.hora_fin).toISOString().split("T")[0]
-        : new Date(trip.hora_inicio).toISOString().split("T")[0];
-      
-      if (tripDate !== filterFecha) {
-        return false;
-      }
-    }
+async function aplicarFiltros() {
+  console.log("8. Aplicando filtros...");
 
-    return true;
-  });
+  // Los filtros se aplican en el servidor: se vuelve a la primera página
+  filtros = leerFiltros();
+  reiniciarPaginacion();
+  await cargarHistorial();
 
-  currentPage = 1;
-  mostrarViajes();
+  const total = totalRegistros !== null ? totalRegistros : trips.length;
   mostrarAlerta(
-    `Filtros aplicados: ${filteredTrips.length} viaje${filteredTrips.length !== 1 ? "s" : ""} encontrado${filteredTrips.length !== 1 ? "s" : ""}`,
+    `Filtros aplicados: ${total} viaje${total !== 1 ? "s" : ""} encontrado${total !== 1 ? "s" : ""}`,
     "success"
   );
 }
 
 // ==================== LIMPIAR FILTROS ====================
-function limpiarFiltros() {
+async function limpiarFiltros() {
   document.getElementById("filterEstado").value = "";
   document.getElementById("filterTipo").value = "";
   document.getElementById("filterFecha").value = "";
 
-  filteredTrips = [...allTrips];
-  currentPage = 1;
-  mostrarViajes();
+  filtros = {};
+  reiniciarPaginacion();
+  await cargarHistorial();
   mostrarAlerta("Filtros limpiados", "success");
 }
 
@@ -328,23 +341,27 @@ function actualizarPaginacion() {
   const btnPrevPage = document.getElementById("btnPrevPage");
   const btnNextPage = document.getElementById("btnNextPage");
 
-  const totalPages = Math.ceil(filteredTrips.length / tripsPerPage);
-
-  if (totalPages <= 1) {
+  if (currentPage === 1 && !siguienteCursor) {
     pagination.style.display = "none";
     return;
   }
 
   pagination.style.display = "flex";
-  paginationInfo.textContent = `Página ${currentPage} de ${totalPages}`;
+  paginationInfo.textContent = totalRegistros !== null
+    ? `Página ${currentPage} de ${Math.max(1, Math.ceil(totalRegistros / tripsPerPage))}`
+    : `Página ${currentPage}`;
 
   btnPrevPage.disabled = currentPage === 1;
-  btnNextPage.disabled = currentPage === totalPages;
+  btnNextPage.disabled = !siguienteCursor;
 }
 
-function cambiarPagina(direction) {
-  currentPage += direction;
-  mostrarViajes();
+async function cambiarPagina(direction) {
+  if (direction > 0) {
+    if (!siguienteCursor) return;
+    cursores[currentPage] = siguienteCursor;
+  }
+  currentPage = Math.max(1, currentPage + direction);
+  await cargarHistorial();
   window.scrollTo({ top: 0, behavior: "smooth" });
 }
 